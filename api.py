@@ -1,7 +1,7 @@
 # main.py
 from fastapi import FastAPI, HTTPException, Request, Depends
 from pydantic import BaseModel, Field, validator
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorCollection
 from typing import Optional, Any
 import os
 from dotenv import load_dotenv
@@ -13,12 +13,23 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from eth_utils import is_address
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import json
 import random
 import string
 import re # Untuk validasi regex kode referral
+import asyncio
+import time
 from datetime import datetime # Import datetime
+from app.utils.bloom_filter import BloomFilter
+from app.db.batch_writer import BatchInsertWriter
+from app.db.backends import AnyAsyncMongoClient, MONGO_DRIVERS, close_client, create_client
+from app.utils.single_flight import SingleFlight
+from app.utils.server_timing import ServerTimingMiddleware, MongoTimingListener, instrument_redis, aiohttp_trace_config
+from app.utils.metrics import MetricsMiddleware, MongoPoolMetricsListener, register_redis_pool, registry as metrics_registry, CONTENT_TYPE_LATEST
+from app.utils.loop_lag import LoopLagMonitor
+from app.utils.health import CircuitBreaker, CircuitOpenError, HealthMonitor
+from app.utils.log_queue import setup_queue_logging
 
 # Load environment variables from .env file
 load_dotenv()
@@ -33,21 +44,51 @@ if not ALCHEMY_API_KEY:
     # Ini akan menghentikan aplikasi jika API Key tidak ada, yang merupakan perilaku yang baik.
     logger.critical("FATAL: ALCHEMY_API_KEY environment variable not set.")
     raise ValueError("ALCHEMY_API_KEY environment variable not set.")
-ALCHEMY_URL = f"https://base-mainnet.g.alchemy.com/v2/{ALCHEMY_API_KEY}"
+ALCHEMY_URL = os.getenv("ALCHEMY_RPC_URL") or f"https://base-mainnet.g.alchemy.com/v2/{ALCHEMY_API_KEY}" # ALCHEMY_RPC_URL: stub load test
 
 REFERRAL_CODE_LENGTH = 8
+REFERRAL_CODE_INSERT_ATTEMPTS = 3 # Kode baru dibuat ulang jika insert bentrok di unique index
 CACHE_EXPIRY_SECONDS = 3600 # 1 jam untuk cache Redis
 
-# Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler() # Output ke console
-        # Anda bisa menambahkan FileHandler di sini jika ingin log ke file
-        # logging.FileHandler("api.log"),
-    ]
-)
+# Bloom filter untuk cek keberadaan wallet & kode referral (lihat bagian "Bloom Filter")
+BLOOM_CAPACITY = int(os.getenv("BLOOM_CAPACITY", "1000000"))
+BLOOM_ERROR_RATE = float(os.getenv("BLOOM_ERROR_RATE", "0.01"))
+# Rebuild penuh = scan seluruh user_registrations per worker (lihat README "Bloom Filter").
+# 0 (default): hanya saat startup, setelah pub/sub terputus, atau saat filter melewati kapasitas.
+BLOOM_REBUILD_INTERVAL_SECONDS = int(os.getenv("BLOOM_REBUILD_INTERVAL_SECONDS", "0"))
+BLOOM_SYNC_CHANNEL = "bloom:registrations"
+
+# Group-commit insert registrasi: insert bersamaan digabung jadi satu insert_many
+REGISTRATION_BATCH_MAX_SIZE = int(os.getenv("REGISTRATION_BATCH_MAX_SIZE", "500"))
+REGISTRATION_BATCH_MAX_DELAY_MS = float(os.getenv("REGISTRATION_BATCH_MAX_DELAY_MS", "5"))
+
+# Single-flight registrasi per wallet: marker Redis selama registrasi berjalan di worker mana pun
+REGISTRATION_INFLIGHT_TTL_MS = int(os.getenv("REGISTRATION_INFLIGHT_TTL_MS", "15000"))
+
+# Log line `request_timing` (Mongo, Redis, Alchemy) per request; header Server-Timing hanya jika diminta
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes")
+SERVER_TIMING_EXPOSE_HEADER = os.getenv("SERVER_TIMING_EXPOSE_HEADER", "false").lower() in ("1", "true", "yes")
+
+# Endpoint /metrics (format teks Prometheus): latency per route, in-flight, pool, lag event loop
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100")) # 0 = watchdog mati
+
+# Health probe background + circuit breaker MongoDB/Redis: circuit terbuka = request langsung 503,
+# /health dari hasil probe terakhir (lihat bagian "Health Probe & Circuit Breaker")
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "1"))
+HEALTH_PROBE_TIMEOUT_SECONDS = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "1"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "2"))
+CIRCUIT_RECOVERY_THRESHOLD = int(os.getenv("CIRCUIT_RECOVERY_THRESHOLD", "2"))
+REDIS_SOCKET_TIMEOUT_SECONDS = float(os.getenv("REDIS_SOCKET_TIMEOUT_SECONDS", "2"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGODB_DRIVER = os.getenv("MONGODB_DRIVER", "motor") # Sama dengan settings.MONGODB_DRIVER app utama: "motor" | "pymongo"
+if MONGODB_DRIVER not in MONGO_DRIVERS:
+    raise ValueError(f"MONGODB_DRIVER must be one of {MONGO_DRIVERS}, got '{MONGODB_DRIVER}'")
+
+# Logging setup: record masuk queue, thread QueueListener yang memformat dan menulis ke console.
+# Log INFO per call site dibatasi LOG_SAMPLE_MAX_PER_SECOND baris/detik (0 = tanpa sampling)
+LOG_SAMPLE_MAX_PER_SECOND = int(os.getenv("LOG_SAMPLE_MAX_PER_SECOND", "20"))
+setup_queue_logging("INFO", sample_max_per_second=LOG_SAMPLE_MAX_PER_SECOND)
 logger = logging.getLogger(__name__)
 
 # FastAPI app initialization
@@ -72,46 +113,243 @@ limiter = Limiter(key_func=get_remote_address, default_limits=["100/hour", "20/m
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+if SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware, logger=logger, expose_header=SERVER_TIMING_EXPOSE_HEADER)
+alchemy_trace_configs = [aiohttp_trace_config()] if SERVER_TIMING_ENABLED else []
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+loop_lag_monitor = LoopLagMonitor(block_threshold=LOOP_BLOCK_THRESHOLD_MS / 1000 or None, logger=logger) if METRICS_ENABLED else None
+
 
 # Database and Cache Client Placeholders
 # Akan diinisialisasi saat startup
-mongo_client: Optional[AsyncIOMotorClient] = None
+mongo_client: Optional[AnyAsyncMongoClient] = None
 db: Optional[AsyncIOMotorDatabase] = None
 collection: Optional[AsyncIOMotorCollection] = None
 redis_client: Optional[redis.Redis] = None
+registration_writer: Optional[BatchInsertWriter] = None
+registration_flight = SingleFlight() # Coalescing registrasi wallet yang sama dalam proses ini
+
+# --- Health Probe & Circuit Breaker ---
+# Probe background mem-ping MongoDB dan Redis setiap HEALTH_PROBE_INTERVAL_SECONDS. Setelah
+# CIRCUIT_FAILURE_THRESHOLD kegagalan berturut-turut, dependency di-resolve ke 503 tanpa I/O,
+# sehingga outage tidak berubah menjadi antrean request yang menunggu timeout.
+mongo_circuit = CircuitBreaker(
+    "mongodb", failure_threshold=CIRCUIT_FAILURE_THRESHOLD, recovery_threshold=CIRCUIT_RECOVERY_THRESHOLD,
+    retry_after=HEALTH_PROBE_INTERVAL_SECONDS, logger=logger
+)
+redis_circuit = CircuitBreaker(
+    "redis", failure_threshold=CIRCUIT_FAILURE_THRESHOLD, recovery_threshold=CIRCUIT_RECOVERY_THRESHOLD,
+    retry_after=HEALTH_PROBE_INTERVAL_SECONDS, logger=logger
+)
+
+async def ping_mongo() -> None:
+    if mongo_client is None:
+        raise ConnectionError("MongoDB client not initialized")
+    await mongo_client.admin.command("ping")
+
+async def ping_redis() -> None:
+    if redis_client is None:
+        raise ConnectionError("Redis client not initialized")
+    await redis_client.ping()
+
+health_monitor = HealthMonitor(interval=HEALTH_PROBE_INTERVAL_SECONDS, logger=logger)
+health_monitor.add(mongo_circuit, ping_mongo, timeout=HEALTH_PROBE_TIMEOUT_SECONDS)
+health_monitor.add(redis_circuit, ping_redis, timeout=HEALTH_PROBE_TIMEOUT_SECONDS)
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"{exc.dependency} is temporarily unavailable, please try again."},
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+# --- Bloom Filter ---
+# Filter in-process untuk wallet terdaftar dan kode referral yang sudah diterbitkan.
+# Filter dibangun penuh dari MongoDB saat startup, lalu di-update inkremental saat insert
+# dan disinkronkan antar worker lewat Redis pub/sub (BLOOM_SYNC_CHANNEL), jadi hanya
+# eventually consistent: registrasi di worker lain bisa belum terlihat. Miss hanya dipakai untuk
+# melewati lookup yang dijaga unique index (wallet baru, kode referral baru), tidak pernah
+# untuk menolak input user.
+wallet_bloom = BloomFilter(BLOOM_CAPACITY, BLOOM_ERROR_RATE)
+referral_bloom = BloomFilter(BLOOM_CAPACITY, BLOOM_ERROR_RATE)
+bloom_ready = False # Miss hanya dipercaya setelah rebuild pertama selesai
+bloom_rebuild_pending: Optional[list] = None # Registrasi yang masuk selama rebuild berjalan
+bloom_sync_task: Optional[asyncio.Task] = None
+
+def bloom_add_registration(wallet_address: str, referral_code: Optional[str]) -> None:
+    wallet_bloom.add(wallet_address)
+    if referral_code:
+        referral_bloom.add(referral_code)
+    if bloom_rebuild_pending is not None:
+        bloom_rebuild_pending.append((wallet_address, referral_code))
+
+BLOOM_METRIC_STATS = ("items", "fillRatio", "estimatedFalsePositiveRate", "memoryBytes")
+
+def bloom_metric_samples() -> list:
+    # Pengganti endpoint /bloom/report: /metrics sudah dibatasi di ingress, endpoint publik tidak
+    samples = []
+    for name, bloom in (("wallets", wallet_bloom), ("referral_codes", referral_bloom)):
+        report = bloom.report()
+        samples.extend(((name, stat), float(report[stat])) for stat in BLOOM_METRIC_STATS)
+    return samples
+
+if METRICS_ENABLED:
+    metrics_registry.callback_gauge("bloom_filter", "In-process Bloom filter stats (items, fill ratio, estimated FPR, memory)", bloom_metric_samples, ("filter", "stat"))
+    metrics_registry.callback_gauge("bloom_filter_ready", "1 once the first Bloom filter rebuild has completed", lambda: [((), float(bloom_ready))])
+
+async def rebuild_bloom_filters(current_collection: AsyncIOMotorCollection) -> None:
+    """Membangun ulang kedua filter dari MongoDB lalu menukarnya secara atomik."""
+    global wallet_bloom, referral_bloom, bloom_ready, bloom_rebuild_pending
+    started = time.perf_counter()
+    bloom_rebuild_pending = []
+    try:
+        doc_count = await current_collection.estimated_document_count()
+        capacity = max(BLOOM_CAPACITY, doc_count * 2)
+        new_wallet_bloom = BloomFilter(capacity, BLOOM_ERROR_RATE)
+        new_referral_bloom = BloomFilter(capacity, BLOOM_ERROR_RATE)
+        cursor = current_collection.find(
+            {}, {"_id": 0, "wallet_address": 1, "user_referral_code": 1}
+        ).batch_size(10000)
+        async for doc in cursor:
+            new_wallet_bloom.add(doc["wallet_address"])
+            if doc.get("user_referral_code"):
+                new_referral_bloom.add(doc["user_referral_code"])
+        # Registrasi yang terjadi selama scan mungkin terlewat oleh cursor
+        for wallet_address, referral_code in bloom_rebuild_pending:
+            new_wallet_bloom.add(wallet_address)
+            if referral_code:
+                new_referral_bloom.add(referral_code)
+        wallet_bloom, referral_bloom = new_wallet_bloom, new_referral_bloom
+        bloom_ready = True
+    finally:
+        bloom_rebuild_pending = None
+    logger.info(
+        f"Bloom filters rebuilt in {time.perf_counter() - started:.2f}s. "
+        f"Wallets: {wallet_bloom.report()}, Referral codes: {referral_bloom.report()}"
+    )
+
+def bloom_rebuild_due(seconds_since_rebuild: float) -> bool:
+    # Melewati kapasitas membuat FPR naik di atas target; rebuild memperbesar kapasitas (doc_count * 2)
+    if len(wallet_bloom) > wallet_bloom.capacity or len(referral_bloom) > referral_bloom.capacity:
+        return True
+    return BLOOM_REBUILD_INTERVAL_SECONDS > 0 and seconds_since_rebuild >= BLOOM_REBUILD_INTERVAL_SECONDS
+
+async def bloom_sync_loop() -> None:
+    """Menerima registrasi dari worker lain lewat Redis pub/sub; rebuild penuh hanya bila ada celah atau filter penuh."""
+    last_rebuild = time.monotonic()
+    reconnect_delay = 1.0
+    while True:
+        pubsub = None
+        try:
+            pubsub = redis_client.pubsub()
+            await pubsub.subscribe(BLOOM_SYNC_CHANNEL)
+            if not bloom_ready or reconnect_delay > 1.0:
+                # Pesan selama koneksi putus hilang (pub/sub tidak menyimpan pesan), jadi rebuild penuh
+                await rebuild_bloom_filters(collection)
+                last_rebuild = time.monotonic()
+            reconnect_delay = 1.0
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message.get("type") == "message":
+                    try:
+                        payload = json.loads(message["data"])
+                        bloom_add_registration(payload["w"], payload.get("r"))
+                    except (json.JSONDecodeError, KeyError, TypeError) as e:
+                        logger.warning(f"Ignoring malformed bloom sync message {message.get('data')!r}: {e}")
+                if bloom_rebuild_due(time.monotonic() - last_rebuild):
+                    await rebuild_bloom_filters(collection)
+                    last_rebuild = time.monotonic()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Bloom sync loop error: {e}. Reconnecting in {reconnect_delay:.0f}s.")
+            await asyncio.sleep(reconnect_delay)
+            reconnect_delay = min(reconnect_delay * 2, 30.0)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+async def publish_bloom_registration(current_redis: redis.Redis, wallet_address: str, referral_code: Optional[str]) -> None:
+    bloom_add_registration(wallet_address, referral_code)
+    try:
+        await current_redis.publish(BLOOM_SYNC_CHANNEL, json.dumps({"w": wallet_address, "r": referral_code}))
+    except Exception as e:
+        logger.error(f"Failed to publish bloom sync message for {wallet_address}: {e}")
 
 # --- Startup and Shutdown Events ---
 @app.on_event("startup")
 async def startup_event():
-    global mongo_client, db, collection, redis_client
+    global mongo_client, db, collection, redis_client, bloom_sync_task, registration_writer
     logger.info("API starting up...")
+    if loop_lag_monitor is not None:
+        loop_lag_monitor.start()
     try:
         # Initialize MongoDB connection
-        logger.info(f"Connecting to MongoDB at {MONGO_URI}...")
-        mongo_client = AsyncIOMotorClient(MONGO_URI)
+        logger.info("Connecting to MongoDB at %s (driver: %s)...", MONGO_URI, MONGODB_DRIVER)
+        mongo_event_listeners = [MongoTimingListener()] if SERVER_TIMING_ENABLED else []
+        if METRICS_ENABLED:
+            mongo_event_listeners.append(MongoPoolMetricsListener())
+        mongo_client = create_client(
+            MONGODB_DRIVER, MONGO_URI,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS, event_listeners=mongo_event_listeners,
+        )
         db = mongo_client[DB_NAME]
         collection = db[COLLECTION_NAME]
-        # Ensure indexes are created (Motor handles this efficiently)
+        # Ensure indexes are created
         await collection.create_index("wallet_address", unique=True)
         await collection.create_index("user_referral_code", unique=True)
         await collection.create_index("invited_by_referral_code") # Indeks untuk query referral
-        logger.info(f"MongoDB connected. Database: {DB_NAME}, Collection: {COLLECTION_NAME}. Indexes ensured.")
+        registration_writer = BatchInsertWriter(
+            collection,
+            max_batch_size=REGISTRATION_BATCH_MAX_SIZE,
+            max_delay_ms=REGISTRATION_BATCH_MAX_DELAY_MS
+        )
+        logger.info("MongoDB connected. Database: %s, Collection: %s. Indexes ensured.", DB_NAME, COLLECTION_NAME)
 
         # Initialize Redis connection
-        logger.info(f"Connecting to Redis at {REDIS_URI}...")
-        redis_client = redis.Redis.from_url(REDIS_URI, decode_responses=True)
+        logger.info("Connecting to Redis at %s...", REDIS_URI)
+        redis_client = redis.Redis.from_url(
+            REDIS_URI, decode_responses=True,
+            socket_timeout=REDIS_SOCKET_TIMEOUT_SECONDS, socket_connect_timeout=REDIS_SOCKET_TIMEOUT_SECONDS
+        )
         await redis_client.ping() # Test connection
+        if SERVER_TIMING_ENABLED:
+            instrument_redis(redis_client)
+        if METRICS_ENABLED:
+            register_redis_pool("registrations", lambda: redis_client)
         logger.info("Redis connected successfully.")
 
+        # Rebuild awal Bloom filter dijalankan oleh sync loop; sampai selesai, semua lookup tetap ke cache/DB
+        bloom_sync_task = asyncio.create_task(bloom_sync_loop())
+
     except Exception as e:
         logger.error(f"FATAL: Error during startup: {e}", exc_info=True)
         # Menghentikan aplikasi jika koneksi penting gagal adalah praktik yang baik
         # raise SystemExit(f"Failed to connect to critical services: {e}")
 
+    # Tetap dijalankan walau startup gagal: circuit terbuka dan /health melaporkan dependency yang down
+    await health_monitor.run_once()
+    health_monitor.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("API shutting down...")
+    await health_monitor.stop()
+    if bloom_sync_task:
+        bloom_sync_task.cancel()
+    if loop_lag_monitor is not None:
+        await loop_lag_monitor.stop()
+    if registration_writer:
+        try:
+            await registration_writer.close()
+        except Exception as e:
+            logger.error(f"Error flushing pending registration inserts: {e}", exc_info=True)
     if redis_client:
         try:
             await redis_client.close()
@@ -120,7 +358,7 @@ async def shutdown_event():
             logger.error(f"Error closing Redis connection: {e}", exc_info=True)
     if mongo_client:
         try:
-            mongo_client.close()
+            await close_client(mongo_client)
             logger.info("MongoDB connection closed.")
         except Exception as e:
             logger.error(f"Error closing MongoDB connection: {e}", exc_info=True)
@@ -143,6 +381,8 @@ async def get_unique_referral_code(
     max_retries = 10 
     for _ in range(max_retries):
         code = generate_referral_code(length)
+        if bloom_ready and code not in referral_bloom:
+            return code # Collision dengan kode dari worker lain ditangkap unique index saat insert (retry)
         if await current_collection.find_one({"user_referral_code": code}) is None:
             return code
     logger.error(f"Failed to generate a unique referral code after {max_retries} retries.")
@@ -171,18 +411,21 @@ class RegistrationResponse(BaseModel):
 
 # --- Dependency to check service readiness ---
 async def get_db() -> AsyncIOMotorDatabase: # Ganti nama agar lebih generik
+    mongo_circuit.check() # Circuit terbuka: 503 dalam mikrodetik, bukan menunggu server selection
     if db is None: # Perbaikan di sini
         logger.error("MongoDB database client not initialized.")
         raise HTTPException(status_code=503, detail="Database service temporarily unavailable.")
     return db
 
 async def get_collection() -> AsyncIOMotorCollection: # Dependency baru untuk collection
+    mongo_circuit.check()
     if collection is None: # Perbaikan di sini
         logger.error("MongoDB collection not initialized.")
         raise HTTPException(status_code=503, detail="Database service temporarily unavailable.")
     return collection
 
 async def get_redis() -> redis.Redis: # Ganti nama agar lebih generik
+    redis_circuit.check()
     if redis_client is None: # Perbaikan di sini
         logger.error("Redis client not initialized.")
         raise HTTPException(status_code=503, detail="Cache service temporarily unavailable.")
@@ -191,41 +434,19 @@ async def get_redis() -> redis.Redis: # Ganti nama agar lebih generik
 
 # --- Endpoints ---
 @app.get("/health", summary="Check API Health Status")
-async def health_check(
-    # Menggunakan dependency yang sudah diperbaiki
-    current_db: AsyncIOMotorDatabase = Depends(get_db), 
-    current_redis: redis.Redis = Depends(get_redis)
-):
+async def health_check():
     """
-    Performs a health check on the API and its connected services (MongoDB, Redis).
+    Reports the health of the API and its connected services (MongoDB, Redis) from the latest
+    background probe results. No I/O per call, so it stays fast while a dependency is down.
     """
-    mongo_ok = False
-    redis_ok = False
-    try:
-        await current_db.command('ping')
-        mongo_ok = True
-    except Exception as e:
-        logger.error(f"MongoDB ping failed: {e}")
-    
-    try:
-        await current_redis.ping()
-        redis_ok = True
-    except Exception as e:
-        logger.error(f"Redis ping failed: {e}")
-
-    if mongo_ok and redis_ok:
-        return {"status": "healthy", "services": {"mongodb": "connected", "redis": "connected"}}
-    else:
-        return JSONResponse(
-            status_code=503,
-            content={
-                "status": "unhealthy", 
-                "services": {
-                    "mongodb": "connected" if mongo_ok else "error", 
-                    "redis": "connected" if redis_ok else "error"
-                }
-            }
-        )
+    return JSONResponse(status_code=200 if health_monitor.healthy else 503, content=health_monitor.report())
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    # Tanpa autentikasi (untuk scraper Prometheus); batasi aksesnya di level jaringan/ingress
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE_LATEST)
 
 @app.post("/register", response_model=RegistrationResponse, summary="Register Wallet for Airdrop")
 @limiter.limit("5/minute") 
@@ -252,15 +473,98 @@ async def register_wallet(
         raise HTTPException(status_code=400, detail="Invalid wallet address format.")
 
     client_ip = get_remote_address(request) # type: ignore
-    logger.info(f"Registration attempt: Wallet={registered_addr_lower}, ReferrerCode={referral_code_used_input}, IP={client_ip}")
+    logger.info("Registration attempt: Wallet=%s, ReferrerCode=%s, IP=%s", registered_addr_lower, referral_code_used_input, client_ip)
+
+    # Request duplikat untuk wallet (dan kode referral) yang sama menunggu hasil request pertama
+    flight_key = f"{registered_addr_lower}:{referral_code_used_input or ''}"
+    if registration_flight.in_flight(flight_key):
+        logger.info("Registration for %s already in flight in this worker. Awaiting its result.", registered_addr_lower)
+    return await registration_flight.do(
+        flight_key,
+        lambda: register_wallet_across_workers(
+            registered_addr_lower, referral_code_used_input, current_collection, current_redis
+        )
+    )
+
+async def register_wallet_across_workers(
+    registered_addr_lower: str,
+    referral_code_used_input: Optional[str],
+    current_collection: AsyncIOMotorCollection,
+    current_redis: redis.Redis
+) -> RegistrationResponse:
+    """
+    Single-flight antar worker: worker pertama memasang marker `register_inflight:{wallet}` (SET NX PX).
+    Worker lain menunggu hasil worker tersebut muncul di cache `wallet_data:{wallet}`,
+    dan baru memproses sendiri jika marker hilang tanpa hasil (leader gagal) atau waktu tunggu habis.
+    Bloom filter dan cache dicek lebih dulu: wallet yang sudah terdaftar cukup satu GET, marker
+    (SET NX + DEL) hanya dipasang saat cache miss.
+    """
+    # 0. Bloom filter: miss berarti wallet pasti belum terdaftar, lewati cache dan DB
+    wallet_definitely_new = bloom_ready and registered_addr_lower not in wallet_bloom
 
     # 1. Check Redis cache
+    if not wallet_definitely_new:
+        cached_response = await get_cached_registration(registered_addr_lower, current_redis)
+        if cached_response is not None:
+            return cached_response
+
+    marker_key = f"register_inflight:{registered_addr_lower}"
+    try:
+        acquired = await current_redis.set(marker_key, "1", nx=True, px=REGISTRATION_INFLIGHT_TTL_MS)
+    except Exception as e:
+        logger.error(f"Redis set failed for {marker_key}: {e}. Processing registration without cross-worker coalescing.")
+        return await process_wallet_registration(registered_addr_lower, referral_code_used_input, current_collection, current_redis, wallet_definitely_new)
+
+    if not acquired:
+        logger.info("Registration for %s in flight on another worker. Awaiting its result.", registered_addr_lower)
+        awaited_response = await await_inflight_registration(registered_addr_lower, current_redis)
+        if awaited_response is not None:
+            return awaited_response
+        return await process_wallet_registration(registered_addr_lower, referral_code_used_input, current_collection, current_redis, wallet_definitely_new)
+
+    try:
+        return await process_wallet_registration(registered_addr_lower, referral_code_used_input, current_collection, current_redis, wallet_definitely_new)
+    finally:
+        try:
+            await current_redis.delete(marker_key)
+        except Exception as e:
+            logger.error(f"Redis delete failed for {marker_key}: {e}")
+
+async def await_inflight_registration(registered_addr_lower: str, current_redis: redis.Redis) -> Optional[RegistrationResponse]:
+    cache_key = f"wallet_data:{registered_addr_lower}"
+    marker_key = f"register_inflight:{registered_addr_lower}"
+    deadline = time.monotonic() + REGISTRATION_INFLIGHT_TTL_MS / 1000
+    delay = 0.02
+    while time.monotonic() < deadline:
+        await asyncio.sleep(delay)
+        try:
+            cached_user_data_str, marker = await current_redis.mget(cache_key, marker_key)
+        except Exception as e:
+            logger.error(f"Redis mget failed while awaiting in-flight registration of {registered_addr_lower}: {e}")
+            return None
+        if cached_user_data_str:
+            try:
+                return RegistrationResponse.model_validate_json(cached_user_data_str)
+            except ValueError as e:
+                logger.warning(f"Failed to parse cached data for {registered_addr_lower} while awaiting in-flight registration: {e}")
+                return None
+        if marker is None:
+            return None
+        delay = min(delay * 2, 0.25)
+    logger.warning(f"Timed out awaiting in-flight registration of {registered_addr_lower}.")
+    return None
+
+async def get_cached_registration(registered_addr_lower: str, current_redis: redis.Redis) -> Optional[RegistrationResponse]:
     cache_key = f"wallet_data:{registered_addr_lower}"
-    cached_user_data_str = await current_redis.get(cache_key)
+    try:
+        cached_user_data_str = await current_redis.get(cache_key)
+    except Exception as e:
+        logger.error(f"Redis get failed for {cache_key}: {e}. Fetching from DB.")
+        return None
     if cached_user_data_str:
         try:
             cached_user_data = json.loads(cached_user_data_str)
-            logger.info(f"Cache hit for {registered_addr_lower}")
+            logger.info("Cache hit for %s", registered_addr_lower)
             # Pastikan semua field yang dibutuhkan RegistrationResponse ada di cached_user_data
             return RegistrationResponse(
                 status=cached_user_data.get("status", "success"),
@@ -272,12 +576,22 @@ async def register_wallet(
             )
         except (json.JSONDecodeError, TypeError) as e: # Tambah TypeError untuk **cached_user_data
             logger.warning(f"Failed to parse or unpack cached data for {registered_addr_lower}: {e}. Fetching from DB.")
-
+    return None
+
+async def process_wallet_registration(
+    registered_addr_lower: str,
+    referral_code_used_input: Optional[str],
+    current_collection: AsyncIOMotorCollection,
+    current_redis: redis.Redis,
+    wallet_definitely_new: bool
+) -> RegistrationResponse:
+    """Cache sudah dicek oleh register_wallet_across_workers; mulai dari lookup MongoDB."""
+    cache_key = f"wallet_data:{registered_addr_lower}"
 
     # 2. Check MongoDB
-    existing_user_doc = await current_collection.find_one({"wallet_address": registered_addr_lower})
+    existing_user_doc = None if wallet_definitely_new else await current_collection.find_one({"wallet_address": registered_addr_lower})
     if existing_user_doc:
-        logger.info(f"DB hit for {registered_addr_lower}")
+        logger.info("DB hit for %s", registered_addr_lower)
         response_payload = RegistrationResponse(
             status="success",
             message="Wallet already registered.",
@@ -295,7 +609,8 @@ async def register_wallet(
     # 3. New registration: Validate referrer_code if provided
     actual_referrer_wallet_address: Optional[str] = None
     if referral_code_used_input:
-        logger.info(f"Validating referral code used: {referral_code_used_input}")
+        logger.info("Validating referral code used: %s", referral_code_used_input)
+        # Selalu ke MongoDB: kode yang baru diterbitkan worker lain bisa belum ada di Bloom filter worker ini
         referrer_doc = await current_collection.find_one({"user_referral_code": referral_code_used_input})
         if not referrer_doc:
             logger.warning(f"Invalid or non-existent referral code used: {referral_code_used_input}")
@@ -305,13 +620,13 @@ async def register_wallet(
             if actual_referrer_wallet_address == registered_addr_lower:
                 logger.warning(f"User {registered_addr_lower} attempted to refer themselves.")
                 raise HTTPException(status_code=400, detail="Cannot use your own referral code.")
-            logger.info(f"Referral code {referral_code_used_input} is valid, referrer: {actual_referrer_wallet_address}")
+            logger.info("Referral code %s is valid, referrer: %s", referral_code_used_input, actual_referrer_wallet_address)
             # TODO: Implement bonus logic for the referrer (e.g., increment a counter, send notification)
 
     # 4. Fetch transaction count from Alchemy
     tx_count = 0
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(trace_configs=alchemy_trace_configs) as session:
             payload = {
                 "jsonrpc": "2.0", "method": "eth_getTransactionCount",
                 "params": [registered_addr_lower, "latest"], "id": 1
@@ -322,7 +637,7 @@ async def register_wallet(
                     if alchemy_data and "result" in alchemy_data:
                         hex_value = alchemy_data["result"]
                         tx_count = int(hex_value, 16)
-                        logger.info(f"Transaction count for {registered_addr_lower}: {tx_count}")
+                        logger.info("Transaction count for %s: %s", registered_addr_lower, tx_count)
                     else:
                         logger.error(f"Alchemy response missing 'result' for {registered_addr_lower}: {alchemy_data}")
                 else:
@@ -346,35 +661,48 @@ async def register_wallet(
         "registration_timestamp": datetime.utcnow() 
     }
    
-    # 6. Insert into MongoDB
-    try:
-        await current_collection.insert_one(user_document)
-        logger.info(f"Successfully registered {registered_addr_lower} to MongoDB.")
-    except Exception as e: 
-        logger.error(f"Error inserting {registered_addr_lower} to MongoDB: {e}", exc_info=True)
-        error_message_lower = str(e).lower()
-        if "duplicate key error" in error_message_lower:
-            if "wallet_address" in error_message_lower:
-                logger.warning(f"Race condition: Wallet {registered_addr_lower} registered concurrently.")
-                existing_doc_after_fail = await current_collection.find_one({"wallet_address": registered_addr_lower})
-                if existing_doc_after_fail:
-                    response_payload_race = RegistrationResponse(
-                        status="success",
-                        message="Wallet already registered (concurrently).",
-                        wallet_address=registered_addr_lower,
-                        points=existing_doc_after_fail.get("points_basis", 0),
-                        user_referral_code=existing_doc_after_fail.get("user_referral_code"),
-                        invited_by_wallet_address=existing_doc_after_fail.get("referrer_wallet_address")
-                    )
-                    try:
-                        await current_redis.set(cache_key, response_payload_race.model_dump_json(), ex=CACHE_EXPIRY_SECONDS)
-                    except Exception as redis_e:
-                        logger.error(f"Redis set failed for {cache_key} after race condition: {redis_e}")
-                    return response_payload_race
-            elif "user_referral_code" in error_message_lower:
-                 logger.error(f"Generated referral code collision: {new_user_referral_code}. This should be extremely rare.")
-                 raise HTTPException(status_code=500, detail="Internal error generating unique ID. Please try again.")
-        raise HTTPException(status_code=500, detail="Database error during registration.")
+    # 6. Insert into MongoDB (digabung dengan insert lain yang bersamaan oleh registration_writer)
+    for attempt in range(1, REFERRAL_CODE_INSERT_ATTEMPTS + 1):
+        try:
+            if registration_writer is not None:
+                await registration_writer.insert(user_document)
+            else:
+                await current_collection.insert_one(user_document)
+            logger.info("Successfully registered %s to MongoDB.", registered_addr_lower)
+            await publish_bloom_registration(current_redis, registered_addr_lower, new_user_referral_code)
+            break
+        except Exception as e:
+            error_message_lower = str(e).lower()
+            if "duplicate key error" in error_message_lower and "user_referral_code" in error_message_lower and attempt < REFERRAL_CODE_INSERT_ATTEMPTS:
+                # Kode dari Bloom miss bisa sudah diterbitkan worker lain yang sync pub/sub-nya belum sampai
+                logger.warning(f"Generated referral code collision: {new_user_referral_code}. Retrying with a new code.")
+                referral_bloom.add(new_user_referral_code)
+                new_user_referral_code = await get_unique_referral_code(current_collection)
+                user_document["user_referral_code"] = new_user_referral_code
+                continue
+            logger.error(f"Error inserting {registered_addr_lower} to MongoDB: {e}", exc_info=True)
+            if "duplicate key error" in error_message_lower:
+                if "wallet_address" in error_message_lower:
+                    logger.warning(f"Race condition: Wallet {registered_addr_lower} registered concurrently.")
+                    existing_doc_after_fail = await current_collection.find_one({"wallet_address": registered_addr_lower})
+                    if existing_doc_after_fail:
+                        response_payload_race = RegistrationResponse(
+                            status="success",
+                            message="Wallet already registered (concurrently).",
+                            wallet_address=registered_addr_lower,
+                            points=existing_doc_after_fail.get("points_basis", 0),
+                            user_referral_code=existing_doc_after_fail.get("user_referral_code"),
+                            invited_by_wallet_address=existing_doc_after_fail.get("referrer_wallet_address")
+                        )
+                        try:
+                            await current_redis.set(cache_key, response_payload_race.model_dump_json(), ex=CACHE_EXPIRY_SECONDS)
+                        except Exception as redis_e:
+                            logger.error(f"Redis set failed for {cache_key} after race condition: {redis_e}")
+                        return response_payload_race
+                elif "user_referral_code" in error_message_lower:
+                     logger.error(f"Generated referral code collided {attempt} times for {registered_addr_lower}.")
+                     raise HTTPException(status_code=500, detail="Internal error generating unique ID. Please try again.")
+            raise HTTPException(status_code=500, detail="Database error during registration.")
 
     # 7. Update Redis cache
     response_payload_new = RegistrationResponse(
@@ -387,7 +715,7 @@ async def register_wallet(
     )
     try:
         await current_redis.set(cache_key, response_payload_new.model_dump_json(), ex=CACHE_EXPIRY_SECONDS)
-        logger.info(f"Cached data for new user {registered_addr_lower}")
+        logger.info("Cached data for new user %s", registered_addr_lower)
     except Exception as e:
         logger.error(f"Redis set failed for new user {registered_addr_lower}: {e}")
 
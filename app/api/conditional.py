@@ -0,0 +1,38 @@
+# ===========================================================================
+# File: app/api/conditional.py (BARU)
+# ===========================================================================
+import hashlib
+from typing import Any, Dict
+
+from fastapi import Request, Response, status as HttpStatus
+
+# Data per-user: boleh disimpan browser, tapi harus selalu divalidasi ulang (If-None-Match)
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+
+def build_etag(*parts: Any) -> str:
+    """ETag kuat dari versi dokumen (id, updatedAt, versi katalog, ...), bukan dari isi body."""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Perbandingan weak sesuai RFC 9110 untuk If-None-Match (prefix W/ diabaikan)."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def conditional_headers(etag: str, cache_control: str = CONDITIONAL_CACHE_CONTROL) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if cache_control.startswith("private"):
+        headers["Vary"] = "Authorization"
+    return headers
+
+
+def not_modified_response(etag: str, cache_control: str = CONDITIONAL_CACHE_CONTROL) -> Response:
+    return Response(status_code=HttpStatus.HTTP_304_NOT_MODIFIED, headers=conditional_headers(etag, cache_control))
@@ -67,4 +67,12 @@ async def get_current_active_user(
         )
         raise credentials_exception
         
-    return user
\ No newline at end of file
+    return user
+
+async def get_current_active_admin_user(
+    current_user: UserInDB = Depends(get_current_active_user)
+) -> UserInDB:
+    if not current_user.is_superuser:
+        logger.warning(f"User {current_user.username} (ID: {current_user.id}) attempted to access an admin endpoint.")
+        raise HTTPException(status_code=HttpStatus.HTTP_403_FORBIDDEN, detail="Akses admin diperlukan.")
+    return current_user
@@ -0,0 +1,103 @@
+# ===========================================================================
+# File: app/api/rate_limit.py (MODIFIKASI: kuota per user memakai user dari get_current_active_user)
+# ===========================================================================
+import json
+import re
+from typing import List, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status as HttpStatus
+
+from app.api.deps import get_current_active_user
+from app.core.config import settings
+from app.core.rate_limit import RateLimitRule, rate_limiter
+from app.models.user import UserInDB
+
+
+_WALLET_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+
+def client_ip(request: Request) -> str:
+    # Di belakang reverse proxy, jalankan uvicorn dengan --proxy-headers agar request.client berisi IP asli
+    return request.client.host if request.client else "unknown"
+
+
+async def _wallet_from_request(request: Request) -> Optional[str]:
+    wallet = request.query_params.get("walletAddress")
+    if wallet is None and request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = json.loads(await request.body()) # Body di-cache Starlette, endpoint tetap bisa membacanya
+        except ValueError:
+            return None
+        wallet = body.get("walletAddress") if isinstance(body, dict) else None
+    if not isinstance(wallet, str) or not _WALLET_RE.match(wallet.strip()):
+        return None # Bukan alamat (endpoint menjawab 422): tidak dapat bucket wallet sendiri, cukup aturan ip
+    return wallet.strip().lower()
+
+
+def _parse_rules(*scoped_rates: Tuple[str, Optional[str]]) -> List[RateLimitRule]:
+    return [
+        RateLimitRule.from_rate(scope, rate)
+        for scope, rates in scoped_rates
+        for rate in (rates or "").split(",")
+        if rate.strip()
+    ]
+
+
+class RateLimit:
+    """
+    Dependency FastAPI: `dependencies=[Depends(RateLimit("auth_challenge", ip="30/minute", wallet="5/minute"))]`.
+
+    Satu scope boleh punya beberapa rate dipisah koma, misal `ip="30/minute,500/day"`.
+    Aturan yang identitasnya tidak ada di request (misal wallet tidak dikirim) dilewati.
+    Melebihi limit -> 429 dengan header Retry-After. Kuota per user: lihat UserRateLimit.
+    """
+
+    def __init__(self, name: str, *, ip: Optional[str] = None, wallet: Optional[str] = None):
+        self.name = name
+        self.rules: List[RateLimitRule] = _parse_rules(("ip", ip), ("wallet", wallet))
+
+    async def _checks(self, request: Request, user_id: Optional[str]) -> List[Tuple[RateLimitRule, str]]:
+        checks: List[Tuple[RateLimitRule, str]] = []
+        for rule in self.rules:
+            if rule.scope == "ip":
+                identity = client_ip(request)
+            elif rule.scope == "wallet":
+                identity = await _wallet_from_request(request)
+            else:
+                identity = user_id
+            if identity:
+                checks.append((rule, identity))
+        return checks
+
+    async def __call__(self, request: Request) -> None:
+        await self._enforce(request, user_id=None)
+
+    async def _enforce(self, request: Request, user_id: Optional[str]) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        checks = await self._checks(request, user_id)
+        if not checks:
+            return
+        result = await rate_limiter.hit(self.name, checks)
+        if not result.allowed:
+            retry_after = max(1, result.retry_after_seconds)
+            raise HTTPException(
+                status_code=HttpStatus.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Terlalu banyak permintaan. Coba lagi dalam {retry_after} detik.",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+
+class UserRateLimit(RateLimit):
+    """
+    RateLimit dengan kuota `user`. User diambil dari get_current_active_user, yang di-cache
+    FastAPI per request dan dipakai juga oleh endpoint: JWT hanya didecode sekali, dan token
+    yang tidak valid sudah ditolak 401 sebelum dihitung ke kuota siapa pun.
+    """
+
+    def __init__(self, name: str, *, user: str, ip: Optional[str] = None, wallet: Optional[str] = None):
+        super().__init__(name, ip=ip, wallet=wallet)
+        self.rules += _parse_rules(("user", user))
+
+    async def __call__(self, request: Request, current_user: UserInDB = Depends(get_current_active_user)) -> None:
+        await self._enforce(request, user_id=str(current_user.id))
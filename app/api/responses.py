@@ -0,0 +1,47 @@
+# ===========================================================================
+# File: app/api/responses.py (BARU)
+# ===========================================================================
+from typing import Any, Mapping, Optional, Type, TypeVar
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSONResponse yang menserialisasi model Pydantic langsung ke bytes dengan
+    `model_dump_json(by_alias=True)` (pydantic-core, satu kali jalan).
+
+    Jika endpoint mengembalikan instance Response, FastAPI melewati validasi ulang
+    terhadap `response_model` dan `jsonable_encoder`; `response_model` tetap
+    dipasang di decorator untuk dokumentasi OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(by_alias=True).encode("utf-8")
+        return super().render(content)
+
+
+def model_response(
+    response_model: Type[ModelT],
+    content: Any,
+    *,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> PydanticJSONResponse:
+    """
+    Konvensi endpoint dengan respons daftar: `return model_response(SkemaRespons, hasil_service)`.
+    Hanya dipakai di call site yang terbukti lebih cepat di app/scripts/bench_serialization.py
+    (daftar directives, badges, allies); untuk objek tunggal kecil hasilnya setara jalur
+    default FastAPI, jadi endpoint tersebut cukup mengembalikan modelnya.
+
+    Jika `content` sudah persis bertipe `response_model` ia diserialisasi apa adanya;
+    selain itu (dict, model DB, subclass dengan field tambahan) divalidasi sekali ke
+    `response_model` agar field yang keluar sama dengan yang didokumentasikan.
+    """
+    if type(content) is not response_model:
+        content = response_model.model_validate(content)
+    return PydanticJSONResponse(content, status_code=status_code, headers=headers)
@@ -1,11 +1,11 @@
 # ===========================================================================
-# File: app/api/v1/endpoints/auth.py (MODIFIKASI: Endpoint /x/initiate-oauth dan /x/callback)
+# File: app/api/v1/endpoints/auth.py (MODIFIKASI: /challenge stateless tanpa Redis, walletAddress divalidasi EthAddress)
 # ===========================================================================
 from fastapi import APIRouter, Depends, HTTPException, status as HttpStatus, Query, Request as FastAPIRequest
 from fastapi.responses import RedirectResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import redis.asyncio as aioredis
-from typing import Optional
+from typing import Annotated, Optional
 from urllib.parse import quote
 
 from app.db.session import get_db
@@ -18,6 +18,7 @@ from app.api.v1.schemas.auth import (
 from app.api.v1.schemas.token import TokenResponse
 from app.core.config import logger, settings
 from app.api.deps import get_current_active_user
+from app.api.rate_limit import RateLimit
 from app.models.user import UserInDB
 
 router = APIRouter()
@@ -26,24 +27,27 @@ router = APIRouter()
 @router.get(
     "/challenge",
     response_model=ChallengeMessageResponse,
-    summary="Request Challenge Message for Wallet Signature"
+    summary="Request Challenge Message for Wallet Signature",
+    dependencies=[Depends(RateLimit(
+        "auth_challenge", ip=settings.RATE_LIMIT_CHALLENGE_PER_IP, wallet=settings.RATE_LIMIT_CHALLENGE_PER_WALLET
+    ))]
 )
 async def request_challenge_message_endpoint(
-    walletAddress: EthAddress = Query(..., description="Alamat wallet pengguna Ethereum (hex string)"),
-    redis_client: Optional[aioredis.Redis] = Depends(get_redis_nonce_client)
+    # Annotated menjaga StringConstraints EthAddress; `EthAddress = Query(...)` membuangnya (alamat sampah -> 200)
+    walletAddress: Annotated[EthAddress, Query(description="Alamat wallet pengguna Ethereum (hex string)")]
 ):
-    logger.info(f"Challenge requested for wallet: {walletAddress}")
-    challenge = await auth_service.generate_challenge_message(
-        wallet_address=str(walletAddress),
-        redis_client=redis_client
-    )
-    return ChallengeMessageResponse(**challenge)
+    logger.info("Challenge requested for wallet: %s", walletAddress)
+    challenge = await auth_service.generate_challenge_message(wallet_address=str(walletAddress))
+    return challenge
 
 
 @router.post(
     "/connect",
     response_model=TokenResponse,
-    summary="Connect Wallet, Authenticate, and Get Session Token"
+    summary="Connect Wallet, Authenticate, and Get Session Token",
+    dependencies=[Depends(RateLimit(
+        "auth_connect", ip=settings.RATE_LIMIT_CONNECT_PER_IP, wallet=settings.RATE_LIMIT_CONNECT_PER_WALLET
+    ))]
 )
 async def connect_wallet_endpoint(
     *,
@@ -52,7 +56,7 @@ async def connect_wallet_endpoint(
     redis_client: Optional[aioredis.Redis] = Depends(get_redis_nonce_client)
 ):
     try:
-        logger.info(f"Connect attempt from wallet: {request_data.walletAddress}")
+        logger.info("Connect attempt from wallet: %s", request_data.walletAddress)
         token_response_obj = await auth_service.connect_wallet_and_get_token(
             db=db, 
             request_data=request_data,
@@ -83,7 +87,7 @@ async def twitter_initiate_oauth_endpoint(
         logger.error("Twitter OAuth credentials not configured in settings.")
         raise HTTPException(status_code=HttpStatus.HTTP_501_NOT_IMPLEMENTED, detail="Fitur koneksi X belum dikonfigurasi.")
     
-    logger.info(f"User {current_user.username} initiating X OAuth flow.")
+    logger.info("User %s initiating X OAuth flow.", current_user.username)
     
     # auth_service.initiate_twitter_oauth sekarang mengembalikan RedirectResponse
     # Kita ekstrak URL dari header 'location' untuk dikirim sebagai JSON
@@ -129,7 +133,7 @@ async def twitter_oauth_callback_endpoint(
         error_message = quote("Parameter callback tidak lengkap dari Twitter.")
         return RedirectResponse(url=f"{frontend_redirect_base_url}?x_connected=false&error={error_message}", status_code=HttpStatus.HTTP_307_TEMPORARY_REDIRECT)
 
-    logger.info(f"Received Twitter callback with state: {state_from_twitter} and code: {code[:10]}...")
+    logger.info("Received Twitter callback with state: %s and code: %s...", state_from_twitter, code[:10])
     
     try:
         callback_response_data = await auth_service.handle_twitter_oauth_callback(
@@ -140,7 +144,7 @@ async def twitter_oauth_callback_endpoint(
         )
         success_message = quote(callback_response_data.message)
         success_redirect_url = f"{frontend_redirect_base_url}?x_connected=true&message={success_message}"
-        logger.info(f"Redirecting user to: {success_redirect_url} after X OAuth callback success.")
+        logger.info("Redirecting user to: %s after X OAuth callback success.", success_redirect_url)
         return RedirectResponse(url=success_redirect_url, status_code=HttpStatus.HTTP_307_TEMPORARY_REDIRECT)
 
     except HTTPException as e:
@@ -1,12 +1,15 @@
 # ===========================================================================
-# File: app/api/v1/endpoints/missions.py (MODIFIKASI: Implementasi endpoint)
+# File: app/api/v1/endpoints/missions.py (MODIFIKASI: model_response hanya untuk daftar directives)
 # ===========================================================================
-from fastapi import APIRouter, Depends, HTTPException, status as HttpStatus
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status as HttpStatus
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List
 
 from app.db.session import get_db
 from app.api.deps import get_current_active_user
+from app.api.responses import model_response
+from app.api.rate_limit import UserRateLimit
+from app.api.conditional import build_etag, etag_matches, conditional_headers, not_modified_response
 from app.models.user import UserInDB
 from app.services.mission_service import mission_service
 from app.api.v1.schemas.mission import (
@@ -16,7 +19,7 @@ from app.api.v1.schemas.mission import (
     MissionCompletionRequest, # Jika ada body untuk complete
     MissionCompletionResponse
 )
-from app.core.config import logger
+from app.core.config import logger, settings
 
 router = APIRouter()
 
@@ -26,16 +29,22 @@ router = APIRouter()
     summary="Get List of Active Mission Directives"
 )
 async def get_active_directives(
+    request: Request,
     db: AsyncIOMotorDatabase = Depends(get_db),
     current_user: UserInDB = Depends(get_current_active_user)
 ):
     """
     Mengambil daftar semua direktif misi yang aktif dan relevan untuk pengguna.
     Status misi (available, completed, dll.) akan disesuaikan untuk pengguna yang login.
+    Mendukung `If-None-Match` (304 jika katalog misi, link misi user, dan data user tidak berubah).
     """
-    logger.info(f"Fetching active directives for user: {current_user.username}")
-    directives = await mission_service.get_directives_for_user(db=db, user=current_user)
-    return MissionDirectivesListResponse(directives=directives)
+    active_missions, links = await mission_service.load_directive_inputs(db=db, user=current_user)
+    etag = build_etag("directives", *mission_service.get_directives_version(current_user, active_missions, links))
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    logger.info("Fetching active directives for user: %s", current_user.username)
+    directives = mission_service.build_directives(current_user, active_missions, links)
+    return model_response(MissionDirectivesListResponse, {"directives": directives}, headers=conditional_headers(etag))
 
 @router.get(
     "/me/summary", 
@@ -43,21 +52,30 @@ async def get_active_directives(
     summary="Get Current User's Mission Progress Summary"
 )
 async def get_my_mission_summary(
+    request: Request,
+    response: Response,
     db: AsyncIOMotorDatabase = Depends(get_db),
     current_user: UserInDB = Depends(get_current_active_user)
 ):
     """
     Mengambil ringkasan progres misi untuk pengguna yang sedang login
-    (Operation Status, Active Signals).
+    (Operation Status, Active Signals). Mendukung `If-None-Match`.
     """
-    logger.info(f"Fetching mission progress summary for user: {current_user.username}")
+    etag = build_etag("mission-summary", *await mission_service.get_mission_summary_version(db=db, user=current_user))
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    logger.info("Fetching mission progress summary for user: %s", current_user.username)
     summary = await mission_service.get_user_mission_progress_summary(db=db, user=current_user)
+    response.headers.update(conditional_headers(etag))
     return summary
 
 @router.post(
     "/directives/{mission_id_str}/complete", 
     response_model=MissionCompletionResponse,
-    summary="Attempt to Complete a Mission Directive"
+    summary="Attempt to Complete a Mission Directive",
+    dependencies=[Depends(UserRateLimit(
+        "mission_complete", ip=settings.RATE_LIMIT_COMPLETE_PER_IP, user=settings.RATE_LIMIT_COMPLETE_PER_USER
+    ))]
 )
 async def complete_mission_directive_endpoint(
     mission_id_str: str, # ID string misi, bukan ObjectId DB
@@ -70,7 +88,7 @@ async def complete_mission_directive_endpoint(
     - **mission_id_str**: ID string dari misi yang ingin diselesaikan.
     - **Request Body (Opsional)**: Bisa berisi data pendukung untuk validasi penyelesaian.
     """
-    logger.info(f"User {current_user.username} attempting to complete mission_id_str: {mission_id_str}")
+    logger.info("User %s attempting to complete mission_id_str: %s", current_user.username, mission_id_str)
     try:
         # Mengambil data dari body jika ada, atau None jika tidak
         # request_body_data = completion_data.validation_data if completion_data else None
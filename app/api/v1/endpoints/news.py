@@ -1,10 +1,27 @@
 # ===========================================================================
-# File: app/api/v1/endpoints/news.py (Stub)
+# File: app/api/v1/endpoints/news.py (MODIFIKASI: Feed tetap tersaji dari snapshot selama outage MongoDB)
 # ===========================================================================
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
+
+from app.db.session import get_db
+from app.api.conditional import etag_matches, conditional_headers, not_modified_response
+from app.api.v1.schemas.news import NewsFeedResponse
+from app.services.news_service import news_service
 
 router = APIRouter()
 
-@router.get("/feed", summary="Get News Feed (Stub)")
-async def get_news_feed():
-    return {"message": "News feed endpoint (coming soon)"}
\ No newline at end of file
+@router.get("/feed", response_model=NewsFeedResponse, summary="Get News Feed")
+async def get_news_feed(request: Request):
+    """
+    Daftar news aktif (urut `order`, lalu `createdAt`). Dilayani dari snapshot in-memory;
+    item yang kedaluwarsa hilang tepat saat `expiresAt`. Mendukung `If-None-Match`.
+    Selama circuit MongoDB terbuka feed tetap dilayani dari snapshot terakhir.
+    """
+    if not news_service.loaded:
+        # Hanya di sini DB (dan circuit-nya) disentuh: snapshot belum pernah dimuat sama sekali
+        await news_service.ensure_loaded(await get_db())
+    body, etag, max_age = news_service.get_feed()
+    cache_control = f"public, max-age={max_age}"
+    if etag_matches(request, etag):
+        return not_modified_response(etag, cache_control)
+    return Response(content=body, media_type="application/json", headers=conditional_headers(etag, cache_control))
@@ -1,7 +1,20 @@
 # ===========================================================================
-# File: app/api/v1/endpoints/system.py (Stub)
+# File: app/api/v1/endpoints/system.py (MODIFIKASI: Endpoint profiling on-demand untuk admin)
 # ===========================================================================
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query, status as HttpStatus
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from typing import Literal, Optional
+
+from app.db.session import get_db
+from app.api.deps import get_current_active_admin_user
+from app.models.user import UserInDB
+from app.services.export_service import (
+    snapshot_export_service, SnapshotFormat, SnapshotSource, SNAPSHOT_MEDIA_TYPES
+)
+from app.services.profiling_service import ProfilerBusyError, profiling_service
+from app.core.config import settings, logger
 
 router = APIRouter()
 
@@ -12,3 +25,90 @@ async def get_system_status():
 # @router.get("/logs", summary="Get System Logs (Stub - Admin Only)")
 # async def get_system_logs(current_user: UserInDB = Depends(get_current_active_admin_user)): # Perlu dependency admin
 # return {"message": "System logs endpoint (coming soon, admin only)"}
+
+def _parse_object_id_param(value: Optional[str], name: str) -> Optional[ObjectId]:
+    if value is None:
+        return None
+    if not ObjectId.is_valid(value):
+        raise HTTPException(status_code=HttpStatus.HTTP_400_BAD_REQUEST, detail=f"Parameter '{name}' bukan ObjectId yang valid.")
+    return ObjectId(value)
+
+@router.get("/exports/airdrop-snapshot", summary="Stream Airdrop Snapshot of Registrations and XP (Admin Only)")
+async def export_airdrop_snapshot(
+    format: SnapshotFormat = Query("csv", description="Format output: csv atau ndjson"),
+    source: SnapshotSource = Query("registrations", description="Koleksi penggerak: registrations (user_registrations) atau users"),
+    after_id: Optional[str] = Query(None, description="Checkpoint: lanjutkan setelah nilai 'cursor' terakhir yang diterima"),
+    upper_id: Optional[str] = Query(None, description="Batas atas _id dari export sebelumnya (header X-Snapshot-Upper-Id) saat melanjutkan"),
+    batch_size: int = Query(5000, ge=100, le=50000),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    current_admin: UserInDB = Depends(get_current_active_admin_user)
+):
+    """
+    Streaming snapshot airdrop (wallet, points, XP, rank, referral) sebagai CSV atau NDJSON.
+    Untuk melanjutkan export yang terputus, kirim `after_id` = kolom `cursor` baris terakhir
+    dan `upper_id` = header `X-Snapshot-Upper-Id` dari respons pertama.
+    """
+    parsed_after_id = _parse_object_id_param(after_id, "after_id")
+    parsed_upper_id = _parse_object_id_param(upper_id, "upper_id")
+
+    users_collection = db["users"]
+    registrations_db_name = settings.REGISTRATIONS_DB_NAME or settings.MONGODB_DB_NAME
+    registrations_collection = db.client[registrations_db_name][settings.REGISTRATIONS_COLLECTION_NAME]
+    driving_collection = registrations_collection if source == "registrations" else users_collection
+    if parsed_upper_id is None:
+        parsed_upper_id = await snapshot_export_service.resolve_upper_id(driving_collection)
+
+    logger.info(
+        f"Admin {current_admin.username} exporting airdrop snapshot: format={format}, source={source}, "
+        f"after_id={parsed_after_id}, upper_id={parsed_upper_id}"
+    )
+    stream = snapshot_export_service.stream_snapshot(
+        client=db.client,
+        users_collection=users_collection,
+        registrations_collection=registrations_collection,
+        fmt=format,
+        source=source,
+        after_id=parsed_after_id,
+        upper_id=parsed_upper_id,
+        batch_size=batch_size,
+        include_header=parsed_after_id is None,
+    )
+    headers = {"Content-Disposition": f'attachment; filename="airdrop-snapshot.{format}"'}
+    if parsed_upper_id is not None:
+        headers["X-Snapshot-Upper-Id"] = str(parsed_upper_id)
+    return StreamingResponse(stream, media_type=SNAPSHOT_MEDIA_TYPES[format], headers=headers)
+
+def _ensure_profiling_enabled() -> None:
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=HttpStatus.HTTP_404_NOT_FOUND, detail="Profiling tidak diaktifkan (PROFILING_ENABLED).")
+
+@router.post("/profiling/{kind}", summary="Profile This Worker for N Seconds (Admin Only)", response_class=PlainTextResponse)
+async def profile_worker(
+    kind: Literal["cpu", "memory"],
+    seconds: float = Query(10.0, gt=0),
+    current_admin: UserInDB = Depends(get_current_active_admin_user)
+):
+    """
+    Profil worker yang menerima request ini selama `seconds` detik. CPU: sampel stack event loop;
+    memory: alokasi bersih tracemalloc. Output folded stacks (flamegraph.pl / speedscope).
+    """
+    _ensure_profiling_enabled()
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(status_code=HttpStatus.HTTP_400_BAD_REQUEST, detail=f"Durasi maksimal {settings.PROFILING_MAX_SECONDS} detik.")
+    logger.info("Admin %s profiling worker: kind=%s, seconds=%s", current_admin.username, kind, seconds)
+    try:
+        profile_id, folded = await profiling_service.profile_worker(kind, seconds)
+    except ProfilerBusyError:
+        raise HTTPException(status_code=HttpStatus.HTTP_409_CONFLICT, detail="Sesi profiling lain sedang berjalan di worker ini.")
+    return PlainTextResponse(folded, headers={"X-Profile-Id": profile_id})
+
+@router.get("/profiles/{profile_id}", summary="Get Stored Request Profile (Admin Only)", response_class=PlainTextResponse)
+async def get_stored_profile(
+    profile_id: str,
+    current_admin: UserInDB = Depends(get_current_active_admin_user)
+):
+    _ensure_profiling_enabled()
+    folded = await profiling_service.load(profile_id)
+    if folded is None:
+        raise HTTPException(status_code=HttpStatus.HTTP_404_NOT_FOUND, detail="Profil tidak ditemukan atau sudah kedaluwarsa.")
+    return PlainTextResponse(folded)
@@ -1,12 +1,14 @@
 # ===========================================================================
-# File: app/api/v1/endpoints/users.py (MODIFIKASI: Tambahkan endpoint /me/badges)
+# File: app/api/v1/endpoints/users.py (MODIFIKASI: model_response hanya untuk respons daftar)
 # ===========================================================================
-from fastapi import APIRouter, Depends, HTTPException, status as HttpStatus, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status as HttpStatus, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List # Menambahkan List
 
 from app.db.session import get_db
 from app.api.deps import get_current_active_user
+from app.api.responses import model_response
+from app.api.conditional import build_etag, etag_matches, conditional_headers, not_modified_response
 from app.models.user import UserInDB
 from app.api.v1.schemas.user import UserPublic, UserUpdate, AlliesListResponse
 from app.api.v1.schemas.badge import UserBadgeResponse, UserBadgeListResponse # BARU
@@ -18,10 +20,17 @@ router = APIRouter()
 
 @router.get("/me", response_model=UserPublic, summary="Get Current User Profile")
 async def read_current_user_me(
+    request: Request,
+    response: Response,
     current_user_from_dep: UserInDB = Depends(get_current_active_user)
 ):
-    logger.info(f"Fetching profile for user: {current_user_from_dep.username}")
-    return UserPublic.model_validate(current_user_from_dep)
+    # Semua field UserPublic ada di dokumen user; setiap update lewat CRUDBase mengubah updatedAt
+    etag = build_etag("user-me", current_user_from_dep.id, current_user_from_dep.updatedAt)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    logger.info("Fetching profile for user: %s", current_user_from_dep.username)
+    response.headers.update(conditional_headers(etag))
+    return current_user_from_dep # Divalidasi sekali ke UserPublic oleh response_model
 
 @router.put("/me", response_model=UserPublic, summary="Update Current User Profile")
 async def update_current_user_me(
@@ -30,7 +39,7 @@ async def update_current_user_me(
     user_update_data: UserUpdate,
     current_user_from_dep: UserInDB = Depends(get_current_active_user)
 ):
-    logger.info(f"Updating profile for user: {current_user_from_dep.username}")
+    logger.info("Updating profile for user: %s", current_user_from_dep.username)
     try:
         updated_user_public = await user_service.update_user_profile(
             db=db, user_id=current_user_from_dep.id, profile_update_data=user_update_data
@@ -52,20 +61,25 @@ async def get_my_allies(
     page: int = Query(1, ge=1, description="Nomor halaman"),
     limit: int = Query(10, ge=1, le=100, description="Jumlah item per halaman (maks 100)")
 ):
-    logger.info(f"Fetching allies for user: {current_user.username}, page: {page}, limit: {limit}")
+    logger.info("Fetching allies for user: %s, page: %s, limit: %s", current_user.username, page, limit)
     allies_data = await user_service.get_user_allies_list(
         db=db, current_user=current_user, page=page, limit=limit
     )
-    return allies_data
+    return model_response(AlliesListResponse, allies_data)
 
 @router.get("/me/badges", response_model=UserBadgeListResponse, summary="Get Current User's Acquired Badges")
 async def get_my_neural_imprints(
+    request: Request,
     db: AsyncIOMotorDatabase = Depends(get_db),
     current_user: UserInDB = Depends(get_current_active_user)
 ):
     """
     Mengambil daftar badge (Neural Imprints) yang telah diperoleh oleh pengguna yang sedang login.
+    Mendukung `If-None-Match`.
     """
-    logger.info(f"Fetching badges for user: {current_user.username}")
+    etag = build_etag("user-badges", *await mission_service.get_user_badges_version(db=db, user=current_user))
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    logger.info("Fetching badges for user: %s", current_user.username)
     badges = await mission_service.get_user_badges(db=db, user=current_user)
-    return UserBadgeListResponse(badges=badges, total=len(badges))
+    return model_response(UserBadgeListResponse, {"badges": badges, "total": len(badges)}, headers=conditional_headers(etag))
@@ -6,3 +6,4 @@ from .auth import ChallengeMessageResponse, WalletConnectRequest
 from .user import UserCreate, UserUpdate, UserPublic, AllyInfo, AlliesListResponse
 from .badge import UserBadgeResponse # BARU
 from .mission import MissionDirectiveResponse, MissionProgressSummaryResponse, MissionCompletionRequest # BARU
+from .news import NewsItemResponse, NewsFeedResponse # BARU
@@ -1,5 +1,5 @@
 # ===========================================================================
-# File: app/api/v1/schemas/auth.py (MODIFIKASI: Pastikan TwitterOAuthInitiateResponse benar)
+# File: app/api/v1/schemas/auth.py (MODIFIKASI: Nonce connect wajib 32 karakter hex)
 # ===========================================================================
 from pydantic import BaseModel, Field, StringConstraints, HttpUrl as PydanticHttpUrl
 from typing import Annotated, Optional
@@ -36,6 +36,7 @@ class WalletConnectRequest(BaseModel):
         Field(
             min_length=32, 
             max_length=32,
+            pattern=r"^[0-9a-f]{32}$",
             description="Nonce yang diterima dari /challenge (32 karakter hex string)"
         )
     ]
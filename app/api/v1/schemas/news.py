@@ -0,0 +1,25 @@
+# ===========================================================================
+# File: app/api/v1/schemas/news.py (BARU)
+# ===========================================================================
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+from app.models.base import PyObjectId
+
+class NewsItemResponse(BaseModel):
+    id: PyObjectId = Field(alias="_id")
+    text: str
+    order: int
+    createdAt: datetime
+    expiresAt: Optional[datetime] = None
+
+    model_config = {
+        "populate_by_name": True,
+        "json_encoders": {PyObjectId: str, datetime: lambda dt: dt.isoformat().replace("+00:00", "Z")},
+        "arbitrary_types_allowed": True,
+        "from_attributes": True
+    }
+
+class NewsFeedResponse(BaseModel):
+    items: List[NewsItemResponse]
+    total: int
@@ -0,0 +1,349 @@
+# ===========================================================================
+# File: app/core/cache.py (MODIFIKASI: guard generasi per tag value, bukan per koleksi)
+# ===========================================================================
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Type
+
+import bson
+from pydantic import AnyUrl, BaseModel
+
+from app.core.config import settings, logger
+from app.db.redis_conn import redis_manager
+from app.core.invalidation_bus import invalidation_bus
+from app.utils.single_flight import SingleFlight
+
+CACHE_KEY_PREFIX = "cache:"
+TAG_KEY_PREFIX = "cachetag:"
+GENERATION_KEY_PREFIX = "cachegen:"
+GENERATION_SEQ_KEY = "cachegen-seq"
+# Umur penanda generasi per tag. Load yang lebih lama dari ini tidak lagi terlindungi guard.
+GENERATION_TTL_MS = 60_000
+# Di atas jumlah ini penanda invalidasi L1 dibuang dan semua load yang sedang berjalan dianggap basi.
+_LOCAL_INVALIDATION_MAX_TAGS = 10_000
+
+# Simpan value hanya jika tidak satu pun tag miliknya diinvalidasi sejak loader mulai membaca DB
+# (seq global dibaca di awal load). Write ke dokumen lain tidak menahan store ini.
+# KEYS: cache_key, tag_key... (ARGV[4] buah), generation_key... (ARGV[4] buah)
+# ARGV: value, ttl_ms, expected_seq, tag_count
+_SET_LUA = """
+local tag_count = tonumber(ARGV[4])
+local expected = tonumber(ARGV[3])
+for i = 2 + tag_count, 1 + 2 * tag_count do
+    local generation = redis.call('GET', KEYS[i])
+    if generation and tonumber(generation) > expected then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+for i = 2, 1 + tag_count do
+    redis.call('SADD', KEYS[i], KEYS[1])
+    if redis.call('PTTL', KEYS[i]) < tonumber(ARGV[2]) then
+        redis.call('PEXPIRE', KEYS[i], ARGV[2])
+    end
+end
+return 1
+"""
+
+# Hapus key bertag, lalu tandai setiap tag dengan seq baru (berumur GENERATION_TTL_MS)
+# supaya load yang tumpang tindih dengan invalidasi ini tidak menyimpan value lama.
+# KEYS: tag_key... (ARGV[1] buah), generation_key... (ARGV[1] buah), seq_key  ARGV: tag_count, generation_ttl_ms
+_INVALIDATE_LUA = """
+local tag_count = tonumber(ARGV[1])
+local deleted = 0
+for i = 1, tag_count do
+    local members = redis.call('SMEMBERS', KEYS[i])
+    for _, key in ipairs(members) do
+        deleted = deleted + redis.call('DEL', key)
+    end
+    redis.call('DEL', KEYS[i])
+end
+local seq = redis.call('INCR', KEYS[#KEYS])
+for i = tag_count + 1, 2 * tag_count do
+    redis.call('SET', KEYS[i], seq, 'PX', ARGV[2])
+end
+return deleted
+"""
+
+
+def _to_bson_compatible(value: Any) -> Any:
+    if isinstance(value, AnyUrl):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _to_bson_compatible(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_bson_compatible(item) for item in value]
+    return value
+
+
+class ModelCodec:
+    """Encode model Pydantic (atau list model) ke BSON: datetime dan ObjectId tetap biner, bukan string."""
+
+    def __init__(self, model: Type[BaseModel], many: bool = False):
+        self.model = model
+        self.many = many
+
+    def encode(self, value: Any) -> bytes:
+        if self.many:
+            payload = [_to_bson_compatible(item.model_dump(by_alias=True)) for item in value]
+        else:
+            payload = None if value is None else _to_bson_compatible(value.model_dump(by_alias=True))
+        return bson.encode({"v": payload})
+
+    def decode(self, data: bytes) -> Any:
+        payload = bson.decode(data)["v"]
+        if self.many:
+            return [self.model.model_validate(item) for item in payload]
+        return None if payload is None else self.model.model_validate(payload)
+
+
+class _LocalLRU:
+    """L1: LRU in-process dengan expiry per entry dan indeks tag -> key."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._data: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str, now: float) -> Tuple[bool, Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= now:
+            self._remove(key)
+            return False, None
+        self._data.move_to_end(key)
+        return True, entry[1]
+
+    def set(self, key: str, value: Any, expires_at: float, tags: Tuple[str, ...]) -> None:
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (expires_at, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._data) > self.max_entries:
+            self._remove(next(iter(self._data)))
+
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._tags.clear()
+
+
+class TwoTierCache:
+    """
+    Cache read-path dua tingkat: L1 LRU in-process (TTL pendek) lalu L2 Redis (DB REDIS_DB_CACHE).
+
+    - Value L2 di-encode BSON; TTL per key; setiap key dicatat di set tag `cachetag:{tag}`.
+    - `invalidate_tags` menghapus semua key bertag (Lua, atomik) di L2 dan L1 proses ini,
+      lalu menyiarkan tag-nya lewat `invalidation_bus` ke L1 worker lain. Selama bus tidak
+      tersambung, entry L1 baru hanya hidup `l1_unsubscribed_ttl_seconds`.
+    - Value hasil load tidak disimpan (L1 maupun L2) jika salah satu tag miliknya diinvalidasi
+      selama load berjalan. Guard ini per tag, jadi write beruntun ke dokumen lain di koleksi
+      yang sama tidak membuat cache berhenti terisi.
+    - Miss untuk key yang sama di satu proses digabung (single-flight), jadi satu key
+      panas yang kedaluwarsa hanya memicu satu query DB per proses.
+    - Jika Redis tidak tersedia, cache berjalan hanya dengan L1.
+    Value yang dikembalikan dari cache dipakai bersama: perlakukan sebagai read-only.
+    """
+
+    def __init__(self, *, l1_max_entries: int, l1_ttl_seconds: float, l1_unsubscribed_ttl_seconds: float, enabled: bool = True):
+        self.enabled = enabled
+        self.l1_ttl_seconds = l1_ttl_seconds
+        self.l1_unsubscribed_ttl_seconds = l1_unsubscribed_ttl_seconds
+        self.l1 = _LocalLRU(l1_max_entries)
+        self._flight = SingleFlight()
+        self._generation = 0 # Naik setiap invalidasi lokal (termasuk dari bus)
+        self._invalidated_at: Dict[str, int] = {} # tag -> _generation saat terakhir diinvalidasi
+        self._cleared_at = 0 # _generation saat L1 terakhir di-flush; load sebelum ini dianggap basi
+        self._set_script = None
+        self._invalidate_script = None
+        self.stats: Dict[str, int] = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "l2_errors": 0, "invalidations": 0}
+
+    def _redis(self):
+        return redis_manager.available_cache_client() # None selama circuit Redis terbuka: L1 + MongoDB saja
+
+    def _register_scripts(self, client) -> None:
+        if self._set_script is None or self._set_script.registered_client is not client:
+            self._set_script = client.register_script(_SET_LUA)
+            self._invalidate_script = client.register_script(_INVALIDATE_LUA)
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        *,
+        codec: ModelCodec,
+        ttl: int,
+        tags: Callable[[Any], Sequence[str]],
+        cache_none: bool = False,
+    ) -> Any:
+        if not self.enabled:
+            return await loader()
+        found, value = self.l1.get(key, time.monotonic())
+        if found:
+            self.stats["l1_hits"] += 1
+            return value
+        return await self._flight.do(
+            key, lambda: self._load_through(key, loader, codec=codec, ttl=ttl, tags=tags, cache_none=cache_none)
+        )
+
+    async def _load_through(self, key, loader, *, codec, ttl, tags, cache_none) -> Any:
+        local_generation = self._generation
+        client = self._redis()
+        redis_key = CACHE_KEY_PREFIX + key
+        expected_seq = b"0"
+        if client is not None:
+            try:
+                cached_bytes, seq = await client.mget(redis_key, GENERATION_SEQ_KEY)
+                expected_seq = seq or b"0"
+                if cached_bytes is not None:
+                    value = codec.decode(cached_bytes)
+                    self.stats["l2_hits"] += 1
+                    self._store_l1(key, value, ttl, tags, local_generation)
+                    return value
+            except Exception as e:
+                self.stats["l2_errors"] += 1
+                logger.warning(f"Cache: L2 read failed for {key}: {e}")
+                client = None
+
+        self.stats["misses"] += 1
+        value = await loader()
+        if value is None and not cache_none:
+            return value
+        self._store_l1(key, value, ttl, tags, local_generation)
+        if client is not None:
+            try:
+                self._register_scripts(client)
+                value_tags = self._tags_for(value, tags)
+                await self._set_script(
+                    keys=[
+                        redis_key,
+                        *(TAG_KEY_PREFIX + tag for tag in value_tags),
+                        *(GENERATION_KEY_PREFIX + tag for tag in value_tags),
+                    ],
+                    args=[codec.encode(value), int(ttl * 1000), expected_seq, len(value_tags)],
+                )
+            except Exception as e:
+                self.stats["l2_errors"] += 1
+                logger.warning(f"Cache: L2 write failed for {key}: {e}")
+        return value
+
+    def _tags_for(self, value: Any, tags: Callable[[Any], Sequence[str]]) -> Tuple[str, ...]:
+        return tuple(tags(value)) if value is not None else ()
+
+    def _store_l1(self, key: str, value: Any, ttl: int, tags, local_generation: int) -> None:
+        value_tags = self._tags_for(value, tags)
+        if self._cleared_at > local_generation or any(
+            self._invalidated_at.get(tag, 0) > local_generation for tag in value_tags
+        ):
+            return # Tag value ini diinvalidasi selama load; value ini mungkin sudah basi
+        l1_ttl = self.l1_ttl_seconds if invalidation_bus.connected else self.l1_unsubscribed_ttl_seconds
+        self.l1.set(key, value, time.monotonic() + min(ttl, l1_ttl), value_tags)
+
+    def _invalidate_local(self, tags: Sequence[str]) -> None:
+        self._generation += 1
+        if len(self._invalidated_at) + len(tags) > _LOCAL_INVALIDATION_MAX_TAGS:
+            self._invalidated_at.clear()
+            self._cleared_at = self._generation
+        for tag in tags:
+            self._invalidated_at[tag] = self._generation
+        self.l1.invalidate_tags(tags)
+
+    async def invalidate_tags(self, tags: Sequence[str]) -> None:
+        if not self.enabled or not tags:
+            return
+        self.stats["invalidations"] += 1
+        self._invalidate_local(tags)
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            self._register_scripts(client)
+            await self._invalidate_script(
+                keys=[TAG_KEY_PREFIX + tag for tag in tags] + [GENERATION_KEY_PREFIX + tag for tag in tags] + [GENERATION_SEQ_KEY],
+                args=[len(tags), GENERATION_TTL_MS],
+            )
+        except Exception as e:
+            self.stats["l2_errors"] += 1
+            logger.error(f"Cache: L2 invalidation failed for tags {list(tags)}: {e}")
+        await invalidation_bus.publish(tags)
+
+    def apply_remote_invalidation(self, tags: Sequence[str]) -> None:
+        """Listener bus: L2 sudah diinvalidasi oleh worker pengirim, cukup L1 proses ini."""
+        self._invalidate_local(tags)
+
+    def clear_local(self) -> None:
+        self._generation += 1
+        self._invalidated_at.clear()
+        self._cleared_at = self._generation
+        self.l1.clear()
+
+    def cached(
+        self,
+        name: str,
+        *,
+        key: Callable[..., str],
+        codec: ModelCodec,
+        tags: Callable[[Any], Sequence[str]],
+        ttl: Optional[int] = None,
+        cache_none: bool = False,
+    ) -> Callable:
+        """
+        Decorator untuk method async read-path CRUD/service. Argumen `db` (jika ada)
+        ikut menjadi bagian key lewat nama database-nya. `tags` sekaligus menjadi guard:
+        value tidak disimpan jika salah satu tag-nya diinvalidasi selama load.
+
+            @two_tier_cache.cached("users:by_referral_code", key=lambda self, db, *, referral_code: referral_code,
+                                   codec=ModelCodec(UserInDB), tags=lambda user: [f"users:{user.id}"])
+        """
+        effective_ttl = ttl or settings.CACHE_DEFAULT_TTL_SECONDS
+
+        def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                db = kwargs.get("db", args[1] if len(args) > 1 else None)
+                db_name = getattr(db, "name", "-")
+                cache_key = f"{name}:{db_name}:{key(*args, **kwargs)}"
+                return await self.get_or_load(
+                    cache_key, lambda: fn(*args, **kwargs),
+                    codec=codec, ttl=effective_ttl, tags=tags, cache_none=cache_none,
+                )
+            wrapper.uncached = fn
+            return wrapper
+        return decorator
+
+
+def collection_tags(collection_name: str, doc_id: Any) -> List[str]:
+    """Tag yang diinvalidasi oleh setiap write CRUDBase: dokumennya sendiri dan seluruh koleksi."""
+    return [f"{collection_name}:{doc_id}", f"{collection_name}:*"]
+
+
+two_tier_cache = TwoTierCache(
+    l1_max_entries=settings.CACHE_L1_MAX_ENTRIES,
+    l1_ttl_seconds=settings.CACHE_L1_TTL_SECONDS,
+    l1_unsubscribed_ttl_seconds=settings.CACHE_L1_TTL_UNSUBSCRIBED_SECONDS,
+    enabled=settings.CACHE_ENABLED,
+)
@@ -1,17 +1,39 @@
 # ===========================================================================
-# File: app/core/config.py (MODIFIKASI: Tambahkan settings Twitter)
+# File: app/core/config.py (MODIFIKASI: Header Server-Timing opt-in)
 # ===========================================================================
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional, Dict, Any, List
+from pydantic import Field, AliasChoices
+from typing import Optional, Dict, Any, List, Literal
 import logging
 import os
 
+from app.utils.log_queue import setup_queue_logging
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Cigar DS API"
     API_V1_STR: str = "/api/v1"
     
     MONGODB_URL: str
     MONGODB_DB_NAME: str
+    # Driver async (app/db/backends.py): "motor" (thread pool) atau "pymongo" (AsyncMongoClient native).
+    # Default tetap "motor" sampai app/scripts/bench_mongo_drivers.py dijalankan terhadap server
+    # MongoDB sungguhan dan hasilnya menunjukkan "pymongo" lebih baik; set MONGODB_DRIVER=pymongo untuk mencoba.
+    MONGODB_DRIVER: Literal["motor", "pymongo"] = "motor"
+    # Test suite (app/tests/conftest.py) memakai database terpisah yang di-drop setelah sesi
+    TESTING_MODE: bool = False
+    MONGODB_TEST_DB_NAME: str = "cigar_ds_test"
+    # Koleksi registrasi airdrop milik api.py (legacy); default di database yang sama
+    REGISTRATIONS_DB_NAME: Optional[str] = None
+    REGISTRATIONS_COLLECTION_NAME: str = "user_registrations"
+    # Redis cache `wallet_data:` milik api.py (env yang sama: REDIS_URL)
+    REGISTRATIONS_REDIS_URL: Optional[str] = Field(default=None, validation_alias=AliasChoices("REGISTRATIONS_REDIS_URL", "REDIS_URL"))
+
+    # Alchemy (Base Mainnet) untuk eth_getTransactionCount
+    ALCHEMY_API_KEY: Optional[str] = None
+    ALCHEMY_RPC_URL: Optional[str] = None
+    POINTS_REFRESH_RPC_BATCH_SIZE: int = 100
+    POINTS_REFRESH_MAX_CONCURRENCY: int = 4
+    POINTS_REFRESH_INTERVAL_SECONDS: int = 6 * 60 * 60
 
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
@@ -31,6 +53,9 @@ class Settings(BaseSettings):
     TWITTER_CLIENT_ID: str
     TWITTER_CLIENT_SECRET: str
     TWITTER_CALLBACK_URL: str # URL callback yang didaftarkan di Twitter Dev Portal
+    # Diganti ke server stub (app/scripts/loadtest_stubs.py) saat load test
+    TWITTER_AUTHORIZATION_URL: str = "https://twitter.com/i/oauth2/authorize"
+    TWITTER_API_BASE_URL: str = "https://api.twitter.com"
 
     DEFAULT_RANK_OBSERVER: str = "Observer"
     
@@ -41,8 +66,63 @@ class Settings(BaseSettings):
     RANK_ORDER: List[str] = ["Observer", "Ally", "Field Agent", "Strategist", "Commander", "Overseer"]
 
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    # Log ditulis thread QueueListener (app/utils/log_queue.py); log INFO/DEBUG per call site
+    # dibatasi sekian baris per detik, kelebihannya dibuang dan dihitung. 0 = tanpa sampling
+    LOG_SAMPLE_MAX_PER_SECOND: int = 20
     NONCE_EXPIRY_SECONDS: int = 300
 
+    # Kompresi respons (app/middleware/compression.py); brotli aktif jika modul Brotli terpasang
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+
+    # News feed (snapshot in-memory, lihat app/services/news_service.py)
+    NEWS_FEED_MAX_AGE_SECONDS: int = 30
+    NEWS_REFRESH_INTERVAL_SECONDS: int = 15 # Polling versi jika change stream tidak tersedia
+    NEWS_FULL_RELOAD_SECONDS: int = 300
+
+    # Cache dua tingkat (app/core/cache.py): L1 in-process, L2 Redis DB REDIS_DB_CACHE
+    CACHE_ENABLED: bool = True
+    CACHE_L1_MAX_ENTRIES: int = 10000
+    CACHE_L1_TTL_SECONDS: float = 300.0 # L1 diinvalidasi lewat bus pub/sub; TTL hanya jaring pengaman
+    CACHE_L1_TTL_UNSUBSCRIBED_SECONDS: float = 5.0 # Dipakai selama worker tidak tersambung ke bus invalidasi
+    CACHE_DEFAULT_TTL_SECONDS: int = 300
+    CACHE_BUS_HEARTBEAT_SECONDS: float = 5.0
+
+    # Log line `request_timing` per request (app/utils/server_timing.py)
+    SERVER_TIMING_ENABLED: bool = True
+    SERVER_TIMING_EXPOSE_HEADER: bool = False # Header Server-Timing ke client; rincian internal, hanya untuk debugging
+
+    # Endpoint /metrics (format teks Prometheus) dan sampler lag event loop
+    METRICS_ENABLED: bool = True
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+    LOOP_BLOCK_THRESHOLD_MS: float = 100.0 # Watchdog mencatat stack loop jika terblokir selama ini; 0 = mati
+
+    # Health probe background + circuit breaker per dependency (app/utils/health.py).
+    # Circuit terbuka: request yang butuh dependency itu langsung 503, /health dari hasil probe terakhir
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 1.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 1.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 2 # Probe gagal berturut-turut sebelum circuit terbuka
+    CIRCUIT_RECOVERY_THRESHOLD: int = 2 # Probe sukses berturut-turut sebelum circuit tertutup lagi
+    # Batas waktu socket Redis; tanpa ini command ke Redis yang blackhole menunggu sampai TCP timeout
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 2.0
+
+    # Profiling on-demand khusus admin (header X-Profile / endpoint /system/profiling); mati = tanpa overhead
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILING_MAX_SECONDS: int = 60
+    PROFILING_RESULT_TTL_SECONDS: int = 600
+
+    # Rate limit terdistribusi (app/api/rate_limit.py), format slowapi; beberapa rate dipisah koma
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_CHALLENGE_PER_IP: str = "30/minute"
+    RATE_LIMIT_CHALLENGE_PER_WALLET: str = "10/minute"
+    RATE_LIMIT_CONNECT_PER_IP: str = "20/minute"
+    RATE_LIMIT_CONNECT_PER_WALLET: str = "10/minute"
+    RATE_LIMIT_COMPLETE_PER_IP: str = "120/minute"
+    RATE_LIMIT_COMPLETE_PER_USER: str = "30/minute,1000/day"
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding='utf-8',
@@ -56,6 +136,7 @@ class Settings(BaseSettings):
     def set_computed_urls(self) -> 'Settings':
         nonce_redis_password_part = f":{self.REDIS_PASSWORD}@" if self.REDIS_PASSWORD else ""
         self.NONCE_REDIS_URL = f"redis://{nonce_redis_password_part}{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB_NONCE}"
+        self.CACHE_REDIS_URL = f"redis://{nonce_redis_password_part}{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB_CACHE}"
         
         celery_redis_password_part = f":{self.REDIS_PASSWORD}@" if self.REDIS_PASSWORD else ""
         celery_redis_url = f"redis://{celery_redis_password_part}{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB_CELERY}"
@@ -63,19 +144,18 @@ class Settings(BaseSettings):
             self.CELERY_BROKER_URL = celery_redis_url
         if self.CELERY_RESULT_BACKEND is None:
             self.CELERY_RESULT_BACKEND = celery_redis_url
+        if self.ALCHEMY_RPC_URL is None and self.ALCHEMY_API_KEY:
+            self.ALCHEMY_RPC_URL = f"https://base-mainnet.g.alchemy.com/v2/{self.ALCHEMY_API_KEY}"
         return self
     
     NONCE_REDIS_URL: Optional[str] = None
+    CACHE_REDIS_URL: Optional[str] = None
 
 settings = Settings()
 
-logging.basicConfig(
-    level=settings.LOG_LEVEL,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+setup_queue_logging(settings.LOG_LEVEL, sample_max_per_second=settings.LOG_SAMPLE_MAX_PER_SECOND)
 logger = logging.getLogger(settings.PROJECT_NAME)
-logger.info(f"Logger initialized with level: {settings.LOG_LEVEL}")
+logger.info("Logger initialized with level: %s", settings.LOG_LEVEL)
 if "YOUR_VERY_STRONG_AND_LONG_SECRET_KEY" in settings.SECRET_KEY: # Check default secret
     logger.critical("SECURITY WARNING: Default SECRET_KEY is in use or too weak. Please change it in your .env file immediately!")
 if not settings.TWITTER_CLIENT_ID or not settings.TWITTER_CLIENT_SECRET:
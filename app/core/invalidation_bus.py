@@ -0,0 +1,200 @@
+# ===========================================================================
+# File: app/core/invalidation_bus.py (BARU)
+# ===========================================================================
+import asyncio
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Sequence
+
+from app.core.config import settings, logger
+from app.db.redis_conn import redis_manager
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+PUBLISHER_EXPIRY_HEARTBEATS = 12 # Publisher yang diam selama ini dianggap worker yang sudah berhenti
+
+TagsHandler = Callable[[Sequence[str]], None]
+FlushHandler = Callable[[], None]
+
+
+class InvalidationBus:
+    """
+    Bus invalidasi cache antar worker lewat Redis pub/sub.
+
+    Pesan: `{publisher_id}|{seq}|{tag1,tag2,...}`; heartbeat berkala memakai tags kosong
+    dengan seq terakhir. Setiap worker melacak seq terakhir per publisher: lompatan seq
+    (pesan hilang), subscribe ulang setelah koneksi putus, atau tidak ada pesan sama sekali
+    (termasuk heartbeat sendiri) selama beberapa interval memicu full flush ke semua listener.
+
+    Publisher yang tidak terdengar selama PUBLISHER_EXPIRY_HEARTBEATS heartbeat dilupakan, jadi
+    state tidak tumbuh seiring restart worker. Publisher tak dikenal yang muncul setelah jendela
+    awal subscribe dengan seq yang sudah berjalan (misal publisher yang sempat dilupakan) dianggap
+    punya pesan yang terlewat dan memicu flush; worker baru selalu mulai dari seq 0.
+    """
+
+    def __init__(self, heartbeat_seconds: float = 5.0):
+        self.publisher_id = uuid.uuid4().hex[:12]
+        self.heartbeat_seconds = heartbeat_seconds
+        self.connected = False
+        self._seq = 0
+        self._publish_lock = asyncio.Lock() # Urutan seq di channel harus sama dengan urutan publish
+        self._last_seen: Dict[str, int] = {}
+        self._last_heard: Dict[str, float] = {} # publisher_id -> time.monotonic() pesan terakhir
+        self._subscribed_at: Optional[float] = None
+        self._tags_handlers: List[TagsHandler] = []
+        self._flush_handlers: List[FlushHandler] = []
+        self._tasks: List[asyncio.Task] = []
+        self.stats: Dict[str, int] = {"published": 0, "received": 0, "gaps": 0, "flushes": 0, "reconnects": 0}
+
+    def add_listener(self, on_tags: TagsHandler, on_flush: FlushHandler) -> None:
+        self._tags_handlers.append(on_tags)
+        self._flush_handlers.append(on_flush)
+
+    async def publish(self, tags: Sequence[str]) -> None:
+        if redis_manager.cache_client is None or not tags:
+            return
+        async with self._publish_lock:
+            self._seq += 1 # Tetap naik walau publish gagal: worker lain akan melihat lompatan seq dan flush
+            client = redis_manager.available_cache_client()
+            if client is None:
+                # Circuit Redis terbuka (bisa hanya di worker ini): pesan dilewati, tapi seq sudah naik,
+                # jadi heartbeat berikutnya membuat worker lain melihat lompatan dan flush L1
+                return
+            message = f"{self.publisher_id}|{self._seq}|{','.join(tags)}"
+            try:
+                await client.publish(INVALIDATION_CHANNEL, message)
+                self.stats["published"] += 1
+            except Exception as e:
+                logger.error(f"InvalidationBus: publish failed for tags {list(tags)}: {e}")
+
+    async def _publish_heartbeat(self) -> None:
+        client = redis_manager.cache_client
+        if client is None:
+            return
+        async with self._publish_lock:
+            await client.publish(INVALIDATION_CHANNEL, f"{self.publisher_id}|{self._seq}|")
+
+    def _flush(self, reason: str, *, expected: bool = False) -> None:
+        self.stats["flushes"] += 1
+        if expected:
+            logger.info("InvalidationBus: full local cache flush (%s).", reason)
+        else:
+            logger.warning(f"InvalidationBus: full local cache flush ({reason}).")
+        for handler in self._flush_handlers:
+            try:
+                handler()
+            except Exception as e:
+                logger.error(f"InvalidationBus: flush handler failed: {e}", exc_info=True)
+
+    def _handle_message(self, data: bytes) -> None:
+        try:
+            publisher_id, seq_text, tags_text = data.decode("utf-8").split("|", 2)
+            seq = int(seq_text)
+        except (UnicodeDecodeError, ValueError):
+            logger.warning(f"InvalidationBus: ignoring malformed message: {data[:100]!r}")
+            return
+        if publisher_id == self.publisher_id:
+            return
+        self.stats["received"] += 1
+        now = time.monotonic()
+        self._last_heard[publisher_id] = now
+        last_seq = self._last_seen.get(publisher_id)
+        if last_seq is None and not self._in_adoption_window(now):
+            last_seq = 0 # Di luar jendela subscribe, publisher tak dikenal harus mulai dari seq awal
+        is_heartbeat = tags_text == ""
+        expected_seq = last_seq if is_heartbeat else (last_seq + 1 if last_seq is not None else None)
+        self._last_seen[publisher_id] = max(seq, last_seq or 0)
+        if expected_seq is not None and seq > expected_seq:
+            self.stats["gaps"] += 1
+            self._flush(f"missed messages from {publisher_id}: expected seq {expected_seq}, got {seq}")
+            return
+        if is_heartbeat:
+            return
+        tags = tags_text.split(",")
+        for handler in self._tags_handlers:
+            try:
+                handler(tags)
+            except Exception as e:
+                logger.error(f"InvalidationBus: tags handler failed: {e}", exc_info=True)
+
+    def _in_adoption_window(self, now: float) -> bool:
+        # Pesan sebelum subscribe sudah tertutup flush saat subscribe; setiap publisher hidup
+        # mengirim heartbeat dalam satu interval, jadi dua interval cukup untuk mengenal semuanya
+        return self._subscribed_at is not None and now - self._subscribed_at < self.heartbeat_seconds * 2
+
+    def _evict_silent_publishers(self) -> None:
+        cutoff = time.monotonic() - self.heartbeat_seconds * PUBLISHER_EXPIRY_HEARTBEATS
+        for publisher_id in [publisher_id for publisher_id, heard_at in self._last_heard.items() if heard_at < cutoff]:
+            del self._last_heard[publisher_id]
+            self._last_seen.pop(publisher_id, None)
+            logger.info("InvalidationBus: forgot publisher %s after %s silent heartbeats.", publisher_id, PUBLISHER_EXPIRY_HEARTBEATS)
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._listen_loop()), asyncio.create_task(self._heartbeat_loop())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self.connected = False
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                await self._publish_heartbeat()
+            except Exception as e:
+                logger.warning(f"InvalidationBus: heartbeat publish failed: {e}")
+
+    async def _listen_loop(self) -> None:
+        backoff = 0.5
+        silence_limit = self.heartbeat_seconds * 3
+        while True:
+            client = redis_manager.cache_client
+            if client is None:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+                continue
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                self._last_seen.clear()
+                self._last_heard.clear()
+                self._subscribed_at = time.monotonic()
+                self.connected = True
+                # Pesan selama belum/tidak subscribe hilang (pub/sub at-most-once)
+                self._flush("subscribed to invalidation channel", expected=self.stats["reconnects"] == 0)
+                backoff = 0.5
+                last_message_at = last_eviction_at = time.monotonic()
+                while True:
+                    message = await pubsub.get_message(timeout=self.heartbeat_seconds)
+                    if time.monotonic() - last_eviction_at >= self.heartbeat_seconds:
+                        self._evict_silent_publishers()
+                        last_eviction_at = time.monotonic()
+                    if message is not None and message.get("type") == "message":
+                        last_message_at = time.monotonic()
+                        self._handle_message(message["data"])
+                    elif time.monotonic() - last_message_at > silence_limit:
+                        # Heartbeat sendiri pun tidak kembali: koneksi subscribe dianggap mati
+                        raise ConnectionError(f"no messages for {silence_limit:.0f}s")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["reconnects"] += 1
+                logger.error(f"InvalidationBus: subscription lost: {e}. Reconnecting in {backoff:.1f}s.")
+            finally:
+                self.connected = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10.0)
+
+
+invalidation_bus = InvalidationBus(heartbeat_seconds=settings.CACHE_BUS_HEARTBEAT_SECONDS)
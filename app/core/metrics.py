@@ -0,0 +1,50 @@
+# ===========================================================================
+# File: app/core/metrics.py (BARU)
+# ===========================================================================
+# Collector metrik spesifik app utama (cache, bus invalidasi, kompresi, pool Redis).
+# Primitif registry/middleware ada di app/utils/metrics.py.
+from typing import List, Tuple
+
+from app.core.cache import two_tier_cache
+from app.core.invalidation_bus import invalidation_bus
+from app.db.redis_conn import redis_manager
+from app.middleware.compression import active_compression_middlewares
+from app.utils.metrics import LabelValues, hit_ratio, register_redis_pool, registry
+
+
+def _two_tier_cache_events() -> List[Tuple[LabelValues, float]]:
+    return [((event,), count) for event, count in two_tier_cache.stats.items()]
+
+
+def _cache_hit_ratios() -> List[Tuple[LabelValues, float]]:
+    stats = two_tier_cache.stats
+    samples = [
+        (("two_tier",), hit_ratio(stats["l1_hits"] + stats["l2_hits"], stats["misses"])),
+        (("two_tier_l1",), hit_ratio(stats["l1_hits"], stats["l2_hits"] + stats["misses"])),
+    ]
+    hits = sum(middleware.cache_hits for middleware in active_compression_middlewares)
+    misses = sum(middleware.cache_misses for middleware in active_compression_middlewares)
+    samples.append((("compression",), hit_ratio(hits, misses)))
+    return samples
+
+
+def _compression_bytes() -> List[Tuple[LabelValues, float]]:
+    return [
+        (("in",), sum(middleware.bytes_in for middleware in active_compression_middlewares)),
+        (("out",), sum(middleware.bytes_out for middleware in active_compression_middlewares)),
+    ]
+
+
+def _invalidation_bus_events() -> List[Tuple[LabelValues, float]]:
+    return [((event,), count) for event, count in invalidation_bus.stats.items()]
+
+
+def register_app_metrics() -> None:
+    registry.callback_counter("cache_events_total", "Two-tier cache events since start", _two_tier_cache_events, ("event",))
+    registry.callback_gauge("cache_hit_ratio", "Cache hit ratio since start", _cache_hit_ratios, ("cache",))
+    registry.callback_gauge("cache_l1_entries", "Entries in the in-process L1 cache", lambda: [((), len(two_tier_cache.l1))])
+    registry.callback_counter("compression_bytes_total", "Response bytes before/after compression", _compression_bytes, ("direction",))
+    registry.callback_counter("cache_invalidation_bus_events_total", "Invalidation bus events since start", _invalidation_bus_events, ("event",))
+    registry.callback_gauge("cache_invalidation_bus_connected", "1 if subscribed to the invalidation channel", lambda: [((), float(invalidation_bus.connected))])
+    register_redis_pool("nonce", lambda: redis_manager.redis_client)
+    register_redis_pool("cache", lambda: redis_manager.cache_client)
@@ -0,0 +1,184 @@
+# ===========================================================================
+# File: app/core/rate_limit.py (BARU)
+# ===========================================================================
+import math
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from cachetools import LRUCache
+
+from app.core.config import logger
+from app.db.redis_conn import redis_manager
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit:"
+
+_PERIOD_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Sliding window counter (dua fixed window berbobot) untuk beberapa aturan sekaligus:
+# request hanya dihitung jika SEMUA aturan masih di bawah limit.
+# KEYS: per aturan (current_window_key, previous_window_key)
+# ARGV: per aturan (limit, window_ms, elapsed_ms di window sekarang)
+# Return: {allowed, remaining minimum, retry_after_ms maksimum}
+_SLIDING_WINDOW_LUA = """
+local rule_count = #KEYS / 2
+local allowed = 1
+local min_remaining = -1
+local retry_after = 0
+local currents = {}
+for i = 1, rule_count do
+    local limit = tonumber(ARGV[3 * i - 2])
+    local window = tonumber(ARGV[3 * i - 1])
+    local elapsed = tonumber(ARGV[3 * i])
+    local current = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    currents[i] = current
+    local weighted = previous * (window - elapsed) / window + current
+    local remaining = math.floor(limit - weighted - 1)
+    if weighted + 1 > limit then
+        allowed = 0
+        remaining = 0
+        local wait
+        if current + 1 > limit or previous == 0 then
+            wait = window - elapsed
+        else
+            wait = (window - elapsed) - (limit - 1 - current) * window / previous
+        end
+        if wait > retry_after then
+            retry_after = math.ceil(wait)
+        end
+    end
+    if min_remaining < 0 or remaining < min_remaining then
+        min_remaining = remaining
+    end
+end
+if allowed == 1 then
+    for i = 1, rule_count do
+        redis.call('INCR', KEYS[2 * i - 1])
+        redis.call('PEXPIRE', KEYS[2 * i - 1], tonumber(ARGV[3 * i - 1]) * 2)
+    end
+end
+return {allowed, min_remaining, retry_after}
+"""
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """'10/minute' atau '100/2hour' -> (limit, window detik), format yang sama dengan slowapi di api.py."""
+    count_text, _, period_text = rate.strip().partition("/")
+    period_text = period_text.strip().lower()
+    multiplier_text = "".join(ch for ch in period_text if ch.isdigit())
+    unit = period_text[len(multiplier_text):].rstrip("s")
+    if unit not in _PERIOD_SECONDS:
+        raise ValueError(f"Invalid rate limit '{rate}'")
+    return int(count_text), int(multiplier_text or 1) * _PERIOD_SECONDS[unit]
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    scope: str # "ip" | "wallet" | "user"
+    limit: int
+    window_seconds: int
+
+    @classmethod
+    def from_rate(cls, scope: str, rate: str) -> "RateLimitRule":
+        limit, window_seconds = parse_rate(rate)
+        return cls(scope=scope, limit=limit, window_seconds=window_seconds)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    retry_after_seconds: int
+
+
+class _LocalSlidingWindow:
+    """Fallback per proses saat Redis tidak tersedia; algoritma sama dengan skrip Lua."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self._counters: LRUCache = LRUCache(maxsize=max_keys) # base_key -> (window_index, current, previous)
+
+    def hit(self, checks: Sequence[Tuple[str, RateLimitRule]], now_ms: int) -> Tuple[int, int, int]:
+        allowed, min_remaining, retry_after = 1, -1, 0
+        states = []
+        for base_key, rule in checks:
+            window_ms = rule.window_seconds * 1000
+            window_index, elapsed = divmod(now_ms, window_ms)
+            stored_index, current, previous = self._counters.get(base_key, (window_index, 0, 0))
+            if stored_index != window_index:
+                previous = current if stored_index == window_index - 1 else 0
+                current = 0
+            states.append((base_key, window_index, current, previous))
+            weighted = previous * (window_ms - elapsed) / window_ms + current
+            remaining = math.floor(rule.limit - weighted - 1)
+            if weighted + 1 > rule.limit:
+                allowed, remaining = 0, 0
+                if current + 1 > rule.limit or previous == 0:
+                    wait = window_ms - elapsed
+                else:
+                    wait = (window_ms - elapsed) - (rule.limit - 1 - current) * window_ms / previous
+                retry_after = max(retry_after, math.ceil(wait))
+            min_remaining = remaining if min_remaining < 0 else min(min_remaining, remaining)
+        for base_key, window_index, current, previous in states:
+            self._counters[base_key] = (window_index, current + allowed, previous)
+        return allowed, min_remaining, retry_after
+
+
+class SlidingWindowRateLimiter:
+    """
+    Rate limiter terdistribusi (Redis DB nonce) dengan sliding window counter.
+
+    Satu pemeriksaan = satu EVALSHA untuk semua aturan (per IP, per wallet, per user).
+    Jika Redis tidak tersedia atau error, limiter turun ke counter in-process per worker
+    (limit efektif jadi per worker, tapi endpoint tetap terlindungi dan tidak gagal).
+    """
+
+    def __init__(self):
+        self._script = None
+        self._local = _LocalSlidingWindow()
+        self._degraded = False
+
+    def _register_script(self, client) -> None:
+        if self._script is None or self._script.registered_client is not client:
+            self._script = client.register_script(_SLIDING_WINDOW_LUA)
+
+    async def hit(self, name: str, checks: Sequence[Tuple[RateLimitRule, str]]) -> RateLimitResult:
+        """`checks`: pasangan (aturan, identitas), misal (RateLimitRule('ip', 30, 60), '1.2.3.4')."""
+        now_ms = int(time.time() * 1000)
+        keyed = [(f"{RATE_LIMIT_KEY_PREFIX}{name}:{rule.scope}:{identity}:{rule.window_seconds}", rule) for rule, identity in checks]
+        result = await self._hit_redis(keyed, now_ms)
+        if result is None:
+            result = self._local.hit(keyed, now_ms)
+        allowed, remaining, retry_after_ms = result
+        return RateLimitResult(allowed=bool(allowed), remaining=max(0, int(remaining)), retry_after_seconds=math.ceil(int(retry_after_ms) / 1000))
+
+    async def _hit_redis(self, keyed: Sequence[Tuple[str, RateLimitRule]], now_ms: int) -> Optional[List[int]]:
+        client = redis_manager.available_redis_client()
+        if client is None:
+            self._set_degraded(True, "Redis client unavailable")
+            return None
+        keys: List[str] = []
+        args: List[int] = []
+        for base_key, rule in keyed:
+            window_ms = rule.window_seconds * 1000
+            window_index, elapsed = divmod(now_ms, window_ms)
+            keys += [f"{base_key}:{window_index}", f"{base_key}:{window_index - 1}"]
+            args += [rule.limit, window_ms, elapsed]
+        try:
+            self._register_script(client)
+            result = await self._script(keys=keys, args=args)
+        except Exception as e:
+            self._set_degraded(True, str(e))
+            return None
+        self._set_degraded(False)
+        return result
+
+    def _set_degraded(self, degraded: bool, reason: str = "") -> None:
+        if degraded and not self._degraded:
+            logger.warning(f"RateLimiter: Redis unavailable ({reason}), falling back to per-process limits.")
+        elif not degraded and self._degraded:
+            logger.info("RateLimiter: Redis available again, using distributed limits.")
+        self._degraded = degraded
+
+
+rate_limiter = SlidingWindowRateLimiter()
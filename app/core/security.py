@@ -1,8 +1,12 @@
 # ===========================================================================
-# File: app/core/security.py (MODIFIKASI)
+# File: app/core/security.py (MODIFIKASI: Log dengan argumen %-style)
 # ===========================================================================
+import hashlib
+import hmac
+import re
+import secrets
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union, Optional
+from typing import Any, Union, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from eth_account.messages import encode_defunct
@@ -13,6 +17,11 @@ from app.core.config import settings, logger
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Kunci turunan khusus challenge, jadi HMAC challenge tidak bisa dipakai ulang sebagai tanda tangan lain
+_CHALLENGE_KEY = hmac.new(settings.SECRET_KEY.encode("utf-8"), b"wallet-challenge-v1", hashlib.sha256).digest()
+_CHALLENGE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+_CHALLENGE_PATTERN = re.compile(r"Nonce unik Anda: (?P<nonce>[0-9a-f]{32})\. Berlaku sampai: (?P<expires>\S+) \(ref (?P<salt>[0-9a-f]{16})\)$")
+
 def create_access_token(subject: Union[str, Any], user_id: str, expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -22,6 +31,47 @@ def create_access_token(subject: Union[str, Any], user_id: str, expires_delta: O
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def _challenge_nonce(wallet_address: str, expires_at: int, salt: str) -> str:
+    payload = f"{wallet_address.lower()}|{expires_at}|{salt}".encode("utf-8")
+    return hmac.new(_CHALLENGE_KEY, payload, hashlib.sha256).hexdigest()[:32]
+
+def create_wallet_challenge(wallet_address: str) -> Tuple[str, str]:
+    """
+    Challenge stateless: nonce = HMAC(wallet, expiry, salt), expiry dan salt ikut di pesan.
+    Tidak ada yang disimpan; `verify_wallet_challenge` menghitung ulang nonce dari pesan.
+    Mengembalikan (message_to_sign, nonce).
+    """
+    expires_at = int(datetime.now(timezone.utc).timestamp()) + settings.NONCE_EXPIRY_SECONDS
+    salt = secrets.token_hex(8)
+    nonce = _challenge_nonce(wallet_address, expires_at, salt)
+    expires_text = datetime.fromtimestamp(expires_at, timezone.utc).strftime(_CHALLENGE_TIME_FORMAT)
+    message_to_sign = (
+        f"Selamat datang di {settings.PROJECT_NAME}! Silakan tandatangani pesan ini untuk melanjutkan. "
+        f"Nonce unik Anda: {nonce}. Berlaku sampai: {expires_text} (ref {salt})"
+    )
+    return message_to_sign, nonce
+
+def verify_wallet_challenge(wallet_address: str, message: str, nonce: str) -> Tuple[str, int]:
+    """
+    Mengembalikan (status, expires_at epoch). Status: "ok", "malformed" (pesan bukan challenge kita),
+    "mismatch" (nonce tidak cocok dengan pesan/wallet) atau "expired".
+    """
+    match = _CHALLENGE_PATTERN.search(message)
+    if match is None:
+        return "malformed", 0
+    try:
+        expires_at = int(datetime.strptime(match["expires"], _CHALLENGE_TIME_FORMAT).replace(tzinfo=timezone.utc).timestamp())
+    except ValueError:
+        return "malformed", 0
+    expected_nonce = _challenge_nonce(wallet_address, expires_at, match["salt"])
+    # Dibandingkan sebagai bytes: compare_digest menolak str non-ASCII dengan TypeError (500)
+    nonce_bytes = nonce.encode("utf-8")
+    if not (hmac.compare_digest(nonce_bytes, match["nonce"].encode("ascii")) and hmac.compare_digest(nonce_bytes, expected_nonce.encode("ascii"))):
+        return "mismatch", expires_at
+    if expires_at <= int(datetime.now(timezone.utc).timestamp()):
+        return "expired", expires_at
+    return "ok", expires_at
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -36,7 +86,7 @@ def verify_wallet_signature(wallet_address: str, original_message: str, signatur
     try:
         # Web3.is_address adalah static method, jadi bisa dipanggil langsung
         if not Web3.is_address(wallet_address):
-            logger.warning(f"Attempt to verify signature with invalid wallet address format: {wallet_address}")
+            logger.warning("Attempt to verify signature with invalid wallet address format: %s", wallet_address)
             return False
             
         message_hash_obj = encode_defunct(text=original_message)
@@ -48,10 +98,10 @@ def verify_wallet_signature(wallet_address: str, original_message: str, signatur
         is_valid = recovered_address.lower() == wallet_address.lower()
         if not is_valid:
             logger.warning(
-                f"Signature verification failed. Expected: {wallet_address.lower()}, Recovered: {recovered_address.lower()}"
+                "Signature verification failed. Expected: %s, Recovered: %s", wallet_address.lower(), recovered_address.lower()
             )
         return is_valid
     except Exception as e:
         # Tangkap error yang lebih spesifik jika memungkinkan, misal dari eth_keys.exceptions.BadSignature
-        logger.error(f"Error during signature verification for {wallet_address}: {e}", exc_info=True)
+        logger.error("Error during signature verification for %s: %s", wallet_address, e, exc_info=True)
         return False
\ No newline at end of file
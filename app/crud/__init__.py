@@ -1,7 +1,19 @@
 # ===========================================================================
-# File: app/crud/__init__.py (MODIFIKASI: Tambahkan CRUD baru)
+# File: app/crud/__init__.py (MODIFIKASI: ensure_indexes per koleksi)
 # ===========================================================================
+from app.core.config import logger
 from .base import CRUDBase
 from .crud_user import crud_user
 from .crud_badge import crud_badge, crud_user_badge_link # BARU
 from .crud_mission import crud_mission, crud_user_mission_link # BARU
+from .crud_news import crud_news # BARU
+
+ALL_CRUDS = [crud_user, crud_badge, crud_user_badge_link, crud_mission, crud_user_mission_link, crud_news]
+
+async def ensure_indexes(db) -> None:
+    """Membuat index yang dideklarasikan di setiap CRUD (idempoten, dipanggil saat startup)."""
+    for crud in ALL_CRUDS:
+        try:
+            await crud.ensure_indexes(db)
+        except Exception as e: # Konflik index (mis. data lama duplikat) tidak boleh menggagalkan koleksi lain
+            logger.error(f"Failed to ensure indexes on '{crud.collection_name}': {e}")
@@ -1,14 +1,17 @@
 # ===========================================================================
-# File: app/crud/base.py (MODIFIKASI: Penanganan update operator yang lebih eksplisit)
+# File: app/crud/base.py (MODIFIKASI: Log dengan argumen %-style)
 # ===========================================================================
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel as PydanticBaseModel, HttpUrl as PydanticHttpUrl
 from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorCollection
+from pymongo import IndexModel, ReturnDocument
 from app.models.base import PyObjectId
 from fastapi import HTTPException, status
 from datetime import datetime, timezone
 from app.core.config import logger
+from app.core.cache import two_tier_cache, collection_tags
+from app.db import backends as db_backends
 from bson import ObjectId
 
 ModelType = TypeVar("ModelType", bound=PydanticBaseModel)
@@ -40,21 +43,30 @@ def _convert_pydantic_types_to_bson(data: Dict[str, Any]) -> Dict[str, Any]:
     return processed_data
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: Type[ModelType], collection_name: str):
+    def __init__(self, model: Type[ModelType], collection_name: str, indexes: Optional[List[IndexModel]] = None):
         self.model = model
         self.collection_name = collection_name
+        self.indexes = indexes or [] # Dibuat saat startup oleh ensure_indexes
+
+    async def ensure_indexes(self, db: AsyncIOMotorDatabase) -> List[str]:
+        if not self.indexes:
+            return []
+        collection = await self.get_collection(db)
+        names = await collection.create_indexes(self.indexes)
+        logger.debug("CRUD: Ensured indexes on '%s': %s", self.collection_name, names)
+        return names
 
     async def get_collection(self, db: AsyncIOMotorDatabase) -> AsyncIOMotorCollection:
         return db[self.collection_name]
 
     async def get(self, db: AsyncIOMotorDatabase, id: PyObjectId) -> Optional[ModelType]:
         collection = await self.get_collection(db)
-        logger.debug(f"CRUD: Attempting to find document in '{self.collection_name}' with _id: {ObjectId(id)}")
+        logger.debug("CRUD: Attempting to find document in '%s' with _id: %s", self.collection_name, id)
         doc = await collection.find_one({"_id": ObjectId(id)}) # Selalu query dengan bson.ObjectId
         if doc:
-            logger.debug(f"CRUD: Document found in '{self.collection_name}' for _id: {id}")
+            logger.debug("CRUD: Document found in '%s' for _id: %s", self.collection_name, id)
             return self.model.model_validate(doc)
-        logger.warning(f"CRUD: Document NOT found in '{self.collection_name}' for _id: {id}")
+        logger.warning("CRUD: Document NOT found in '%s' for _id: %s", self.collection_name, id)
         return None
 
     async def get_multi(
@@ -68,14 +80,14 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             try:
                 db_query["_id"] = ObjectId(db_query["_id"])
             except Exception: # bson.errors.InvalidId
-                logger.warning(f"Invalid ObjectId string in query for get_multi: {db_query['_id']}")
+                logger.warning("Invalid ObjectId string in query for get_multi: %s", db_query['_id'])
                 return []
         # Konversi field lain yang mungkin PyObjectId juga jika perlu
         if "referredBy" in db_query and isinstance(db_query["referredBy"], str): # Contoh
              try:
                 db_query["referredBy"] = ObjectId(db_query["referredBy"])
              except Exception:
-                logger.warning(f"Invalid ObjectId string for 'referredBy' in query: {db_query['referredBy']}")
+                logger.warning("Invalid ObjectId string for 'referredBy' in query: %s", db_query['referredBy'])
                 return []
 
         cursor = collection.find(db_query).skip(skip).limit(limit)
@@ -84,23 +96,43 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         documents = await cursor.to_list(length=limit)
         return [self.model.model_validate(doc) for doc in documents]
 
+    async def get_version(
+        self, db: AsyncIOMotorDatabase, *, query: Optional[Dict[str, Any]] = None,
+        fields: Sequence[str] = ("_id", "updatedAt")
+    ) -> List[Any]:
+        """
+        Versi ringkas sekumpulan dokumen untuk ETag: [jumlah, max(field1), max(field2), ...]
+        dalam satu aggregate. Insert mengubah max(_id), update lewat CRUDBase.update mengubah
+        max(updatedAt), dan delete mengubah jumlah.
+        """
+        collection = await self.get_collection(db)
+        group: Dict[str, Any] = {"_id": None, "count": {"$sum": 1}}
+        for index, field in enumerate(fields):
+            group[f"max{index}"] = {"$max": f"${field}"}
+        cursor = await db_backends.aggregate(collection, [{"$match": query or {}}, {"$group": group}])
+        docs = await cursor.to_list(length=1)
+        if not docs:
+            return [0] + [None] * len(fields)
+        return [docs[0]["count"]] + [docs[0][f"max{index}"] for index in range(len(fields))]
+
     async def create(self, db: AsyncIOMotorDatabase, *, obj_in: ModelType) -> ModelType:
         collection = await self.get_collection(db)
         # obj_in sudah merupakan instance ModelType (misal UserInDB)
         # model_dump() akan menggunakan json_encoders jika ada di model, TAPI kita mau tipe asli untuk DB
         obj_in_dict = obj_in.model_dump(by_alias=True, exclude_none=True) 
         bson_compatible_data = _convert_pydantic_types_to_bson(obj_in_dict) # Konversi manual tipe khusus
-        logger.debug(f"CRUD: Creating document in '{self.collection_name}' with BSON-compatible data: {bson_compatible_data}")
+        logger.debug("CRUD: Creating document in '%s' with BSON-compatible data: %s", self.collection_name, bson_compatible_data)
         
         result = await collection.insert_one(bson_compatible_data)
         if not result.inserted_id:
-             logger.error(f"CRUD: Insert failed for {self.collection_name}, no inserted_id. Data: {bson_compatible_data}")
+             logger.error("CRUD: Insert failed for %s, no inserted_id. Data: %s", self.collection_name, bson_compatible_data)
              raise Exception(f"Database insert failed for {self.collection_name}, no inserted_id.")
         
-        logger.debug(f"CRUD: Document inserted in '{self.collection_name}' with new _id: {result.inserted_id}")
+        logger.debug("CRUD: Document inserted in '%s' with new _id: %s", self.collection_name, result.inserted_id)
+        await two_tier_cache.invalidate_tags(collection_tags(self.collection_name, result.inserted_id))
         created_doc = await collection.find_one({"_id": result.inserted_id})
         if not created_doc:
-            logger.error(f"CRUD: Failed to retrieve document after insert for {self.collection_name}, id: {result.inserted_id}")
+            logger.error("CRUD: Failed to retrieve document after insert for %s, id: %s", self.collection_name, result.inserted_id)
             raise Exception(f"Database retrieval failed after insert for {self.collection_name}, id: {result.inserted_id}")
         return self.model.model_validate(created_doc)
 
@@ -143,25 +175,27 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         else:
             raise ValueError("obj_in must be a Pydantic model or a dictionary for update")
 
-        logger.debug(f"CRUD: Attempting to update document in '{self.collection_name}' with _id: {db_obj_id}, update_payload: {update_payload}")
+        logger.debug("CRUD: Attempting to update document in '%s' with _id: %s, update_payload: %s", self.collection_name, db_obj_id, update_payload)
 
-        result = await collection.update_one(
-            {"_id": ObjectId(db_obj_id)}, update_payload # Menggunakan update_payload yang sudah diformat
+        # Dokumen hasil update dikembalikan server dalam round trip yang sama (tanpa find_one ulang)
+        updated_doc = await collection.find_one_and_update(
+            {"_id": ObjectId(db_obj_id)}, update_payload, return_document=ReturnDocument.AFTER
         )
-        if result.matched_count == 0:
-            logger.warning(f"CRUD: No document found with _id: {db_obj_id} in '{self.collection_name}' to update.")
+        if updated_doc is None:
+            logger.warning("CRUD: No document found with _id: %s in '%s' to update.", db_obj_id, self.collection_name)
             return None 
         
-        logger.debug(f"CRUD: Update result for _id: {db_obj_id} in '{self.collection_name}' - Matched: {result.matched_count}, Modified: {result.modified_count}")
-        updated_doc = await self.get(db, id=db_obj_id)
-        return updated_doc
+        logger.debug("CRUD: Updated document _id: %s in '%s'", db_obj_id, self.collection_name)
+        await two_tier_cache.invalidate_tags(collection_tags(self.collection_name, db_obj_id))
+        return self.model.model_validate(updated_doc)
 
     async def remove(self, db: AsyncIOMotorDatabase, *, id: PyObjectId) -> Optional[ModelType]:
         collection = await self.get_collection(db)
-        logger.debug(f"CRUD: Attempting to remove document in '{self.collection_name}' with _id: {id}")
+        logger.debug("CRUD: Attempting to remove document in '%s' with _id: %s", self.collection_name, id)
         deleted_obj_doc = await collection.find_one_and_delete({"_id": ObjectId(id)})
         if deleted_obj_doc:
-            logger.debug(f"CRUD: Document removed from '{self.collection_name}' with _id: {id}")
+            logger.debug("CRUD: Document removed from '%s' with _id: %s", self.collection_name, id)
+            await two_tier_cache.invalidate_tags(collection_tags(self.collection_name, id))
             return self.model.model_validate(deleted_obj_doc)
-        logger.warning(f"CRUD: No document found with _id: {id} in '{self.collection_name}' to remove.")
+        logger.warning("CRUD: No document found with _id: %s in '%s' to remove.", id, self.collection_name)
         return None
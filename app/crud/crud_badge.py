@@ -1,8 +1,9 @@
 # ===========================================================================
-# File: app/crud/crud_badge.py (BARU)
+# File: app/crud/crud_badge.py (MODIFIKASI: Index badges dan user_badges)
 # ===========================================================================
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import Optional, List
+from pymongo import ASCENDING, IndexModel
 from app.models.base import PyObjectId
 from app.crud.base import CRUDBase
 from app.models.badge import BadgeInDB, UserBadgeLink
@@ -28,5 +29,9 @@ class CRUDBadge(CRUDBase[BadgeInDB, PydanticBaseModel, PydanticBaseModel]):
         doc = await collection.find_one({"badgeId_str": badge_id_str})
         return BadgeInDB.model_validate(doc) if doc else None
 
-crud_badge = CRUDBadge(BadgeInDB, "badges")
-crud_user_badge_link = CRUDUserBadgeLink(UserBadgeLink, "user_badges")
+crud_badge = CRUDBadge(BadgeInDB, "badges", indexes=[
+    IndexModel([("badgeId_str", ASCENDING)], name="badgeId_str"),
+])
+crud_user_badge_link = CRUDUserBadgeLink(UserBadgeLink, "user_badges", indexes=[
+    IndexModel([("userId", ASCENDING), ("badgeId", ASCENDING)], name="userId_badgeId"),
+])
@@ -1,10 +1,12 @@
 # ===========================================================================
-# File: app/crud/crud_mission.py (BARU)
+# File: app/crud/crud_mission.py (MODIFIKASI: Index missions dan user_missions)
 # ===========================================================================
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import Optional, List, Dict, Any
+from pymongo import ASCENDING, IndexModel
 from app.models.base import PyObjectId
 from app.crud.base import CRUDBase
+from app.core.cache import two_tier_cache, ModelCodec
 from app.models.mission import MissionInDB, UserMissionLink, MissionStatusType
 from pydantic import BaseModel as PydanticBaseModel # Placeholder
 
@@ -14,6 +16,13 @@ class CRUDMission(CRUDBase[MissionInDB, PydanticBaseModel, PydanticBaseModel]):
         doc = await collection.find_one({"missionId_str": mission_id_str})
         return MissionInDB.model_validate(doc) if doc else None
 
+    @two_tier_cache.cached(
+        "missions:active",
+        key=lambda self, db, skip=0, limit=100: f"{skip}:{limit}",
+        codec=ModelCodec(MissionInDB, many=True),
+        tags=lambda missions: ["missions:*"],
+        ttl=60, # Juga membatasi basi jika katalog diedit langsung di DB (tanpa CRUDBase)
+    )
     async def get_active_missions(self, db: AsyncIOMotorDatabase, skip: int = 0, limit: int = 100) -> List[MissionInDB]:
         return await self.get_multi(db, query={"isActive": True}, skip=skip, limit=limit, sort=[("order", 1), ("createdAt", 1)])
 
@@ -40,5 +49,11 @@ class CRUDUserMissionLink(CRUDBase[UserMissionLink, PydanticBaseModel, PydanticB
         return await collection.count_documents({"userId": user_id, "status": status})
 
 
-crud_mission = CRUDMission(MissionInDB, "missions")
-crud_user_mission_link = CRUDUserMissionLink(UserMissionLink, "user_missions")
+crud_mission = CRUDMission(MissionInDB, "missions", indexes=[
+    IndexModel([("missionId_str", ASCENDING)], name="missionId_str"), # Tidak unique: export katalog lama punya missionId_str ganda
+    IndexModel([("isActive", ASCENDING), ("order", ASCENDING), ("createdAt", ASCENDING)], name="isActive_order_createdAt"),
+])
+crud_user_mission_link = CRUDUserMissionLink(UserMissionLink, "user_missions", indexes=[
+    # Prefix userId melayani semua query per user (list, count per status, versi ETag)
+    IndexModel([("userId", ASCENDING), ("missionId", ASCENDING)], name="userId_missionId"),
+])
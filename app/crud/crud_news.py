@@ -0,0 +1,24 @@
+# ===========================================================================
+# File: app/crud/crud_news.py (BARU)
+# ===========================================================================
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import List
+from datetime import datetime
+from pymongo import ASCENDING, IndexModel
+from app.crud.base import CRUDBase
+from app.models.news import NewsInDB
+from pydantic import BaseModel as PydanticBaseModel # Placeholder
+
+NEWS_FEED_SORT = [("order", ASCENDING), ("createdAt", ASCENDING)]
+
+class CRUDNews(CRUDBase[NewsInDB, PydanticBaseModel, PydanticBaseModel]):
+    async def get_live_news(self, db: AsyncIOMotorDatabase, *, now: datetime, limit: int = 200) -> List[NewsInDB]:
+        # TTL monitor MongoDB berjalan ~60 detik sekali, jadi item yang sudah lewat expiresAt tetap difilter di sini
+        query = {"isActive": True, "$or": [{"expiresAt": None}, {"expiresAt": {"$gt": now}}]}
+        return await self.get_multi(db, query=query, limit=limit, sort=NEWS_FEED_SORT)
+
+
+crud_news = CRUDNews(NewsInDB, "news", indexes=[
+    IndexModel([("expiresAt", ASCENDING)], name="expiresAt_ttl", expireAfterSeconds=0),
+    IndexModel([("isActive", ASCENDING), ("order", ASCENDING), ("createdAt", ASCENDING)], name="isActive_order_createdAt"),
+])
@@ -0,0 +1,52 @@
+# ===========================================================================
+# File: app/db/backends.py (BARU)
+# ===========================================================================
+# Driver MongoDB async yang bisa dipilih lewat settings.MONGODB_DRIVER:
+# - "motor": AsyncIOMotorClient; setiap operasi dijalankan pymongo sinkron di thread pool Motor.
+# - "pymongo": AsyncMongoClient bawaan pymongo >= 4.10; I/O langsung di event loop.
+# API keduanya hampir sama (find/find_one/bulk_write/cursor.to_list/async for). Perbedaan yang
+# dipakai app (aggregate, watch, start_session, close) dibungkus helper di bawah, jadi kode CRUD
+# dan service tidak perlu tahu backend mana yang aktif. Tidak bergantung pada app.core.config.
+import inspect
+from typing import Any, Dict, List, Literal, Optional, Union
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
+
+MongoDriver = Literal["motor", "pymongo"]
+MONGO_DRIVERS = ("motor", "pymongo")
+
+AnyAsyncMongoClient = Union[AsyncIOMotorClient, AsyncMongoClient]
+AnyAsyncDatabase = Union[AsyncIOMotorDatabase, AsyncDatabase]
+
+
+def create_client(driver: MongoDriver, url: str, **kwargs: Any) -> AnyAsyncMongoClient:
+    if driver == "motor":
+        return AsyncIOMotorClient(url, **kwargs)
+    if driver == "pymongo":
+        return AsyncMongoClient(url, **kwargs)
+    raise ValueError(f"Unknown MongoDB driver '{driver}', expected one of {MONGO_DRIVERS}")
+
+
+async def _resolve(value: Any) -> Any:
+    # Motor mengembalikan objek langsung, pymongo async mengembalikan coroutine
+    return await value if inspect.isawaitable(value) else value
+
+
+async def aggregate(collection: Any, pipeline: List[Dict[str, Any]], **kwargs: Any) -> Any:
+    """Cursor aggregate untuk kedua backend: `(await aggregate(coll, pipeline)).to_list(...)`."""
+    return await _resolve(collection.aggregate(pipeline, **kwargs))
+
+
+async def watch(collection: Any, pipeline: Optional[List[Dict[str, Any]]] = None, **kwargs: Any) -> Any:
+    """Change stream (dipakai dengan `async with`)."""
+    return await _resolve(collection.watch(pipeline, **kwargs))
+
+
+async def start_session(client: AnyAsyncMongoClient, **kwargs: Any) -> Any:
+    return await _resolve(client.start_session(**kwargs))
+
+
+async def close_client(client: AnyAsyncMongoClient) -> None:
+    await _resolve(client.close())
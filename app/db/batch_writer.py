@@ -0,0 +1,106 @@
+# ===========================================================================
+# File: app/db/batch_writer.py (BARU)
+# ===========================================================================
+# Modul ini juga dipakai oleh api.py (legacy), jadi sengaja tidak mengimpor app.core.config.
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteConcernError, WriteError
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+class BatchInsertWriter:
+    """
+    Group-commit untuk insert: insert yang datang bersamaan dikumpulkan selama
+    paling lama `max_delay_ms` (atau sampai `max_batch_size` dokumen) lalu
+    dikirim sebagai satu `insert_many(ordered=False)`.
+
+    Setiap pemanggil `insert()` tetap mendapat hasilnya sendiri: `_id` dokumen
+    jika berhasil, atau exception per dokumen (misal `DuplicateKeyError` dengan
+    errmsg asli dari server) jika dokumennya yang gagal.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection, max_batch_size: int = 500, max_delay_ms: float = 5.0):
+        self.collection = collection
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay = max(0.0, max_delay_ms) / 1000
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+
+    async def insert(self, document: Dict[str, Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((document, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._schedule_flush)
+        return await future
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._write_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _write_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        documents = [document for document, _ in batch]
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            failed_indexes = set()
+            for write_error in e.details.get("writeErrors", []):
+                index = write_error["index"]
+                failed_indexes.add(index)
+                _, future = batch[index]
+                if write_error.get("code") == DUPLICATE_KEY_ERROR_CODE:
+                    exc: Exception = DuplicateKeyError(write_error.get("errmsg", ""), DUPLICATE_KEY_ERROR_CODE, write_error)
+                else:
+                    exc = WriteError(write_error.get("errmsg", ""), write_error.get("code"), write_error)
+                _set_exception(future, exc)
+            write_concern_errors = e.details.get("writeConcernErrors") or []
+            for index, (document, future) in enumerate(batch):
+                if index in failed_indexes:
+                    continue
+                if write_concern_errors:
+                    first = write_concern_errors[0]
+                    _set_exception(future, WriteConcernError(first.get("errmsg", ""), first.get("code"), first))
+                else:
+                    _set_result(future, document.get("_id"))
+            logger.debug("Batch insert into '%s': %s docs, %s failed.", self.collection.name, len(batch), len(failed_indexes))
+            return
+        except Exception as e:
+            logger.error(f"Batch insert into '{self.collection.name}' of {len(batch)} docs failed: {e}")
+            for _, future in batch:
+                _set_exception(future, e)
+            return
+        for document, future in batch:
+            _set_result(future, document.get("_id"))
+        logger.debug("Batch insert into '%s': %s docs.", self.collection.name, len(batch))
+
+    async def close(self) -> None:
+        """Mengirim sisa antrean dan menunggu semua batch yang sedang berjalan."""
+        self._schedule_flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+
+def _set_result(future: asyncio.Future, value: Any) -> None:
+    if not future.done():
+        future.set_result(value)
+
+
+def _set_exception(future: asyncio.Future, exc: Exception) -> None:
+    if not future.done():
+        future.set_exception(exc)
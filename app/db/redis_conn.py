@@ -1,28 +1,73 @@
 # ===========================================================================
-# File: app/db/redis_conn.py
+# File: app/db/redis_conn.py (MODIFIKASI: Circuit breaker Redis, timeout socket, client gagal cepat)
 # ===========================================================================
-# (Sama seperti versi sebelumnya)
 import redis.asyncio as aioredis
 from typing import Optional
 from app.core.config import settings, logger
+from app.utils.server_timing import instrument_redis
+from app.utils.health import CircuitBreaker
 
 class RedisManager:
     redis_client: Optional[aioredis.Redis] = None
+    cache_client: Optional[aioredis.Redis] = None # Binary (decode_responses=False), dipakai app/core/cache.py
+
+    def __init__(self):
+        # Satu circuit untuk kedua client (server yang sama, DB berbeda); diisi probe background
+        self.circuit = CircuitBreaker(
+            "redis",
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_threshold=settings.CIRCUIT_RECOVERY_THRESHOLD,
+            retry_after=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+            logger=logger,
+        )
 
     async def connect_to_redis(self):
         if self.redis_client is None:
-            logger.info(f"Attempting to connect to Redis at {settings.REDIS_HOST}:{settings.REDIS_PORT} (DB: {settings.REDIS_DB_NONCE}) for nonces...")
+            logger.info("Attempting to connect to Redis at %s:%s (DB: %s) for nonces...", settings.REDIS_HOST, settings.REDIS_PORT, settings.REDIS_DB_NONCE)
             try:
                 self.redis_client = aioredis.from_url(
                     settings.NONCE_REDIS_URL,
                     encoding="utf-8", 
-                    decode_responses=True
+                    decode_responses=True,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
                 )
                 await self.redis_client.ping()
+                if settings.SERVER_TIMING_ENABLED:
+                    instrument_redis(self.redis_client)
                 logger.info("Successfully connected to Redis for nonces.")
             except Exception as e:
                 logger.error(f"Could not connect to Redis for nonces: {e}", exc_info=True)
                 self.redis_client = None
+        if self.cache_client is None:
+            logger.info("Attempting to connect to Redis at %s:%s (DB: %s) for cache...", settings.REDIS_HOST, settings.REDIS_PORT, settings.REDIS_DB_CACHE)
+            try:
+                self.cache_client = aioredis.from_url(
+                    settings.CACHE_REDIS_URL,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                )
+                await self.cache_client.ping()
+                if settings.SERVER_TIMING_ENABLED:
+                    instrument_redis(self.cache_client)
+                logger.info("Successfully connected to Redis for cache.")
+            except Exception as e:
+                logger.error(f"Could not connect to Redis for cache: {e}. Cache will run in-process only.")
+                self.cache_client = None
+
+    async def ping(self) -> None:
+        """Health probe: PING lewat client nonce (atau cache jika hanya itu yang tersambung)."""
+        client = self.redis_client or self.cache_client
+        if client is None:
+            raise ConnectionError("Redis client not initialized")
+        await client.ping()
+
+    def available_redis_client(self) -> Optional[aioredis.Redis]:
+        """Client nonce, atau None selama circuit terbuka: pemanggil langsung pakai jalur degradasinya."""
+        return None if self.circuit.is_open else self.redis_client
+
+    def available_cache_client(self) -> Optional[aioredis.Redis]:
+        return None if self.circuit.is_open else self.cache_client
 
     async def close_redis_connection(self):
         if self.redis_client:
@@ -30,6 +75,9 @@ class RedisManager:
             await self.redis_client.aclose()
             logger.info("Redis connection for nonces closed.")
             self.redis_client = None
+        if self.cache_client:
+            await self.cache_client.aclose()
+            self.cache_client = None
     
     async def get_redis_client(self) -> Optional[aioredis.Redis]:
         if self.redis_client is None:
@@ -39,6 +87,9 @@ class RedisManager:
 redis_manager = RedisManager()
 
 async def get_redis_nonce_client() -> Optional[aioredis.Redis]:
+    if redis_manager.circuit.is_open:
+        # Auth service menjawab 503 untuk client None; tanpa menunggu timeout socket dan tanpa log per request
+        return None
     client = await redis_manager.get_redis_client()
     if client is None:
         logger.error("Failed to get Redis client for nonces. Nonce functionality will be impaired or unavailable.")
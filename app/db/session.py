@@ -1,34 +1,58 @@
 # ===========================================================================
-# File: app/db/session.py
+# File: app/db/session.py (MODIFIKASI: Circuit breaker MongoDB yang diberi makan health probe)
 # ===========================================================================
 # (Sama seperti versi sebelumnya)
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from app.core.config import settings, logger
 from typing import Optional
+from app.db.backends import AnyAsyncDatabase, AnyAsyncMongoClient, MongoDriver, close_client, create_client
+from app.utils.server_timing import MongoTimingListener
+from app.utils.metrics import MongoPoolMetricsListener
+from app.utils.health import CircuitBreaker
 
 class MongoDbContextManager:
-    client: Optional[AsyncIOMotorClient] = None
-    db: Optional[AsyncIOMotorDatabase] = None
+    client: Optional[AnyAsyncMongoClient] = None
+    db: Optional[AnyAsyncDatabase] = None
+
+    def __init__(self, driver: Optional[MongoDriver] = None):
+        self.driver: MongoDriver = driver or settings.MONGODB_DRIVER
+        # State diisi probe background (app/main.py); get_db gagal cepat selama circuit terbuka
+        self.circuit = CircuitBreaker(
+            "mongodb",
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_threshold=settings.CIRCUIT_RECOVERY_THRESHOLD,
+            retry_after=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+            logger=logger,
+        )
 
     async def connect_to_mongo(self):
-        logger.info(f"Attempting to connect to MongoDB at {settings.MONGODB_URL}...")
+        logger.info("Attempting to connect to MongoDB at %s (driver: %s)...", settings.MONGODB_URL, self.driver)
         try:
-            self.client = AsyncIOMotorClient(settings.MONGODB_URL, serverSelectionTimeoutMS=5000)
+            event_listeners = [MongoTimingListener()] if settings.SERVER_TIMING_ENABLED else []
+            if settings.METRICS_ENABLED:
+                event_listeners.append(MongoPoolMetricsListener())
+            self.client = create_client(self.driver, settings.MONGODB_URL, serverSelectionTimeoutMS=5000, event_listeners=event_listeners)
             await self.client.admin.command('ping')
             self.db = self.client[settings.MONGODB_DB_NAME]
-            logger.info(f"Successfully connected to MongoDB database: {settings.MONGODB_DB_NAME}")
+            logger.info("Successfully connected to MongoDB database: %s", settings.MONGODB_DB_NAME)
         except Exception as e:
             logger.error(f"Could not connect to MongoDB: {e}", exc_info=True)
 
+    async def ping(self) -> None:
+        """Health probe: satu command `ping` ke server."""
+        if self.client is None:
+            raise ConnectionError("MongoDB client not initialized")
+        await self.client.admin.command('ping')
+
     async def close_mongo_connection(self):
         if self.client:
             logger.info("Closing MongoDB connection...")
-            self.client.close()
+            await close_client(self.client)
             logger.info("MongoDB connection closed.")
 
 mongo_db_manager = MongoDbContextManager()
 
-async def get_db() -> AsyncIOMotorDatabase:
+async def get_db() -> AnyAsyncDatabase:
+    mongo_db_manager.circuit.check() # CircuitOpenError -> 503 (handler di app/main.py)
     if mongo_db_manager.db is None:
         logger.critical("MongoDB not initialized. Application might not have started correctly or DB connection failed at startup.")
         raise RuntimeError("MongoDB not connected. Ensure connect_to_mongo is called successfully at application startup.")
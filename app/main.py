@@ -1,31 +1,72 @@
 # ===========================================================================
-# File: app/main.py (MODIFIKASI: Menggunakan lifespan, bukan on_event)
+# File: app/main.py (MODIFIKASI: Header Server-Timing opt-in)
 # ===========================================================================
 from fastapi import FastAPI, HTTPException, Request, status as HttpStatus
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager # Untuk lifespan
 
 from app.core.config import settings, logger
 from app.db.session import mongo_db_manager
 from app.db.redis_conn import redis_manager
 from app.api.v1 import api_v1_router
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.utils.server_timing import ServerTimingMiddleware
+from app.utils.metrics import MetricsMiddleware, registry as metrics_registry, CONTENT_TYPE_LATEST
+from app.utils.loop_lag import LoopLagMonitor
+from app.utils.health import CircuitOpenError, HealthMonitor
+from app.core.metrics import register_app_metrics
+from app.crud import ensure_indexes
+from app.services.news_service import news_service
+from app.core.cache import two_tier_cache
+from app.core.invalidation_bus import invalidation_bus
 from jose import JWTError
 from pydantic import ValidationError
 
+loop_lag_monitor = LoopLagMonitor(
+    interval=settings.LOOP_LAG_INTERVAL_SECONDS,
+    block_threshold=settings.LOOP_BLOCK_THRESHOLD_MS / 1000 or None,
+    logger=logger,
+) if settings.METRICS_ENABLED else None
+if settings.METRICS_ENABLED:
+    register_app_metrics()
+
+health_monitor = HealthMonitor(interval=settings.HEALTH_PROBE_INTERVAL_SECONDS, logger=logger)
+health_monitor.add(mongo_db_manager.circuit, mongo_db_manager.ping, timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+health_monitor.add(redis_manager.circuit, redis_manager.ping, timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Kode yang dijalankan sebelum aplikasi mulai menerima request (startup)
-    logger.info(f"Starting up {settings.PROJECT_NAME}...")
+    logger.info("Starting up %s...", settings.PROJECT_NAME)
     await mongo_db_manager.connect_to_mongo()
     await redis_manager.connect_to_redis()
-    logger.info(f"--- {settings.PROJECT_NAME} v{getattr(app, 'version', 'N/A')} startup complete ---")
+    if mongo_db_manager.db is not None:
+        try:
+            await ensure_indexes(mongo_db_manager.db)
+        except Exception as e:
+            logger.error(f"Failed to ensure MongoDB indexes: {e}", exc_info=True)
+        news_service.start(mongo_db_manager.db)
+    invalidation_bus.add_listener(two_tier_cache.apply_remote_invalidation, two_tier_cache.clear_local)
+    invalidation_bus.add_listener(news_service.handle_invalidation, news_service.handle_flush)
+    invalidation_bus.start()
+    if loop_lag_monitor is not None:
+        loop_lag_monitor.start()
+    await health_monitor.run_once() # /health dan circuit sudah terisi sebelum request pertama
+    health_monitor.start()
+    logger.info("--- %s v%s startup complete ---", settings.PROJECT_NAME, getattr(app, 'version', 'N/A'))
     yield
     # Kode yang dijalankan setelah aplikasi selesai menerima request (shutdown)
-    logger.info(f"Shutting down {settings.PROJECT_NAME}...")
+    logger.info("Shutting down %s...", settings.PROJECT_NAME)
+    await health_monitor.stop()
+    if loop_lag_monitor is not None:
+        await loop_lag_monitor.stop()
+    await invalidation_bus.stop()
+    await news_service.stop()
     await redis_manager.close_redis_connection()
     await mongo_db_manager.close_mongo_connection()
-    logger.info(f"--- {settings.PROJECT_NAME} shutdown complete ---")
+    logger.info("--- %s shutdown complete ---", settings.PROJECT_NAME)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -50,6 +91,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    cache_max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
+)
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+if settings.SERVER_TIMING_ENABLED:
+    # Paling luar, jadi waktu kompresi ikut terhitung di `other`
+    app.add_middleware(ServerTimingMiddleware, logger=logger, expose_header=settings.SERVER_TIMING_EXPOSE_HEADER)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Custom Exception Handlers (sama seperti sebelumnya)
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -61,6 +120,15 @@ async def jwt_exception_handler(request: Request, exc: JWTError):
     logger.error(f"Unhandled JWTError: {exc} for {request.url.path}")
     return JSONResponse(status_code=HttpStatus.HTTP_401_UNAUTHORIZED, content={"detail": "Invalid or expired token."}, headers={"WWW-Authenticate": "Bearer"})
 
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_exception_handler(request: Request, exc: CircuitOpenError):
+    # Tanpa log per request: transisi circuit sudah dicatat, dan jumlah penolakan ada di /metrics
+    return JSONResponse(
+        status_code=HttpStatus.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": f"Layanan {exc.dependency} sedang tidak tersedia. Silakan coba lagi."},
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
 @app.exception_handler(ValidationError)
 async def pydantic_validation_exception_handler(request: Request, exc: ValidationError):
     logger.error(f"Pydantic ValidationError: {exc.errors()} for {request.url.path}")
@@ -86,4 +154,16 @@ async def root():
         "api_v1_path": settings.API_V1_STR
     }
 
+@app.get("/health", tags=["Root"], summary="Check API Health Status")
+async def health_check():
+    # Dari hasil probe background terakhir: tanpa I/O, jadi tetap cepat saat dependency down
+    report = health_monitor.report()
+    return JSONResponse(status_code=HttpStatus.HTTP_200_OK if health_monitor.healthy else HttpStatus.HTTP_503_SERVICE_UNAVAILABLE, content=report)
+
 app.include_router(api_v1_router, prefix=settings.API_V1_STR)
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        # Tanpa autentikasi (untuk scraper Prometheus); batasi aksesnya di level jaringan/ingress
+        return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE_LATEST)
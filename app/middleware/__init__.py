@@ -0,0 +1,3 @@
+# ===========================================================================
+# File: app/middleware/__init__.py (BARU)
+# ===========================================================================
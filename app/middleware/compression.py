@@ -0,0 +1,238 @@
+# ===========================================================================
+# File: app/middleware/compression.py (MODIFIKASI: Registry instance untuk metrik)
+# ===========================================================================
+import asyncio
+import gzip
+import weakref
+import zlib
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from cachetools import LRUCache
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli # Opsional: pip install Brotli
+except ImportError: # pragma: no cover - tergantung environment
+    brotli = None
+
+# Instance dibuat Starlette saat middleware stack dibangun; dicatat di sini agar stats bisa di-scrape
+active_compression_middlewares: "weakref.WeakSet[CompressionMiddleware]" = weakref.WeakSet()
+
+DEFAULT_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/csv",
+    "text/plain",
+    "text/html",
+    "text/css",
+    "image/svg+xml",
+)
+
+
+def _parse_accept_encoding(value: str) -> Dict[str, float]:
+    encodings: Dict[str, float] = {}
+    for part in value.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[token] = quality
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI murni untuk kompresi respons (br jika modul Brotli terpasang, lalu gzip).
+
+    - Hanya content-type di allowlist dan body >= `minimum_size` yang dikompres.
+    - Respons streaming (misal export NDJSON/CSV) dikompres per potongan dengan flush,
+      jadi client tetap menerima data secara bertahap.
+    - Respons yang punya ETag (dan tidak `no-store`) disimpan dalam bentuk terkompresi di
+      LRU per (path, ETag, encoding), sehingga respons panas tidak dikompres ulang.
+      ETag dijadikan weak (W/) pada respons terkompresi, sesuai RFC 9110; If-None-Match
+      tetap cocok karena dibandingkan secara weak.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        compressible_types: Iterable[str] = DEFAULT_COMPRESSIBLE_TYPES,
+        cache_max_bytes: int = 16 * 1024 * 1024,
+        offload_threshold: int = 256 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.compressible_types = frozenset(compressible_types)
+        self.offload_threshold = offload_threshold # Body sebesar ini dikompres di thread, bukan di event loop
+        self.cache: LRUCache = LRUCache(maxsize=cache_max_bytes, getsizeof=lambda entry: len(entry[1]))
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        active_compression_middlewares.add(self)
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        if not accept_encoding:
+            return None
+        accepted = _parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        if brotli is not None and accepted.get("br", wildcard) > 0:
+            return "br"
+        if accepted.get("gzip", wildcard) > 0:
+            return "gzip"
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cacheEntries": len(self.cache),
+            "cacheBytes": self.cache.currsize,
+            "cacheHits": self.cache_hits,
+            "cacheMisses": self.cache_misses,
+            "bytesIn": self.bytes_in,
+            "bytesOut": self.bytes_out,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, scope["path"], encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def is_compressible(self, headers: Headers, status: int) -> bool:
+        if status < 200 or status in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        return media_type in self.compressible_types
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def stream_compressor(self, encoding: str) -> Any:
+        if encoding == "br":
+            return brotli.Compressor(quality=self.brotli_quality)
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS) # wbits+16: format gzip
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, path: str, encoding: str, send: Send):
+        self.middleware = middleware
+        self.path = path
+        self.encoding = encoding
+        self.downstream_send = send
+        self.start_message: Optional[Message] = None
+        self.mode: Optional[str] = None # "passthrough" | "buffer" | "stream"
+        self.compressor: Any = None
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            if not self.middleware.is_compressible(headers, message["status"]):
+                self.mode = "passthrough"
+                await self.downstream_send(message)
+            return
+        if message_type != "http.response.body" or self.mode == "passthrough":
+            await self.downstream_send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.mode is None:
+            self.mode = "stream" if more_body else "buffer"
+            if self.mode == "stream":
+                await self._start_stream()
+
+        if self.mode == "buffer":
+            # Satu pesan body utuh (kasus umum JSONResponse)
+            await self._send_buffered(body)
+            return
+
+        await self._send_stream_chunk(body, more_body)
+
+    def _response_headers(self) -> MutableHeaders:
+        return MutableHeaders(raw=self.start_message["headers"])
+
+    async def _send_buffered(self, body: bytes) -> None:
+        headers = self._response_headers()
+        headers.add_vary_header("Accept-Encoding")
+        if len(body) < self.middleware.minimum_size:
+            await self.downstream_send(self.start_message)
+            await self.downstream_send({"type": "http.response.body", "body": body})
+            return
+
+        etag = headers.get("etag")
+        cacheable = bool(etag) and "no-store" not in headers.get("cache-control", "")
+        cache_key: Optional[Tuple[str, str, str]] = (self.path, etag, self.encoding) if cacheable else None
+        compressed: Optional[bytes] = None
+        if cache_key is not None:
+            entry = self.middleware.cache.get(cache_key)
+            if entry is not None and entry[0] == len(body):
+                compressed = entry[1]
+                self.middleware.cache_hits += 1
+            else:
+                self.middleware.cache_misses += 1
+        if compressed is None:
+            if len(body) >= self.middleware.offload_threshold:
+                compressed = await asyncio.to_thread(self.middleware.compress, body, self.encoding)
+            else:
+                compressed = self.middleware.compress(body, self.encoding)
+            if cache_key is not None and len(compressed) <= self.middleware.cache.maxsize:
+                self.middleware.cache[cache_key] = (len(body), compressed)
+
+        if len(compressed) >= len(body): # Tidak ada untungnya (misal body sudah acak/terkompresi)
+            await self.downstream_send(self.start_message)
+            await self.downstream_send({"type": "http.response.body", "body": body})
+            return
+        self.middleware.bytes_in += len(body)
+        self.middleware.bytes_out += len(compressed)
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        await self.downstream_send(self.start_message)
+        await self.downstream_send({"type": "http.response.body", "body": compressed})
+
+    async def _start_stream(self) -> None:
+        headers = self._response_headers()
+        headers.add_vary_header("Accept-Encoding")
+        headers["Content-Encoding"] = self.encoding
+        if "content-length" in headers:
+            del headers["content-length"]
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        self.compressor = self.middleware.stream_compressor(self.encoding)
+        await self.downstream_send(self.start_message)
+
+    async def _send_stream_chunk(self, body: bytes, more_body: bool) -> None:
+        if self.encoding == "br":
+            data = self.compressor.process(body) + (self.compressor.flush() if more_body else self.compressor.finish())
+        else:
+            data = self.compressor.compress(body) + self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+        self.middleware.bytes_in += len(body)
+        self.middleware.bytes_out += len(data)
+        await self.downstream_send({"type": "http.response.body", "body": data, "more_body": more_body})
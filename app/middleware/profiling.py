@@ -0,0 +1,74 @@
+# ===========================================================================
+# File: app/middleware/profiling.py (BARU)
+# ===========================================================================
+import asyncio
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.deps import get_current_active_admin_user, get_current_active_user
+from app.core.config import logger
+from app.db.session import mongo_db_manager
+from app.services.profiling_service import ProfilerBusyError, profiling_service
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+class ProfilingMiddleware:
+    """
+    Profil worker selama satu request berjalan jika admin mengirim header `X-Profile: cpu` atau
+    `X-Profile: memory`. Profil TIDAK terisolasi per request: mode cpu mengambil sampel thread
+    event loop, jadi request lain yang berjalan bersamaan di worker ini ikut tercatat; mode memory
+    menyalakan tracemalloc untuk seluruh proses (overhead ikut dibayar request lain) dan mencatat
+    semua alokasi selama jendela itu. Untuk profil yang bersih, kirim ke worker yang sepi.
+    Respons membawa `X-Profile-Id`; hasil (folded stacks) diambil lewat
+    GET {API_V1_STR}/system/profiles/{id}. Hanya dipasang jika PROFILING_ENABLED.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        kind = headers.get(PROFILE_HEADER, "").strip().lower()
+        if not kind:
+            await self.app(scope, receive, send)
+            return
+        if kind not in ("cpu", "memory"):
+            await JSONResponse(status_code=400, content={"detail": "Header X-Profile harus 'cpu' atau 'memory'."})(scope, receive, send)
+            return
+        try:
+            await self._authorize_admin(headers)
+        except HTTPException as e:
+            await JSONResponse(status_code=e.status_code, content={"detail": e.detail}, headers=e.headers)(scope, receive, send)
+            return
+        try:
+            session = profiling_service.begin(kind)
+        except ProfilerBusyError:
+            await JSONResponse(status_code=409, content={"detail": "Sesi profiling lain sedang berjalan di worker ini."})(scope, receive, send)
+            return
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER, session.profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            folded = await asyncio.to_thread(profiling_service.end, session)
+            await profiling_service.store(session.profile_id, folded)
+            logger.info("Profiling: %s profile %s stored for %s %s.", kind, session.profile_id, scope['method'], scope['path'])
+
+    async def _authorize_admin(self, headers: Headers) -> None:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token or mongo_db_manager.db is None:
+            raise HTTPException(status_code=401, detail="Could not validate credentials", headers={"WWW-Authenticate": "Bearer"})
+        user = await get_current_active_user(db=mongo_db_manager.db, token=token)
+        await get_current_active_admin_user(current_user=user)
@@ -6,3 +6,4 @@ from .user import UserInDB, UserProfile, UserSystemStatus
 from .token import Token, TokenPayload
 from .badge import BadgeInDB, UserBadgeLink # BARU
 from .mission import MissionInDB, UserMissionLink, MissionActionDetails, RewardBadgeDetails # BARU
+from .news import NewsInDB # BARU
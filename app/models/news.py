@@ -0,0 +1,22 @@
+# ===========================================================================
+# File: app/models/news.py (BARU)
+# ===========================================================================
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime, timezone
+from app.models.base import PyObjectId
+
+class NewsInDB(BaseModel): # Untuk koleksi news (lihat dummy-news-feed-.json)
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    text: str = Field(...)
+    order: int = 0
+    isActive: bool = True
+    createdAt: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updatedAt: Optional[datetime] = None
+    expiresAt: Optional[datetime] = None # Dihapus otomatis oleh TTL index; None = tidak kedaluwarsa
+
+    model_config = {
+        "populate_by_name": True,
+        "json_encoders": {PyObjectId: str, datetime: lambda dt: dt.isoformat().replace("+00:00", "Z")},
+        "arbitrary_types_allowed": True
+    }
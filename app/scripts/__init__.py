@@ -0,0 +1,4 @@
+# ===========================================================================
+# File: app/scripts/__init__.py (BARU)
+# ===========================================================================
+# Skrip CLI operasional. Jalankan dari root project, misal: python -m app.scripts.export_snapshot --help
@@ -0,0 +1,103 @@
+# ===========================================================================
+# File: app/scripts/bench_logging.py (BARU)
+# ===========================================================================
+"""
+Benchmark biaya logging per request di thread pemanggil (thread event loop).
+Satu "request" meniru log flow /auth/connect: satu INFO endpoint, beberapa DEBUG CRUD
+dengan payload dokumen (DEBUG mati, seperti di produksi), INFO service dan request_timing.
+
+Varian:
+    eager_sync      f-string + StreamHandler sinkron (setup lama, logging.basicConfig)
+    lazy_sync       argumen %-style + StreamHandler sinkron
+    lazy_queue      argumen %-style + LazyQueueHandler -> QueueListener
+    lazy_queue_sampled  seperti lazy_queue + CallSiteSamplingFilter
+
+Log ditulis ke file sementara agar hasil tidak bergantung pada terminal.
+
+Contoh:
+    python -m app.scripts.bench_logging --requests 50000
+"""
+import argparse
+import logging
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener
+
+from app.utils.log_queue import DEFAULT_DATEFMT, DEFAULT_FORMAT, CallSiteSamplingFilter, LazyQueueHandler
+
+_DOCUMENT = {
+    "walletAddress": "0x" + "ab" * 20,
+    "username": "agent_0001",
+    "profile": {"rank": "Observer", "nextRank": "Ally", "rankProgressPercent": 0.0, "xp": 0},
+    "referralCode": "CIGAR-XYZ123",
+    "completedMissions": [f"mission_{i}" for i in range(10)],
+}
+
+
+def _eager_request(logger: logging.Logger, i: int) -> None:
+    wallet = _DOCUMENT["walletAddress"]
+    logger.info(f"Connect attempt from wallet: {wallet}")
+    logger.debug(f"CRUDUser: Getting user by wallet_address: {wallet}")
+    logger.debug(f"CRUD: Creating document in 'users' with BSON-compatible data: {_DOCUMENT}")
+    logger.debug(f"CRUD: Document inserted in 'users' with new _id: {i}")
+    logger.debug(f"CRUD: Attempting to update document in 'users' with _id: {i}, update_payload: {_DOCUMENT['profile']}")
+    logger.info(f"User {_DOCUMENT['username']} authenticated successfully. Was created: {True}")
+    logger.info(f"request_timing method=POST path=/api/v1/auth/connect status=200 mongo;dur={1.2:.3f} redis;dur={0.4:.3f}")
+
+
+def _lazy_request(logger: logging.Logger, i: int) -> None:
+    wallet = _DOCUMENT["walletAddress"]
+    logger.info("Connect attempt from wallet: %s", wallet)
+    logger.debug("CRUDUser: Getting user by wallet_address: %s", wallet)
+    logger.debug("CRUD: Creating document in '%s' with BSON-compatible data: %s", "users", _DOCUMENT)
+    logger.debug("CRUD: Document inserted in '%s' with new _id: %s", "users", i)
+    logger.debug("CRUD: Attempting to update document in '%s' with _id: %s, update_payload: %s", "users", i, _DOCUMENT["profile"])
+    logger.info("User %s authenticated successfully. Was created: %s", _DOCUMENT["username"], True)
+    logger.info("request_timing method=%s path=%s status=%s %s", "POST", "/api/v1/auth/connect", 200, "mongo;dur=1.200 redis;dur=0.400")
+
+
+def _run_variant(name: str, requests: int, log_file) -> None:
+    logger = logging.getLogger(f"bench_logging.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    stream_handler = logging.StreamHandler(log_file)
+    stream_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT, DEFAULT_DATEFMT))
+    listener = None
+    if name.startswith("lazy_queue"):
+        log_queue = queue.SimpleQueue()
+        handler = LazyQueueHandler(log_queue)
+        if name.endswith("sampled"):
+            handler.addFilter(CallSiteSamplingFilter(20))
+        listener = QueueListener(log_queue, stream_handler)
+        listener.start()
+    else:
+        handler = stream_handler
+    logger.addHandler(handler)
+    request = _eager_request if name.startswith("eager") else _lazy_request
+
+    for i in range(min(1000, requests)): # Warm-up
+        request(logger, i)
+    started = time.perf_counter()
+    for i in range(requests):
+        request(logger, i)
+    caller_us = (time.perf_counter() - started) / requests * 1_000_000
+    drain_started = time.perf_counter()
+    if listener is not None:
+        listener.stop() # Menunggu thread listener menulis semua record yang tersisa
+    drain_ms = (time.perf_counter() - drain_started) * 1000
+    logger.removeHandler(handler)
+    print(f"{name:>18}: {caller_us:7.2f} us/request in caller (listener drain after run: {drain_ms:7.1f} ms)")
+
+
+def main(requests: int) -> None:
+    with tempfile.TemporaryFile("w") as log_file:
+        for name in ("eager_sync", "lazy_sync", "lazy_queue", "lazy_queue_sampled"):
+            _run_variant(name, requests, log_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark biaya logging per request.")
+    parser.add_argument("--requests", type=int, default=50_000)
+    args = parser.parse_args()
+    main(args.requests)
@@ -0,0 +1,70 @@
+# ===========================================================================
+# File: app/scripts/bench_metrics.py (BARU)
+# ===========================================================================
+"""
+Benchmark overhead per request dari MetricsMiddleware (dan ServerTimingMiddleware
+sebagai pembanding): app ASGI minimal dipanggil langsung, tanpa HTTP/socket,
+sehingga selisih waktunya murni biaya middleware.
+
+Contoh:
+    python -m app.scripts.bench_metrics --requests 200000
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from app.utils.metrics import MetricsMiddleware, registry
+from app.utils.server_timing import ServerTimingMiddleware
+
+
+class _Route:
+    path_format = "/api/v1/users/{user_id}"
+
+
+async def _endpoint(scope, receive, send) -> None:
+    scope["route"] = _Route # Seperti router FastAPI setelah match
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message) -> None:
+    pass
+
+
+async def _run(app, requests: int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        scope = {"type": "http", "method": "GET", "path": f"/api/v1/users/{i}", "root_path": "", "headers": []}
+        await app(scope, _receive, _send)
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+async def main(requests: int) -> None:
+    quiet_logger = logging.getLogger("bench_metrics")
+    quiet_logger.setLevel(logging.WARNING)
+    variants = {
+        "bare": _endpoint,
+        "metrics": MetricsMiddleware(_endpoint),
+        "server_timing": ServerTimingMiddleware(_endpoint, logger=quiet_logger, expose_header=True),
+    }
+    for app in variants.values():
+        await _run(app, 1000) # Warm-up
+    results = {name: await _run(app, requests) for name, app in variants.items()}
+    for name, per_request_us in results.items():
+        overhead = per_request_us - results["bare"]
+        print(f"{name:>14}: {per_request_us:7.2f} us/request (overhead {overhead:+.2f} us)")
+    started = time.perf_counter()
+    body = registry.render()
+    print(f"render /metrics: {(time.perf_counter() - started) * 1000:.2f} ms, {len(body)} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark overhead MetricsMiddleware per request.")
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,148 @@
+# ===========================================================================
+# File: app/scripts/bench_mongo_drivers.py (BARU)
+# ===========================================================================
+"""
+Perbandingan backend MongoDB (settings.MONGODB_DRIVER): Motor vs AsyncMongoClient pymongo,
+pada method CRUD yang dipanggil request panas:
+
+    get_user           crud_user.get (get_current_active_user, setiap request terautentikasi)
+    get_by_wallet      crud_user.get_by_wallet_address (/auth/connect)
+    mission_links      crud_user_mission_link.get_missions_by_user_id (/missions/directives)
+    links_version      crud_user_mission_link.get_version (ETag /missions/me/summary)
+    update_last_login  crud_user.update_last_login (find_one_and_update)
+
+Per backend: latency sekuensial (p50/p99) per operasi, lalu throughput campuran dengan
+--concurrency task bersamaan. CPU proses per operasi ikut dicetak: thread pool Motor
+menambah CPU dan context switch yang tidak terlihat dari latency saja.
+Cache two-tier dimatikan agar setiap panggilan sampai ke MongoDB.
+
+Dataset dibuat di database terpisah (default <MONGODB_DB_NAME>_bench_drivers, di-drop di akhir):
+    python -m app.scripts.bench_mongo_drivers --users 2000 --operations 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from pymongo import MongoClient
+
+import app.api.v1 # noqa: F401  Muat router lebih dulu (circular import app.crud / app.services)
+from app.core.cache import two_tier_cache
+from app.core.config import settings
+from app.crud import ensure_indexes
+from app.crud.crud_mission import crud_user_mission_link
+from app.crud.crud_user import crud_user
+from app.db.backends import MONGO_DRIVERS, close_client, create_client
+from app.scripts import generate_dataset
+
+Operation = Callable[[Any, Dict[str, Any]], Awaitable[Any]]
+
+OPERATIONS: Dict[str, Operation] = {
+    "get_user": lambda db, user: crud_user.get(db, id=user["_id"]),
+    "get_by_wallet": lambda db, user: crud_user.get_by_wallet_address(db, wallet_address=user["walletAddress"]),
+    "mission_links": lambda db, user: crud_user_mission_link.get_missions_by_user_id(db, user_id=user["_id"]),
+    "links_version": lambda db, user: crud_user_mission_link.get_version(db, query={"userId": user["_id"]}, fields=("_id", "updatedAt", "completedAt")),
+    "update_last_login": lambda db, user: crud_user.update_last_login(db, user_id=user["_id"]),
+}
+
+
+def _percentile(sorted_values: List[float], quantile: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(quantile * len(sorted_values)))]
+
+
+async def _latency(db, users: List[Dict[str, Any]], operation: Operation, operations: int) -> Tuple[float, float, float]:
+    rng = random.Random(1)
+    for _ in range(min(200, operations)): # Warm-up: pool koneksi dan thread executor terisi
+        await operation(db, rng.choice(users))
+    durations = []
+    cpu_started = time.process_time()
+    for _ in range(operations):
+        user = rng.choice(users)
+        started = time.perf_counter()
+        await operation(db, user)
+        durations.append(time.perf_counter() - started)
+    cpu_us = (time.process_time() - cpu_started) / operations * 1_000_000
+    durations.sort()
+    return _percentile(durations, 0.5) * 1_000_000, _percentile(durations, 0.99) * 1_000_000, cpu_us
+
+
+async def _throughput(db, users: List[Dict[str, Any]], operations: int, concurrency: int) -> Tuple[float, float]:
+    mix = list(OPERATIONS.values())
+    remaining = operations
+
+    async def worker(seed: int) -> None:
+        nonlocal remaining
+        rng = random.Random(seed)
+        while remaining > 0:
+            remaining -= 1
+            await rng.choice(mix)(db, rng.choice(users))
+
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(seed) for seed in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return operations / elapsed, (time.process_time() - cpu_started) / operations * 1_000_000
+
+
+async def bench_driver(driver: str, args: argparse.Namespace) -> None:
+    client = create_client(driver, args.mongo_url, maxPoolSize=max(100, args.concurrency))
+    try:
+        db = client[args.db]
+        await ensure_indexes(db)
+        users = await db["users"].find({}, {"_id": 1, "walletAddress": 1}).to_list(length=args.users)
+        print(f"\n[{driver}] {len(users)} users")
+        print(f"{'operation':<20}{'p50 us':>10}{'p99 us':>10}{'cpu us/op':>12}")
+        for name, operation in OPERATIONS.items():
+            p50, p99, cpu_us = await _latency(db, users, operation, args.operations)
+            print(f"{name:<20}{p50:>10.0f}{p99:>10.0f}{cpu_us:>12.0f}")
+        ops_per_second, cpu_us = await _throughput(db, users, args.operations * len(OPERATIONS), args.concurrency)
+        print(f"{'mixed x' + str(args.concurrency):<20}{ops_per_second:>10.0f} ops/s{cpu_us:>10.0f} cpu us/op")
+    finally:
+        await close_client(client)
+
+
+def _drop(args: argparse.Namespace) -> None:
+    client = MongoClient(args.mongo_url)
+    try:
+        client.drop_database(args.db)
+    finally:
+        client.close()
+
+
+def _seed(args: argparse.Namespace) -> None:
+    _drop(args)
+    client = MongoClient(args.mongo_url)
+    try:
+        db = client[args.db]
+        config = generate_dataset.build_config(db, mongo_url=args.mongo_url, users=args.users, seed=args.seed, batch_size=1_000)
+        generate_dataset.load_dataset(db, config, finalize=False) # Index dibuat ensure_indexes per backend
+    finally:
+        client.close()
+
+
+async def main(args: argparse.Namespace) -> None:
+    two_tier_cache.enabled = False
+    await asyncio.to_thread(_seed, args)
+    try:
+        for driver in args.drivers:
+            await bench_driver(driver, args)
+    finally:
+        if not args.keep:
+            await asyncio.to_thread(_drop, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Motor vs PyMongo async pada hot path CRUD.")
+    parser.add_argument("--mongo-url", default=settings.MONGODB_URL)
+    parser.add_argument("--db", default=f"{settings.MONGODB_DB_NAME}_bench_drivers")
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--operations", type=int, default=2_000, help="Operasi sekuensial per jenis operasi")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--drivers", nargs="+", choices=MONGO_DRIVERS, default=list(MONGO_DRIVERS))
+    parser.add_argument("--keep", action="store_true", help="Jangan drop database benchmark di akhir")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING) # Log INFO per operasi CRUD akan mendominasi hasil
+    asyncio.run(main(args))
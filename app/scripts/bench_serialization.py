@@ -0,0 +1,196 @@
+# ===========================================================================
+# File: app/scripts/bench_serialization.py (BARU)
+# ===========================================================================
+"""
+Benchmark requests/detik jalur serialisasi respons per bentuk call site endpoint: jalur default
+FastAPI (return model/dict -> validasi ulang response_model -> jsonable_encoder -> json.dumps)
+dibanding `model_response` (validasi hanya jika tipe berbeda, lalu model_dump_json sekali).
+
+Setiap kasus memakai input yang sama dengan yang diterima endpoint aslinya (misal /users/me
+menerima UserInDB, bukan UserPublic), jadi hasilnya bisa dipakai untuk memutuskan call site
+mana yang memakai `model_response`. Tidak butuh MongoDB: payload sintetis, request in-process
+lewat ASGITransport.
+
+Contoh:
+    python -m app.scripts.bench_serialization --requests 3000 --directives 50 --rounds 3
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Type
+
+import httpx
+from bson import ObjectId
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from app.api.responses import model_response
+from app.api.v1.schemas.auth import ChallengeMessageResponse, TwitterOAuthInitiateResponse
+from app.api.v1.schemas.badge import UserBadgeListResponse, UserBadgeResponse
+from app.api.v1.schemas.mission import MissionDirectivesListResponse, MissionDirectiveResponse, MissionProgressSummaryResponse
+from app.api.v1.schemas.token import TokenResponse
+from app.api.v1.schemas.user import AlliesListResponse, AllyInfo, UserPublic
+from app.models.user import UserInDB
+
+
+class Case(NamedTuple):
+    name: str
+    response_model: Type[BaseModel]
+    content: Callable[[], Any] # Dipanggil per request: membangun input persis seperti di endpoint
+
+
+def build_user() -> UserInDB:
+    now = datetime.now(timezone.utc)
+    return UserInDB.model_validate({
+        "_id": ObjectId(),
+        "walletAddress": "0x" + "ab" * 20,
+        "username": "Commander-Nova-4821",
+        "rank": "Explorer",
+        "xp": 1250,
+        "referralCode": "NOVA4821",
+        "alliesCount": 7,
+        "profile": {"commanderName": "Nova", "rankBadgeUrl": "https://cdn.example.com/ranks/explorer.png", "nextRank": "Pioneer", "rankProgressPercent": 42.5},
+        "systemStatus": {"starDate": "SD 2077.123", "networkLoadPercent": 37.5},
+        "twitter_data": {"twitter_user_id": "123456", "twitter_username": "nova", "connected_at": now},
+        "lastLogin": now,
+        "createdAt": now,
+    })
+
+
+def build_directives(count: int) -> List[MissionDirectiveResponse]:
+    return [
+        MissionDirectiveResponse.model_validate({
+            "_id": ObjectId(),
+            "missionId_str": f"mission-{i}",
+            "title": f"Directive {i}",
+            "description": "Selesaikan transmisi untuk membuka sinyal berikutnya. " * 2,
+            "type": "social",
+            "rewardXp": 100 + i,
+            "rewardBadge": {"badge_id_str": f"badge-{i}", "name": f"Badge {i}", "imageUrl": f"https://cdn.example.com/badges/{i}.png"} if i % 3 == 0 else None,
+            "status": "available",
+            "action": {"label": "Go", "type": "external_link", "url": f"https://x.com/cigar/{i}"},
+        })
+        for i in range(count)
+    ]
+
+
+def build_badges(count: int) -> List[UserBadgeResponse]:
+    now = datetime.now(timezone.utc)
+    return [
+        UserBadgeResponse.model_validate({
+            "_id": ObjectId(), "badge_doc_id": ObjectId(), "badgeId_str": f"badge-{i}", "name": f"Badge {i}",
+            "imageUrl": f"https://cdn.example.com/badges/{i}.png", "description": "Neural imprint", "acquiredAt": now,
+        })
+        for i in range(count)
+    ]
+
+
+def build_allies(count: int) -> AlliesListResponse:
+    now = datetime.now(timezone.utc)
+    allies = [AllyInfo.model_validate({"_id": ObjectId(), "username": f"Ally-{i}", "rank": "Observer", "joinedAt": now}) for i in range(count)]
+    return AlliesListResponse(totalAllies=count, allies=allies, page=1, limit=count, totalPages=1)
+
+
+def build_cases(args: argparse.Namespace) -> List[Case]:
+    user = build_user()
+    user_public = UserPublic.model_validate(user)
+    directives = build_directives(args.directives)
+    badges = build_badges(args.badges)
+    allies = build_allies(args.allies)
+    summary = MissionProgressSummaryResponse(completedMissions=12, totalMissions=40, activeSignals=28)
+    challenge = {"messageToSign": "Selamat datang di CigarDS! Nonce unik Anda: " + "0" * 32, "nonce": "0" * 32}
+    return [
+        Case("users_me", UserPublic, lambda: user), # GET /users/me: UserInDB dari dependency
+        Case("token", TokenResponse, lambda: TokenResponse(access_token="x" * 160, user=user_public)), # POST /auth/connect
+        Case("challenge", ChallengeMessageResponse, lambda: challenge), # GET /auth/challenge: dict dari service
+        Case("x_initiate", TwitterOAuthInitiateResponse, lambda: {"redirect_url": "https://twitter.com/i/oauth2/authorize?state=" + "s" * 43}),
+        Case("summary", MissionProgressSummaryResponse, lambda: summary),
+        Case("directives", MissionDirectivesListResponse, lambda: {"directives": directives}),
+        Case("badges", UserBadgeListResponse, lambda: {"badges": badges, "total": len(badges)}),
+        Case("allies", AlliesListResponse, lambda: allies), # Halaman default 10 ally
+    ]
+
+
+def build_app(cases: List[Case]) -> FastAPI:
+    app = FastAPI()
+    for case in cases:
+        def register(case: Case) -> None:
+            @app.get(f"/default/{case.name}", response_model=case.response_model)
+            async def default_path():
+                return case.content()
+
+            @app.get(f"/fast/{case.name}", response_model=case.response_model)
+            async def fast_path():
+                return model_response(case.response_model, case.content())
+        register(case)
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> float:
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            resp = await client.get(path)
+            resp.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started)
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    cases = build_cases(args)
+    transport = httpx.ASGITransport(app=build_app(cases))
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for case in cases:
+            default_body = (await client.get(f"/default/{case.name}")).json()
+            fast_body = (await client.get(f"/fast/{case.name}")).json()
+            if default_body != fast_body:
+                raise SystemExit(f"Output '{case.name}' berbeda antara jalur default dan model_response.")
+            await measure(client, f"/default/{case.name}", min(200, args.requests), args.concurrency) # warm-up
+            await measure(client, f"/fast/{case.name}", min(200, args.requests), args.concurrency)
+            # Putaran bergantian, diambil median: drift mesin tidak menguntungkan satu jalur saja
+            default_runs, fast_runs = [], []
+            for _ in range(args.rounds):
+                default_runs.append(await measure(client, f"/default/{case.name}", args.requests, args.concurrency))
+                fast_runs.append(await measure(client, f"/fast/{case.name}", args.requests, args.concurrency))
+            default_rps, fast_rps = statistics.median(default_runs), statistics.median(fast_runs)
+            results.append({
+                "payload": case.name,
+                "default_rps": round(default_rps, 1),
+                "model_response_rps": round(fast_rps, 1),
+                "speedup": round(fast_rps / default_rps, 2),
+            })
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark serialisasi respons (default FastAPI vs model_response).")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3, help="Putaran per jalur; yang dilaporkan median")
+    parser.add_argument("--directives", type=int, default=50, help="Jumlah direktif di payload list")
+    parser.add_argument("--badges", type=int, default=20, help="Jumlah badge di payload list")
+    parser.add_argument("--allies", type=int, default=10, help="Jumlah ally di payload list")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING) # Satu baris INFO per request mengotori output
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'payload':<12}{'default req/s':>16}{'model_response req/s':>24}{'speedup':>10}")
+    for row in results:
+        print(f"{row['payload']:<12}{row['default_rps']:>16}{row['model_response_rps']:>24}{row['speedup']:>9}x")
+
+
+if __name__ == "__main__":
+    main()
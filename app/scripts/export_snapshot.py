@@ -0,0 +1,153 @@
+# ===========================================================================
+# File: app/scripts/export_snapshot.py (MODIFIKASI: client MongoDB lewat app/db/backends)
+# ===========================================================================
+"""
+CLI export snapshot airdrop (wallet, points, XP, rank, referral) ke CSV atau NDJSON.
+
+Contoh:
+    python -m app.scripts.export_snapshot --format ndjson --output snapshot.ndjson --checkpoint snapshot.ckpt.json
+    # Jika proses terputus, jalankan ulang perintah yang sama dengan --resume
+
+Snapshot session MongoDB hanya bertahan selama minSnapshotHistoryWindowInSeconds (default 300 detik).
+Export yang lebih lama, atau yang di-resume, dibaca dalam beberapa segmen snapshot; cursor awal
+tiap segmen dicatat di checkpoint (`snapshot_segments`).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+
+from app.core.config import settings, logger
+from app.db.backends import MONGO_DRIVERS, close_client, create_client
+from app.services.export_service import snapshot_export_service
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export snapshot airdrop secara streaming dan resumable.")
+    parser.add_argument("--mongo-url", default=settings.MONGODB_URL)
+    parser.add_argument("--mongo-driver", choices=MONGO_DRIVERS, default=settings.MONGODB_DRIVER)
+    parser.add_argument("--users-db", default=settings.MONGODB_DB_NAME)
+    parser.add_argument("--registrations-db", default=settings.REGISTRATIONS_DB_NAME or settings.MONGODB_DB_NAME)
+    parser.add_argument("--registrations-collection", default=settings.REGISTRATIONS_COLLECTION_NAME)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--source", choices=["registrations", "users"], default="registrations")
+    parser.add_argument("--output", default="-", help="Path file output, atau '-' untuk stdout")
+    parser.add_argument("--checkpoint", default=None, help="Path file checkpoint JSON (default: <output>.ckpt.json)")
+    parser.add_argument("--resume", action="store_true", help="Lanjutkan dari checkpoint terakhir")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--checkpoint-interval", type=float, default=2.0, help="Detik minimum antar penulisan checkpoint")
+    args = parser.parse_args(argv)
+    if args.checkpoint is None and args.output != "-":
+        args.checkpoint = f"{args.output}.ckpt.json"
+    return args
+
+
+def load_checkpoint(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: Optional[str], data: Dict[str, Any]) -> None:
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path) # Atomik: checkpoint tidak pernah setengah tertulis
+
+
+async def run_export(args: argparse.Namespace) -> int:
+    client = create_client(args.mongo_driver, args.mongo_url)
+    users_collection = client[args.users_db]["users"]
+    registrations_collection = client[args.registrations_db][args.registrations_collection]
+    driving_collection = registrations_collection if args.source == "registrations" else users_collection
+
+    checkpoint = load_checkpoint(args.checkpoint) if args.resume else None
+    if checkpoint:
+        if checkpoint.get("completed"):
+            logger.info(f"Export: checkpoint {args.checkpoint} already marks this export as completed.")
+            return 0
+        if checkpoint.get("format") != args.format or checkpoint.get("source") != args.source:
+            logger.error("Export: checkpoint format/source does not match the requested export.")
+            return 2
+    after_id = ObjectId(checkpoint["last_id"]) if checkpoint and checkpoint.get("last_id") else None
+    if checkpoint and checkpoint.get("upper_id"):
+        upper_id = ObjectId(checkpoint["upper_id"])
+    else:
+        upper_id = await snapshot_export_service.resolve_upper_id(driving_collection)
+
+    if args.output == "-":
+        out = sys.stdout.buffer
+    elif checkpoint:
+        out = open(args.output, "r+b")
+        out.truncate(checkpoint.get("bytes_written", 0)) # Buang batch parsial setelah checkpoint terakhir
+        out.seek(0, os.SEEK_END)
+    else:
+        out = open(args.output, "wb")
+
+    state: Dict[str, Any] = {
+        "format": args.format,
+        "source": args.source,
+        "upper_id": str(upper_id) if upper_id else None,
+        "last_id": str(after_id) if after_id else None,
+        "rows": checkpoint.get("rows", 0) if checkpoint else 0,
+        "bytes_written": checkpoint.get("bytes_written", 0) if checkpoint else 0,
+        "snapshot_segments": checkpoint.get("snapshot_segments", []) if checkpoint else [],
+        "completed": False,
+    }
+    if not checkpoint:
+        state["bytes_written"] += out.write(snapshot_export_service.encode_header(args.format))
+
+    def on_snapshot(segment_after_id: Optional[ObjectId]) -> None:
+        state["snapshot_segments"].append(str(segment_after_id) if segment_after_id else None)
+
+    started = time.monotonic()
+    last_checkpoint_at = started
+    rows_this_run = 0
+    try:
+        async for rows in snapshot_export_service.iter_export_batches(
+            client=client,
+            users_collection=users_collection,
+            registrations_collection=registrations_collection,
+            source=args.source,
+            after_id=after_id,
+            upper_id=upper_id,
+            batch_size=args.batch_size,
+            on_snapshot=on_snapshot,
+        ):
+            state["bytes_written"] += out.write(snapshot_export_service.encode_rows(rows, args.format))
+            state["rows"] += len(rows)
+            state["last_id"] = rows[-1]["cursor"]
+            rows_this_run += len(rows)
+            now = time.monotonic()
+            if now - last_checkpoint_at >= args.checkpoint_interval:
+                out.flush()
+                save_checkpoint(args.checkpoint, state)
+                last_checkpoint_at = now
+                logger.info(f"Export: {state['rows']} rows ({rows_this_run / (now - started):.0f} rows/s), last cursor {state['last_id']}")
+        out.flush()
+        state["completed"] = True
+        save_checkpoint(args.checkpoint, state)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        await close_client(client)
+
+    elapsed = max(time.monotonic() - started, 1e-9)
+    logger.info(f"Export completed: {state['rows']} rows total, {rows_this_run} this run in {elapsed:.1f}s ({rows_this_run / elapsed:.0f} rows/s).")
+    return 0
+
+
+def main(argv=None) -> None:
+    sys.exit(asyncio.run(run_export(parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+# ===========================================================================
+# File: app/scripts/generate_dataset.py (MODIFIKASI: load_dataset satu proses untuk test dan benchmark)
+# ===========================================================================
+"""
+Generator dataset sintetis untuk uji skala (jutaan user): users dengan pohon referral yang
+condong ke user awal, distribusi XP/rank, serta link user_missions dan user_badges.
+Katalog misi dan badge diambil dari fixture repo (cigar_ds_db.missions.json, dummy-badges.json).
+
+Deterministik: dengan --seed, --users, --epoch dan --span-days yang sama, isi database identik
+(termasuk _id), berapa pun jumlah worker. Setiap batch dibangkitkan dari RNG miliknya sendiri
+lalu di-insert_many paralel oleh proses worker (pymongo sinkron, satu client per proses).
+Index dibuat setelah load (lebih cepat daripada memelihara index selama insert).
+
+Contoh:
+    python -m app.scripts.generate_dataset --users 1000000 --drop
+    python -m app.scripts.generate_dataset --users 10000000 --workers 16 --batch-size 20000 --drop
+"""
+import argparse
+import hashlib
+import os
+import random
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from bson import ObjectId, json_util
+from pymongo import MongoClient, ReplaceOne
+
+import app.api.v1 # noqa: F401  Muat router lebih dulu: import app.crud / app.services langsung berputar (circular)
+from app.core.config import settings, logger
+from app.crud.crud_badge import crud_badge, crud_user_badge_link
+from app.crud.crud_mission import crud_mission, crud_user_mission_link
+from app.crud.crud_user import crud_user
+from app.services.user_service import user_service
+from app.utils.helpers import SCI_FI_MAIN_WORDS
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_MISSIONS_FILE = REPO_ROOT / "cigar_ds_db.missions.json"
+DEFAULT_BADGES_FILE = REPO_ROOT / "dummy-badges.json"
+GENERATED_COLLECTIONS = ("users", "user_missions", "user_badges")
+
+# Peluang user menyelesaikan misi per tipe aksi. Misi invite (requiredAllies) dan "disabled"
+# tidak dibangkitkan: kelayakannya bergantung pada alliesCount yang baru diketahui setelah load.
+COMPLETION_RATE_BY_ACTION = {"external_link": 0.6, "oauth_connect": 0.35, "api_call": 0.8}
+DAILY_CHECKIN_MISSION_ID = "daily-checkin"
+DAILY_CHECKIN_XP = 10
+
+# Tag byte di _id agar id tiap koleksi tidak bertabrakan: [4 byte waktu][tag][slot][6 byte indeks user]
+_USER_TAG, _MISSION_LINK_TAG, _BADGE_LINK_TAG = 1, 2, 3
+
+
+class MissionSpec(NamedTuple):
+    slot: int
+    id: ObjectId
+    mission_id_str: str
+    reward_xp: int
+    completion_rate: float
+    badge_id: Optional[ObjectId]
+
+
+class GeneratorConfig(NamedTuple):
+    mongo_url: str
+    db_name: str
+    seed: int
+    users: int
+    batch_size: int
+    epoch: float
+    span_seconds: float
+    referral_rate: float
+    referral_skew: float
+    missions: Tuple[MissionSpec, ...]
+    rank_badge_urls: Dict[str, Optional[str]]
+
+
+def _object_id(created_at: float, tag: int, slot: int, user_index: int) -> ObjectId:
+    return ObjectId(struct.pack(">IBB", int(created_at), tag, slot) + user_index.to_bytes(6, "big"))
+
+
+def _created_at(config: GeneratorConfig, user_index: int) -> float:
+    # Tanpa RNG: _id referrer bisa dihitung dari indeksnya saja, di batch mana pun
+    return config.epoch + config.span_seconds * user_index / config.users
+
+
+def _base36(value: int) -> str:
+    digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    out = ""
+    while True:
+        value, remainder = divmod(value, 36)
+        out = digits[remainder] + out
+        if value == 0:
+            return out
+
+
+def _rank_for_xp(xp: int) -> str:
+    rank = settings.RANK_ORDER[0]
+    for candidate in settings.RANK_ORDER:
+        if xp >= settings.RANK_THRESHOLDS[candidate]:
+            rank = candidate
+    return rank
+
+
+def _profile(config: GeneratorConfig, username: str, rank: str, xp: int) -> Dict[str, Any]:
+    # Sama dengan UserService._calculate_rank_details_for_profile, tanpa biaya validasi HttpUrl per user
+    index = settings.RANK_ORDER.index(rank)
+    next_rank = settings.RANK_ORDER[index + 1] if index < len(settings.RANK_ORDER) - 1 else None
+    if next_rank is None:
+        progress = 100.0
+    else:
+        current_threshold = settings.RANK_THRESHOLDS[rank]
+        needed = settings.RANK_THRESHOLDS[next_rank] - current_threshold
+        progress = min(100.0, max(0.0, (xp - current_threshold) / needed * 100)) if needed > 0 else 0.0
+    profile = {"commanderName": username, "rankProgressPercent": round(progress, 2), "nextRank": next_rank}
+    if config.rank_badge_urls.get(rank):
+        profile["rankBadgeUrl"] = config.rank_badge_urls[rank]
+    return profile
+
+
+def _build_batch(config: GeneratorConfig, batch_index: int) -> Tuple[List[dict], List[dict], List[dict]]:
+    rng = random.Random(f"{config.seed}:{batch_index}")
+    start = batch_index * config.batch_size
+    stop = min(config.users, start + config.batch_size)
+    end_of_span = config.epoch + config.span_seconds
+    users: List[dict] = []
+    mission_links: List[dict] = []
+    badge_links: List[dict] = []
+    for user_index in range(start, stop):
+        created_ts = _created_at(config, user_index)
+        created_at = datetime.fromtimestamp(created_ts, timezone.utc)
+        user_id = _object_id(created_ts, _USER_TAG, 0, user_index)
+        wallet = "0x" + hashlib.blake2b(f"{config.seed}:{user_index}".encode("ascii"), digest_size=20).hexdigest()
+        username = f"{rng.choice(SCI_FI_MAIN_WORDS)[:15]}_{_base36(user_index)}" # Suffix indeks: unik tanpa cek ke DB
+        active_until = created_ts + rng.random() * (end_of_span - created_ts)
+
+        xp = 0
+        twitter_data = None
+        last_daily_checkin = None
+        for mission in config.missions:
+            if rng.random() >= mission.completion_rate:
+                continue
+            completed_ts = created_ts + rng.random() * (active_until - created_ts)
+            completed_at = datetime.fromtimestamp(completed_ts, timezone.utc)
+            xp += mission.reward_xp
+            if mission.mission_id_str == DAILY_CHECKIN_MISSION_ID:
+                # Satu link per user (di-update setiap check-in); hari aktif lain menambah XP
+                xp += DAILY_CHECKIN_XP * min(365, int(rng.lognormvariate(1.5, 1.2)))
+                last_daily_checkin = completed_at
+            if mission.mission_id_str == "connect-x-account":
+                twitter_data = {"twitter_user_id": str(10**17 + user_index), "twitter_username": f"agent_{_base36(user_index).lower()}", "connected_at": completed_at}
+            mission_links.append({
+                "_id": _object_id(completed_ts, _MISSION_LINK_TAG, mission.slot, user_index),
+                "userId": user_id, "missionId": mission.id, "status": "completed", "completedAt": completed_at,
+            })
+            if mission.badge_id is not None:
+                badge_links.append({
+                    "_id": _object_id(completed_ts, _BADGE_LINK_TAG, mission.slot, user_index),
+                    "userId": user_id, "badgeId": mission.badge_id, "acquiredAt": completed_at,
+                })
+
+        rank = _rank_for_xp(xp)
+        user = {
+            "_id": user_id,
+            "walletAddress": wallet,
+            "username": username,
+            "rank": rank,
+            "xp": xp,
+            "cigarBalance": 0.0,
+            "referralCode": f"CGR{_base36(user_index).rjust(6, '0')}",
+            "alliesCount": 0, # Dihitung dari referredBy setelah semua batch selesai
+            "profile": _profile(config, username, rank, xp),
+            "systemStatus": {
+                "starDate": f"{created_at.year}.{created_at.timetuple().tm_yday}.{created_at:%H%M}",
+                "signalStatus": "Optimal",
+                "networkLoadPercent": round(rng.uniform(20.0, 60.0), 2),
+                "anomaliesResolved": 0,
+            },
+            "is_active": True,
+            "is_superuser": False,
+            "createdAt": created_at,
+            "updatedAt": datetime.fromtimestamp(active_until, timezone.utc),
+            "lastLogin": datetime.fromtimestamp(active_until, timezone.utc),
+        }
+        if user_index > 0 and rng.random() < config.referral_rate:
+            # Referrer selalu user yang lebih dulu daftar; pangkat skew > 1 membuat user awal
+            # mengumpulkan sebagian besar ally (distribusi berekor panjang seperti produksi)
+            referrer_index = int(user_index * rng.random() ** config.referral_skew)
+            user["referredBy"] = _object_id(_created_at(config, referrer_index), _USER_TAG, 0, referrer_index)
+        if twitter_data is not None:
+            user["twitter_data"] = twitter_data
+        if last_daily_checkin is not None:
+            user["last_daily_checkin"] = last_daily_checkin
+        users.append(user)
+    return users, mission_links, badge_links
+
+
+_worker_client: Optional[MongoClient] = None
+
+
+def _init_worker(mongo_url: str) -> None:
+    global _worker_client
+    _worker_client = MongoClient(mongo_url, w=1)
+
+
+def _load_batch(job: Tuple[GeneratorConfig, int]) -> Tuple[int, int, int]:
+    config, batch_index = job
+    users, mission_links, badge_links = _build_batch(config, batch_index)
+    db = _worker_client[config.db_name]
+    for collection, docs in (("users", users), ("user_missions", mission_links), ("user_badges", badge_links)):
+        if docs:
+            db[collection].insert_many(docs, ordered=False, bypass_document_validation=True)
+    return len(users), len(mission_links), len(badge_links)
+
+
+def _load_catalog(db, missions_file: Path, badges_file: Path) -> Tuple[MissionSpec, ...]:
+    """Upsert katalog misi dan badge dari fixture, lalu kembalikan misi yang dibangkitkan linknya."""
+    badges = json_util.loads(badges_file.read_text(encoding="utf-8"))
+    missions = json_util.loads(missions_file.read_text(encoding="utf-8"))
+    if badges:
+        db["badges"].bulk_write([ReplaceOne({"_id": badge["_id"]}, badge, upsert=True) for badge in badges])
+    if missions:
+        db["missions"].bulk_write([ReplaceOne({"_id": mission["_id"]}, mission, upsert=True) for mission in missions])
+    badge_ids = {badge["badgeId_str"]: badge["_id"] for badge in badges}
+    specs: List[MissionSpec] = []
+    seen = set()
+    for mission in sorted(missions, key=lambda doc: (doc.get("order") or 0, str(doc["_id"]))):
+        rate = COMPLETION_RATE_BY_ACTION.get(mission["action"]["type"])
+        if not mission.get("isActive", True) or rate is None or mission.get("requiredAllies") or mission["missionId_str"] in seen:
+            continue
+        seen.add(mission["missionId_str"])
+        reward_badge = mission.get("rewardBadge") or {}
+        specs.append(MissionSpec(
+            slot=len(specs), id=mission["_id"], mission_id_str=mission["missionId_str"], reward_xp=mission["rewardXp"],
+            completion_rate=rate, badge_id=badge_ids.get(reward_badge.get("badge_id_str")),
+        ))
+    return tuple(specs)
+
+
+def _rank_badge_urls() -> Dict[str, Optional[str]]:
+    urls = {}
+    for rank in settings.RANK_ORDER:
+        badge_url = user_service._calculate_rank_details_for_profile(current_rank=rank, current_xp=settings.RANK_THRESHOLDS[rank])["rankBadgeUrl"]
+        urls[rank] = str(badge_url) if badge_url else None
+    return urls
+
+
+def build_config(
+    db, *, mongo_url: str, users: int, seed: int = 1, batch_size: int = 10_000, epoch: str = "2025-06-01",
+    span_days: float = 365.0, referral_rate: float = 0.55, referral_skew: float = 3.0,
+    missions_file: Path = DEFAULT_MISSIONS_FILE, badges_file: Path = DEFAULT_BADGES_FILE,
+) -> GeneratorConfig:
+    """Upsert katalog ke `db` (pymongo sinkron) lalu susun konfigurasi generator."""
+    return GeneratorConfig(
+        mongo_url=mongo_url,
+        db_name=db.name,
+        seed=seed,
+        users=users,
+        batch_size=batch_size,
+        epoch=datetime.strptime(epoch, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp(),
+        span_seconds=timedelta(days=span_days).total_seconds(),
+        referral_rate=referral_rate,
+        referral_skew=referral_skew,
+        missions=_load_catalog(db, missions_file, badges_file),
+        rank_badge_urls=_rank_badge_urls(),
+    )
+
+
+def load_dataset(db, config: GeneratorConfig, *, finalize: bool = True) -> Tuple[int, int, int]:
+    """Load di proses ini tanpa worker pool; untuk dataset kecil (test query plan, benchmark)."""
+    totals = [0, 0, 0]
+    for batch_index in range((config.users + config.batch_size - 1) // config.batch_size):
+        docs_per_collection = _build_batch(config, batch_index)
+        for position, (collection, docs) in enumerate(zip(GENERATED_COLLECTIONS, docs_per_collection)):
+            if docs:
+                db[collection].insert_many(docs, ordered=False, bypass_document_validation=True)
+            totals[position] += len(docs)
+    if finalize:
+        _finalize(db)
+    return totals[0], totals[1], totals[2]
+
+
+def _finalize(db) -> None:
+    started = time.monotonic()
+    db["users"].aggregate([
+        {"$match": {"referredBy": {"$exists": True}}},
+        {"$group": {"_id": "$referredBy", "alliesCount": {"$sum": 1}}},
+        {"$merge": {"into": "users", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}},
+    ], allowDiskUse=True)
+    logger.info("Dataset: alliesCount computed in %.1fs.", time.monotonic() - started)
+
+    started = time.monotonic()
+    for crud in (crud_user, crud_mission, crud_user_mission_link, crud_badge, crud_user_badge_link):
+        if crud.indexes:
+            db[crud.collection_name].create_indexes(crud.indexes)
+    logger.info("Dataset: indexes built in %.1fs.", time.monotonic() - started)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bangkitkan dataset sintetis (users, referral, user_missions, user_badges).")
+    parser.add_argument("--mongo-url", default=settings.MONGODB_URL)
+    parser.add_argument("--db", default=settings.MONGODB_DB_NAME)
+    parser.add_argument("--users", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=10_000, help="User per insert_many (juga unit determinisme RNG)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--epoch", default="2025-06-01", help="Tanggal (UTC) user pertama mendaftar")
+    parser.add_argument("--span-days", type=float, default=365.0, help="Rentang waktu pendaftaran semua user")
+    parser.add_argument("--referral-rate", type=float, default=0.55, help="Fraksi user yang mendaftar dengan kode referral")
+    parser.add_argument("--referral-skew", type=float, default=3.0, help="> 1: ally menumpuk pada user awal")
+    parser.add_argument("--missions-file", type=Path, default=DEFAULT_MISSIONS_FILE)
+    parser.add_argument("--badges-file", type=Path, default=DEFAULT_BADGES_FILE)
+    parser.add_argument("--drop", action="store_true", help=f"Hapus koleksi {', '.join(GENERATED_COLLECTIONS)} sebelum load")
+    parser.add_argument("--skip-finalize", action="store_true", help="Lewati perhitungan alliesCount dan pembuatan index")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    client = MongoClient(args.mongo_url)
+    db = client[args.db]
+    if args.drop:
+        for name in GENERATED_COLLECTIONS:
+            db.drop_collection(name)
+    elif db["users"].estimated_document_count() > 0:
+        logger.error("Dataset: database '%s' already has users; use --drop to regenerate.", args.db)
+        return 2
+
+    config = build_config(
+        db, mongo_url=args.mongo_url, users=args.users, seed=args.seed, batch_size=args.batch_size,
+        epoch=args.epoch, span_days=args.span_days, referral_rate=args.referral_rate,
+        referral_skew=args.referral_skew, missions_file=args.missions_file, badges_file=args.badges_file,
+    )
+    batches = (args.users + args.batch_size - 1) // args.batch_size
+    logger.info(
+        "Dataset: generating %s users in %s batches with %s workers (seed %s, %s missions).",
+        args.users, batches, args.workers, args.seed, len(config.missions),
+    )
+    started = time.monotonic()
+    totals = [0, 0, 0]
+    last_report = started
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.mongo_url,)) as pool:
+        for counts in pool.map(_load_batch, ((config, index) for index in range(batches))):
+            totals = [total + count for total, count in zip(totals, counts)]
+            now = time.monotonic()
+            if now - last_report >= 5:
+                last_report = now
+                logger.info("Dataset: %s/%s users (%.0f users/s).", totals[0], args.users, totals[0] / (now - started))
+    elapsed = time.monotonic() - started
+    logger.info(
+        "Dataset: inserted %s users, %s user_missions, %s user_badges in %.1fs (%.0f users/s).",
+        totals[0], totals[1], totals[2], elapsed, totals[0] / elapsed if elapsed else 0,
+    )
+    if not args.skip_finalize:
+        _finalize(db)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# ===========================================================================
+# File: app/scripts/loadtest_stubs.py (BARU)
+# ===========================================================================
+"""
+Stub upstream untuk load test (locustfile.py): endpoint OAuth2 Twitter/X dan JSON-RPC Alchemy.
+Respons deterministik dari input, jadi user yang sama selalu mendapat akun X yang sama.
+
+    uvicorn app.scripts.loadtest_stubs:app --port 9100 --workers 2
+
+Arahkan app ke stub:
+    TWITTER_API_BASE_URL=http://127.0.0.1:9100
+    TWITTER_AUTHORIZATION_URL=http://127.0.0.1:9100/i/oauth2/authorize
+    ALCHEMY_RPC_URL=http://127.0.0.1:9100/v2/stub   (api.py dan points_refresher)
+
+STUB_LATENCY_MS (default 0) menambahkan jeda per request untuk meniru latency upstream.
+"""
+import asyncio
+import hashlib
+import os
+from typing import Any, Dict, List, Union
+
+from fastapi import FastAPI, Form, Header, HTTPException, Request
+
+STUB_LATENCY_SECONDS = float(os.getenv("STUB_LATENCY_MS", "0")) / 1000
+
+app = FastAPI(title="Cigar DS load test upstream stubs", docs_url=None, redoc_url=None)
+
+
+def _digest(value: str) -> int:
+    return int.from_bytes(hashlib.sha256(value.encode("utf-8")).digest()[:8], "big")
+
+
+async def _upstream_latency() -> None:
+    if STUB_LATENCY_SECONDS > 0:
+        await asyncio.sleep(STUB_LATENCY_SECONDS)
+
+
+@app.get("/i/oauth2/authorize")
+async def authorize(state: str, redirect_uri: str) -> Dict[str, str]:
+    # Browser tidak dipakai di load test; locustfile langsung memanggil callback dengan state ini
+    return {"state": state, "redirect_uri": redirect_uri}
+
+
+@app.post("/2/oauth2/token")
+async def oauth_token(code: str = Form(...), code_verifier: str = Form(...)) -> Dict[str, Any]:
+    await _upstream_latency()
+    return {"token_type": "bearer", "expires_in": 7200, "access_token": f"stub-{code}", "scope": "users.read tweet.read offline.access"}
+
+
+@app.get("/2/users/me")
+async def users_me(authorization: str = Header(...)) -> Dict[str, Any]:
+    await _upstream_latency()
+    token = authorization.removeprefix("Bearer ").strip()
+    if not token.startswith("stub-"):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    user_id = _digest(token) % 10**18
+    return {"data": {"id": str(user_id), "username": f"agent_{user_id % 10**10}", "name": "Load Test Agent"}}
+
+
+def _rpc_result(call: Dict[str, Any]) -> Dict[str, Any]:
+    response: Dict[str, Any] = {"jsonrpc": "2.0", "id": call.get("id")}
+    if call.get("method") == "eth_getTransactionCount":
+        address = str((call.get("params") or [""])[0]).lower()
+        response["result"] = hex(_digest(address) % 500)
+    elif call.get("method") == "eth_blockNumber":
+        response["result"] = hex(30_000_000)
+    else:
+        response["error"] = {"code": -32601, "message": "Method not found"}
+    return response
+
+
+@app.post("/v2/{api_key}")
+async def json_rpc(api_key: str, request: Request) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    await _upstream_latency()
+    payload = await request.json()
+    if isinstance(payload, list): # Batch JSON-RPC (points_refresher)
+        return [_rpc_result(call) for call in payload]
+    return _rpc_result(payload)
@@ -1,6 +1,7 @@
 # ===========================================================================
-# File: app/services/__init__.py (MODIFIKASI: Tambahkan service baru)
+# File: app/services/__init__.py (MODIFIKASI: Tambahkan news_service)
 # ===========================================================================
 from .auth_service import auth_service
 from .user_service import user_service
-from .mission_service import mission_service # BARU
\ No newline at end of file
+from .mission_service import mission_service # BARU
+from .news_service import news_service # BARU
\ No newline at end of file
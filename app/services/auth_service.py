@@ -1,5 +1,5 @@
 # ===========================================================================
-# File: app/services/auth_service.py (MODIFIKASI: Pastikan signature initiate_twitter_oauth)
+# File: app/services/auth_service.py (MODIFIKASI: Log dengan argumen %-style)
 # ===========================================================================
 from fastapi import HTTPException, status as HttpStatus, Depends, Request as FastAPIRequest
 from fastapi.responses import RedirectResponse
@@ -12,7 +12,8 @@ import base64
 from urllib.parse import urlencode, quote
 
 from app.core.config import settings, logger
-from app.core.security import create_access_token, verify_wallet_signature
+from app.utils.server_timing import httpx_event_hooks
+from app.core.security import create_access_token, verify_wallet_signature, create_wallet_challenge, verify_wallet_challenge
 from app.crud.crud_user import crud_user
 from app.api.v1.schemas.auth import WalletConnectRequest, TwitterOAuthCallbackResponse, TwitterOAuthInitiateResponse
 from app.api.v1.schemas.token import TokenResponse
@@ -28,40 +29,20 @@ import redis.asyncio as aioredis
 from app.models.base import PyObjectId
 from pydantic import HttpUrl as PydanticHttpUrl
 
-TWITTER_AUTHORIZATION_URL = "https://twitter.com/i/oauth2/authorize"
-TWITTER_TOKEN_URL = "https://api.twitter.com/2/oauth2/token"
-TWITTER_USER_ME_URL = "https://api.twitter.com/2/users/me"
+TWITTER_AUTHORIZATION_URL = settings.TWITTER_AUTHORIZATION_URL
+TWITTER_TOKEN_URL = f"{settings.TWITTER_API_BASE_URL.rstrip('/')}/2/oauth2/token"
+TWITTER_USER_ME_URL = f"{settings.TWITTER_API_BASE_URL.rstrip('/')}/2/users/me"
 TWITTER_SCOPES = ["users.read", "tweet.read", "offline.access"]
 CONNECT_X_MISSION_ID_STR = "connect-x-account" 
 OAUTH_STATE_EXPIRY_SECONDS = 600
+USED_NONCE_KEY_PREFIX = "nonce_used:"
 
 class AuthService:
     # ... (generate_challenge_message dan connect_wallet_and_get_token sama seperti versi sebelumnya) ...
-    async def generate_challenge_message(
-        self, 
-        wallet_address: str, 
-        redis_client: Optional[aioredis.Redis] = None
-    ) -> Dict[str, str]:
-        # ... (logika sama seperti sebelumnya) ...
-        if redis_client is None:
-            logger.error("Redis client not available for nonce generation. Auth will fail or be insecure.")
-            raise HTTPException(status_code=HttpStatus.HTTP_503_SERVICE_UNAVAILABLE, detail="Nonce service unavailable.")
-
-        wallet_address_lower = wallet_address.lower()
-        nonce_key = f"nonce:{wallet_address_lower}"
-
-        await redis_client.delete(nonce_key)
-
-        nonce = secrets.token_hex(16)
-        message_to_sign = f"Selamat datang di {settings.PROJECT_NAME}! Silakan tandatangani pesan ini untuk melanjutkan. Nonce unik Anda: {nonce}"
-        
-        nonce_data = {"nonce": nonce, "message_to_sign": message_to_sign}
-        await redis_client.set(
-            nonce_key, 
-            json.dumps(nonce_data),
-            ex=settings.NONCE_EXPIRY_SECONDS 
-        )
-        logger.info(f"Generated challenge (Redis) for {wallet_address_lower}, nonce: {nonce[:8]}..., key: {nonce_key}")
+    async def generate_challenge_message(self, wallet_address: str) -> Dict[str, str]:
+        # Stateless (HMAC): tidak ada I/O, jadi caller tanpa autentikasi tidak bisa membebani Redis
+        message_to_sign, nonce = create_wallet_challenge(wallet_address)
+        logger.info("Generated stateless challenge for %s, nonce: %s...", wallet_address.lower(), nonce[:8])
         return {"messageToSign": message_to_sign, "nonce": nonce}
 
 
@@ -78,34 +59,24 @@ class AuthService:
             raise HTTPException(status_code=HttpStatus.HTTP_503_SERVICE_UNAVAILABLE, detail="Authentication service temporarily unavailable.")
 
         wallet_address_lower = request_data.walletAddress.lower()
-        nonce_key = f"nonce:{wallet_address_lower}"
-        
-        stored_nonce_json = await redis_client.get(nonce_key)
+        challenge_status, expires_at = verify_wallet_challenge(
+            wallet_address_lower, request_data.message, request_data.nonce
+        )
 
-        if not stored_nonce_json:
-            logger.warning(f"Nonce not found or expired in Redis for {wallet_address_lower}. Key: {nonce_key}")
+        if challenge_status == "malformed":
+            logger.warning("Message for %s is not a challenge issued by this server.", wallet_address_lower)
             raise HTTPException(
-                status_code=HttpStatus.HTTP_400_BAD_REQUEST, 
-                detail="Nonce tidak ditemukan atau sudah kadaluarsa. Silakan minta challenge baru."
+                status_code=HttpStatus.HTTP_400_BAD_REQUEST,
+                detail="Pesan yang ditandatangani tidak cocok dengan challenge yang diberikan."
             )
-        
-        try:
-            stored_data = json.loads(stored_nonce_json)
-        except json.JSONDecodeError:
-            logger.error(f"Failed to decode nonce data from Redis for {wallet_address_lower}. Data: {stored_nonce_json}")
-            await redis_client.delete(nonce_key)
-            raise HTTPException(status_code=HttpStatus.HTTP_500_INTERNAL_SERVER_ERROR, detail="Kesalahan data internal.")
-        
-        if request_data.nonce != stored_data.get("nonce"):
-            logger.warning(f"Nonce mismatch for {wallet_address_lower}. Expected: {stored_data.get('nonce','')[:8]}..., Got: {request_data.nonce[:8]}...")
+        if challenge_status == "mismatch":
+            logger.warning("Nonce mismatch for %s. Got: %s...", wallet_address_lower, request_data.nonce[:8])
             raise HTTPException(status_code=HttpStatus.HTTP_400_BAD_REQUEST, detail="Nonce tidak cocok.")
-        
-        if request_data.message != stored_data.get("message_to_sign"):
-            logger.warning(f"Message mismatch for {wallet_address_lower}.")
-            await redis_client.delete(nonce_key)
+        if challenge_status == "expired":
+            logger.warning("Expired challenge for %s, nonce: %s...", wallet_address_lower, request_data.nonce[:8])
             raise HTTPException(
-                status_code=HttpStatus.HTTP_400_BAD_REQUEST,
-                detail="Pesan yang ditandatangani tidak cocok dengan challenge yang diberikan."
+                status_code=HttpStatus.HTTP_400_BAD_REQUEST, 
+                detail="Nonce tidak ditemukan atau sudah kadaluarsa. Silakan minta challenge baru."
             )
 
         is_signature_valid = verify_wallet_signature(
@@ -115,21 +86,31 @@ class AuthService:
         )
 
         if not is_signature_valid:
-            logger.warning(f"Invalid signature for {request_data.walletAddress}")
+            logger.warning("Invalid signature for %s", request_data.walletAddress)
             raise HTTPException(
                 status_code=HttpStatus.HTTP_401_UNAUTHORIZED,
                 detail="Signature tidak valid atau alamat wallet tidak cocok.",
             )
 
-        await redis_client.delete(nonce_key)
-        logger.info(f"Nonce {nonce_key} used and deleted from Redis for {wallet_address_lower}.")
+        # Replay set: hanya nonce yang sudah terpakai yang disimpan, sampai challenge-nya kedaluwarsa
+        remaining_seconds = max(1, expires_at - int(datetime.now(timezone.utc).timestamp()))
+        first_use = await redis_client.set(
+            f"{USED_NONCE_KEY_PREFIX}{request_data.nonce}", wallet_address_lower, nx=True, ex=remaining_seconds
+        )
+        if not first_use:
+            logger.warning("Replayed nonce for %s: %s...", wallet_address_lower, request_data.nonce[:8])
+            raise HTTPException(
+                status_code=HttpStatus.HTTP_400_BAD_REQUEST,
+                detail="Nonce sudah digunakan. Silakan minta challenge baru."
+            )
+        logger.info("Nonce %s... consumed for %s.", request_data.nonce[:8], wallet_address_lower)
 
 
         db_user = await crud_user.get_by_wallet_address(db, wallet_address=request_data.walletAddress)
         
         user_was_created = False
         if not db_user:
-            logger.info(f"New user connecting: {request_data.walletAddress}. Creating account...")
+            logger.info("New user connecting: %s. Creating account...", request_data.walletAddress)
             user_was_created = True
             
             initial_username = await self._generate_unique_username(db)
@@ -142,12 +123,12 @@ class AuthService:
                 referrer_user = await crud_user.get_by_referral_code(db, referral_code=request_data.referral_code_input)
                 if referrer_user:
                     if referrer_user.walletAddress.lower() == request_data.walletAddress.lower():
-                        logger.warning(f"User {request_data.walletAddress} attempted to refer themselves. Ignoring referral code.")
+                        logger.warning("User %s attempted to refer themselves. Ignoring referral code.", request_data.walletAddress)
                     else:
                         referred_by_user_id_val = referrer_user.id
-                        logger.info(f"New user {request_data.walletAddress} referred by {referrer_user.username} (ID: {referrer_user.id})")
+                        logger.info("New user %s referred by %s (ID: %s)", request_data.walletAddress, referrer_user.username, referrer_user.id)
                 else:
-                    logger.warning(f"Referral code '{request_data.referral_code_input}' not found for new user {request_data.walletAddress}.")
+                    logger.warning("Referral code '%s' not found for new user %s.", request_data.referral_code_input, request_data.walletAddress)
             
             db_user = await crud_user.create_new_user_with_complete_data(
                 db, 
@@ -159,28 +140,28 @@ class AuthService:
                 referred_by_user_id=referred_by_user_id_val
             )
             if not db_user:
-                 logger.critical(f"CRITICAL: Failed to create user in DB for wallet {request_data.walletAddress} after all checks.")
+                 logger.critical("CRITICAL: Failed to create user in DB for wallet %s after all checks.", request_data.walletAddress)
                  raise HTTPException(status_code=HttpStatus.HTTP_500_INTERNAL_SERVER_ERROR, detail="Gagal membuat pengguna baru.")
 
-            logger.info(f"New user '{db_user.username}' created for wallet {db_user.walletAddress}{f' (referred by ID: {referred_by_user_id_val})' if referred_by_user_id_val else ''}.")
+            logger.info("New user '%s' created for wallet %s (referred by ID: %s).", db_user.username, db_user.walletAddress, referred_by_user_id_val)
             
             if referred_by_user_id_val:
                 updated_referrer = await crud_user.increment_allies_count(db, user_id=referred_by_user_id_val)
                 if not updated_referrer:
-                    logger.error(f"Failed to increment allies_count for referrer ID: {referred_by_user_id_val}")
+                    logger.error("Failed to increment allies_count for referrer ID: %s", referred_by_user_id_val)
             
         if not db_user or not db_user.is_active:
-            logger.warning(f"Login attempt by inactive or non-existent user: {request_data.walletAddress}")
+            logger.warning("Login attempt by inactive or non-existent user: %s", request_data.walletAddress)
             raise HTTPException(status_code=HttpStatus.HTTP_400_BAD_REQUEST, detail="Akun tidak aktif atau bermasalah.")
 
         user_after_last_login_update = await crud_user.update_last_login(db, user_id=db_user.id)
         if user_after_last_login_update:
             db_user = user_after_last_login_update
         else:
-            logger.error(f"Failed to update last_login for user {db_user.username}. Fetching user again.")
+            logger.error("Failed to update last_login for user %s. Fetching user again.", db_user.username)
             refetched_db_user = await crud_user.get(db, id=db_user.id)
             if not refetched_db_user:
-                 logger.critical(f"CRITICAL: User {db_user.username} (ID: {db_user.id}) not found after attempting to update last_login.")
+                 logger.critical("CRITICAL: User %s (ID: %s) not found after attempting to update last_login.", db_user.username, db_user.id)
                  raise HTTPException(status_code=HttpStatus.HTTP_500_INTERNAL_SERVER_ERROR, detail="Kesalahan kritis data pengguna.")
             db_user = refetched_db_user
         
@@ -191,7 +172,7 @@ class AuthService:
         
         user_public_data = UserPublic.model_validate(db_user)
         
-        logger.info(f"User {db_user.username} authenticated successfully. Was created: {user_was_created}")
+        logger.info("User %s authenticated successfully. Was created: %s", db_user.username, user_was_created)
         return TokenResponse(
             access_token=access_token,
             token_type="bearer",
@@ -207,7 +188,7 @@ class AuthService:
             counter += 1
             username_candidate = f"{base_username_for_suffix}_{counter}" 
             if counter > 20:
-                logger.error(f"Could not generate unique username after {counter} attempts for base {base_username_for_suffix}")
+                logger.error("Could not generate unique username after %s attempts for base %s", counter, base_username_for_suffix)
                 return f"Agent{secrets.token_hex(4)}"
         return username_candidate
 
@@ -219,7 +200,7 @@ class AuthService:
             counter +=1
             referral_code_candidate = generate_unique_referral_code(length=7 if counter < 5 else 8)
             if counter > 10:
-                logger.error(f"Could not generate unique referral code after {counter} attempts.")
+                logger.error("Could not generate unique referral code after %s attempts.", counter)
                 return f"REF{secrets.token_hex(5).upper()}"
         return referral_code_candidate
 
@@ -244,7 +225,7 @@ class AuthService:
         }
         state_redis_key = f"twitter_oauth_state:{state}"
         await redis_client.set(state_redis_key, json.dumps(oauth_state_data), ex=OAUTH_STATE_EXPIRY_SECONDS)
-        logger.info(f"Stored Twitter OAuth state in Redis for user {current_user.username} with key {state_redis_key}")
+        logger.info("Stored Twitter OAuth state in Redis for user %s with key %s", current_user.username, state_redis_key)
 
         twitter_auth_params = {
             "response_type": "code",
@@ -257,7 +238,7 @@ class AuthService:
         }
         authorization_url_str = f"{TWITTER_AUTHORIZATION_URL}?{urlencode(twitter_auth_params)}"
         
-        logger.info(f"Redirecting user {current_user.username} to Twitter authorization URL.")
+        logger.info("Redirecting user %s to Twitter authorization URL.", current_user.username)
         return RedirectResponse(url=authorization_url_str, status_code=307)
 
 
@@ -275,7 +256,7 @@ class AuthService:
         await redis_client.delete(state_redis_key)
 
         if not stored_oauth_context_json:
-            logger.error(f"Invalid or expired OAuth state '{state_from_twitter}' received from Twitter callback.")
+            logger.error("Invalid or expired OAuth state '%s' received from Twitter callback.", state_from_twitter)
             raise HTTPException(status_code=HttpStatus.HTTP_400_BAD_REQUEST, detail="Sesi otorisasi X tidak valid atau sudah kadaluarsa.")
         
         try:
@@ -283,21 +264,21 @@ class AuthService:
             code_verifier = stored_oauth_context.get("code_verifier")
             original_user_id_str_from_state = stored_oauth_context.get("user_id")
         except json.JSONDecodeError:
-            logger.error(f"Failed to decode stored OAuth state data from Redis for state: {state_from_twitter}")
+            logger.error("Failed to decode stored OAuth state data from Redis for state: %s", state_from_twitter)
             raise HTTPException(status_code=HttpStatus.HTTP_500_INTERNAL_SERVER_ERROR, detail="Kesalahan internal state otorisasi X.")
 
         if not code_verifier or not original_user_id_str_from_state:
-            logger.error(f"Code verifier or original_user_id missing in stored OAuth state for state: {state_from_twitter}")
+            logger.error("Code verifier or original_user_id missing in stored OAuth state for state: %s", state_from_twitter)
             raise HTTPException(status_code=HttpStatus.HTTP_500_INTERNAL_SERVER_ERROR, detail="Kesalahan internal state otorisasi X (verifier).")
         
         try:
             user_object_id = PyObjectId(original_user_id_str_from_state)
             platform_user = await crud_user.get(db, id=user_object_id)
             if not platform_user:
-                logger.error(f"User with ID {original_user_id_str_from_state} from OAuth state not found in DB.")
+                logger.error("User with ID %s from OAuth state not found in DB.", original_user_id_str_from_state)
                 raise HTTPException(status_code=HttpStatus.HTTP_404_NOT_FOUND, detail="Pengguna otorisasi tidak ditemukan.")
         except Exception as e_user:
-            logger.error(f"Error fetching platform user from state: {e_user}", exc_info=True)
+            logger.error("Error fetching platform user from state: %s", e_user, exc_info=True)
             raise HTTPException(status_code=HttpStatus.HTTP_500_INTERNAL_SERVER_ERROR, detail="Gagal memuat data pengguna platform.")
 
 
@@ -314,19 +295,19 @@ class AuthService:
             "Authorization": f"Basic {auth_header_value}"
         }
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=httpx_event_hooks()) as client:
             try:
-                logger.debug(f"Requesting X access token with payload: {token_payload}")
+                logger.debug("Requesting X access token with payload: %s", token_payload)
                 token_response = await client.post(TWITTER_TOKEN_URL, data=token_payload, headers=headers)
                 token_response.raise_for_status()
                 token_json = token_response.json()
-                logger.debug(f"X access token response: {token_json}")
+                logger.debug("X access token response: %s", token_json)
             except httpx.HTTPStatusError as e:
-                logger.error(f"Twitter token exchange failed: {e.response.status_code} - {e.response.text}", exc_info=True)
+                logger.error("Twitter token exchange failed: %s - %s", e.response.status_code, e.response.text, exc_info=True)
                 error_detail = e.response.json().get('error_description', e.response.json().get('error', e.response.text))
                 raise HTTPException(status_code=HttpStatus.HTTP_502_BAD_GATEWAY, detail=f"Gagal mendapatkan token dari Twitter: {error_detail}")
             except Exception as e:
-                logger.error(f"Error during Twitter token exchange: {e}", exc_info=True)
+                logger.error("Error during Twitter token exchange: %s", e, exc_info=True)
                 raise HTTPException(status_code=HttpStatus.HTTP_500_INTERNAL_SERVER_ERROR, detail="Kesalahan saat komunikasi dengan Twitter.")
 
         x_access_token = token_json.get("access_token")
@@ -337,17 +318,17 @@ class AuthService:
         user_info_headers = {"Authorization": f"Bearer {x_access_token}"}
         user_fields = "id,username,name"
         
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=httpx_event_hooks()) as client:
             try:
                 user_info_response = await client.get(f"{TWITTER_USER_ME_URL}?user.fields={user_fields}", headers=user_info_headers)
                 user_info_response.raise_for_status()
                 twitter_user_info = user_info_response.json().get("data")
-                logger.debug(f"X user info response: {twitter_user_info}")
+                logger.debug("X user info response: %s", twitter_user_info)
             except httpx.HTTPStatusError as e:
-                logger.error(f"Twitter get user info failed: {e.response.status_code} - {e.response.text}", exc_info=True)
+                logger.error("Twitter get user info failed: %s - %s", e.response.status_code, e.response.text, exc_info=True)
                 raise HTTPException(status_code=HttpStatus.HTTP_502_BAD_GATEWAY, detail="Gagal mendapatkan info user dari Twitter.")
             except Exception as e:
-                logger.error(f"Error during Twitter get user info: {e}", exc_info=True)
+                logger.error("Error during Twitter get user info: %s", e, exc_info=True)
                 raise HTTPException(status_code=HttpStatus.HTTP_500_INTERNAL_SERVER_ERROR, detail="Kesalahan saat mengambil info user Twitter.")
 
         if not twitter_user_info:
@@ -358,7 +339,7 @@ class AuthService:
         twitter_username_str = twitter_user_info.get("username")
 
         if not twitter_user_id_str or not twitter_username_str:
-            logger.error(f"Twitter user ID or username missing in response: {twitter_user_info}")
+            logger.error("Twitter user ID or username missing in response: %s", twitter_user_info)
             raise HTTPException(status_code=HttpStatus.HTTP_502_BAD_GATEWAY, detail="Data user Twitter tidak lengkap.")
 
         user_twitter_data_to_save = UserTwitterData(
@@ -369,9 +350,9 @@ class AuthService:
             db, user_id=platform_user.id, twitter_data=user_twitter_data_to_save
         )
         if not updated_user:
-            logger.error(f"Failed to update user {platform_user.username} with Twitter data. User ID: {platform_user.id}")
+            logger.error("Failed to update user %s with Twitter data. User ID: %s", platform_user.username, platform_user.id)
         
-        logger.info(f"User {platform_user.username} successfully connected X account @{twitter_username_str} (ID: {twitter_user_id_str})")
+        logger.info("User %s successfully connected X account @%s (ID: %s)", platform_user.username, twitter_username_str, twitter_user_id_str)
 
         try:
             completion_response = await mission_service.process_mission_completion(
@@ -380,9 +361,9 @@ class AuthService:
                 mission_id_str_to_complete=CONNECT_X_MISSION_ID_STR,
                 completion_data={"twitter_user_id": twitter_user_id_str}
             )
-            logger.info(f"Mission '{CONNECT_X_MISSION_ID_STR}' completion processed for user {platform_user.username}: {completion_response.message}")
+            logger.info("Mission '%s' completion processed for user %s: %s", CONNECT_X_MISSION_ID_STR, platform_user.username, completion_response.message)
         except Exception as e:
-            logger.error(f"Error processing mission completion for '{CONNECT_X_MISSION_ID_STR}' for user {platform_user.username} after X connect: {e}", exc_info=True)
+            logger.error("Error processing mission completion for '%s' for user %s after X connect: %s", CONNECT_X_MISSION_ID_STR, platform_user.username, e, exc_info=True)
 
         return TwitterOAuthCallbackResponse(
             message=f"Akun X @{twitter_username_str} berhasil terhubung!"
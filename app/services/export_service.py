@@ -0,0 +1,232 @@
+# ===========================================================================
+# File: app/services/export_service.py (MODIFIKASI: Lanjut dengan snapshot baru saat SnapshotTooOld)
+# ===========================================================================
+import asyncio
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession, AsyncIOMotorCollection
+from pymongo.errors import OperationFailure
+
+from app.core.config import logger
+from app.db import backends as db_backends
+
+SnapshotFormat = Literal["csv", "ndjson"]
+SnapshotSource = Literal["registrations", "users"]
+
+# Kolom snapshot airdrop. "cursor" adalah _id dokumen penggerak (hex), dipakai untuk resume.
+SNAPSHOT_FIELDS = ["cursor", "wallet_address", "points", "xp", "rank", "referral_code", "referred_by"]
+SNAPSHOT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+SNAPSHOT_TOO_OLD_CODE = 239 # Snapshot lebih tua dari minSnapshotHistoryWindowInSeconds server
+
+REGISTRATION_PROJECTION = {"wallet_address": 1, "points_basis": 1, "user_referral_code": 1, "referrer_wallet_address": 1}
+USER_PROJECTION = {"walletAddress": 1, "xp": 1, "rank": 1, "referralCode": 1}
+
+
+class SnapshotExportService:
+    """
+    Export snapshot airdrop (wallet, points, XP, rank, referral) secara streaming.
+
+    - Koleksi penggerak (registrations atau users) dibaca dengan cursor server-side
+      terurut _id, per batch; data pasangan diambil dengan satu query `$in` per batch,
+      jadi memori terbatas pada ukuran batch.
+    - Himpunan baris dibatasi oleh `upper_id` (_id terakhir saat export dimulai) agar
+      dokumen baru tidak ikut masuk, dan bisa dilanjutkan dari `after_id` (checkpoint).
+      `upper_id` hanya membatasi insert; update tidak dibatasi olehnya.
+    - Jika deployment mendukung (replica set / sharded), read memakai snapshot session, jadi
+      update selama export juga tidak terlihat, tetapi hanya dalam satu segmen snapshot.
+      Server hanya menyimpan history selama minSnapshotHistoryWindowInSeconds (default 300 detik);
+      read sesudahnya gagal dengan SnapshotTooOld dan export dilanjutkan dari cursor terakhir
+      dengan snapshot baru. Resume dari checkpoint juga memulai snapshot baru. Baris dari segmen
+      berbeda bisa mencerminkan titik waktu berbeda; `on_snapshot` dipanggil di awal tiap segmen.
+    - Standalone: tanpa snapshot session, update selama export bisa terlihat.
+    """
+
+    async def supports_snapshot_reads(self, client: AsyncIOMotorClient) -> bool:
+        try:
+            hello = await client.admin.command("hello")
+        except Exception as e:
+            logger.warning(f"Export: 'hello' command failed, snapshot reads disabled: {e}")
+            return False
+        return bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+
+    async def start_snapshot_session(self, client: AsyncIOMotorClient) -> Optional[AsyncIOMotorClientSession]:
+        if not await self.supports_snapshot_reads(client):
+            logger.warning("Export: deployment does not support snapshot reads (standalone?). Reading without a snapshot session.")
+            return None
+        return await db_backends.start_session(client, snapshot=True)
+
+    async def resolve_upper_id(
+        self, collection: AsyncIOMotorCollection, session: Optional[AsyncIOMotorClientSession] = None
+    ) -> Optional[ObjectId]:
+        doc = await collection.find_one({}, {"_id": 1}, sort=[("_id", -1)], session=session)
+        return doc["_id"] if doc else None
+
+    async def iter_snapshot_batches(
+        self,
+        *,
+        users_collection: AsyncIOMotorCollection,
+        registrations_collection: AsyncIOMotorCollection,
+        source: SnapshotSource = "registrations",
+        after_id: Optional[ObjectId] = None,
+        upper_id: Optional[ObjectId] = None,
+        batch_size: int = 5000,
+        session: Optional[AsyncIOMotorClientSession] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        if source == "registrations":
+            driving, driving_projection, lookup, lookup_projection = (
+                registrations_collection, REGISTRATION_PROJECTION, users_collection, USER_PROJECTION
+            )
+            driving_wallet_field, lookup_wallet_field = "wallet_address", "walletAddress"
+        else:
+            driving, driving_projection, lookup, lookup_projection = (
+                users_collection, USER_PROJECTION, registrations_collection, REGISTRATION_PROJECTION
+            )
+            driving_wallet_field, lookup_wallet_field = "walletAddress", "wallet_address"
+
+        id_filter: Dict[str, Any] = {}
+        if after_id is not None:
+            id_filter["$gt"] = after_id
+        if upper_id is not None:
+            id_filter["$lte"] = upper_id
+        query = {"_id": id_filter} if id_filter else {}
+
+        cursor = driving.find(query, driving_projection, session=session).sort("_id", 1).batch_size(batch_size)
+        # Tanpa session, batch berikutnya diambil dari server selagi batch sekarang di-join dan ditulis.
+        # Satu session tidak boleh dipakai oleh dua operasi bersamaan, jadi dengan snapshot session dibaca berurutan.
+        prefetch = session is None
+        next_batch_task: Optional[asyncio.Future] = (
+            asyncio.ensure_future(cursor.to_list(length=batch_size)) if prefetch else None
+        )
+        try:
+            while True:
+                if next_batch_task is not None:
+                    driving_docs = await next_batch_task
+                else:
+                    driving_docs = await cursor.to_list(length=batch_size)
+                if not driving_docs:
+                    break
+                if prefetch:
+                    next_batch_task = asyncio.ensure_future(cursor.to_list(length=batch_size))
+
+                wallets = [doc[driving_wallet_field] for doc in driving_docs if doc.get(driving_wallet_field)]
+                lookup_by_wallet: Dict[str, Dict[str, Any]] = {}
+                async for lookup_doc in lookup.find(
+                    {lookup_wallet_field: {"$in": wallets}}, lookup_projection, session=session
+                ).batch_size(len(wallets) or 1):
+                    lookup_by_wallet[lookup_doc[lookup_wallet_field]] = lookup_doc
+
+                rows = []
+                for doc in driving_docs:
+                    paired = lookup_by_wallet.get(doc.get(driving_wallet_field), {})
+                    registration, user = (doc, paired) if source == "registrations" else (paired, doc)
+                    rows.append(self._build_row(doc["_id"], registration, user))
+                yield rows
+        finally:
+            if next_batch_task is not None and not next_batch_task.done():
+                next_batch_task.cancel()
+            await cursor.close()
+
+    async def iter_export_batches(
+        self,
+        *,
+        client: AsyncIOMotorClient,
+        users_collection: AsyncIOMotorCollection,
+        registrations_collection: AsyncIOMotorCollection,
+        source: SnapshotSource = "registrations",
+        after_id: Optional[ObjectId] = None,
+        upper_id: Optional[ObjectId] = None,
+        batch_size: int = 5000,
+        on_snapshot: Optional[Callable[[Optional[ObjectId]], None]] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Seperti iter_snapshot_batches, tetapi mengelola snapshot session sendiri: saat SnapshotTooOld,
+        session baru dibuka dan pembacaan dilanjutkan setelah baris terakhir yang sudah di-yield.
+        `on_snapshot(after_id)` dipanggil setiap kali segmen snapshot baru dimulai.
+        """
+        while True:
+            session = await self.start_snapshot_session(client)
+            if on_snapshot is not None:
+                on_snapshot(after_id)
+            segment_start = after_id
+            try:
+                async for rows in self.iter_snapshot_batches(
+                    users_collection=users_collection,
+                    registrations_collection=registrations_collection,
+                    source=source,
+                    after_id=after_id,
+                    upper_id=upper_id,
+                    batch_size=batch_size,
+                    session=session,
+                ):
+                    after_id = ObjectId(rows[-1]["cursor"])
+                    yield rows
+                return
+            except OperationFailure as e:
+                # Segmen yang gagal tanpa satu batch pun tidak akan berhasil dengan snapshot baru juga
+                if session is None or e.code != SNAPSHOT_TOO_OLD_CODE or after_id == segment_start:
+                    raise
+                logger.warning(
+                    f"Export: snapshot expired (SnapshotTooOld, export ran past minSnapshotHistoryWindowInSeconds) "
+                    f"after cursor {after_id}. Continuing with a new snapshot; later rows reflect a later point in time."
+                )
+            finally:
+                if session is not None:
+                    await session.end_session()
+
+    def _build_row(self, cursor_id: ObjectId, registration: Dict[str, Any], user: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "cursor": str(cursor_id),
+            "wallet_address": registration.get("wallet_address") or user.get("walletAddress"),
+            "points": registration.get("points_basis", 0),
+            "xp": user.get("xp", 0),
+            "rank": user.get("rank"),
+            "referral_code": registration.get("user_referral_code") or user.get("referralCode"),
+            "referred_by": registration.get("referrer_wallet_address"),
+        }
+
+    def encode_header(self, fmt: SnapshotFormat) -> bytes:
+        if fmt != "csv":
+            return b""
+        return (",".join(SNAPSHOT_FIELDS) + "\r\n").encode("utf-8")
+
+    def encode_rows(self, rows: List[Dict[str, Any]], fmt: SnapshotFormat) -> bytes:
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows([row[field] for field in SNAPSHOT_FIELDS] for row in rows)
+            return buffer.getvalue().encode("utf-8")
+        return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows).encode("utf-8")
+
+    async def stream_snapshot(
+        self,
+        *,
+        client: AsyncIOMotorClient,
+        users_collection: AsyncIOMotorCollection,
+        registrations_collection: AsyncIOMotorCollection,
+        fmt: SnapshotFormat = "csv",
+        source: SnapshotSource = "registrations",
+        after_id: Optional[ObjectId] = None,
+        upper_id: Optional[ObjectId] = None,
+        batch_size: int = 5000,
+        include_header: bool = True,
+    ) -> AsyncIterator[bytes]:
+        """Menghasilkan potongan bytes (header lalu satu potong per batch) untuk StreamingResponse."""
+        if include_header:
+            yield self.encode_header(fmt)
+        async for rows in self.iter_export_batches(
+            client=client,
+            users_collection=users_collection,
+            registrations_collection=registrations_collection,
+            source=source,
+            after_id=after_id,
+            upper_id=upper_id,
+            batch_size=batch_size,
+        ):
+            yield self.encode_rows(rows, fmt)
+
+
+snapshot_export_service = SnapshotExportService()
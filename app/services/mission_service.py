@@ -1,8 +1,9 @@
 # ===========================================================================
-# File: app/services/mission_service.py (MODIFIKASI: Perbaiki Pydantic Validation)
+# File: app/services/mission_service.py (MODIFIKASI: Direktif dari satu kali baca katalog + link user)
 # ===========================================================================
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from fastapi import HTTPException, status as HttpStatus
 
 from app.core.config import settings, logger
@@ -18,11 +19,54 @@ from app.models.base import PyObjectId
 from app.services.user_service import user_service
 from datetime import datetime, timezone, timedelta
 
+# Field yang berubah saat link user dibuat/diupdate (untuk versi ETag)
+MISSION_LINK_VERSION_FIELDS = ("_id", "updatedAt", "completedAt")
+BADGE_LINK_VERSION_FIELDS = ("_id", "updatedAt", "acquiredAt")
+
 class MissionService:
+    async def load_directive_inputs(
+        self, db: AsyncIOMotorDatabase, user: UserInDB
+    ) -> Tuple[List[MissionInDB], List[UserMissionLink]]:
+        """
+        Katalog misi aktif (cache two-tier) dan link misi user: satu-satunya data yang dibaca
+        endpoint directives. Versi ETag dan body dibangun dari hasil yang sama, jadi 200 maupun
+        304 cukup satu query ke user_missions.
+        """
+        active_missions, links = await asyncio.gather(
+            crud_mission.get_active_missions(db, limit=100),
+            crud_user_mission_link.get_missions_by_user_id(db, user_id=user.id),
+        )
+        return active_missions, links
+
+    def get_directives_version(
+        self, user: UserInDB, active_missions: List[MissionInDB], links: List[UserMissionLink]
+    ) -> Tuple[Any, ...]:
+        catalog_version = [(mission.id, mission.updatedAt) for mission in active_missions]
+        links_version = sorted((link.id, link.status, link.completedAt) for link in links)
+        # alliesCount dan last_daily_checkin ada di dokumen user (updatedAt); status daily-checkin juga bergantung tanggal UTC
+        return (user.id, user.updatedAt, catalog_version, links_version, datetime.now(timezone.utc).date())
+
+    async def get_mission_summary_version(self, db: AsyncIOMotorDatabase, user: UserInDB) -> Tuple[Any, ...]:
+        catalog_version, links_version = await asyncio.gather(
+            crud_mission.get_version(db, query={"isActive": True}),
+            crud_user_mission_link.get_version(db, query={"userId": user.id}, fields=MISSION_LINK_VERSION_FIELDS),
+        )
+        return (user.id, catalog_version, links_version)
+
+    async def get_user_badges_version(self, db: AsyncIOMotorDatabase, user: UserInDB) -> Tuple[Any, ...]:
+        links_version, badge_catalog_version = await asyncio.gather(
+            crud_user_badge_link.get_version(db, query={"userId": user.id}, fields=BADGE_LINK_VERSION_FIELDS),
+            crud_badge.get_version(db),
+        )
+        return (user.id, links_version, badge_catalog_version)
+
     async def get_directives_for_user(self, db: AsyncIOMotorDatabase, user: UserInDB) -> List[MissionDirectiveResponse]:
-        active_missions_db = await crud_mission.get_active_missions(db, limit=100)
-        user_missions_links = await crud_user_mission_link.get_missions_by_user_id(db, user_id=user.id)
-        
+        active_missions_db, user_missions_links = await self.load_directive_inputs(db, user)
+        return self.build_directives(user, active_missions_db, user_missions_links)
+
+    def build_directives(
+        self, user: UserInDB, active_missions_db: List[MissionInDB], user_missions_links: List[UserMissionLink]
+    ) -> List[MissionDirectiveResponse]:
         user_mission_status_map: Dict[PyObjectId, MissionStatusType] = {
             link.missionId: link.status for link in user_missions_links
         }
@@ -111,7 +155,7 @@ class MissionService:
     async def process_mission_completion(
         self, db: AsyncIOMotorDatabase, user: UserInDB, mission_id_str_to_complete: str, completion_data: Optional[Dict[str, Any]] = None
     ) -> MissionCompletionResponse:
-        logger.info(f"User {user.username} attempting to complete mission: {mission_id_str_to_complete}")
+        logger.info("User %s attempting to complete mission: %s", user.username, mission_id_str_to_complete)
 
         mission_to_complete = await crud_mission.get_by_mission_id_str(db, mission_id_str=mission_id_str_to_complete)
         if not mission_to_complete or not mission_to_complete.isActive:
@@ -122,7 +166,7 @@ class MissionService:
             db, user_id=user.id, mission_db_id=mission_to_complete.id
         )
         if user_mission_link and user_mission_link.status == "completed":
-            logger.info(f"Mission {mission_id_str_to_complete} already completed by user {user.username}.")
+            logger.info("Mission %s already completed by user %s.", mission_id_str_to_complete, user.username)
             return MissionCompletionResponse(message="Misi sudah pernah diselesaikan.")
 
         if mission_id_str_to_complete == "daily-checkin":
@@ -141,7 +185,7 @@ class MissionService:
             raise HTTPException(status_code=HttpStatus.HTTP_400_BAD_REQUEST, detail="Anda sudah melakukan check-in hari ini.")
         
         await crud_user.update(db, db_obj_id=user.id, obj_in={"last_daily_checkin": now_utc})
-        logger.info(f"User {user.username} daily check-in timestamp updated.")
+        logger.info("User %s daily check-in timestamp updated.", user.username)
         
         return await self._grant_rewards(db, user, mission)
 
@@ -152,7 +196,7 @@ class MissionService:
             logger.warning(f"User {user.username} tried to claim invite mission '{mission.title}' but has {user.alliesCount}/{required_allies} allies.")
             raise HTTPException(status_code=HttpStatus.HTTP_400_BAD_REQUEST, detail=f"Target undangan ({required_allies} allies) belum tercapai.")
 
-        logger.info(f"User {user.username} is eligible to claim invite mission '{mission.title}'.")
+        logger.info("User %s is eligible to claim invite mission '%s'.", user.username, mission.title)
         await self._mark_mission_as_completed(db, user.id, mission.id)
         return await self._grant_rewards(db, user, mission)
 
@@ -181,7 +225,7 @@ class MissionService:
                 completedAt=datetime.now(timezone.utc)
             )
             await crud_user_mission_link.create(db, obj_in=new_link_data)
-        logger.info(f"Mission {mission_id} marked as completed for user {user_id}.")
+        logger.info("Mission %s marked as completed for user %s.", mission_id, user_id)
 
 
     async def _grant_rewards(self, db: AsyncIOMotorDatabase, user: UserInDB, mission: MissionInDB) -> MissionCompletionResponse:
@@ -189,7 +233,7 @@ class MissionService:
         if mission.rewardXp > 0:
             await user_service.grant_xp_and_manage_rank(db, user_id=user.id, xp_to_add=mission.rewardXp)
             xp_gained = mission.rewardXp
-            logger.info(f"Granted {xp_gained} XP to user {user.username} for mission '{mission.title}'.")
+            logger.info("Granted %s XP to user %s for mission '%s'.", xp_gained, user.username, mission.title)
         
         badge_awarded_resp = None
         if mission.rewardBadge:
@@ -199,7 +243,7 @@ class MissionService:
                 if not existing_link:
                     await crud_user_badge_link.create(db, obj_in=UserBadgeLink(userId=user.id, badgeId=badge_def.id))
                     badge_awarded_resp = MissionRewardBadgeResponse.model_validate(badge_def.model_dump()) # Gunakan model_dump()
-                    logger.info(f"Awarded badge '{badge_def.name}' to user {user.username}.")
+                    logger.info("Awarded badge '%s' to user %s.", badge_def.name, user.username)
             else:
                 logger.error(f"Badge definition not found for badge_id_str: {mission.rewardBadge.badge_id_str}")
 
@@ -0,0 +1,173 @@
+# ===========================================================================
+# File: app/services/news_service.py (MODIFIKASI: Change stream lewat app.db.backends)
+# ===========================================================================
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Sequence, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+
+from app.core.config import settings, logger
+from app.crud.crud_news import crud_news
+from app.db import backends as db_backends
+from app.api.v1.schemas.news import NewsItemResponse
+
+NewsEntry = Tuple[Optional[float], bytes] # (expiresAt sebagai epoch detik atau None, JSON item)
+
+
+class NewsService:
+    """
+    Snapshot news feed in-process.
+
+    Item aktif disimpan terurut (order, createdAt) dan sudah diserialisasi per item;
+    body JSON feed + ETag dibangun sekali per perubahan. Item yang lewat `expiresAt`
+    dibuang dari snapshot tepat pada deadline-nya tanpa query DB (cek satu angka per request).
+    Perubahan koleksi dideteksi lewat change stream, atau polling versi jika
+    deployment MongoDB tidak mendukung change stream (standalone).
+    """
+
+    def __init__(self):
+        self._entries: List[NewsEntry] = []
+        self._body: bytes = b'{"items":[],"total":0}'
+        self._etag: str = ""
+        self._valid_until: Optional[float] = None # Deadline expiry terdekat di snapshot
+        self._version: Optional[List[Any]] = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._refresher_task: Optional[asyncio.Task] = None
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._reload_task: Optional[asyncio.Task] = None
+        self._reload_requested = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def reload(self, db: AsyncIOMotorDatabase) -> None:
+        async with self._lock:
+            version = await crud_news.get_version(db)
+            now = datetime.now(timezone.utc)
+            news_docs = await crud_news.get_live_news(db, now=now)
+            entries: List[NewsEntry] = []
+            for news_doc in news_docs:
+                expires_at = news_doc.expiresAt
+                if expires_at is not None and expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc) # Motor mengembalikan datetime naive (UTC)
+                item_json = NewsItemResponse.model_validate(news_doc).model_dump_json(by_alias=True).encode("utf-8")
+                entries.append((expires_at.timestamp() if expires_at else None, item_json))
+            self._entries = entries
+            self._version = version
+            self._publish(time.time())
+            self._loaded = True
+            logger.info("NewsService: snapshot reloaded with %s live items.", len(self._entries))
+
+    async def ensure_loaded(self, db: AsyncIOMotorDatabase) -> None:
+        if not self._loaded:
+            await self.reload(db)
+
+    def _publish(self, now: float) -> None:
+        live = [entry for entry in self._entries if entry[0] is None or entry[0] > now]
+        self._entries = live
+        self._body = b'{"items":[' + b",".join(item_json for _, item_json in live) + b'],"total":' + str(len(live)).encode() + b"}"
+        self._etag = f'"{hashlib.blake2b(self._body, digest_size=16).hexdigest()}"'
+        deadlines = [expires_at for expires_at, _ in live if expires_at is not None]
+        self._valid_until = min(deadlines) if deadlines else None
+
+    def get_feed(self) -> Tuple[bytes, str, int]:
+        """Mengembalikan (body JSON, ETag, max-age detik). Tidak menyentuh DB."""
+        now = time.time()
+        if self._valid_until is not None and now >= self._valid_until:
+            self._publish(now)
+        max_age = settings.NEWS_FEED_MAX_AGE_SECONDS
+        if self._valid_until is not None:
+            # Cache HTTP tidak boleh menyimpan feed melewati deadline item berikutnya
+            max_age = min(max_age, max(0, int(self._valid_until - now)))
+        return self._body, self._etag, max_age
+
+    def _schedule_reload(self) -> None:
+        if self._db is None:
+            return
+        self._reload_requested = True
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.create_task(self._run_requested_reloads())
+
+    async def _run_requested_reloads(self) -> None:
+        # Permintaan yang datang selama reload berjalan memicu satu reload lagi setelahnya
+        while self._reload_requested:
+            self._reload_requested = False
+            try:
+                await self.reload(self._db)
+            except Exception as e:
+                logger.error(f"NewsService: reload after invalidation failed: {e}")
+
+    def handle_invalidation(self, tags: Sequence[str]) -> None:
+        """Listener bus invalidasi: write news di worker lain langsung memicu reload snapshot."""
+        if any(tag.startswith("news:") for tag in tags):
+            self._schedule_reload()
+
+    def handle_flush(self) -> None:
+        if self._loaded:
+            self._schedule_reload()
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        self._db = db
+        if self._refresher_task is None:
+            self._refresher_task = asyncio.create_task(self._refresh_loop(db))
+
+    async def stop(self) -> None:
+        if self._refresher_task is not None:
+            self._refresher_task.cancel()
+            try:
+                await self._refresher_task
+            except asyncio.CancelledError:
+                pass
+            self._refresher_task = None
+        if self._reload_task is not None:
+            self._reload_task.cancel()
+            self._reload_task = None
+
+    async def _refresh_loop(self, db: AsyncIOMotorDatabase) -> None:
+        change_streams_supported = True
+        while True:
+            try:
+                if change_streams_supported:
+                    await self._watch_changes(db)
+                else:
+                    await self._poll_changes(db)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if change_streams_supported:
+                    logger.info("NewsService: change streams unavailable (%s), polling the news version every %ss.", e, settings.NEWS_REFRESH_INTERVAL_SECONDS)
+                    change_streams_supported = False
+                    continue
+                logger.error(f"NewsService: refresh failed: {e}")
+                await asyncio.sleep(settings.NEWS_REFRESH_INTERVAL_SECONDS)
+            except Exception as e:
+                logger.error(f"NewsService: refresh failed: {e}")
+                await asyncio.sleep(settings.NEWS_REFRESH_INTERVAL_SECONDS)
+
+    async def _watch_changes(self, db: AsyncIOMotorDatabase) -> None:
+        collection = await crud_news.get_collection(db)
+        async with await db_backends.watch(collection) as stream:
+            await self.reload(db) # Setelah stream terbuka, jadi tidak ada perubahan yang terlewat
+            async for _ in stream:
+                await self.reload(db)
+
+    async def _poll_changes(self, db: AsyncIOMotorDatabase) -> None:
+        if not self._loaded:
+            await self.reload(db)
+        last_full_reload = time.monotonic()
+        while True:
+            await asyncio.sleep(settings.NEWS_REFRESH_INTERVAL_SECONDS)
+            version = await crud_news.get_version(db)
+            # Reload penuh berkala menangkap edit manual yang tidak mengubah updatedAt
+            if version != self._version or time.monotonic() - last_full_reload >= settings.NEWS_FULL_RELOAD_SECONDS:
+                await self.reload(db)
+                last_full_reload = time.monotonic()
+
+
+news_service = NewsService()
@@ -0,0 +1,98 @@
+# ===========================================================================
+# File: app/services/profiling_service.py (BARU)
+# ===========================================================================
+import asyncio
+import uuid
+from typing import Dict, Literal, Optional, Tuple, Union
+
+from cachetools import TTLCache
+
+from app.core.config import settings, logger
+from app.db.redis_conn import redis_manager
+from app.utils.profiling import MemoryTracer, StackSampler, render_folded
+
+ProfileKind = Literal["cpu", "memory"]
+PROFILE_KEY_PREFIX = "profile:"
+
+
+class ProfilerBusyError(Exception):
+    pass
+
+
+class ProfilingSession:
+    def __init__(self, kind: ProfileKind, profile_id: str):
+        self.kind = kind
+        self.profile_id = profile_id
+        self._collector: Union[StackSampler, MemoryTracer] = (
+            StackSampler(interval=settings.PROFILING_SAMPLE_INTERVAL_MS / 1000) if kind == "cpu" else MemoryTracer()
+        )
+
+    def start(self) -> "ProfilingSession":
+        self._collector.start()
+        return self
+
+    def stop(self) -> str:
+        counts = self._collector.stop()
+        if self.kind == "cpu":
+            summary = f"cpu samples={self._collector.samples} duration={self._collector.duration:.3f}s"
+        else:
+            summary = f"memory allocated_bytes={self._collector.total_bytes}"
+        logger.info("Profiling: session %s finished (%s).", self.profile_id, summary)
+        return render_folded(counts)
+
+
+class ProfilingService:
+    """
+    Sesi profiling on-demand per worker (satu sesi aktif per proses): per request lewat header
+    `X-Profile` (app/middleware/profiling.py) atau seluruh worker selama N detik (endpoint admin).
+    Hasil per request disimpan di Redis (TTL) agar bisa diambil dari worker mana pun;
+    jika Redis tidak tersedia, disimpan in-process.
+    """
+
+    def __init__(self):
+        self._active: Optional[ProfilingSession] = None
+        self._local_results: TTLCache = TTLCache(maxsize=32, ttl=settings.PROFILING_RESULT_TTL_SECONDS)
+
+    def begin(self, kind: ProfileKind) -> ProfilingSession:
+        if self._active is not None:
+            raise ProfilerBusyError(f"Profiling session {self._active.profile_id} is already running on this worker.")
+        self._active = ProfilingSession(kind, uuid.uuid4().hex).start()
+        return self._active
+
+    def end(self, session: ProfilingSession) -> str:
+        try:
+            return session.stop()
+        finally:
+            self._active = None
+
+    async def profile_worker(self, kind: ProfileKind, seconds: float) -> Tuple[str, str]:
+        """Profil seluruh worker ini selama `seconds` detik. Mengembalikan (profile_id, folded stacks)."""
+        session = self.begin(kind)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            folded = await asyncio.to_thread(self.end, session) # Snapshot tracemalloc bisa ratusan ms
+        return session.profile_id, folded
+
+    async def store(self, profile_id: str, folded: str) -> None:
+        client = redis_manager.cache_client
+        if client is not None:
+            try:
+                await client.set(PROFILE_KEY_PREFIX + profile_id, folded.encode("utf-8"), ex=settings.PROFILING_RESULT_TTL_SECONDS)
+                return
+            except Exception as e:
+                logger.warning("Profiling: storing profile %s in Redis failed: %s", profile_id, e)
+        self._local_results[profile_id] = folded
+
+    async def load(self, profile_id: str) -> Optional[str]:
+        folded = self._local_results.get(profile_id)
+        if folded is not None:
+            return folded
+        client = redis_manager.cache_client
+        if client is None:
+            return None
+        data = await client.get(PROFILE_KEY_PREFIX + profile_id)
+        return data.decode("utf-8") if data is not None else None
+
+
+profiling_service = ProfilingService()
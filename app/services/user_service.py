@@ -1,5 +1,5 @@
 # ===========================================================================
-# File: app/services/user_service.py (UPDATE SESUAI KODE DARI USER)
+# File: app/services/user_service.py (MODIFIKASI: Cache get_user_by_wallet_public)
 # ===========================================================================
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import Optional, List, Any, Dict
@@ -8,6 +8,7 @@ from app.models.user import UserInDB, UserProfile as UserProfileModel
 from app.api.v1.schemas.user import UserUpdate as UserUpdateSchema, UserPublic, AllyInfo, AlliesListResponse
 from app.models.base import PyObjectId
 from app.core.config import settings, logger
+from app.core.cache import two_tier_cache, ModelCodec
 from fastapi import HTTPException, status as HttpStatus
 from pydantic import HttpUrl as PydanticHttpUrl
 import math
@@ -17,6 +18,12 @@ class UserService:
         user_doc = await crud_user.get(db, id=user_id)
         return UserPublic.model_validate(user_doc) if user_doc else None
 
+    @two_tier_cache.cached(
+        "users:public_by_wallet",
+        key=lambda self, db, wallet_address: wallet_address.lower(),
+        codec=ModelCodec(UserPublic),
+        tags=lambda user: [f"users:{user.id}"],
+    )
     async def get_user_by_wallet_public(self, db: AsyncIOMotorDatabase, wallet_address: str) -> Optional[UserPublic]:
         user_doc = await crud_user.get_by_wallet_address(db, wallet_address=wallet_address)
         return UserPublic.model_validate(user_doc) if user_doc else None
@@ -113,10 +120,10 @@ class UserService:
             if not updated_user_doc:
                 logger.error(f"Failed to update profile rank details for user {user.username}")
                 return user
-            logger.info(f"Profile rank details updated for user {user.username}: Rank {updated_user_doc.rank}, Next {updated_user_doc.profile.nextRank}, Progress {updated_user_doc.profile.rankProgressPercent}%")
+            logger.info("Profile rank details updated for user %s: Rank %s, Next %s, Progress %s%%", user.username, updated_user_doc.rank, updated_user_doc.profile.nextRank, updated_user_doc.profile.rankProgressPercent)
             return updated_user_doc
         
-        logger.debug(f"No change in profile rank details for user {user.username}. Skipping DB update for profile.")
+        logger.debug("No change in profile rank details for user %s. Skipping DB update for profile.", user.username)
         return user
 
     async def update_user_profile(
@@ -176,11 +183,11 @@ class UserService:
         MODIFIKASI: Alur yang lebih jelas untuk update XP dan detail profil.
         """
         if xp_to_add <= 0:
-            logger.info(f"Attempt to add non-positive XP ({xp_to_add}) to user {user_id}. No change.")
+            logger.info("Attempt to add non-positive XP (%s) to user %s. No change.", xp_to_add, user_id)
             user_doc = await crud_user.get(db, id=user_id)
             return UserPublic.model_validate(user_doc) if user_doc else None
 
-        logger.info(f"Granting {xp_to_add} XP to user {user_id}.")
+        logger.info("Granting %s XP to user %s.", xp_to_add, user_id)
         
         # 1. Panggil CRUD yang HANYA update XP dan field 'rank' (string)
         user_after_xp_rank_update = await crud_user.add_xp_and_update_rank(db, user_id=user_id, xp_to_add=xp_to_add)
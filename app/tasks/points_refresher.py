@@ -0,0 +1,274 @@
+# ===========================================================================
+# File: app/tasks/points_refresher.py (MODIFIKASI: client MongoDB lewat app/db/backends, transport HTTP bisa diganti)
+# ===========================================================================
+"""
+Job periodik untuk menghitung ulang `transaction_count` dan `points_basis` semua
+wallet di `user_registrations` (koleksi milik api.py).
+
+- Wallet dibaca terurut _id per halaman; tiap halaman dipecah menjadi beberapa
+  batch JSON-RPC `eth_getTransactionCount` yang dikirim paralel dengan batas
+  concurrency (semaphore).
+- Hanya dokumen yang nilainya berubah yang ditulis, lewat satu `bulk_write`
+  per halaman, lalu key cache `wallet_data:{wallet}` milik api.py dihapus.
+- Progres (`lastId`) disimpan di koleksi `job_checkpoints` setelah setiap
+  halaman, jadi jika proses mati job dilanjutkan dari halaman terakhir.
+
+Contoh:
+    python -m app.tasks.points_refresher              # satu putaran
+    python -m app.tasks.points_refresher --interval 21600
+"""
+import argparse
+import asyncio
+import socket
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+import redis.asyncio as aioredis
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings, logger
+from app.db.backends import MONGO_DRIVERS, close_client, create_client
+
+JOB_ID = "points_refresher"
+POINTS_PER_TRANSACTION = 10 # Harus sama dengan rumus di api.py (tx_count * 10)
+RPC_MAX_ATTEMPTS = 3
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class PointsRefresher:
+    def __init__(
+        self,
+        *,
+        registrations: AsyncIOMotorCollection,
+        checkpoints: AsyncIOMotorCollection,
+        rpc_url: str,
+        redis_client: Optional[aioredis.Redis] = None,
+        rpc_batch_size: int = 100,
+        max_concurrency: int = 4,
+        page_size: Optional[int] = None,
+        lease_seconds: int = 300,
+        transport: Optional[httpx.AsyncBaseTransport] = None, # Test: httpx.MockTransport sebagai stub JSON-RPC
+    ):
+        self.registrations = registrations
+        self.checkpoints = checkpoints
+        self.rpc_url = rpc_url
+        self.redis = redis_client
+        self.rpc_batch_size = max(1, rpc_batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        # Default satu halaman = satu "gelombang" batch RPC paralel
+        self.page_size = page_size or self.rpc_batch_size * self.max_concurrency
+        self.lease_seconds = lease_seconds
+        self.transport = transport
+        self.owner = f"{socket.gethostname()}:{id(self)}"
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def acquire_lease(self) -> bool:
+        """Memastikan hanya satu instance job yang berjalan (lease di dokumen checkpoint)."""
+        now = datetime.now(timezone.utc)
+        try:
+            await self.checkpoints.find_one_and_update(
+                {"_id": JOB_ID, "$or": [{"leaseUntil": {"$lt": now}}, {"leaseUntil": None}, {"leaseOwner": self.owner}]},
+                {"$set": {"leaseOwner": self.owner, "leaseUntil": now + timedelta(seconds=self.lease_seconds)}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False # Dokumen ada dan lease masih dipegang instance lain
+        return True
+
+    async def release_lease(self) -> None:
+        await self.checkpoints.update_one({"_id": JOB_ID, "leaseOwner": self.owner}, {"$set": {"leaseUntil": None}})
+
+    async def fetch_transaction_counts(self, client: httpx.AsyncClient, wallets: List[str]) -> Dict[str, int]:
+        """Satu request JSON-RPC batch. Wallet yang gagal tidak ada di hasil (nilainya tidak diubah)."""
+        payload = [
+            {"jsonrpc": "2.0", "id": index, "method": "eth_getTransactionCount", "params": [wallet, "latest"]}
+            for index, wallet in enumerate(wallets)
+        ]
+        async with self._semaphore:
+            for attempt in range(1, RPC_MAX_ATTEMPTS + 1):
+                try:
+                    resp = await client.post(self.rpc_url, json=payload)
+                    if resp.status_code in RETRYABLE_STATUS_CODES and attempt < RPC_MAX_ATTEMPTS:
+                        logger.warning(f"PointsRefresher: RPC batch got HTTP {resp.status_code}, retrying (attempt {attempt}).")
+                        await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+                        continue
+                    resp.raise_for_status()
+                    results = resp.json()
+                    break
+                except (httpx.TransportError, httpx.HTTPStatusError, ValueError) as e:
+                    if attempt >= RPC_MAX_ATTEMPTS:
+                        logger.error(f"PointsRefresher: RPC batch of {len(wallets)} wallets failed: {e}")
+                        return {}
+                    await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+
+        if not isinstance(results, list): # Provider bisa membalas satu objek error untuk seluruh batch
+            logger.error(f"PointsRefresher: unexpected RPC batch response: {str(results)[:200]}")
+            return {}
+        counts: Dict[str, int] = {}
+        for item in results:
+            index = item.get("id")
+            if not isinstance(index, int) or not 0 <= index < len(wallets) or "result" not in item:
+                continue
+            try:
+                counts[wallets[index]] = int(item["result"], 16)
+            except (TypeError, ValueError):
+                continue
+        if len(counts) < len(wallets):
+            logger.warning(f"PointsRefresher: {len(wallets) - len(counts)} of {len(wallets)} wallets missing from RPC batch result.")
+        return counts
+
+    async def process_page(self, client: httpx.AsyncClient, docs: List[Dict[str, Any]]) -> Dict[str, int]:
+        wallets = [doc["wallet_address"] for doc in docs if doc.get("wallet_address")]
+        chunks = [wallets[i:i + self.rpc_batch_size] for i in range(0, len(wallets), self.rpc_batch_size)]
+        counts: Dict[str, int] = {}
+        for result in await asyncio.gather(*(self.fetch_transaction_counts(client, chunk) for chunk in chunks)):
+            counts.update(result)
+
+        now = datetime.now(timezone.utc)
+        operations = []
+        changed_wallets = []
+        for doc in docs:
+            tx_count = counts.get(doc.get("wallet_address"))
+            if tx_count is None or tx_count == doc.get("transaction_count"):
+                continue
+            operations.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"transaction_count": tx_count, "points_basis": tx_count * POINTS_PER_TRANSACTION, "points_refreshed_at": now}},
+            ))
+            changed_wallets.append(doc["wallet_address"])
+
+        if operations:
+            await self.registrations.bulk_write(operations, ordered=False)
+            if self.redis is not None:
+                try:
+                    await self.redis.delete(*[f"wallet_data:{wallet}" for wallet in changed_wallets])
+                except Exception as e:
+                    # Cache api.py tetap kedaluwarsa sendiri (CACHE_EXPIRY_SECONDS)
+                    logger.warning(f"PointsRefresher: failed to invalidate {len(changed_wallets)} wallet_data keys: {e}")
+        return {"fetched": len(counts), "failed": len(wallets) - len(counts), "updated": len(operations)}
+
+    async def run_once(self, resume: bool = True) -> Dict[str, Any]:
+        if not await self.acquire_lease():
+            logger.info("PointsRefresher: another instance holds the lease, skipping this run.")
+            return {"skipped": True}
+
+        checkpoint = await self.checkpoints.find_one({"_id": JOB_ID}) or {}
+        resuming = resume and checkpoint.get("lastId") is not None and not checkpoint.get("completed", True)
+        stats = {
+            "processed": checkpoint.get("processed", 0) if resuming else 0,
+            "updated": checkpoint.get("updated", 0) if resuming else 0,
+            "failed": checkpoint.get("failed", 0) if resuming else 0,
+        }
+        after_id = checkpoint["lastId"] if resuming else None
+        started_at = checkpoint.get("startedAt") if resuming else datetime.now(timezone.utc)
+        if resuming:
+            logger.info("PointsRefresher: resuming after _id %s (%s wallets already processed).", after_id, stats['processed'])
+        await self.checkpoints.update_one(
+            {"_id": JOB_ID}, {"$set": {"completed": False, "startedAt": started_at, "lastId": after_id, **stats}}
+        )
+
+        query = {"_id": {"$gt": after_id}} if after_id is not None else {}
+        projection = {"wallet_address": 1, "transaction_count": 1}
+        cursor = self.registrations.find(query, projection).sort("_id", 1).batch_size(self.page_size)
+        started = time.monotonic()
+        processed_this_run = 0
+        try:
+            async with httpx.AsyncClient(
+                timeout=30.0, limits=httpx.Limits(max_connections=self.max_concurrency), transport=self.transport
+            ) as client:
+                while True:
+                    docs = await cursor.to_list(length=self.page_size)
+                    if not docs:
+                        break
+                    page_stats = await self.process_page(client, docs)
+                    stats["processed"] += len(docs)
+                    stats["updated"] += page_stats["updated"]
+                    stats["failed"] += page_stats["failed"]
+                    processed_this_run += len(docs)
+                    await self.checkpoints.update_one(
+                        {"_id": JOB_ID},
+                        {"$set": {
+                            "lastId": docs[-1]["_id"], **stats,
+                            "updatedAt": datetime.now(timezone.utc),
+                            "leaseUntil": datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds),
+                        }},
+                    )
+                    elapsed = max(time.monotonic() - started, 1e-9)
+                    logger.info(
+                        f"PointsRefresher: {stats['processed']} wallets processed, {stats['updated']} updated, "
+                        f"{stats['failed']} failed ({processed_this_run / elapsed:.0f} wallets/s)."
+                    )
+            await self.checkpoints.update_one(
+                {"_id": JOB_ID},
+                {"$set": {"completed": True, "lastId": None, "finishedAt": datetime.now(timezone.utc), **stats}},
+            )
+        finally:
+            await cursor.close()
+            await self.release_lease()
+        logger.info("PointsRefresher: run completed in %.1fs: %s", time.monotonic() - started, stats)
+        return stats
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Hitung ulang transaction_count dan points_basis semua wallet terdaftar.")
+    parser.add_argument("--mongo-url", default=settings.MONGODB_URL)
+    parser.add_argument("--mongo-driver", choices=MONGO_DRIVERS, default=settings.MONGODB_DRIVER)
+    parser.add_argument("--registrations-db", default=settings.REGISTRATIONS_DB_NAME or settings.MONGODB_DB_NAME)
+    parser.add_argument("--registrations-collection", default=settings.REGISTRATIONS_COLLECTION_NAME)
+    parser.add_argument("--redis-url", default=settings.REGISTRATIONS_REDIS_URL, help="Redis cache api.py (wallet_data:)")
+    parser.add_argument("--rpc-url", default=settings.ALCHEMY_RPC_URL)
+    parser.add_argument("--rpc-batch-size", type=int, default=settings.POINTS_REFRESH_RPC_BATCH_SIZE)
+    parser.add_argument("--max-concurrency", type=int, default=settings.POINTS_REFRESH_MAX_CONCURRENCY)
+    parser.add_argument("--interval", type=int, default=None, help="Jalankan terus setiap N detik (tanpa opsi ini: satu putaran)")
+    parser.add_argument("--restart", action="store_true", help="Abaikan checkpoint dan mulai dari awal")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> int:
+    if not args.rpc_url:
+        logger.error("PointsRefresher: ALCHEMY_API_KEY / ALCHEMY_RPC_URL is not configured.")
+        return 2
+    client = create_client(args.mongo_driver, args.mongo_url)
+    database = client[args.registrations_db]
+    redis_client = aioredis.from_url(args.redis_url) if args.redis_url else None
+    if redis_client is None:
+        logger.warning("PointsRefresher: no Redis URL configured, wallet_data cache will not be invalidated.")
+    refresher = PointsRefresher(
+        registrations=database[args.registrations_collection],
+        checkpoints=database["job_checkpoints"],
+        rpc_url=args.rpc_url,
+        redis_client=redis_client,
+        rpc_batch_size=args.rpc_batch_size,
+        max_concurrency=args.max_concurrency,
+    )
+    try:
+        resume = not args.restart
+        while True:
+            try:
+                await refresher.run_once(resume=resume)
+            except Exception as e:
+                if args.interval is None:
+                    raise
+                logger.error(f"PointsRefresher: run failed, will resume from checkpoint next interval: {e}", exc_info=True)
+            if args.interval is None:
+                break
+            resume = True
+            await asyncio.sleep(args.interval)
+    finally:
+        if redis_client is not None:
+            await redis_client.aclose()
+        await close_client(client)
+    return 0
+
+
+def main(argv=None) -> None:
+    sys.exit(asyncio.run(run(parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
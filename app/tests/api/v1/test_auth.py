@@ -1,5 +1,5 @@
 # ===========================================================================
-# File: app/tests/api/v1/test_auth.py (Contoh Tes Auth - Lebih Lengkap)
+# File: app/tests/api/v1/test_auth.py (MODIFIKASI: Tes replay dan format nonce connect)
 # ===========================================================================
 import pytest
 from httpx import AsyncClient
@@ -46,7 +46,7 @@ async def test_request_challenge_message_missing_wallet(async_test_client: Async
     assert response.status_code == HttpStatus.HTTP_422_UNPROCESSABLE_ENTITY
 
 
-@patch("app.core.security.verify_wallet_signature", return_value=True) # Mock fungsi verifikasi signature
+@patch("app.services.auth_service.verify_wallet_signature", return_value=True) # Mock fungsi verifikasi signature
 async def test_connect_wallet_new_user_success(
     mock_verify_signature, # Argumen untuk mock
     async_test_client: AsyncClient, 
@@ -105,7 +105,7 @@ async def test_connect_wallet_new_user_success(
         signature=dummy_signature
     )
 
-@patch("app.core.security.verify_wallet_signature", return_value=True)
+@patch("app.services.auth_service.verify_wallet_signature", return_value=True)
 async def test_connect_wallet_existing_user_success(
     mock_verify_signature,
     async_test_client: AsyncClient, 
@@ -165,13 +165,13 @@ async def test_connect_wallet_invalid_nonce(async_test_client: AsyncClient):
     )
     challenge_data = challenge_response.json()
     message_to_sign_correct_nonce = challenge_data["messageToSign"]
-    # Nonce yang salah
-    invalid_nonce = "wrongnonce" + challenge_data["nonce"][:22] # Buat nonce yang salah tapi panjangnya sama
+    # Nonce yang salah: tetap 32 karakter hex, tapi bukan nonce yang ada di pesan challenge
+    invalid_nonce = "0" * 32 if challenge_data["nonce"] != "0" * 32 else "1" * 32
 
     dummy_signature = "0x" + "c" * 130
     connect_payload = {
         "walletAddress": VALID_TEST_WALLET_ADDRESS_NEW,
-        "message": message_to_sign_correct_nonce.replace(challenge_data["nonce"], invalid_nonce), # Pesan dengan nonce salah
+        "message": message_to_sign_correct_nonce, # Pesan challenge asli, nonce di body berbeda
         "signature": dummy_signature,
         "nonce": invalid_nonce # Nonce yang salah
     }
@@ -184,7 +184,7 @@ async def test_connect_wallet_invalid_nonce(async_test_client: AsyncClient):
     assert "Nonce tidak cocok" in connect_response.json()["detail"]
 
 
-@patch("app.core.security.verify_wallet_signature", return_value=False) # Mock signature gagal
+@patch("app.services.auth_service.verify_wallet_signature", return_value=False) # Mock signature gagal
 async def test_connect_wallet_invalid_signature(
     mock_verify_signature_false,
     async_test_client: AsyncClient
@@ -208,3 +208,44 @@ async def test_connect_wallet_invalid_signature(
     )
     assert connect_response.status_code == HttpStatus.HTTP_401_UNAUTHORIZED
     assert "Signature tidak valid" in connect_response.json()["detail"]
+
+
+async def test_connect_wallet_non_hex_nonce_is_422(async_test_client: AsyncClient):
+    logger.info("Testing POST /auth/connect - Non-hex Nonce")
+    challenge_data = (await async_test_client.get(
+        f"{settings.API_V1_STR}/auth/challenge",
+        params={"walletAddress": VALID_TEST_WALLET_ADDRESS_NEW}
+    )).json()
+    connect_payload = {
+        "walletAddress": VALID_TEST_WALLET_ADDRESS_NEW,
+        "message": challenge_data["messageToSign"],
+        "signature": "0x" + "c" * 130,
+        "nonce": "\u00e9" * 32 # 32 karakter, tapi bukan hex (dulu TypeError di compare_digest -> 500)
+    }
+    connect_response = await async_test_client.post(f"{settings.API_V1_STR}/auth/connect", json=connect_payload)
+    assert connect_response.status_code == HttpStatus.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@patch("app.services.auth_service.verify_wallet_signature", return_value=True)
+async def test_connect_wallet_replayed_nonce(
+    mock_verify_signature,
+    async_test_client: AsyncClient,
+    test_user: UserInDB
+):
+    logger.info("Testing POST /auth/connect - Replayed Nonce")
+    challenge_data = (await async_test_client.get(
+        f"{settings.API_V1_STR}/auth/challenge",
+        params={"walletAddress": test_user.walletAddress}
+    )).json()
+    connect_payload = {
+        "walletAddress": test_user.walletAddress,
+        "message": challenge_data["messageToSign"],
+        "signature": "0x" + "f" * 130,
+        "nonce": challenge_data["nonce"]
+    }
+    first = await async_test_client.post(f"{settings.API_V1_STR}/auth/connect", json=connect_payload)
+    assert first.status_code == HttpStatus.HTTP_200_OK, first.text
+
+    replay = await async_test_client.post(f"{settings.API_V1_STR}/auth/connect", json=connect_payload)
+    assert replay.status_code == HttpStatus.HTTP_400_BAD_REQUEST
+    assert "Nonce sudah digunakan" in replay.json()["detail"]
@@ -0,0 +1,33 @@
+# ===========================================================================
+# File: app/tests/api/v1/test_conditional.py (BARU)
+# ===========================================================================
+# ETag/If-None-Match tetap terpasang baik di endpoint yang memakai model_response (daftar)
+# maupun yang mengembalikan model lewat jalur default FastAPI (objek tunggal).
+import pytest
+from httpx import AsyncClient
+from fastapi import status as HttpStatus
+
+from app.core.config import settings
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.mark.parametrize("path", ["/users/me", "/users/me/badges", "/missions/me/summary", "/missions/directives"])
+async def test_conditional_get(async_test_client: AsyncClient, test_user_auth_headers, path: str):
+    url = f"{settings.API_V1_STR}{path}"
+    response = await async_test_client.get(url, headers=test_user_auth_headers)
+    assert response.status_code == HttpStatus.HTTP_200_OK, response.text
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["cache-control"].startswith("private")
+    etag = response.headers["etag"]
+
+    cached = await async_test_client.get(url, headers={**test_user_auth_headers, "If-None-Match": etag})
+    assert cached.status_code == HttpStatus.HTTP_304_NOT_MODIFIED
+    assert cached.headers["etag"] == etag
+
+
+async def test_users_me_body_is_user_public(async_test_client: AsyncClient, test_user_auth_headers, test_user):
+    body = (await async_test_client.get(f"{settings.API_V1_STR}/users/me", headers=test_user_auth_headers)).json()
+    assert body["walletAddress"] == test_user.walletAddress
+    assert "_id" in body
+    assert "hashed_password" not in body and "updatedAt" not in body # Field UserInDB di luar UserPublic dibuang
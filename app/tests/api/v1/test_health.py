@@ -0,0 +1,101 @@
+# ===========================================================================
+# File: app/tests/api/v1/test_health.py (BARU)
+# ===========================================================================
+# /health dari state probe background, dan 503 cepat tanpa I/O selama circuit dependency terbuka.
+# Endpoint yang punya snapshot in-memory (news feed) tetap melayani selama outage.
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from fastapi import status as HttpStatus
+
+from app.core.config import settings
+from app.main import health_monitor
+from app.models.user import UserInDB
+
+pytestmark = pytest.mark.asyncio
+
+
+@asynccontextmanager
+async def dependency_outage(name: str):
+    """Probe `name` dibuat gagal sampai circuit terbuka; setelahnya probe asli dipulihkan sampai circuit tertutup."""
+    probe = health_monitor.probes[name]
+    original_check = probe.check
+
+    async def failing_check():
+        raise ConnectionError("simulated outage")
+
+    probe.check = failing_check
+    try:
+        for _ in range(probe.breaker.failure_threshold):
+            await health_monitor.run_once()
+        assert probe.breaker.is_open
+        yield probe
+    finally:
+        probe.check = original_check
+        for _ in range(probe.breaker.recovery_threshold):
+            await health_monitor.run_once()
+        assert not probe.breaker.is_open
+
+
+async def test_health_is_served_from_probe_state(async_test_client: AsyncClient, round_trips):
+    with round_trips() as trips:
+        response = await async_test_client.get("/health")
+    assert response.status_code == HttpStatus.HTTP_200_OK, response.text
+    body = response.json()
+    assert body["status"] == "healthy"
+    assert body["services"] == {"mongodb": "connected", "redis": "connected"}
+    trips.assert_budget(mongo=0, redis=0)
+
+    async with dependency_outage("redis"):
+        response = await async_test_client.get("/health")
+    assert response.status_code == HttpStatus.HTTP_503_SERVICE_UNAVAILABLE
+    body = response.json()
+    assert body["services"]["redis"] == "error"
+    assert body["checks"]["redis"]["circuit"] == "open"
+    assert "simulated outage" in body["checks"]["redis"]["lastError"]
+
+
+async def test_open_mongo_circuit_fails_fast(async_test_client: AsyncClient, test_user_auth_headers, round_trips):
+    async with dependency_outage("mongodb"):
+        with round_trips() as trips:
+            response = await async_test_client.get(f"{settings.API_V1_STR}/users/me", headers=test_user_auth_headers)
+    assert response.status_code == HttpStatus.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["retry-after"] == "1"
+    trips.assert_budget(mongo=0)
+
+
+async def test_news_feed_is_served_from_snapshot_during_mongo_outage(async_test_client: AsyncClient, round_trips):
+    before = await async_test_client.get(f"{settings.API_V1_STR}/news/feed")
+    assert before.status_code == HttpStatus.HTTP_200_OK, before.text
+
+    async with dependency_outage("mongodb"):
+        with round_trips() as trips:
+            response = await async_test_client.get(f"{settings.API_V1_STR}/news/feed")
+    assert response.status_code == HttpStatus.HTTP_200_OK, response.text
+    assert response.content == before.content
+    assert response.headers["etag"] == before.headers["etag"]
+    trips.assert_budget(mongo=0)
+
+
+@patch("app.services.auth_service.verify_wallet_signature", return_value=True)
+async def test_open_redis_circuit_fails_auth_fast(
+    mock_verify_signature, async_test_client: AsyncClient, test_user: UserInDB, round_trips
+):
+    challenge = (await async_test_client.get(
+        f"{settings.API_V1_STR}/auth/challenge", params={"walletAddress": test_user.walletAddress}
+    )).json()
+    payload = {
+        "walletAddress": test_user.walletAddress,
+        "message": challenge["messageToSign"],
+        "signature": "0x" + "e" * 130,
+        "nonce": challenge["nonce"],
+    }
+
+    async with dependency_outage("redis"):
+        with round_trips() as trips:
+            response = await async_test_client.post(f"{settings.API_V1_STR}/auth/connect", json=payload)
+    assert response.status_code == HttpStatus.HTTP_503_SERVICE_UNAVAILABLE, response.text
+    # Rate limit jatuh ke limiter per proses, nonce client None: tidak ada command Redis sama sekali
+    trips.assert_budget(redis=0)
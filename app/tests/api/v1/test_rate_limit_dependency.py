@@ -0,0 +1,116 @@
+# ===========================================================================
+# File: app/tests/api/v1/test_rate_limit_dependency.py (BARU)
+# ===========================================================================
+# Dependency RateLimit / UserRateLimit (app/api/rate_limit.py) di app FastAPI kecil:
+# 429 + Retry-After, beberapa aturan per scope, fallback tanpa Redis, dan reuse user yang login.
+import uuid
+from typing import Dict, Optional
+
+import pytest
+from fastapi import Depends, FastAPI, status as HttpStatus
+from httpx import ASGITransport, AsyncClient
+
+from app.api import deps
+from app.api.deps import get_current_active_user
+from app.api.rate_limit import RateLimit, UserRateLimit
+from app.core.config import settings
+from app.db.redis_conn import redis_manager
+from app.models.user import UserInDB
+
+pytestmark = pytest.mark.asyncio
+
+
+def limited_client(limit: RateLimit) -> AsyncClient:
+    app = FastAPI()
+
+    @app.get("/limited", dependencies=[Depends(limit)])
+    async def limited(walletAddress: Optional[str] = None) -> Dict[str, bool]:
+        return {"ok": True}
+
+    @app.get("/me", dependencies=[Depends(limit)])
+    async def me(current_user: UserInDB = Depends(get_current_active_user)) -> Dict[str, str]:
+        return {"id": str(current_user.id)}
+
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver")
+
+
+async def test_exceeding_the_limit_returns_429_with_retry_after():
+    async with limited_client(RateLimit(uuid.uuid4().hex, ip="2/minute")) as client:
+        statuses = [(await client.get("/limited")).status_code for _ in range(2)]
+        rejected = await client.get("/limited")
+    assert statuses == [HttpStatus.HTTP_200_OK] * 2
+    assert rejected.status_code == HttpStatus.HTTP_429_TOO_MANY_REQUESTS
+    assert 1 <= int(rejected.headers["retry-after"]) <= 60
+    assert rejected.headers["retry-after"] in rejected.json()["detail"]
+
+
+async def test_multiple_rates_per_scope():
+    limit = RateLimit(uuid.uuid4().hex, ip="100/minute", wallet="2/minute,3/hour")
+    assert [(rule.scope, rule.limit, rule.window_seconds) for rule in limit.rules] == [
+        ("ip", 100, 60), ("wallet", 2, 60), ("wallet", 3, 3600),
+    ]
+    async with limited_client(limit) as client:
+        wallet_a = [(await client.get("/limited", params={"walletAddress": "0x" + "aA" * 20})).status_code for _ in range(3)]
+        wallet_b = await client.get("/limited", params={"walletAddress": "0x" + "bb" * 20})
+        no_wallet = await client.get("/limited") # Aturan wallet dilewati, hanya aturan ip
+    assert wallet_a == [HttpStatus.HTTP_200_OK] * 2 + [HttpStatus.HTTP_429_TOO_MANY_REQUESTS]
+    assert wallet_b.status_code == HttpStatus.HTTP_200_OK
+    assert no_wallet.status_code == HttpStatus.HTTP_200_OK
+
+
+async def test_malformed_wallets_do_not_get_their_own_bucket():
+    async with limited_client(RateLimit(uuid.uuid4().hex, ip="100/minute", wallet="1/minute")) as client:
+        statuses = [
+            (await client.get("/limited", params={"walletAddress": f"0xInvalidAddress{index}"})).status_code
+            for index in range(3)
+        ]
+        # Huruf besar/kecil dan spasi tidak membuat bucket baru untuk alamat yang sama
+        same_wallet = [
+            (await client.get("/limited", params={"walletAddress": wallet})).status_code
+            for wallet in ("0x" + "cC" * 20, " 0x" + "cc" * 20)
+        ]
+    assert statuses == [HttpStatus.HTTP_200_OK] * 3
+    assert same_wallet == [HttpStatus.HTTP_200_OK, HttpStatus.HTTP_429_TOO_MANY_REQUESTS]
+
+
+async def test_limits_still_apply_without_redis(monkeypatch: pytest.MonkeyPatch, round_trips):
+    monkeypatch.setattr(redis_manager, "available_redis_client", lambda: None)
+    async with limited_client(RateLimit(uuid.uuid4().hex, ip="1/minute")) as client:
+        with round_trips() as trips:
+            allowed = await client.get("/limited")
+            rejected = await client.get("/limited")
+    assert allowed.status_code == HttpStatus.HTTP_200_OK
+    assert rejected.status_code == HttpStatus.HTTP_429_TOO_MANY_REQUESTS
+    trips.assert_budget(redis=0)
+
+
+async def test_disabled_rate_limit(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    async with limited_client(RateLimit(uuid.uuid4().hex, ip="1/minute")) as client:
+        statuses = [(await client.get("/limited")).status_code for _ in range(3)]
+    assert statuses == [HttpStatus.HTTP_200_OK] * 3
+
+
+async def test_user_limit_reuses_the_authenticated_user(
+    monkeypatch: pytest.MonkeyPatch, test_user: UserInDB, test_user_auth_headers: Dict[str, str]
+):
+    decoded = []
+    original_decode = deps.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decoded.append(args[0])
+        return original_decode(*args, **kwargs)
+
+    monkeypatch.setattr(deps.jwt, "decode", counting_decode)
+    async with limited_client(UserRateLimit(uuid.uuid4().hex, user="2/minute")) as client:
+        unauthenticated = await client.get("/me", headers={"Authorization": "Bearer not-a-jwt"})
+        decoded.clear()
+        first = await client.get("/me", headers=test_user_auth_headers)
+        assert len(decoded) == 1 # Dependency rate limit dan endpoint memakai user yang sama
+        second = await client.get("/me", headers=test_user_auth_headers)
+        rejected = await client.get("/me", headers=test_user_auth_headers)
+
+    assert unauthenticated.status_code == HttpStatus.HTTP_401_UNAUTHORIZED # Tidak memakai kuota siapa pun
+    assert first.json() == {"id": str(test_user.id)}
+    assert second.status_code == HttpStatus.HTTP_200_OK
+    assert rejected.status_code == HttpStatus.HTTP_429_TOO_MANY_REQUESTS
@@ -0,0 +1,72 @@
+# ===========================================================================
+# File: app/tests/api/v1/test_round_trips.py (BARU)
+# ===========================================================================
+# Budget round trip MongoDB/Redis per request. Jika test ini gagal, pesan error memuat urutan
+# command yang sebenarnya dikirim; cari query tambahan sebelum menaikkan budget.
+import pytest
+from httpx import AsyncClient
+from unittest.mock import patch
+from fastapi import status as HttpStatus
+from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.models.user import UserInDB
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_directives_round_trip_budget(async_test_client: AsyncClient, test_user_auth_headers, round_trips):
+    url = f"{settings.API_V1_STR}/missions/directives"
+    warmup = await async_test_client.get(url, headers=test_user_auth_headers) # Mengisi cache katalog misi
+    assert warmup.status_code == HttpStatus.HTTP_200_OK
+
+    with round_trips() as trips:
+        response = await async_test_client.get(url, headers=test_user_auth_headers)
+    assert response.status_code == HttpStatus.HTTP_200_OK
+    # users (get_current_active_user) + user_missions; katalog misi dari cache
+    trips.assert_budget(mongo=2, redis=1, collections={"missions": 0})
+
+    with round_trips() as trips:
+        response = await async_test_client.get(url, headers={**test_user_auth_headers, "If-None-Match": response.headers["etag"]})
+    assert response.status_code == HttpStatus.HTTP_304_NOT_MODIFIED
+    trips.assert_budget(mongo=2, redis=1, collections={"missions": 0})
+
+
+@patch("app.services.auth_service.verify_wallet_signature", return_value=True)
+async def test_connect_existing_user_round_trip_budget(
+    mock_verify_signature, async_test_client: AsyncClient, test_user: UserInDB, round_trips
+):
+    challenge = (await async_test_client.get(
+        f"{settings.API_V1_STR}/auth/challenge", params={"walletAddress": test_user.walletAddress}
+    )).json()
+    payload = {
+        "walletAddress": test_user.walletAddress,
+        "message": challenge["messageToSign"],
+        "signature": "0x" + "e" * 130,
+        "nonce": challenge["nonce"],
+    }
+
+    with round_trips() as trips:
+        response = await async_test_client.post(f"{settings.API_V1_STR}/auth/connect", json=payload)
+    assert response.status_code == HttpStatus.HTTP_200_OK, response.text
+    # find user by wallet + find_one_and_update lastLogin (tanpa find ulang)
+    # Redis: rate limit, nonce replay set, invalidasi cache user + broadcast bus
+    trips.assert_budget(mongo=2, redis=4, collections={"users": 2})
+
+
+async def test_rejected_challenge_round_trip_budget(async_test_client: AsyncClient, round_trips, monkeypatch: pytest.MonkeyPatch):
+    scopes = []
+    original_hit = rate_limiter.hit
+
+    async def recording_hit(name, checks):
+        scopes.extend(rule.scope for rule, _ in checks)
+        return await original_hit(name, checks)
+
+    monkeypatch.setattr(rate_limiter, "hit", recording_hit)
+    with round_trips() as trips:
+        response = await async_test_client.get(
+            f"{settings.API_V1_STR}/auth/challenge", params={"walletAddress": "0xInvalidAddress"}
+        )
+    assert response.status_code == HttpStatus.HTTP_422_UNPROCESSABLE_ENTITY, response.text
+    # Hanya rate limit per IP; alamat sampah tidak membuat bucket wallet dan tidak menyentuh MongoDB
+    trips.assert_budget(mongo=0, redis=1)
+    assert scopes == ["ip"]
@@ -0,0 +1,154 @@
+# ===========================================================================
+# File: app/tests/benchmarks/conftest.py (BARU)
+# ===========================================================================
+"""
+Fixture `benchmark` untuk microbenchmark fungsi hot path (marker `benchmark`, tidak ikut
+run pytest biasa). Setiap benchmark diukur sebagai waktu per panggilan (minimum dari
+beberapa round) lalu dibandingkan dengan baseline JSON; lebih lambat dari
+baseline * (1 + threshold) = gagal.
+
+    pytest -m benchmark app/tests/benchmarks                       # bandingkan dengan baseline
+    pytest -m benchmark app/tests/benchmarks --benchmark-save      # tulis/refresh baseline
+    pytest -m benchmark app/tests/benchmarks --benchmark-threshold 0.5
+
+Baseline bergantung pada mesin; simpan per mesin/runner CI lewat --benchmark-baseline
+(default `.benchmarks/baseline.json`, di luar git).
+"""
+import asyncio
+import json
+import os
+import platform
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import pytest
+
+DEFAULT_BASELINE_PATH = ".benchmarks/baseline.json"
+DEFAULT_THRESHOLD = float(os.getenv("BENCHMARK_REGRESSION_THRESHOLD", "0.25"))
+ROUNDS = 7
+MIN_ROUND_SECONDS = 0.05
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmark")
+    group.addoption("--benchmark-save", action="store_true", help="Tulis hasil run ini sebagai baseline.")
+    group.addoption("--benchmark-baseline", default=DEFAULT_BASELINE_PATH, help="Path file baseline JSON.")
+    group.addoption(
+        "--benchmark-threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="Regresi maksimum relatif terhadap baseline (0.25 = 25%% lebih lambat). Env: BENCHMARK_REGRESSION_THRESHOLD.",
+    )
+
+
+class BenchmarkRecorder:
+    def __init__(self, baseline_path: Path, threshold: float, save: bool):
+        self.baseline_path = baseline_path
+        self.threshold = threshold
+        self.save = save
+        self.results: Dict[str, float] = {} # nama -> mikrodetik per panggilan
+        self.baseline: Dict[str, float] = {}
+        if baseline_path.exists():
+            self.baseline = json.loads(baseline_path.read_text(encoding="utf-8")).get("results", {})
+
+    def check(self, name: str, per_call_us: float) -> None:
+        self.results[name] = per_call_us
+        baseline_us = self.baseline.get(name)
+        if self.save or baseline_us is None:
+            return
+        limit_us = baseline_us * (1 + self.threshold)
+        if per_call_us > limit_us:
+            pytest.fail(
+                f"Benchmark '{name}' regressed: {per_call_us:.2f} us/call vs baseline {baseline_us:.2f} us "
+                f"(limit {limit_us:.2f} us, threshold {self.threshold:.0%})."
+            )
+
+    def write_baseline(self) -> None:
+        merged = {**self.baseline, **self.results}
+        self.baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "machine": {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.processor()},
+            "results": dict(sorted(merged.items())),
+        }
+        self.baseline_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+def _per_call_us(timer: Callable[[int], float]) -> float:
+    """Kalibrasi jumlah iterasi agar satu round >= MIN_ROUND_SECONDS, lalu ambil round tercepat."""
+    iterations = 1
+    while True:
+        elapsed = timer(iterations)
+        if elapsed >= MIN_ROUND_SECONDS:
+            break
+        iterations *= 2 if elapsed <= 0 else max(2, min(10, int(MIN_ROUND_SECONDS / elapsed) + 1))
+    best = min(timer(iterations) for _ in range(ROUNDS))
+    return best / iterations * 1_000_000
+
+
+class Benchmark:
+    def __init__(self, recorder: BenchmarkRecorder, name: str):
+        self._recorder = recorder
+        self._name = name
+
+    def __call__(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        result = func(*args, **kwargs) # Warm-up, sekaligus nilai kembali untuk assertion di tes
+
+        def timer(iterations: int) -> float:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                func(*args, **kwargs)
+            return time.perf_counter() - started
+
+        self._recorder.check(self._name, _per_call_us(timer))
+        return result
+
+    def run_async(self, coro_func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Untuk coroutine: semua iterasi satu round dijalankan dalam satu event loop baru."""
+
+        async def run_many(iterations: int) -> float:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                await coro_func(*args, **kwargs)
+            return time.perf_counter() - started
+
+        result = asyncio.run(coro_func(*args, **kwargs))
+        self._recorder.check(self._name, _per_call_us(lambda iterations: asyncio.run(run_many(iterations))))
+        return result
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder(request: pytest.FixtureRequest) -> BenchmarkRecorder:
+    config = request.config
+    recorder = BenchmarkRecorder(
+        Path(config.getoption("--benchmark-baseline")),
+        config.getoption("--benchmark-threshold"),
+        config.getoption("--benchmark-save"),
+    )
+    config._benchmark_recorder = recorder # Dibaca pytest_terminal_summary
+    yield recorder
+    if recorder.save and recorder.results:
+        recorder.write_baseline()
+
+
+@pytest.fixture
+def benchmark(benchmark_recorder: BenchmarkRecorder, request: pytest.FixtureRequest) -> Benchmark:
+    return Benchmark(benchmark_recorder, request.node.name)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def lifespan_manager_fixture() -> None:
+    # Benchmark berjalan tanpa MongoDB/Redis: override fixture lifespan autouse dari app/tests/conftest.py
+    return None
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    recorder: Optional[BenchmarkRecorder] = getattr(config, "_benchmark_recorder", None)
+    if recorder is None or not recorder.results:
+        return
+    lines: List[str] = []
+    for name, per_call_us in sorted(recorder.results.items()):
+        baseline_us = recorder.baseline.get(name)
+        delta = f"{(per_call_us / baseline_us - 1):+.1%}" if baseline_us else "no baseline"
+        lines.append(f"{name:<55} {per_call_us:12.2f} us/call  {delta}")
+    terminalreporter.write_sep("-", "benchmark results")
+    for line in lines:
+        terminalreporter.write_line(line)
@@ -0,0 +1,150 @@
+# ===========================================================================
+# File: app/tests/benchmarks/test_hot_paths.py (BARU)
+# ===========================================================================
+import copy
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from bson import ObjectId, json_util
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from jose import jwt
+
+from app.api.v1.schemas.user import UserPublic
+from app.core.config import settings
+from app.core.security import create_access_token, verify_wallet_signature
+from app.crud.base import _convert_pydantic_types_to_bson
+from app.crud.crud_mission import crud_mission, crud_user_mission_link
+from app.models.mission import MissionInDB, UserMissionLink
+from app.models.user import UserInDB, UserProfile
+from app.services.mission_service import mission_service
+from app.services.user_service import user_service
+
+pytestmark = pytest.mark.benchmark
+
+MISSIONS_FIXTURE = Path(__file__).resolve().parents[3] / "cigar_ds_db.missions.json"
+MISSION_COPIES = 8 # 8 misi di fixture x 8 = 64 misi aktif
+
+
+@pytest.fixture(scope="module")
+def mission_docs():
+    seed = json_util.loads(MISSIONS_FIXTURE.read_text(encoding="utf-8"))
+    docs = []
+    for copy_index in range(MISSION_COPIES):
+        for doc in seed:
+            doc = copy.deepcopy(doc)
+            doc["_id"] = ObjectId()
+            doc["missionId_str"] = doc["missionId_str"] if copy_index == 0 else f"{doc['missionId_str']}-{copy_index}"
+            docs.append(doc)
+    return docs
+
+
+@pytest.fixture(scope="module")
+def user_doc():
+    now = datetime.now(timezone.utc)
+    return {
+        "_id": ObjectId(),
+        "walletAddress": "0x" + "ab" * 20,
+        "username": "Agent_Benchmark",
+        "rank": "Field Agent",
+        "xp": 920,
+        "cigarBalance": 12.5,
+        "referralCode": "CGR12345",
+        "alliesCount": 3,
+        "profile": {"commanderName": "Agent_Benchmark", "rankBadgeUrl": "https://placehold.co/64x64/777/FFF?text=FAG", "rankProgressPercent": 42.0, "nextRank": "Strategist"},
+        "systemStatus": {"starDate": "2025.155", "signalStatus": "Optimal", "networkLoadPercent": 33.3, "anomaliesResolved": 2},
+        "twitter_data": {"twitter_user_id": "123456", "twitter_username": "agent_bench", "connected_at": now},
+        "is_active": True,
+        "createdAt": now - timedelta(days=30),
+        "updatedAt": now,
+        "lastLogin": now,
+        "last_daily_checkin": now - timedelta(days=1),
+    }
+
+
+def test_convert_pydantic_types_to_bson(benchmark, user_doc, mission_docs):
+    user = UserInDB.model_validate(user_doc)
+    payload = {**user.model_dump(by_alias=True), "profile": user.profile, "missions": [MissionInDB.model_validate(doc) for doc in mission_docs[:8]]}
+    converted = benchmark(_convert_pydantic_types_to_bson, payload)
+    assert isinstance(converted["_id"], ObjectId)
+    assert isinstance(converted["profile"]["rankBadgeUrl"], str)
+
+
+def test_user_in_db_validate(benchmark, user_doc):
+    user = benchmark(UserInDB.model_validate, user_doc)
+    assert user.username == user_doc["username"]
+
+
+def test_user_in_db_dump(benchmark, user_doc):
+    user = UserInDB.model_validate(user_doc)
+    dumped = benchmark(user.model_dump, by_alias=True)
+    assert dumped["_id"] == user_doc["_id"]
+
+
+def test_mission_in_db_validate(benchmark, mission_docs):
+    mission = benchmark(MissionInDB.model_validate, mission_docs[0])
+    assert mission.missionId_str == mission_docs[0]["missionId_str"]
+
+
+def test_mission_in_db_dump(benchmark, mission_docs):
+    mission = MissionInDB.model_validate(mission_docs[0])
+    dumped = benchmark(mission.model_dump, by_alias=True)
+    assert dumped["missionId_str"] == mission.missionId_str
+
+
+def test_user_public_from_user_in_db(benchmark, user_doc):
+    user = UserInDB.model_validate(user_doc)
+    public = benchmark(UserPublic.model_validate, user.model_dump(by_alias=True))
+    assert public.walletAddress == user.walletAddress
+
+
+def test_user_public_dump_json(benchmark, user_doc):
+    public = UserPublic.model_validate(UserInDB.model_validate(user_doc).model_dump(by_alias=True))
+    body = benchmark(public.model_dump_json, by_alias=True)
+    assert user_doc["username"] in body
+
+
+def test_calculate_rank_details_for_profile(benchmark):
+    details = benchmark(user_service._calculate_rank_details_for_profile, current_rank="Field Agent", current_xp=920)
+    assert details["nextRank"] == "Strategist"
+
+
+def test_verify_wallet_signature(benchmark):
+    account = Account.create()
+    message = "Selamat datang di Cigar DS API! Nonce unik Anda: " + "0" * 32
+    signature = Account.sign_message(encode_defunct(text=message), account.key).signature.hex()
+    assert benchmark(verify_wallet_signature, account.address, message, signature) is True
+
+
+def test_create_access_token(benchmark):
+    token = benchmark(create_access_token, subject="0x" + "ab" * 20, user_id=str(ObjectId()))
+    assert token.count(".") == 2
+
+
+def test_decode_access_token(benchmark):
+    token = create_access_token(subject="0x" + "ab" * 20, user_id=str(ObjectId()))
+    payload = benchmark(jwt.decode, token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert payload["sub"] == "0x" + "ab" * 20
+
+
+def test_get_directives_for_user(benchmark, monkeypatch, user_doc, mission_docs):
+    user = UserInDB.model_validate(user_doc)
+    missions = [MissionInDB.model_validate(doc) for doc in mission_docs]
+    links = [
+        UserMissionLink(userId=user.id, missionId=mission.id, status="completed", completedAt=datetime.now(timezone.utc))
+        for mission in missions[::3]
+    ]
+
+    async def get_active_missions(db, skip=0, limit=100):
+        return missions[skip:skip + limit]
+
+    async def get_missions_by_user_id(db, *, user_id, status=None):
+        return links
+
+    # Dataset in-memory: hanya biaya membangun direktif yang diukur, bukan round trip MongoDB
+    monkeypatch.setattr(crud_mission, "get_active_missions", get_active_missions)
+    monkeypatch.setattr(crud_user_mission_link, "get_missions_by_user_id", get_missions_by_user_id)
+    directives = benchmark.run_async(mission_service.get_directives_for_user, None, user)
+    assert len(directives) == len(missions)
+    assert sum(directive.status == "completed" for directive in directives) >= len(links)
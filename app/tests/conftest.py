@@ -1,24 +1,23 @@
 # ===========================================================================
-# File: app/tests/conftest.py (MODIFIKASI: Import UserProfile dari app.models.user)
+# File: app/tests/conftest.py (MODIFIKASI: Fixture round_trips untuk budget round trip MongoDB/Redis)
 # ===========================================================================
 import pytest
-import asyncio
-from httpx import AsyncClient
-from typing import AsyncGenerator, Generator, Dict, Any
+from httpx import AsyncClient, ASGITransport
+from pymongo import monitoring
+from typing import AsyncGenerator, Callable, Dict, Any
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from asgi_lifespan import LifespanManager
 
 from app.main import app
 from app.core.config import settings, logger
-from app.db.session import get_db as app_get_db
 from app.db.session import mongo_db_manager
-from app.db.redis_conn import redis_manager, get_redis_nonce_client as app_get_redis_nonce_client
+from app.db.redis_conn import redis_manager
 from app.models.user import UserInDB
 from app.api.v1.schemas.user import UserCreate # Hanya UserCreate dari schemas.user
-from app.models.user import UserProfile # UserProfile diimpor dari models.user
-from app.utils.helpers import generate_sci_fi_username
+from app.models.user import UserProfile, UserSystemStatus # UserProfile diimpor dari models.user
+from app.utils.helpers import generate_sci_fi_username, generate_unique_referral_code
 from app.core.security import create_access_token
-from fastapi import Depends # Menambahkan Depends
+from app.tests import round_trips as round_trip_capture
 
 settings.TESTING_MODE = True
 settings.MONGODB_DB_NAME = settings.MONGODB_TEST_DB_NAME
@@ -29,12 +28,9 @@ logger.info(f"--- RUNNING IN TESTING MODE (conftest.py) ---")
 logger.info(f"Test MongoDB: {settings.MONGODB_URL}/{settings.MONGODB_DB_NAME}")
 logger.info(f"Test Redis Nonce DB: {settings.REDIS_DB_NONCE}")
 
+# Listener global harus terdaftar sebelum lifespan membuat client Motor
+monitoring.register(round_trip_capture.MongoCommandCounter())
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
 
 @pytest.fixture(scope="session", autouse=True)
 async def lifespan_manager_fixture() -> AsyncGenerator[LifespanManager, None]: # Mengganti nama fixture
@@ -72,26 +68,28 @@ async def test_redis_nonce_client_fixture(lifespan_manager_fixture: LifespanMana
     # if redis_manager.redis_client:
     #     await redis_manager.redis_client.flushdb()
 
-
-async def override_get_db_for_test(db_session = Depends(test_db)) -> AsyncIOMotorDatabase:
-    yield db_session
-
-app.dependency_overrides[app_get_db] = override_get_db_for_test
-
-async def override_get_redis_nonce_client_for_test(
-    redis_client_session = Depends(test_redis_nonce_client_fixture) # Menggunakan nama fixture baru
-):
-    yield redis_client_session
-
-app.dependency_overrides[app_get_redis_nonce_client] = override_get_redis_nonce_client_for_test
+# get_db / get_redis_nonce_client app sudah mengembalikan koneksi lifespan (database test), tanpa override
 
 
 @pytest.fixture(scope="module")
 async def async_test_client() -> AsyncGenerator[AsyncClient, None]:
     # LifespanManager sudah aktif via autouse fixture, jadi client bisa langsung dibuat
-    async with AsyncClient(app=app, base_url="http://testserver") as client:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
         yield client
 
+@pytest.fixture(scope="function")
+def round_trips(monkeypatch: pytest.MonkeyPatch, lifespan_manager_fixture: LifespanManager) -> Callable:
+    """
+    `with round_trips() as trips: ...` lalu `trips.assert_budget(mongo=2, redis=3)`.
+    Command MongoDB dihitung lewat listener pymongo, command Redis lewat execute_command client app.
+    """
+    seen = set()
+    for client in (redis_manager.redis_client, redis_manager.cache_client):
+        if client is not None and id(client) not in seen:
+            seen.add(id(client))
+            monkeypatch.setattr(client, "execute_command", round_trip_capture.counting_execute_command(client.execute_command))
+    return round_trip_capture.capture
+
 @pytest.fixture(scope="function")
 async def test_user(test_db: AsyncIOMotorDatabase) -> UserInDB:
     from app.crud.crud_user import crud_user
@@ -102,14 +100,17 @@ async def test_user(test_db: AsyncIOMotorDatabase) -> UserInDB:
         logger.debug(f"Removing existing test user: {existing_user.username}")
         await crud_user.remove(db=test_db, id=existing_user.id)
 
-    username = generate_sci_fi_username(prefix="TestUser")
+    username = generate_sci_fi_username()
     # UserProfile diimpor dari app.models.user
     profile = UserProfile(commanderName=username) 
     
-    user = await crud_user.create_new_user_from_wallet_connect(
+    user = await crud_user.create_new_user_with_complete_data(
         db=test_db, 
         wallet_address=test_wallet_address,
-        profile_details=profile
+        username=username,
+        profile=profile,
+        system_status=UserSystemStatus(),
+        referral_code=generate_unique_referral_code(),
     )
     logger.debug(f"Created test user: {user.username} with ID {user.id}")
     return user
@@ -0,0 +1,136 @@
+# ===========================================================================
+# File: app/tests/core/test_cache.py (BARU)
+# ===========================================================================
+# TwoTierCache (app/core/cache.py) terhadap Redis sungguhan: isi L1/L2, invalidasi tag,
+# dan guard generasi untuk invalidasi yang terjadi di tengah load.
+import uuid
+from typing import Any, Awaitable, Callable, List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.cache import CACHE_KEY_PREFIX, ModelCodec, TwoTierCache, collection_tags
+from app.db.redis_conn import redis_manager
+
+
+class Item(BaseModel):
+    id: str
+    name: str
+
+
+CODEC = ModelCodec(Item)
+
+
+def item_tags(item: Item) -> List[str]:
+    return [f"items:{item.id}"]
+
+
+def new_cache() -> TwoTierCache:
+    """Satu instance per 'worker': L1 terpisah, L2 Redis bersama."""
+    return TwoTierCache(l1_max_entries=100, l1_ttl_seconds=60.0, l1_unsubscribed_ttl_seconds=60.0)
+
+
+class CountingLoader:
+    def __init__(self, item: Item, during_load: Optional[Callable[[], Awaitable[Any]]] = None):
+        self.item = item
+        self.during_load = during_load
+        self.calls = 0
+
+    async def __call__(self) -> Item:
+        self.calls += 1
+        if self.during_load is not None:
+            await self.during_load() # Write lain terjadi setelah loader membaca "DB"
+        return self.item
+
+
+@pytest.fixture
+def item() -> Item:
+    return Item(id=uuid.uuid4().hex, name="relic")
+
+
+async def in_l2(key: str) -> bool:
+    return bool(await redis_manager.cache_client.exists(CACHE_KEY_PREFIX + key))
+
+
+async def load(cache: TwoTierCache, key: str, loader: CountingLoader) -> Item:
+    return await cache.get_or_load(key, loader, codec=CODEC, ttl=60, tags=item_tags)
+
+
+async def test_miss_fills_l1_and_l2(item: Item):
+    cache, other_worker = new_cache(), new_cache()
+    loader = CountingLoader(item)
+    key = f"items:{item.id}"
+
+    assert await load(cache, key, loader) == item
+    assert loader.calls == 1 and cache.stats["misses"] == 1
+    assert await in_l2(key)
+
+    assert await load(cache, key, loader) == item
+    assert cache.stats["l1_hits"] == 1
+
+    assert await load(other_worker, key, loader) == item
+    assert other_worker.stats["l2_hits"] == 1
+    assert await load(other_worker, key, loader) == item
+    assert other_worker.stats["l1_hits"] == 1 # L2 hit ikut mengisi L1
+    assert loader.calls == 1
+
+
+async def test_invalidate_tags_clears_l1_and_l2(item: Item):
+    cache = new_cache()
+    loader = CountingLoader(item)
+    key = f"items:{item.id}"
+    await load(cache, key, loader)
+
+    await cache.invalidate_tags(collection_tags("items", item.id))
+    assert not await in_l2(key)
+    assert len(cache.l1) == 0
+
+    await load(cache, key, loader)
+    assert loader.calls == 2
+
+
+async def test_invalidation_during_load_is_not_overwritten(item: Item):
+    cache, writer = new_cache(), new_cache()
+    key = f"items:{item.id}"
+    loader = CountingLoader(item, lambda: writer.invalidate_tags(collection_tags("items", item.id)))
+
+    assert await load(cache, key, loader) == item # Pemanggil tetap menerima hasil loader
+    assert not await in_l2(key)
+
+    loader.during_load = None
+    await load(new_cache(), key, loader) # Worker lain: tidak ada value lama di L2
+    assert loader.calls == 2
+    assert await in_l2(key)
+
+
+async def test_local_invalidation_during_load_skips_l1(item: Item):
+    cache = new_cache()
+    key = f"items:{item.id}"
+    loader = CountingLoader(item)
+
+    async def remote_invalidation() -> None:
+        cache.apply_remote_invalidation([f"items:{item.id}"])
+
+    loader.during_load = remote_invalidation
+    await cache.get_or_load(key, loader, codec=CODEC, ttl=60, tags=item_tags)
+    assert len(cache.l1) == 0
+
+
+async def test_writes_to_other_documents_do_not_block_the_store(item: Item):
+    cache, writer = new_cache(), new_cache()
+    key = f"items:{item.id}"
+
+    async def busy_collection() -> None:
+        for _ in range(3):
+            other_id = uuid.uuid4().hex
+            await writer.invalidate_tags(collection_tags("items", other_id)) # Termasuk tag `items:*`
+            cache.apply_remote_invalidation(collection_tags("items", other_id))
+
+    loader = CountingLoader(item, busy_collection)
+    await load(cache, key, loader)
+    assert await in_l2(key)
+    assert len(cache.l1) == 1
+
+    loader.during_load = None
+    assert await load(new_cache(), key, loader) == item
+    assert loader.calls == 1
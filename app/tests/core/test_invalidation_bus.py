@@ -0,0 +1,149 @@
+# ===========================================================================
+# File: app/tests/core/test_invalidation_bus.py (BARU)
+# ===========================================================================
+# Bus invalidasi L1 antar worker (app/core/invalidation_bus.py) lewat Redis sungguhan.
+import asyncio
+import time
+from typing import Callable, List
+
+import pytest
+
+from app.core.invalidation_bus import PUBLISHER_EXPIRY_HEARTBEATS, InvalidationBus
+from app.db.redis_conn import redis_manager
+
+async def wait_until(condition: Callable[[], bool], timeout: float = 3.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met before timeout"
+        await asyncio.sleep(0.01)
+
+
+def recording_bus(*, subscribed: bool = True) -> InvalidationBus:
+    """Bus tanpa koneksi Redis untuk memanggil _handle_message langsung."""
+    bus = InvalidationBus(heartbeat_seconds=5.0)
+    bus.received: List[List[str]] = []
+    bus.flush_count = 0
+
+    def on_flush() -> None:
+        bus.flush_count += 1
+
+    bus.add_listener(lambda tags: bus.received.append(list(tags)), on_flush)
+    if subscribed:
+        bus._subscribed_at = time.monotonic()
+    return bus
+
+
+@pytest.fixture
+async def subscriber():
+    """Bus kedua yang subscribe ke channel; `received` berisi tags, `flushes` jumlah full flush."""
+    bus = InvalidationBus(heartbeat_seconds=0.2)
+    bus.received: List[List[str]] = []
+    bus.flush_count = 0
+
+    def on_flush() -> None:
+        bus.flush_count += 1
+
+    bus.add_listener(lambda tags: bus.received.append(list(tags)), on_flush)
+    bus.start()
+    await wait_until(lambda: bus.connected and bus.flush_count == 1) # Flush awal saat subscribe
+    yield bus
+    await bus.stop()
+
+
+async def test_publish_while_circuit_open_forces_flush_on_other_workers(subscriber: InvalidationBus):
+    publisher = InvalidationBus(heartbeat_seconds=0.2)
+    await publisher.publish(["users:1"])
+    await wait_until(lambda: subscriber.received == [["users:1"]])
+
+    circuit = redis_manager.circuit
+    for _ in range(circuit.failure_threshold):
+        circuit.record_failure("simulated outage")
+    try:
+        assert circuit.is_open
+        await publisher.publish(["users:2"]) # Dilewati, tapi seq tetap naik
+        assert publisher.stats["published"] == 1
+    finally:
+        for _ in range(circuit.recovery_threshold):
+            circuit.record_success()
+    assert not circuit.is_open
+
+    await publisher._publish_heartbeat()
+    await wait_until(lambda: subscriber.flush_count == 2)
+    assert subscriber.stats["gaps"] == 1
+    assert subscriber.received == [["users:1"]]
+
+
+def test_in_order_messages_reach_listeners():
+    bus = recording_bus()
+    bus._handle_message(b"worker-a|1|users:1")
+    bus._handle_message(b"worker-a|2|users:2,missions:catalog")
+    assert bus.received == [["users:1"], ["users:2", "missions:catalog"]]
+    assert bus.flush_count == 0
+
+
+def test_own_messages_are_skipped():
+    bus = recording_bus()
+    bus._handle_message(f"{bus.publisher_id}|1|users:1".encode())
+    bus._handle_message(f"{bus.publisher_id}|9|".encode())
+    assert bus.received == []
+    assert bus.flush_count == 0
+    assert bus.stats["received"] == 0
+
+
+def test_seq_gap_flushes_instead_of_applying_tags():
+    bus = recording_bus()
+    bus._handle_message(b"worker-a|1|users:1")
+    bus._handle_message(b"worker-a|3|users:3") # seq 2 hilang
+    assert bus.received == [["users:1"]] # Flush sudah menutup users:3
+    assert bus.flush_count == 1
+    assert bus.stats["gaps"] == 1
+    bus._handle_message(b"worker-a|4|users:4")
+    assert bus.received[-1] == ["users:4"]
+    assert bus.flush_count == 1
+
+
+def test_heartbeat_detects_missed_trailing_message():
+    bus = recording_bus()
+    bus._handle_message(b"worker-a|1|users:1")
+    bus._handle_message(b"worker-a|1|") # Heartbeat dengan seq yang sama: tidak ada yang terlewat
+    assert bus.flush_count == 0
+    bus._handle_message(b"worker-a|2|") # Pesan seq 2 hilang, heartbeat membawa seq terakhir
+    assert bus.flush_count == 1
+    assert bus.received == [["users:1"]]
+
+
+def test_malformed_messages_are_ignored():
+    bus = recording_bus()
+    for data in (b"garbage", b"worker-a|x|users:1", b"\xff\xfe|1|users:1"):
+        bus._handle_message(data)
+    assert bus.received == [] and bus.flush_count == 0
+
+
+def test_unknown_publisher_after_adoption_window():
+    bus = recording_bus(subscribed=False)
+    bus._handle_message(b"worker-new|0|") # Worker baru: heartbeat seq 0
+    bus._handle_message(b"worker-new|1|users:1")
+    assert bus.flush_count == 0
+    bus._handle_message(b"worker-old|7|users:7") # Sudah berjalan, pesan 1..6 tidak pernah diterima
+    assert bus.flush_count == 1
+
+
+def test_unknown_publisher_inside_adoption_window_is_adopted():
+    bus = recording_bus()
+    bus._handle_message(b"worker-a|57|") # Riwayatnya sudah tertutup flush saat subscribe
+    bus._handle_message(b"worker-a|58|users:58")
+    assert bus.flush_count == 0
+    assert bus.received == [["users:58"]]
+
+
+def test_silent_publishers_are_evicted():
+    bus = recording_bus(subscribed=False)
+    bus._handle_message(b"worker-gone|0|")
+    bus._handle_message(b"worker-alive|0|")
+    bus._last_heard["worker-gone"] -= bus.heartbeat_seconds * (PUBLISHER_EXPIRY_HEARTBEATS + 1)
+    bus._evict_silent_publishers()
+    assert set(bus._last_seen) == set(bus._last_heard) == {"worker-alive"}
+
+    # Publisher yang dilupakan lalu muncul lagi dengan seq berjalan: pesannya mungkin terlewat
+    bus._handle_message(b"worker-gone|3|users:3")
+    assert bus.flush_count == 1
@@ -0,0 +1,106 @@
+# ===========================================================================
+# File: app/tests/core/test_rate_limit.py (BARU)
+# ===========================================================================
+# SlidingWindowRateLimiter (app/core/rate_limit.py): skrip Lua di Redis sungguhan dan fallback
+# per proses harus memberi keputusan yang sama untuk urutan request yang sama.
+import uuid
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from app.core import rate_limit as rate_limit_module
+from app.core.rate_limit import RateLimitRule, SlidingWindowRateLimiter, parse_rate
+from app.db.redis_conn import redis_manager
+
+WINDOW_START = 1_700_000_040.0 # Kelipatan 60 detik: awal window menit
+
+
+@pytest.fixture(params=["redis", "local"])
+def limiter(request, monkeypatch: pytest.MonkeyPatch) -> SlidingWindowRateLimiter:
+    if request.param == "local":
+        monkeypatch.setattr(redis_manager, "available_redis_client", lambda: None)
+    return SlidingWindowRateLimiter()
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    now = [WINDOW_START]
+    monkeypatch.setattr(rate_limit_module, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.mark.parametrize("rate, expected", [
+    ("10/minute", (10, 60)),
+    ("100/2hour", (100, 7200)),
+    (" 5/Seconds ", (5, 1)),
+    ("1000/day", (1000, 86400)),
+])
+def test_parse_rate(rate, expected):
+    assert parse_rate(rate) == expected
+
+
+@pytest.mark.parametrize("rate", ["10/fortnight", "10", "ten/minute"])
+def test_parse_rate_rejects_invalid(rate):
+    with pytest.raises(ValueError):
+        parse_rate(rate)
+
+
+async def test_limit_within_one_window(limiter: SlidingWindowRateLimiter, clock: List[float]):
+    name = uuid.uuid4().hex
+    rule = RateLimitRule.from_rate("ip", "3/minute")
+    results = [await limiter.hit(name, [(rule, "1.2.3.4")]) for _ in range(4)]
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results] == [2, 1, 0, 0]
+    assert results[-1].retry_after_seconds == 60
+
+    other = await limiter.hit(name, [(rule, "5.6.7.8")]) # Identitas lain punya kuotanya sendiri
+    assert other.allowed
+
+
+async def test_previous_window_is_weighted(limiter: SlidingWindowRateLimiter, clock: List[float]):
+    name = uuid.uuid4().hex
+    check = [(RateLimitRule.from_rate("user", "4/minute"), "user-1")]
+    clock[0] = WINDOW_START + 59
+    for _ in range(4):
+        assert (await limiter.hit(name, check)).allowed
+
+    clock[0] = WINDOW_START + 90 # Setengah window berikutnya: 4 * 0.5 = 2 request lama masih dihitung
+    assert [(await limiter.hit(name, check)).allowed for _ in range(3)] == [True, True, False]
+    # Menunggu sampai bobot window lama turun cukup untuk satu request lagi: (30s) - (4-1-2) * 60s / 4
+    assert (await limiter.hit(name, check)).retry_after_seconds == 15
+
+
+async def test_all_rules_must_pass_and_rejections_are_not_counted(limiter: SlidingWindowRateLimiter, clock: List[float]):
+    name = uuid.uuid4().hex
+    per_minute = RateLimitRule.from_rate("user", "2/minute")
+    per_day = RateLimitRule.from_rate("user", "5/day")
+    checks = [(per_minute, "user-1"), (per_day, "user-1")]
+
+    assert [(await limiter.hit(name, checks)).allowed for _ in range(3)] == [True, True, False]
+    clock[0] += 120 # Window menit sudah lewat, kuota harian baru terpakai 2
+    results = [await limiter.hit(name, checks) for _ in range(3)]
+    assert [r.allowed for r in results] == [True, True, False]
+    assert results[1].remaining == 0 # Minimum dari kedua aturan
+
+    clock[0] += 120
+    assert [(await limiter.hit(name, checks)).allowed for _ in range(2)] == [True, False] # Kuota harian habis di 5
+    assert (await limiter.hit(name, checks)).retry_after_seconds > 60
+
+
+async def test_falls_back_to_local_counters_when_redis_is_missing(monkeypatch: pytest.MonkeyPatch, clock: List[float]):
+    limiter = SlidingWindowRateLimiter()
+    name = uuid.uuid4().hex
+    check = [(RateLimitRule.from_rate("ip", "2/minute"), "1.2.3.4")]
+    assert (await limiter.hit(name, check)).allowed
+    assert not limiter._degraded
+
+    monkeypatch.setattr(redis_manager, "available_redis_client", lambda: None)
+    results = [await limiter.hit(name, check) for _ in range(3)]
+    assert limiter._degraded
+    assert [r.allowed for r in results] == [True, True, False] # Counter lokal mulai dari nol
+
+    monkeypatch.undo()
+    monkeypatch.setattr(rate_limit_module, "time", SimpleNamespace(time=lambda: clock[0]))
+    assert (await limiter.hit(name, check)).allowed # Kembali ke Redis: baru 1 hit tercatat di sana
+    assert not limiter._degraded
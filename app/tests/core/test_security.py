@@ -0,0 +1,67 @@
+# ===========================================================================
+# File: app/tests/core/test_security.py (BARU)
+# ===========================================================================
+# Challenge wallet stateless (create_wallet_challenge / verify_wallet_challenge).
+# Replay nonce dicek di auth_service lewat Redis, lihat test_auth.py.
+import re
+
+import pytest
+
+from app.core.config import settings
+from app.core.security import create_wallet_challenge, verify_wallet_challenge
+
+WALLET = "0x1234567890123456789012345678901234567890"
+OTHER_WALLET = "0x0000000000000000000000000000000000000002"
+
+
+def test_challenge_round_trip():
+    message, nonce = create_wallet_challenge(WALLET)
+    assert re.fullmatch(r"[0-9a-f]{32}", nonce)
+    status, expires_at = verify_wallet_challenge(WALLET, message, nonce)
+    assert status == "ok"
+    assert expires_at > 0
+    # Alamat dibandingkan case-insensitive, seperti walletAddress di DB
+    assert verify_wallet_challenge(WALLET.upper().replace("0X", "0x"), message, nonce)[0] == "ok"
+
+
+def test_challenge_is_bound_to_wallet():
+    message, nonce = create_wallet_challenge(WALLET)
+    assert verify_wallet_challenge(OTHER_WALLET, message, nonce)[0] == "mismatch"
+
+
+def test_tampered_salt_is_rejected():
+    message, nonce = create_wallet_challenge(WALLET)
+    salt = re.search(r"\(ref ([0-9a-f]{16})\)$", message).group(1)
+    tampered = message.replace(f"(ref {salt})", f"(ref {'0' * 16 if salt != '0' * 16 else '1' * 16})")
+    assert verify_wallet_challenge(WALLET, tampered, nonce)[0] == "mismatch"
+
+
+def test_tampered_expiry_is_rejected():
+    message, nonce = create_wallet_challenge(WALLET)
+    tampered = re.sub(r"Berlaku sampai: \d{4}", "Berlaku sampai: 2999", message)
+    assert tampered != message
+    assert verify_wallet_challenge(WALLET, tampered, nonce)[0] == "mismatch"
+
+
+def test_expired_challenge(monkeypatch):
+    monkeypatch.setattr(settings, "NONCE_EXPIRY_SECONDS", -5)
+    message, nonce = create_wallet_challenge(WALLET)
+    assert verify_wallet_challenge(WALLET, message, nonce)[0] == "expired"
+
+
+def test_nonce_must_match_the_message():
+    message, nonce = create_wallet_challenge(WALLET)
+    other_message, other_nonce = create_wallet_challenge(WALLET)
+    assert verify_wallet_challenge(WALLET, message, other_nonce)[0] == "mismatch"
+    assert verify_wallet_challenge(WALLET, message.replace(nonce, other_nonce), other_nonce)[0] == "mismatch"
+
+
+@pytest.mark.parametrize("bad_nonce", ["é" * 32, "ｆ" * 32, "", "A" * 32])
+def test_non_hex_nonce_is_a_mismatch_not_an_error(bad_nonce):
+    message, _ = create_wallet_challenge(WALLET)
+    assert verify_wallet_challenge(WALLET, message, bad_nonce)[0] == "mismatch"
+
+
+def test_message_that_is_not_our_challenge():
+    _, nonce = create_wallet_challenge(WALLET)
+    assert verify_wallet_challenge(WALLET, "Sign in please", nonce) == ("malformed", 0)
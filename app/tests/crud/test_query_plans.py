@@ -0,0 +1,117 @@
+# ===========================================================================
+# File: app/tests/crud/test_query_plans.py (BARU)
+# ===========================================================================
+# Setiap shape query yang dikirim layer CRUD di-explain terhadap dataset sintetis
+# (app/scripts/generate_dataset.py) di database terpisah. COLLSCAN atau rasio examined/returned
+# yang buruk menggagalkan test, kecuali shape-nya ada di ALLOWED_SCANS.
+import asyncio
+from datetime import datetime, timezone
+from typing import AsyncGenerator
+
+import pytest
+from bson import json_util
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import MongoClient
+
+from app.core.config import settings
+from app.core.cache import two_tier_cache
+from app.crud import ensure_indexes
+from app.crud.crud_badge import crud_badge, crud_user_badge_link
+from app.crud.crud_mission import crud_mission, crud_user_mission_link
+from app.crud.crud_news import crud_news
+from app.crud.crud_user import crud_user
+from app.db.session import mongo_db_manager
+from app.models.user import UserInDB, UserProfile, UserSystemStatus, UserTwitterData
+from app.scripts import generate_dataset
+from app.tests.query_plans import explain_plans
+
+pytestmark = pytest.mark.asyncio
+
+PLAN_DB_NAME = f"{settings.MONGODB_TEST_DB_NAME}_plans"
+SEED_USERS = 5_000
+NEWS_FILE = generate_dataset.REPO_ROOT / "dummy-news-feed-.json"
+
+# Scan yang disengaja: shape (lihat app/tests/query_plans.query_shape) -> alasan.
+# Entry yang tidak lagi dipakai juga menggagalkan test, jadi allowlist tidak basi.
+ALLOWED_SCANS = {
+    "aggregate badges {}": "Versi katalog badge untuk ETag /users/me/badges; katalog berisi puluhan dokumen",
+    "aggregate news {}": "Versi feed news (news_service); koleksi kecil, hasilnya di-cache",
+}
+
+
+def _seed_dataset(db_name: str) -> None:
+    client = MongoClient(settings.MONGODB_URL)
+    try:
+        db = client[db_name]
+        config = generate_dataset.build_config(db, mongo_url=settings.MONGODB_URL, users=SEED_USERS, seed=48, batch_size=1_000)
+        generate_dataset.load_dataset(db, config) # Termasuk alliesCount dari referredBy
+        db["news"].insert_many(json_util.loads(NEWS_FILE.read_text(encoding="utf-8")))
+    finally:
+        client.close()
+
+
+@pytest.fixture(scope="module")
+async def plan_db(lifespan_manager_fixture) -> AsyncGenerator[AsyncIOMotorDatabase, None]:
+    client = mongo_db_manager.client
+    await client.drop_database(PLAN_DB_NAME)
+    await asyncio.to_thread(_seed_dataset, PLAN_DB_NAME)
+    db = client[PLAN_DB_NAME]
+    await ensure_indexes(db) # Index yang dideklarasikan CRUD, sama seperti saat startup app
+    yield db
+    await client.drop_database(PLAN_DB_NAME)
+
+
+async def _exercise_crud(db: AsyncIOMotorDatabase, user: UserInDB, mission_link: dict, badge_link: dict) -> None:
+    """Memanggil setiap method CRUD yang membaca/menulis MongoDB dengan data yang ada di dataset."""
+    referred = await crud_user.get_referred_users(db, referrer_id=user.id)
+    assert referred, "Dataset harus punya referrer dengan ally"
+    await crud_user.count_referred_users(db, referrer_id=user.id)
+    assert await crud_user.get(db, id=user.id)
+    assert await crud_user.get_by_wallet_address(db, wallet_address=user.walletAddress)
+    assert await crud_user.get_by_username(db, username=user.username.upper()) # Case-insensitive
+    assert await crud_user.get_by_referral_code(db, referral_code=user.referralCode)
+    await crud_user.update_last_login(db, user_id=user.id)
+    await crud_user.increment_allies_count(db, user_id=user.id)
+    await crud_user.update_twitter_data(db, user_id=user.id, twitter_data=UserTwitterData(twitter_user_id="1", twitter_username="plan_test"))
+    created = await crud_user.create_new_user_with_complete_data(
+        db, wallet_address="0x" + "ab" * 20, username="PlanProbe_1", profile=UserProfile(commanderName="PlanProbe_1"),
+        system_status=UserSystemStatus(), referral_code="CGRPLAN01", referred_by_user_id=user.id,
+    )
+    await crud_user.remove(db, id=created.id)
+
+    assert await crud_mission.get_active_missions(db)
+    await crud_mission.get_by_mission_id_str(db, mission_id_str="daily-checkin")
+    await crud_mission.get_version(db, query={"isActive": True})
+    await crud_user_mission_link.get_missions_by_user_id(db, user_id=user.id)
+    await crud_user_mission_link.get_by_user_and_mission(db, user_id=user.id, mission_db_id=mission_link["missionId"])
+    await crud_user_mission_link.count_user_missions_by_status(db, user_id=user.id, status="completed")
+    await crud_user_mission_link.get_version(db, query={"userId": user.id}, fields=("_id", "updatedAt", "completedAt"))
+
+    await crud_badge.get_by_badge_id_str(db, badge_id_str="first-ally-recruit")
+    await crud_badge.get_version(db)
+    await crud_user_badge_link.get_badges_by_user_id(db, user_id=user.id)
+    await crud_user_badge_link.get_by_user_and_badge(db, user_id=user.id, badge_db_id=badge_link["badgeId"])
+    await crud_user_badge_link.get_version(db, query={"userId": user.id}, fields=("_id", "updatedAt", "acquiredAt"))
+
+    await crud_news.get_live_news(db, now=datetime.now(timezone.utc))
+    await crud_news.get_version(db)
+
+
+async def test_crud_queries_use_indexes(plan_db: AsyncIOMotorDatabase, round_trips, monkeypatch):
+    monkeypatch.setattr(two_tier_cache, "enabled", False) # Semua read harus sampai ke MongoDB
+    # Referrer terbesar: query per-referrer dan per-user bekerja pada set terbesar di dataset
+    user = UserInDB.model_validate(await plan_db["users"].find_one({}, sort=[("alliesCount", -1)]))
+    mission_link = await plan_db["user_missions"].find_one({})
+    badge_link = await plan_db["user_badges"].find_one({})
+
+    with round_trips() as trips:
+        await _exercise_crud(plan_db, user, mission_link, badge_link)
+
+    reports = await explain_plans(mongo_db_manager.client, trips.mongo_documents)
+    failures = [
+        f"  {report.describe()}\n    -> {', '.join(report.violations())}"
+        for report in reports if report.violations() and report.shape not in ALLOWED_SCANS
+    ]
+    assert not failures, "Query CRUD tanpa index yang sesuai (tambahkan index di CRUD atau ALLOWED_SCANS):\n" + "\n".join(failures)
+    stale = set(ALLOWED_SCANS) - {report.shape for report in reports if report.violations()}
+    assert not stale, f"ALLOWED_SCANS berisi shape yang tidak lagi scan: {sorted(stale)}"
@@ -0,0 +1,61 @@
+# ===========================================================================
+# File: app/tests/db/test_backends.py (BARU)
+# ===========================================================================
+# Smoke test layer CRUD di kedua driver MongoDB (app/db/backends.py). Suite lain berjalan di
+# settings.MONGODB_DRIVER; test ini memastikan driver yang lain juga bisa dipakai apa adanya.
+import uuid
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.crud import ensure_indexes
+from app.crud.crud_mission import crud_user_mission_link
+from app.crud.crud_user import crud_user
+from app.db.backends import MONGO_DRIVERS, close_client, create_client
+from app.models.mission import UserMissionLink
+from app.models.user import UserProfile, UserSystemStatus
+
+
+@pytest.fixture(params=MONGO_DRIVERS)
+async def driver_db(request):
+    client = create_client(request.param, settings.MONGODB_URL, serverSelectionTimeoutMS=5000)
+    # Database per driver: key cache two-tier memuat nama database, jadi kedua driver tidak berbagi hit
+    database = client[f"{settings.MONGODB_TEST_DB_NAME}_{request.param}"]
+    try:
+        yield database
+    finally:
+        await client.drop_database(database.name)
+        await close_client(client)
+
+
+async def test_crud_round_trip(driver_db):
+    await ensure_indexes(driver_db)
+    wallet = "0x" + uuid.uuid4().hex[:8] + "0" * 32
+    user = await crud_user.create_new_user_with_complete_data(
+        driver_db,
+        wallet_address=wallet,
+        username=f"Agent_{uuid.uuid4().hex[:6]}",
+        profile=UserProfile(commanderName="Agent"),
+        system_status=UserSystemStatus(),
+        referral_code=uuid.uuid4().hex[:8].upper(),
+    )
+
+    assert (await crud_user.get(driver_db, id=user.id)).walletAddress == wallet
+    assert (await crud_user.get_by_wallet_address(driver_db, wallet_address=wallet)).id == user.id
+    assert (await crud_user.get_by_referral_code(driver_db, referral_code=user.referralCode)).id == user.id
+    assert (await crud_user.increment_allies_count(driver_db, user_id=user.id)).alliesCount == user.alliesCount + 1
+    assert (await crud_user.update_last_login(driver_db, user_id=user.id)).lastLogin is not None
+
+    link = await crud_user_mission_link.create(
+        driver_db, obj_in=UserMissionLink(userId=user.id, missionId=ObjectId(), status="completed")
+    )
+    links = await crud_user_mission_link.get_missions_by_user_id(driver_db, user_id=user.id)
+    assert [item.id for item in links] == [link.id]
+    count = await crud_user_mission_link.count_user_missions_by_status(driver_db, user_id=user.id, status="completed")
+    assert count == 1
+    version = await crud_user_mission_link.get_version(driver_db, query={"userId": user.id}) # aggregate lewat backends
+    assert version[0] == 1 and version[1] == link.id
+
+    assert (await crud_user.remove(driver_db, id=user.id)).id == user.id
+    assert await crud_user.get(driver_db, id=user.id) is None
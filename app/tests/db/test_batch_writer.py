@@ -0,0 +1,114 @@
+# ===========================================================================
+# File: app/tests/db/test_batch_writer.py (BARU)
+# ===========================================================================
+# BatchInsertWriter (app/db/batch_writer.py): kapan batch dikirim, pemetaan error per dokumen,
+# dan close() yang mengosongkan antrean. Collection diganti rekaman insert_many.
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteConcernError, WriteError
+
+from app.db.batch_writer import DUPLICATE_KEY_ERROR_CODE, BatchInsertWriter
+
+
+class RecordingCollection:
+    """Mencatat setiap insert_many; `error` (jika ada) di-raise setelah batch dicatat."""
+
+    name = "recording"
+
+    def __init__(self, error: Optional[Exception] = None, release: Optional[asyncio.Event] = None):
+        self.batches: List[List[Dict[str, Any]]] = []
+        self.error = error
+        self.release = release
+
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True) -> None:
+        assert ordered is False
+        self.batches.append(list(documents))
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+
+
+def insert_all(writer: BatchInsertWriter, count: int) -> List[asyncio.Task]:
+    return [asyncio.create_task(writer.insert({"_id": index})) for index in range(count)]
+
+
+async def test_full_batch_is_flushed_without_waiting_for_the_delay():
+    collection = RecordingCollection()
+    writer = BatchInsertWriter(collection, max_batch_size=3, max_delay_ms=10_000)
+
+    results = await asyncio.wait_for(asyncio.gather(*insert_all(writer, 3)), timeout=1.0)
+    assert results == [0, 1, 2]
+    assert collection.batches == [[{"_id": 0}, {"_id": 1}, {"_id": 2}]]
+
+
+async def test_partial_batch_is_flushed_after_the_delay():
+    collection = RecordingCollection()
+    writer = BatchInsertWriter(collection, max_batch_size=100, max_delay_ms=20)
+
+    tasks = insert_all(writer, 2)
+    await asyncio.sleep(0)
+    assert collection.batches == [] # Masih menunggu insert lain ikut
+
+    assert await asyncio.wait_for(asyncio.gather(*tasks), timeout=1.0) == [0, 1]
+    assert len(collection.batches) == 1
+
+
+async def test_bulk_write_errors_are_mapped_to_their_documents():
+    error = BulkWriteError({
+        "writeErrors": [
+            {"index": 1, "code": DUPLICATE_KEY_ERROR_CODE, "errmsg": "E11000 duplicate key error dup key: { _id: 1 }"},
+            {"index": 2, "code": 121, "errmsg": "Document failed validation"},
+        ],
+        "writeConcernErrors": [],
+        "nInserted": 2,
+    })
+    writer = BatchInsertWriter(RecordingCollection(error), max_batch_size=4)
+
+    results = await asyncio.gather(*insert_all(writer, 4), return_exceptions=True)
+    assert results[0] == 0 and results[3] == 3
+    assert isinstance(results[1], DuplicateKeyError)
+    assert results[1].code == DUPLICATE_KEY_ERROR_CODE
+    assert "dup key" in str(results[1])
+    assert type(results[2]) is WriteError and results[2].code == 121
+
+
+async def test_write_concern_error_fails_the_documents_without_write_errors():
+    error = BulkWriteError({
+        "writeErrors": [{"index": 0, "code": DUPLICATE_KEY_ERROR_CODE, "errmsg": "E11000 duplicate key error"}],
+        "writeConcernErrors": [{"code": 64, "errmsg": "waiting for replication timed out"}],
+    })
+    writer = BatchInsertWriter(RecordingCollection(error), max_batch_size=2)
+
+    results = await asyncio.gather(*insert_all(writer, 2), return_exceptions=True)
+    assert isinstance(results[0], DuplicateKeyError)
+    assert isinstance(results[1], WriteConcernError) and results[1].code == 64
+
+
+async def test_other_errors_fail_the_whole_batch():
+    writer = BatchInsertWriter(RecordingCollection(ConnectionError("connection reset")), max_batch_size=2)
+
+    results = await asyncio.gather(*insert_all(writer, 2), return_exceptions=True)
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+async def test_close_drains_pending_and_inflight_batches():
+    release = asyncio.Event()
+    collection = RecordingCollection(release=release)
+    writer = BatchInsertWriter(collection, max_batch_size=2, max_delay_ms=10_000)
+
+    inflight = insert_all(writer, 2) # Batch penuh: langsung dikirim, tertahan di insert_many
+    await asyncio.sleep(0)
+    pending = asyncio.create_task(writer.insert({"_id": 2})) # Menunggu delay 10 detik
+    await asyncio.sleep(0)
+
+    close = asyncio.create_task(writer.close())
+    await asyncio.sleep(0.01)
+    assert not close.done() # Menunggu batch yang masih berjalan
+    assert collection.batches == [[{"_id": 0}, {"_id": 1}], [{"_id": 2}]]
+
+    release.set()
+    await asyncio.wait_for(close, timeout=1.0)
+    assert all(task.done() for task in inflight) and pending.done()
+    assert await pending == 2
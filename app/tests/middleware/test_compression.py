@@ -0,0 +1,219 @@
+# ===========================================================================
+# File: app/tests/middleware/test_compression.py (BARU)
+# ===========================================================================
+# CompressionMiddleware dipanggil langsung lewat ASGI (tanpa httpx, yang men-decode body otomatis).
+import asyncio
+import gzip
+import json
+import zlib
+from typing import List, Optional
+
+import pytest
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.types import Message
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware
+
+requires_brotli = pytest.mark.skipif(compression.brotli is None, reason="Brotli tidak terpasang")
+
+LARGE_PAYLOAD = {"items": [{"id": index, "name": f"mission-{index}"} for index in range(200)]}
+SMALL_PAYLOAD = {"ok": True}
+
+
+class CountingApp:
+    """App ASGI yang mengembalikan `response_factory()` dan menghitung berapa kali dipanggil."""
+
+    def __init__(self, response_factory):
+        self.response_factory = response_factory
+        self.calls = 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        await self.response_factory()(scope, receive, send)
+
+
+async def call(app, accept_encoding: Optional[str], path: str = "/data", method: str = "GET") -> List[Message]:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding is not None else []
+    scope = {"type": "http", "method": method, "path": path, "headers": headers, "query_string": b""}
+    messages: List[Message] = []
+    requested = False
+
+    async def receive() -> Message:
+        nonlocal requested
+        if requested: # StreamingResponse menunggu http.disconnect; client ini tidak pernah putus
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages
+
+
+def response_headers(messages: List[Message]) -> Headers:
+    return Headers(raw=messages[0]["headers"])
+
+
+def response_body(messages: List[Message]) -> bytes:
+    return b"".join(message.get("body", b"") for message in messages[1:])
+
+
+def json_middleware(payload=LARGE_PAYLOAD, headers=None, **options) -> CompressionMiddleware:
+    return CompressionMiddleware(CountingApp(lambda: JSONResponse(payload, headers=headers)), **options)
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip;q=0", None),
+        ("GZIP; q=0.5", "gzip"),
+        ("*;q=0", None),
+        ("deflate, gzip;q=0", None),
+        ("br;q=0, gzip", "gzip"),
+        ("gzip;q=abc", None), # q yang tidak valid diperlakukan sebagai 0
+    ],
+)
+def test_choose_encoding(accept_encoding: str, expected: Optional[str]):
+    assert json_middleware().choose_encoding(accept_encoding) == expected
+
+
+@requires_brotli
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [("gzip, br", "br"), ("br;q=0.1, gzip;q=1", "br"), ("*", "br"), ("br;q=0, *", "gzip"), ("br;q=0, *;q=0", None)],
+)
+def test_choose_encoding_prefers_brotli(accept_encoding: str, expected: Optional[str]):
+    assert json_middleware().choose_encoding(accept_encoding) == expected
+
+
+def test_choose_encoding_without_brotli(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert json_middleware().choose_encoding("br") is None
+    assert json_middleware().choose_encoding("br, gzip") == "gzip"
+
+
+async def test_large_json_is_gzipped_with_vary():
+    messages = await call(json_middleware(), "gzip")
+    headers = response_headers(messages)
+    body = response_body(messages)
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(body)
+    assert json.loads(gzip.decompress(body)) == LARGE_PAYLOAD
+
+
+@requires_brotli
+async def test_large_json_is_brotli_compressed():
+    messages = await call(json_middleware(), "gzip, br")
+    assert response_headers(messages)["content-encoding"] == "br"
+    assert json.loads(compression.brotli.decompress(response_body(messages))) == LARGE_PAYLOAD
+
+
+async def test_body_below_threshold_is_not_compressed():
+    middleware = json_middleware(SMALL_PAYLOAD, minimum_size=1024)
+    messages = await call(middleware, "gzip")
+    headers = response_headers(messages)
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding" # Respons tetap bisa berbeda per Accept-Encoding
+    assert json.loads(response_body(messages)) == SMALL_PAYLOAD
+
+
+async def test_threshold_is_inclusive():
+    body_size = len(JSONResponse(LARGE_PAYLOAD).body)
+    at_threshold = await call(json_middleware(minimum_size=body_size), "gzip")
+    above_threshold = await call(json_middleware(minimum_size=body_size + 1), "gzip")
+    assert response_headers(at_threshold)["content-encoding"] == "gzip"
+    assert "content-encoding" not in response_headers(above_threshold)
+
+
+async def test_request_without_accept_encoding_passes_through():
+    messages = await call(json_middleware(), None)
+    headers = response_headers(messages)
+    assert "content-encoding" not in headers and "vary" not in headers
+    assert json.loads(response_body(messages)) == LARGE_PAYLOAD
+
+
+async def test_already_encoded_response_is_left_alone():
+    encoded = gzip.compress(json.dumps(LARGE_PAYLOAD).encode(), mtime=0)
+    app = CountingApp(lambda: Response(encoded, media_type="application/json", headers={"Content-Encoding": "gzip"}))
+    messages = await call(CompressionMiddleware(app), "gzip, br")
+    assert response_headers(messages)["content-encoding"] == "gzip"
+    assert response_body(messages) == encoded # Tidak dikompres dua kali
+
+
+async def test_non_compressible_type_is_left_alone():
+    image = bytes(range(256)) * 16
+    app = CountingApp(lambda: Response(image, media_type="image/png"))
+    messages = await call(CompressionMiddleware(app), "gzip")
+    assert "content-encoding" not in response_headers(messages)
+    assert response_body(messages) == image
+
+
+async def test_streaming_response_is_compressed_chunk_by_chunk():
+    chunks = [json.dumps({"id": index, "pad": "x" * 512}).encode() + b"\n" for index in range(3)]
+
+    async def generate():
+        for chunk in chunks:
+            yield chunk
+
+    app = CountingApp(lambda: StreamingResponse(generate(), media_type="application/x-ndjson"))
+    messages = await call(CompressionMiddleware(app, minimum_size=1_000_000), "gzip")
+    headers = response_headers(messages)
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    # Setiap potongan di-flush, jadi bisa didekode sebelum stream selesai (tidak di-buffer)
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    body_messages = [message for message in messages[1:] if message.get("body")]
+    assert [decoder.decompress(message["body"]) for message in body_messages[:3]] == chunks
+    assert messages[-1]["more_body"] is False
+
+
+async def test_head_request_passes_through():
+    messages = await call(json_middleware(), "gzip", method="HEAD")
+    assert "content-encoding" not in response_headers(messages)
+
+
+async def test_precompressed_cache_hit_by_etag():
+    middleware = json_middleware(headers={"ETag": '"v1"'})
+    first = await call(middleware, "gzip")
+    second = await call(middleware, "gzip")
+    assert response_body(first) == response_body(second)
+    assert response_headers(second)["etag"] == 'W/"v1"'
+    assert middleware.stats()["cacheMisses"] == 1 and middleware.stats()["cacheHits"] == 1
+    assert middleware.stats()["cacheEntries"] == 1
+
+    await call(middleware, "gzip", path="/other") # Path lain = key lain
+    assert middleware.stats()["cacheMisses"] == 2
+
+
+async def test_cache_is_skipped_without_etag_or_with_no_store():
+    without_etag = json_middleware()
+    no_store = json_middleware(headers={"ETag": '"v1"', "Cache-Control": "no-store"})
+    for middleware in (without_etag, no_store):
+        await call(middleware, "gzip")
+        await call(middleware, "gzip")
+        assert middleware.stats()["cacheEntries"] == 0 and middleware.stats()["cacheHits"] == 0
+
+
+async def test_cache_entry_is_ignored_when_body_length_changes():
+    payloads = iter([LARGE_PAYLOAD, {**LARGE_PAYLOAD, "extra": "x" * 100}])
+    middleware = CompressionMiddleware(CountingApp(lambda: JSONResponse(next(payloads), headers={"ETag": '"v1"'})))
+    await call(middleware, "gzip")
+    messages = await call(middleware, "gzip")
+    assert json.loads(gzip.decompress(response_body(messages)))["extra"] == "x" * 100
+    assert middleware.stats()["cacheHits"] == 0
+
+
+async def test_cache_evicts_least_recently_used():
+    sample = gzip.compress(JSONResponse(LARGE_PAYLOAD).body, compresslevel=6, mtime=0)
+    middleware = json_middleware(headers={"ETag": '"v1"'}, cache_max_bytes=len(sample) * 2)
+    for path in ("/a", "/b", "/a", "/c"): # /b paling lama tidak dipakai saat /c masuk
+        await call(middleware, "gzip", path=path)
+    assert set(key[0] for key in middleware.cache) == {"/a", "/c"}
@@ -0,0 +1,102 @@
+# ===========================================================================
+# File: app/tests/middleware/test_profiling_middleware.py (BARU)
+# ===========================================================================
+# ProfilingMiddleware dipasang di app kecil (app utama hanya memasangnya jika PROFILING_ENABLED);
+# autentikasi tetap memakai database test dari lifespan sesi.
+import time
+from typing import Dict
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.security import create_access_token
+from app.crud.crud_user import crud_user
+from app.middleware.profiling import ProfilingMiddleware
+from app.models.user import UserInDB
+from app.services.profiling_service import profiling_service
+
+retained = [] # Alokasi yang bertahan sampai snapshot akhir, agar muncul di diff tracemalloc
+
+
+def spin_cpu(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def build_app() -> ProfilingMiddleware:
+    inner = FastAPI()
+
+    @inner.get("/work")
+    async def work():
+        spin_cpu(0.1)
+        retained.append(bytearray(256 * 1024))
+        return {"ok": True}
+
+    return ProfilingMiddleware(inner)
+
+
+@pytest.fixture
+async def profiled_client(test_db):
+    async with AsyncClient(transport=ASGITransport(app=build_app()), base_url="http://testserver") as client:
+        yield client
+    retained.clear()
+
+
+@pytest.fixture
+async def admin_auth_headers(test_db, test_user: UserInDB) -> Dict[str, str]:
+    await test_db[crud_user.collection_name].update_one({"_id": test_user.id}, {"$set": {"is_superuser": True}})
+    token = create_access_token(subject=test_user.walletAddress, user_id=str(test_user.id))
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_request_without_header_is_not_profiled(profiled_client: AsyncClient):
+    response = await profiled_client.get("/work")
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+
+async def test_unknown_kind_is_rejected(profiled_client: AsyncClient, admin_auth_headers: Dict[str, str]):
+    response = await profiled_client.get("/work", headers={**admin_auth_headers, "X-Profile": "disk"})
+    assert response.status_code == 400
+
+
+async def test_anonymous_profile_request_is_unauthorized(profiled_client: AsyncClient):
+    response = await profiled_client.get("/work", headers={"X-Profile": "cpu"})
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+
+async def test_non_admin_profile_request_is_forbidden(profiled_client: AsyncClient, test_user_auth_headers: Dict[str, str]):
+    response = await profiled_client.get("/work", headers={**test_user_auth_headers, "X-Profile": "cpu"})
+    assert response.status_code == 403
+    assert "x-profile-id" not in response.headers
+
+
+async def test_profile_request_conflicts_with_running_session(profiled_client: AsyncClient, admin_auth_headers: Dict[str, str]):
+    session = profiling_service.begin("cpu")
+    try:
+        response = await profiled_client.get("/work", headers={**admin_auth_headers, "X-Profile": "cpu"})
+    finally:
+        profiling_service.end(session)
+    assert response.status_code == 409
+
+
+async def test_cpu_profile_is_stored(profiled_client: AsyncClient, admin_auth_headers: Dict[str, str]):
+    response = await profiled_client.get("/work", headers={**admin_auth_headers, "X-Profile": "cpu"})
+    assert response.status_code == 200
+    folded = await profiling_service.load(response.headers["x-profile-id"])
+    assert folded is not None
+    spin_lines = [line for line in folded.splitlines() if "spin_cpu" in line]
+    assert spin_lines
+    stack, count = spin_lines[0].rsplit(" ", 1)
+    assert "work_(" in stack and int(count) > 0
+
+
+async def test_memory_profile_is_stored(profiled_client: AsyncClient, admin_auth_headers: Dict[str, str]):
+    response = await profiled_client.get("/work", headers={**admin_auth_headers, "X-Profile": "memory"})
+    assert response.status_code == 200
+    folded = await profiling_service.load(response.headers["x-profile-id"])
+    retained_bytes = [int(line.rsplit(" ", 1)[1]) for line in folded.splitlines() if "test_profiling_middleware.py" in line]
+    assert max(retained_bytes) >= 256 * 1024
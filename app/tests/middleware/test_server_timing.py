@@ -0,0 +1,147 @@
+# ===========================================================================
+# File: app/tests/middleware/test_server_timing.py (BARU)
+# ===========================================================================
+# ServerTimingMiddleware di app kecil; client MongoDB/Redis lifespan sudah diinstrumentasi
+# (SERVER_TIMING_ENABLED default aktif), jadi round trip-nya terhitung per request.
+import asyncio
+import logging
+import re
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.db.redis_conn import redis_manager
+from app.db.session import mongo_db_manager
+from app.utils.server_timing import (
+    RequestTimings, ServerTimingMiddleware, current_timings, format_server_timing, instrument_redis
+)
+
+ENTRY_RE = re.compile(r'^(?P<name>[a-z]+);dur=(?P<dur>\d+\.\d)(;desc="(?P<calls>\d+) calls")?$')
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def timing_log():
+    logger = logging.getLogger("test_server_timing")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = RecordingHandler()
+    logger.addHandler(handler)
+    yield logger, handler.messages
+    logger.removeHandler(handler)
+
+
+def build_app(**middleware_options) -> ServerTimingMiddleware:
+    inner = FastAPI()
+
+    @inner.get("/io")
+    async def io():
+        await mongo_db_manager.db["server_timing_probe"].find_one({})
+        await mongo_db_manager.db["server_timing_probe"].find_one({"missing": True})
+        await redis_manager.cache_client.ping()
+        return {"ok": True}
+
+    @inner.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return ServerTimingMiddleware(inner, **middleware_options)
+
+
+def parse_header(value: str) -> dict:
+    entries = {}
+    for part in value.split(", "):
+        match = ENTRY_RE.match(part)
+        assert match, part
+        entries[match["name"]] = (float(match["dur"]), int(match["calls"] or 0))
+    return entries
+
+
+def test_format_server_timing():
+    snapshot = {"mongo": (1.234, 2), "redis": (0.06, 1), "other": (3.0, 0), "total": (4.284, 0)}
+    assert format_server_timing(snapshot) == (
+        'mongo;dur=1.2;desc="2 calls", redis;dur=0.1;desc="1 calls", other;dur=3.0, total;dur=4.3'
+    )
+
+
+def test_other_is_wall_time_minus_io():
+    timings = RequestTimings()
+    timings.add("mongo", 0.002)
+    timings.add("mongo", 0.003)
+    snapshot = timings.snapshot()
+    assert snapshot["mongo"] == (pytest.approx(5.0), 2)
+    assert snapshot["other"][0] == pytest.approx(max(0.0, snapshot["total"][0] - 5.0))
+    assert "app" not in snapshot
+
+
+async def test_header_is_not_exposed_by_default(test_db, timing_log):
+    logger, messages = timing_log
+    async with AsyncClient(transport=ASGITransport(app=build_app(logger=logger)), base_url="http://testserver") as client:
+        response = await client.get("/io")
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert len(messages) == 1 # Log line tetap ditulis
+    assert messages[0].startswith("request_timing method=GET path=/io status=200 ")
+    assert "mongo_calls=2" in messages[0] and "redis_calls=1" in messages[0] and "other_ms=" in messages[0]
+
+
+async def test_exposed_header_counts_mongo_and_redis(test_db, timing_log):
+    logger, messages = timing_log
+    app = build_app(logger=logger, expose_header=True)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.get("/io")
+    entries = parse_header(response.headers["server-timing"])
+    assert list(entries) == ["mongo", "redis", "other", "total"]
+    assert entries["mongo"][1] == 2
+    assert entries["redis"][1] == 1
+    assert entries["total"][0] >= entries["mongo"][0]
+    assert current_timings.get() is None
+
+
+async def test_failed_request_is_logged_as_500(test_db, timing_log):
+    logger, messages = timing_log
+    app = build_app(logger=logger, expose_header=True)
+    async with AsyncClient(transport=ASGITransport(app=app, raise_app_exceptions=False), base_url="http://testserver") as client:
+        response = await client.get("/boom")
+    assert response.status_code == 500
+    assert messages[0].startswith("request_timing method=GET path=/boom status=500 ")
+
+
+class FakeRedis:
+    def __init__(self):
+        self.commands = []
+
+    async def execute_command(self, *args, **options):
+        self.commands.append(args)
+        await asyncio.sleep(0.01)
+        if args[0] == "FAIL":
+            raise ConnectionError("redis down")
+        return b"PONG"
+
+
+async def test_redis_wrapper_records_only_inside_a_request():
+    client = instrument_redis(FakeRedis())
+    assert await client.execute_command("PING") == b"PONG" # Di luar request: tanpa pencatatan
+
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+    try:
+        assert await client.execute_command("GET", "key") == b"PONG"
+        with pytest.raises(ConnectionError):
+            await client.execute_command("FAIL")
+    finally:
+        current_timings.reset(token)
+    duration_ms, calls = timings.snapshot()["redis"]
+    assert calls == 2 # Command yang gagal tetap dihitung
+    assert duration_ms >= 15
+    assert client.commands == [("PING",), ("GET", "key"), ("FAIL",)]
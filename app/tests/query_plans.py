@@ -0,0 +1,126 @@
+# ===========================================================================
+# File: app/tests/query_plans.py (BARU)
+# ===========================================================================
+"""
+Analisis query plan untuk command yang ditangkap fixture `round_trips`: setiap find / aggregate /
+count / findAndModify / update / delete dijalankan ulang sebagai `explain` (executionStats) lalu
+diperiksa: COLLSCAN, atau dokumen/key yang diperiksa jauh lebih banyak daripada yang dikembalikan.
+
+Scan yang disengaja didaftarkan per shape query (lihat `query_shape`) beserta alasannya.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+# Field sesi/transport dari driver yang tidak diterima (atau tidak relevan) di dalam explain
+_DRIVER_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "writeConcern", "readConcern", "apiVersion", "apiStrict"}
+# Ambang rasio: lebih dari MAX_EXAMINED_RATIO x nReturned dianggap plan buruk, tapi hanya
+# jika yang diperiksa juga lebih dari MIN_EXAMINED (set kecil selalu murah). Command agregasi
+# (count, $group) memang mengembalikan jauh lebih sedikit dari yang dibaca, jadi hanya dicek COLLSCAN.
+MAX_EXAMINED_RATIO = 10
+MIN_EXAMINED = 100
+AGGREGATING_COMMANDS = {"aggregate", "count", "distinct"}
+
+
+@dataclass
+class PlanReport:
+    shape: str
+    stages: List[str]
+    docs_examined: int
+    keys_examined: int
+    returned: int
+    check_ratio: bool = True
+
+    def violations(self) -> List[str]:
+        found = []
+        if "COLLSCAN" in self.stages:
+            found.append("COLLSCAN")
+        if not self.check_ratio:
+            return found
+        limit = max(self.returned, 1) * MAX_EXAMINED_RATIO
+        for label, examined in (("docs", self.docs_examined), ("keys", self.keys_examined)):
+            if examined > MIN_EXAMINED and examined > limit:
+                found.append(f"{label} examined {examined} untuk {self.returned} hasil")
+        return found
+
+    def describe(self) -> str:
+        return (
+            f"{self.shape}: stages={'>'.join(self.stages)} docsExamined={self.docs_examined} "
+            f"keysExamined={self.keys_examined} nReturned={self.returned}"
+        )
+
+
+def _filter_of(command_name: str, command: Mapping[str, Any]) -> Mapping[str, Any]:
+    if command_name in ("find", "distinct", "count"):
+        return command.get("filter") or command.get("query") or {}
+    if command_name == "findAndModify":
+        return command.get("query") or {}
+    if command_name == "update":
+        return command["updates"][0].get("q", {})
+    if command_name == "delete":
+        return command["deletes"][0].get("q", {})
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline") or []
+        return pipeline[0].get("$match", {}) if pipeline else {}
+    return {}
+
+
+def query_shape(command_name: str, command: Mapping[str, Any]) -> str:
+    """'find users {walletAddress}': koleksi + field filter top-level (nilai diabaikan), kunci allowlist."""
+    fields = sorted(_filter_of(command_name, command).keys())
+    return f"{command_name} {command[command_name]} {{{', '.join(fields)}}}"
+
+
+def explainable(commands: List[Tuple[str, Dict[str, Any]]]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """(database, shape, command) unik per shape dari hasil capture; shape pertama yang dipakai."""
+    seen = set()
+    for database, command in commands:
+        command_name = next(iter(command))
+        if command_name not in EXPLAINABLE_COMMANDS or not isinstance(command[command_name], str):
+            continue
+        shape = query_shape(command_name, command)
+        if shape in seen:
+            continue
+        seen.add(shape)
+        cleaned = {key: value for key, value in command.items() if not key.startswith("$") and key not in _DRIVER_FIELDS}
+        yield database, shape, cleaned
+
+
+def _walk(node: Any, skip: Tuple[str, ...] = ("rejectedPlans", "allPlansExecution")) -> Iterator[Tuple[str, Any]]:
+    if isinstance(node, Mapping):
+        for key, value in node.items():
+            if key in skip:
+                continue
+            yield key, value
+            yield from _walk(value, skip)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item, skip)
+
+
+def parse_explain(shape: str, explain: Mapping[str, Any], *, check_ratio: bool = True) -> PlanReport:
+    """Mendukung format find/write (queryPlanner di root) dan aggregate (stages[].$cursor)."""
+    planners = [value for key, value in _walk(explain) if key == "queryPlanner"]
+    stages: List[str] = []
+    for planner in planners:
+        stages.extend(value for key, value in _walk(planner.get("winningPlan", {})) if key == "stage")
+    stats: Optional[Mapping[str, Any]] = next((value for key, value in _walk(explain) if key == "executionStats"), None)
+    stats = stats or {}
+    return PlanReport(
+        shape=shape,
+        stages=stages,
+        docs_examined=int(stats.get("totalDocsExamined", 0)),
+        keys_examined=int(stats.get("totalKeysExamined", 0)),
+        returned=int(stats.get("nReturned", 0)),
+        check_ratio=check_ratio,
+    )
+
+
+async def explain_plans(client: AsyncIOMotorClient, commands: List[Tuple[str, Dict[str, Any]]]) -> List[PlanReport]:
+    reports = []
+    for database, shape, command in explainable(commands):
+        explain = await client[database].command({"explain": command, "verbosity": "executionStats"})
+        reports.append(parse_explain(shape, explain, check_ratio=next(iter(command)) not in AGGREGATING_COMMANDS))
+    return reports
@@ -0,0 +1,117 @@
+# ===========================================================================
+# File: app/tests/round_trips.py (BARU)
+# ===========================================================================
+"""
+Penghitung round trip MongoDB dan Redis per request untuk assertion budget di test.
+
+Regresi performa di app ini hampir selalu berupa round trip tambahan (find ulang setelah
+update, query versi terpisah, dst.), jadi test bisa mengunci jumlahnya:
+
+    with round_trips() as trips: # fixture `round_trips` di conftest
+        response = await async_test_client.get("/api/v1/missions/directives", headers=headers)
+    trips.assert_budget(mongo=2)
+
+Capture dibatasi ContextVar: hanya command yang dikirim dari task test (dan task/thread
+turunannya, termasuk thread executor Motor) yang dihitung, bukan task latar belakang app.
+"""
+import contextlib
+import contextvars
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pymongo import monitoring
+
+# Command yang namanya bukan nama koleksi sebagai value pertama
+_COLLECTION_KEYS = {"getMore": "collection"}
+
+
+@dataclass
+class RoundTripCapture:
+    commands: List[Tuple[str, str, str]] = field(default_factory=list) # (backend, command, target)
+    mongo_documents: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list) # (database, dokumen command) untuk explain
+
+    def record(self, backend: str, command: str, target: str = "") -> None:
+        self.commands.append((backend, command, target))
+
+    def mongo(self, collection: Optional[str] = None) -> List[Tuple[str, str]]:
+        return [
+            (command, target) for backend, command, target in self.commands
+            if backend == "mongo" and (collection is None or target == collection)
+        ]
+
+    def redis(self) -> List[Tuple[str, str]]:
+        return [(command, target) for backend, command, target in self.commands if backend == "redis"]
+
+    def describe(self) -> str:
+        if not self.commands:
+            return "  (tidak ada command)"
+        return "\n".join(
+            f"  {index:>2}. {backend:<5} {command} {target}".rstrip()
+            for index, (backend, command, target) in enumerate(self.commands, start=1)
+        )
+
+    def assert_budget(
+        self, *, mongo: Optional[int] = None, redis: Optional[int] = None, collections: Optional[dict] = None
+    ) -> None:
+        """Gagal jika jumlah command melebihi budget; pesan error memuat urutan command sebenarnya."""
+        violations = []
+        if mongo is not None and len(self.mongo()) > mongo:
+            violations.append(f"mongo: {len(self.mongo())} command (budget {mongo})")
+        if redis is not None and len(self.redis()) > redis:
+            violations.append(f"redis: {len(self.redis())} command (budget {redis})")
+        for collection, budget in (collections or {}).items():
+            count = len(self.mongo(collection))
+            if count > budget:
+                violations.append(f"mongo '{collection}': {count} command (budget {budget})")
+        if violations:
+            raise AssertionError(
+                "Budget round trip terlampaui: " + "; ".join(violations) + "\nUrutan command:\n" + self.describe()
+            )
+
+
+_active_capture: contextvars.ContextVar[Optional[RoundTripCapture]] = contextvars.ContextVar(
+    "round_trip_capture", default=None
+)
+
+
+class MongoCommandCounter(monitoring.CommandListener):
+    """Listener global pymongo; harus di-register sebelum client Motor dibuat (lifespan app)."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        capture = _active_capture.get()
+        if capture is None:
+            return
+        target = event.command.get(_COLLECTION_KEYS.get(event.command_name, event.command_name))
+        capture.record("mongo", event.command_name, target if isinstance(target, str) else "")
+        capture.mongo_documents.append((event.database_name, dict(event.command)))
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+
+def counting_execute_command(execute_command: Callable[..., Any]) -> Callable[..., Any]:
+    """Membungkus `Redis.execute_command` sebuah client (semua command non-pipeline lewat sini)."""
+
+    async def wrapper(*args: Any, **options: Any) -> Any:
+        capture = _active_capture.get()
+        if capture is not None and args:
+            target = args[1] if len(args) > 1 and isinstance(args[1], (str, bytes)) else ""
+            if str(args[0]).upper() in ("EVAL", "EVALSHA"):
+                target = "" # args[1] adalah script/sha, bukan key
+            capture.record("redis", str(args[0]).upper(), target.decode() if isinstance(target, bytes) else target)
+        return await execute_command(*args, **options)
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def capture() -> Iterator[RoundTripCapture]:
+    current = RoundTripCapture()
+    token = _active_capture.set(current)
+    try:
+        yield current
+    finally:
+        _active_capture.reset(token)
@@ -0,0 +1,183 @@
+# ===========================================================================
+# File: app/tests/services/test_export_service.py (BARU)
+# ===========================================================================
+# Export snapshot airdrop: urutan cursor, resume dari checkpoint, dan lanjut saat SnapshotTooOld.
+import json
+from typing import List
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+from app.core.config import settings
+from app.db.backends import MONGO_DRIVERS
+from app.db.session import mongo_db_manager
+from app.scripts import export_snapshot
+from app.services.export_service import SNAPSHOT_TOO_OLD_CODE, snapshot_export_service
+
+pytestmark = pytest.mark.asyncio
+
+EXPORT_DB_NAME = f"{settings.MONGODB_TEST_DB_NAME}_export"
+REGISTRATIONS = "user_registrations"
+WALLET_COUNT = 7
+
+
+def wallet(i: int) -> str:
+    return f"0x{i:040x}"
+
+
+@pytest.fixture
+async def export_db():
+    db = mongo_db_manager.client[EXPORT_DB_NAME]
+    await mongo_db_manager.client.drop_database(EXPORT_DB_NAME)
+    await db[REGISTRATIONS].insert_many([
+        {"_id": ObjectId(), "wallet_address": wallet(i), "points_basis": i * 10, "user_referral_code": f"REF{i}"}
+        for i in range(WALLET_COUNT)
+    ])
+    # Sebagian wallet punya akun users (XP); sisanya di-export dengan XP 0
+    await db["users"].insert_many([
+        {"_id": ObjectId(), "walletAddress": wallet(i), "xp": i, "rank": "Observer", "referralCode": f"REF{i}"}
+        for i in range(0, WALLET_COUNT, 2)
+    ])
+    yield db
+    await mongo_db_manager.client.drop_database(EXPORT_DB_NAME)
+
+
+async def collect(**kwargs) -> List[dict]:
+    rows = []
+    async for batch in snapshot_export_service.iter_snapshot_batches(**kwargs):
+        assert 0 < len(batch) <= kwargs["batch_size"]
+        rows.extend(batch)
+    return rows
+
+
+async def test_rows_follow_id_order_and_pair_users(export_db):
+    rows = await collect(
+        users_collection=export_db["users"], registrations_collection=export_db[REGISTRATIONS], batch_size=3
+    )
+    assert [row["wallet_address"] for row in rows] == [wallet(i) for i in range(WALLET_COUNT)]
+    assert [row["cursor"] for row in rows] == sorted(row["cursor"] for row in rows)
+    assert rows[2] == {
+        "cursor": rows[2]["cursor"], "wallet_address": wallet(2), "points": 20, "xp": 2,
+        "rank": "Observer", "referral_code": "REF2", "referred_by": None,
+    }
+    assert rows[3]["xp"] == 0 and rows[3]["rank"] is None
+
+
+async def test_resume_after_cursor_excludes_exported_rows_and_later_inserts(export_db):
+    collections = dict(users_collection=export_db["users"], registrations_collection=export_db[REGISTRATIONS])
+    upper_id = await snapshot_export_service.resolve_upper_id(export_db[REGISTRATIONS])
+    first_part = (await collect(**collections, upper_id=upper_id, batch_size=3))[:3]
+
+    # Registrasi baru setelah export dimulai berada di atas upper_id
+    await export_db[REGISTRATIONS].insert_one({"wallet_address": wallet(99), "points_basis": 1})
+
+    rest = await collect(**collections, after_id=ObjectId(first_part[-1]["cursor"]), upper_id=upper_id, batch_size=3)
+    assert [row["wallet_address"] for row in first_part + rest] == [wallet(i) for i in range(WALLET_COUNT)]
+
+
+async def test_snapshot_too_old_continues_after_last_yielded_row(monkeypatch):
+    ids = [ObjectId() for _ in range(6)]
+    segment_calls = []
+    ended_sessions = []
+
+    class FakeSession:
+        async def end_session(self):
+            ended_sessions.append(self)
+
+    async def start_snapshot_session(client):
+        return FakeSession()
+
+    async def iter_snapshot_batches(*, after_id, session, **kwargs):
+        segment_calls.append(after_id)
+        remaining = [i for i in ids if after_id is None or i > after_id]
+        for position in range(0, len(remaining), 2):
+            if len(segment_calls) == 1 and position == 4: # Segmen pertama kedaluwarsa sebelum batch ketiga
+                raise OperationFailure("Read timestamp is older than the oldest available timestamp.", code=SNAPSHOT_TOO_OLD_CODE)
+            yield [{"cursor": str(i)} for i in remaining[position:position + 2]]
+
+    monkeypatch.setattr(snapshot_export_service, "start_snapshot_session", start_snapshot_session)
+    monkeypatch.setattr(snapshot_export_service, "iter_snapshot_batches", iter_snapshot_batches)
+    segments = []
+    rows = []
+    async for batch in snapshot_export_service.iter_export_batches(
+        client=None, users_collection=None, registrations_collection=None, on_snapshot=segments.append
+    ):
+        rows.extend(batch)
+
+    assert [row["cursor"] for row in rows] == [str(i) for i in ids] # Tanpa duplikat maupun lubang
+    assert segment_calls == [None, ids[3]]
+    assert segments == [None, ids[3]]
+    assert len(ended_sessions) == 2
+
+
+async def test_snapshot_too_old_without_progress_is_raised(monkeypatch):
+    class FakeSession:
+        async def end_session(self):
+            pass
+
+    async def start_snapshot_session(client):
+        return FakeSession()
+
+    async def iter_snapshot_batches(**kwargs):
+        raise OperationFailure("snapshot too old", code=SNAPSHOT_TOO_OLD_CODE)
+        yield []
+
+    monkeypatch.setattr(snapshot_export_service, "start_snapshot_session", start_snapshot_session)
+    monkeypatch.setattr(snapshot_export_service, "iter_snapshot_batches", iter_snapshot_batches)
+    with pytest.raises(OperationFailure):
+        async for _ in snapshot_export_service.iter_export_batches(client=None, users_collection=None, registrations_collection=None):
+            pass
+
+
+async def test_cli_resume_after_interruption_matches_full_export(export_db, tmp_path, monkeypatch):
+    def cli_args(output, *extra):
+        return export_snapshot.parse_args([
+            "--mongo-url", settings.MONGODB_URL, "--users-db", EXPORT_DB_NAME, "--registrations-db", EXPORT_DB_NAME,
+            "--output", str(output), "--batch-size", "2", "--checkpoint-interval", "0", *extra,
+        ])
+
+    full_output = tmp_path / "full.csv"
+    assert await export_snapshot.run_export(cli_args(full_output)) == 0
+
+    real_iter = snapshot_export_service.iter_snapshot_batches
+
+    async def interrupted_iter(**kwargs):
+        batches = 0
+        async for rows in real_iter(**kwargs):
+            if batches == 2:
+                raise ConnectionError("connection lost")
+            batches += 1
+            yield rows
+
+    output = tmp_path / "resumed.csv"
+    monkeypatch.setattr(snapshot_export_service, "iter_snapshot_batches", interrupted_iter)
+    with pytest.raises(ConnectionError):
+        await export_snapshot.run_export(cli_args(output))
+    checkpoint = json.loads((tmp_path / "resumed.csv.ckpt.json").read_text())
+    assert checkpoint["rows"] == 4 and not checkpoint["completed"]
+
+    # Batch parsial setelah checkpoint terakhir harus dibuang saat resume
+    with open(output, "ab") as f:
+        f.write(b"partial,row")
+    monkeypatch.setattr(snapshot_export_service, "iter_snapshot_batches", real_iter)
+    assert await export_snapshot.run_export(cli_args(output, "--resume")) == 0
+
+    assert output.read_bytes() == full_output.read_bytes()
+    checkpoint = json.loads((tmp_path / "resumed.csv.ckpt.json").read_text())
+    assert checkpoint["completed"] and checkpoint["rows"] == WALLET_COUNT
+    assert checkpoint["snapshot_segments"] == [None, checkpoint["snapshot_segments"][1]]
+    assert checkpoint["snapshot_segments"][1] is not None
+
+
+async def test_cli_export_is_identical_on_both_drivers(export_db, tmp_path):
+    outputs = {}
+    for driver in MONGO_DRIVERS:
+        outputs[driver] = tmp_path / f"{driver}.ndjson"
+        args = export_snapshot.parse_args([
+            "--mongo-url", settings.MONGODB_URL, "--mongo-driver", driver, "--users-db", EXPORT_DB_NAME,
+            "--registrations-db", EXPORT_DB_NAME, "--format", "ndjson", "--output", str(outputs[driver]),
+        ])
+        assert await export_snapshot.run_export(args) == 0
+    assert outputs["motor"].read_bytes() == outputs["pymongo"].read_bytes()
+    assert outputs["motor"].read_bytes().count(b"\n") == WALLET_COUNT
@@ -0,0 +1,141 @@
+# ===========================================================================
+# File: app/tests/services/test_news_service.py (BARU)
+# ===========================================================================
+# NewsService di instance terpisah dengan database sendiri, agar tidak berbagi state dengan
+# singleton news_service milik app (dan koleksi news di database test utama).
+import asyncio
+import importlib
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+
+from app.core.config import settings
+from app.crud.crud_news import crud_news
+from app.db.session import mongo_db_manager
+from app.models.news import NewsInDB
+from app.services.news_service import NewsService
+
+# app.services mengekspor singleton dengan nama yang sama, jadi modulnya diambil lewat importlib
+news_service_module = importlib.import_module("app.services.news_service")
+
+NEWS_DB_NAME = f"{settings.MONGODB_TEST_DB_NAME}_news"
+
+
+@pytest.fixture
+async def news_db(lifespan_manager_fixture):
+    database = mongo_db_manager.client[NEWS_DB_NAME]
+    yield database
+    await mongo_db_manager.client.drop_database(NEWS_DB_NAME)
+
+
+@pytest.fixture
+async def service():
+    news = NewsService()
+    yield news
+    await news.stop()
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch):
+    """Jam dinding palsu untuk news_service (expiresAt dibandingkan dengan time.time())."""
+    fake = SimpleNamespace(now=time.time())
+    monkeypatch.setattr(news_service_module, "time", SimpleNamespace(time=lambda: fake.now, monotonic=time.monotonic))
+    return fake
+
+
+async def insert_news(db, text: str, *, order: int = 0, expires_in: float = None) -> None:
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in) if expires_in is not None else None
+    news = NewsInDB(text=text, order=order, expiresAt=expires_at, updatedAt=datetime.now(timezone.utc))
+    collection = await crud_news.get_collection(db)
+    await collection.insert_one(news.model_dump(by_alias=True))
+
+
+def feed_texts(service: NewsService) -> list:
+    body, _, _ = service.get_feed()
+    feed = json.loads(body)
+    assert feed["total"] == len(feed["items"])
+    return [item["text"] for item in feed["items"]]
+
+
+async def wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "kondisi tidak tercapai sebelum timeout"
+        await asyncio.sleep(0.02)
+
+
+async def test_expired_item_drops_out_without_reload(news_db, service: NewsService, clock, round_trips):
+    await insert_news(news_db, "permanent", order=1)
+    await insert_news(news_db, "flash", order=0, expires_in=60)
+    await service.reload(news_db)
+    _, etag_before, max_age = service.get_feed()
+    assert feed_texts(service) == ["flash", "permanent"]
+    assert max_age <= 60 # Cache HTTP tidak boleh melewati deadline item berikutnya
+
+    clock.now += 61
+    with round_trips() as trips:
+        assert feed_texts(service) == ["permanent"]
+        _, etag_after, max_age = service.get_feed()
+    trips.assert_budget(mongo=0, redis=0)
+    assert etag_after != etag_before
+    assert max_age == settings.NEWS_FEED_MAX_AGE_SECONDS
+
+
+async def test_item_already_expired_in_mongo_is_not_loaded(news_db, service: NewsService):
+    await insert_news(news_db, "stale", expires_in=-1) # Belum dihapus TTL monitor
+    await insert_news(news_db, "live")
+    await service.reload(news_db)
+    assert feed_texts(service) == ["live"]
+
+
+async def test_invalidation_reloads_after_mongo_change(news_db, service: NewsService):
+    await insert_news(news_db, "first")
+    await service.reload(news_db)
+    service._db = news_db # Seperti start(), tanpa refresh loop
+    await insert_news(news_db, "second", order=1)
+    assert feed_texts(service) == ["first"] # Snapshot tidak berubah sendiri
+
+    service.handle_invalidation(["user:1"]) # Tag lain diabaikan
+    assert service._reload_task is None
+    service.handle_invalidation(["news:feed"])
+    await service._reload_task
+    assert feed_texts(service) == ["first", "second"]
+
+
+async def test_refresh_loop_picks_up_mongo_change(news_db, service: NewsService, monkeypatch: pytest.MonkeyPatch):
+    # Change stream jika replica set; pada standalone jatuh ke polling versi
+    monkeypatch.setattr(settings, "NEWS_REFRESH_INTERVAL_SECONDS", 0.05)
+    await insert_news(news_db, "first")
+    service.start(news_db)
+    await wait_for(lambda: service.loaded)
+    await insert_news(news_db, "second", order=1)
+    await wait_for(lambda: feed_texts(service) == ["first", "second"])
+
+
+async def test_snapshot_is_served_during_mongo_outage(news_db, service: NewsService, monkeypatch: pytest.MonkeyPatch):
+    await insert_news(news_db, "cached")
+    await service.reload(news_db)
+    body_before, etag_before, _ = service.get_feed()
+
+    async def unavailable(*args, **kwargs):
+        raise ServerSelectionTimeoutError("mongo down")
+
+    monkeypatch.setattr(crud_news, "get_version", unavailable)
+    with pytest.raises(ServerSelectionTimeoutError):
+        await service.reload(news_db)
+    service._db = news_db
+    service.handle_invalidation(["news:feed"])
+    await service._reload_task # Gagal, hanya di-log
+
+    assert service.loaded
+    assert service.get_feed()[:2] == (body_before, etag_before)
+
+    monkeypatch.undo()
+    await insert_news(news_db, "fresh", order=1)
+    service.handle_flush() # Setelah MongoDB pulih, reload berikutnya berhasil
+    await service._reload_task
+    assert feed_texts(service) == ["cached", "fresh"]
@@ -0,0 +1,45 @@
+# ===========================================================================
+# File: app/tests/services/test_profiling_service.py (BARU)
+# ===========================================================================
+import tracemalloc
+
+import pytest
+
+from app.db.redis_conn import redis_manager
+from app.services.profiling_service import PROFILE_KEY_PREFIX, ProfilerBusyError, ProfilingService
+
+
+@pytest.fixture
+def service(lifespan_manager_fixture) -> ProfilingService:
+    return ProfilingService()
+
+
+def test_only_one_session_per_worker(service: ProfilingService):
+    session = service.begin("cpu")
+    with pytest.raises(ProfilerBusyError):
+        service.begin("memory")
+    service.end(session)
+    service.end(service.begin("memory")) # Slot bebas lagi setelah end()
+    assert not tracemalloc.is_tracing()
+
+
+async def test_profile_worker_releases_slot(service: ProfilingService):
+    profile_id, folded = await service.profile_worker("cpu", 0.05)
+    assert profile_id and isinstance(folded, str)
+    service.end(service.begin("cpu"))
+
+
+async def test_store_and_load_through_redis(service: ProfilingService):
+    await service.store("abc", "main;handler 3\n")
+    assert await redis_manager.cache_client.get(PROFILE_KEY_PREFIX + "abc") == b"main;handler 3\n"
+    assert await ProfilingService().load("abc") == "main;handler 3\n" # Worker lain membaca dari Redis
+
+
+async def test_store_falls_back_to_process_when_redis_fails(service: ProfilingService, monkeypatch: pytest.MonkeyPatch):
+    async def failing_set(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(redis_manager.cache_client, "set", failing_set)
+    await service.store("local", "main 1\n")
+    assert await redis_manager.cache_client.get(PROFILE_KEY_PREFIX + "local") is None
+    assert await service.load("local") == "main 1\n"
@@ -0,0 +1,138 @@
+# ===========================================================================
+# File: app/tests/tasks/test_points_refresher.py (BARU)
+# ===========================================================================
+# Job points_refresher terhadap MongoDB/Redis test dengan stub JSON-RPC (httpx.MockTransport):
+# lease, resume dari checkpoint, write hanya untuk yang berubah, dan invalidasi cache wallet_data.
+import json
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.db.redis_conn import redis_manager
+from app.db.session import mongo_db_manager
+from app.tasks.points_refresher import JOB_ID, POINTS_PER_TRANSACTION, PointsRefresher
+
+POINTS_DB_NAME = f"{settings.MONGODB_TEST_DB_NAME}_points"
+
+
+class RpcStub:
+    """Stub eth_getTransactionCount: `counts` per wallet, mencatat wallet per batch yang diminta."""
+
+    def __init__(self, counts: Dict[str, int], fail_on_call: Optional[int] = None):
+        self.counts = counts
+        self.fail_on_call = fail_on_call
+        self.requested: List[List[str]] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        self.requested.append([call["params"][0] for call in payload])
+        if len(self.requested) == self.fail_on_call:
+            raise RuntimeError("worker killed") # Bukan error HTTP: job berhenti di tengah putaran
+        return httpx.Response(200, json=[
+            {"jsonrpc": "2.0", "id": call["id"], "result": hex(self.counts[call["params"][0]])} for call in payload
+        ])
+
+
+class RecordingCollection:
+    """Meneruskan semua ke koleksi asli, mencatat panggilan bulk_write."""
+
+    def __init__(self, collection: Any):
+        self._collection = collection
+        self.bulk_writes: List[int] = []
+
+    async def bulk_write(self, operations, **kwargs):
+        self.bulk_writes.append(len(operations))
+        return await self._collection.bulk_write(operations, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._collection, name)
+
+
+@pytest.fixture
+async def points_db():
+    database = mongo_db_manager.client[POINTS_DB_NAME]
+    yield database
+    await mongo_db_manager.client.drop_database(POINTS_DB_NAME)
+
+
+async def seed_wallets(points_db, count: int, transaction_count: int = 0) -> List[str]:
+    wallets = [f"0x{uuid.uuid4().hex}{index:08x}" for index in range(count)]
+    await points_db["user_registrations"].insert_many([
+        {"wallet_address": wallet, "transaction_count": transaction_count, "points_basis": transaction_count * POINTS_PER_TRANSACTION}
+        for wallet in wallets
+    ])
+    return wallets
+
+
+def make_refresher(points_db, stub: RpcStub, **kwargs) -> PointsRefresher:
+    options: Dict[str, Any] = {"rpc_batch_size": 2, "max_concurrency": 1, "redis_client": redis_manager.redis_client}
+    options.update(kwargs)
+    return PointsRefresher(
+        registrations=options.pop("registrations", points_db["user_registrations"]),
+        checkpoints=points_db["job_checkpoints"],
+        rpc_url="http://rpc.test",
+        transport=httpx.MockTransport(stub.handler),
+        **options,
+    )
+
+
+async def test_lease_is_held_by_one_instance(points_db):
+    stub = RpcStub({})
+    holder, contender = make_refresher(points_db, stub), make_refresher(points_db, stub)
+
+    assert await holder.acquire_lease()
+    assert await holder.acquire_lease() # Pemilik lease boleh memperpanjang
+    assert not await contender.acquire_lease() # Upsert bentrok dengan dokumen yang ada -> DuplicateKeyError
+    assert await contender.run_once() == {"skipped": True}
+
+    await holder.release_lease()
+    assert await contender.acquire_lease()
+
+
+async def test_resume_from_last_id_after_crash(points_db):
+    wallets = await seed_wallets(points_db, 6)
+    counts = {wallet: index + 1 for index, wallet in enumerate(wallets)}
+
+    crashing = RpcStub(counts, fail_on_call=2)
+    with pytest.raises(RuntimeError):
+        await make_refresher(points_db, crashing).run_once()
+    checkpoint = await points_db["job_checkpoints"].find_one({"_id": JOB_ID})
+    assert checkpoint["completed"] is False and checkpoint["processed"] == 2
+    assert checkpoint["leaseUntil"] is None # Lease dilepas walau job gagal
+
+    stub = RpcStub(counts)
+    stats = await make_refresher(points_db, stub).run_once()
+    assert stub.requested == [wallets[2:4], wallets[4:6]] # Halaman pertama tidak diminta ulang
+    assert stats == {"processed": 6, "updated": 6, "failed": 0}
+    docs = await points_db["user_registrations"].find({}).to_list(length=None)
+    assert {doc["wallet_address"]: doc["points_basis"] for doc in docs} == {
+        wallet: count * POINTS_PER_TRANSACTION for wallet, count in counts.items()
+    }
+    checkpoint = await points_db["job_checkpoints"].find_one({"_id": JOB_ID})
+    assert checkpoint["completed"] is True and checkpoint["lastId"] is None
+
+
+async def test_unchanged_page_is_not_written(points_db):
+    wallets = await seed_wallets(points_db, 4, transaction_count=7)
+    counts = {wallet: 7 for wallet in wallets}
+    counts[wallets[3]] = 8 # Hanya halaman kedua yang berubah
+    registrations = RecordingCollection(points_db["user_registrations"])
+
+    stats = await make_refresher(points_db, RpcStub(counts), registrations=registrations).run_once(resume=False)
+    assert stats["updated"] == 1
+    assert registrations.bulk_writes == [1]
+
+
+async def test_changed_wallets_drop_their_cache_keys(points_db):
+    wallets = await seed_wallets(points_db, 3, transaction_count=1)
+    redis = redis_manager.redis_client
+    for wallet in wallets:
+        await redis.set(f"wallet_data:{wallet}", "{}", ex=60)
+    counts = {wallets[0]: 1, wallets[1]: 5, wallets[2]: 9}
+
+    await make_refresher(points_db, RpcStub(counts)).run_once(resume=False)
+    assert [bool(await redis.exists(f"wallet_data:{wallet}")) for wallet in wallets] == [True, False, False]
+    await redis.delete(f"wallet_data:{wallets[0]}")
@@ -0,0 +1,71 @@
+# ===========================================================================
+# File: app/tests/utils/test_bloom_filter.py (BARU)
+# ===========================================================================
+# BloomFilter (app/utils/bloom_filter.py): tanpa false negative, FPR terukur dekat target
+# untuk n yang diketahui, dan isi report(). Item deterministik, jadi hasilnya stabil.
+import math
+
+import pytest
+
+from app.utils.bloom_filter import BloomFilter
+
+CAPACITY = 10_000
+
+
+def wallet(index: int) -> str:
+    return f"0x{index:040x}"
+
+
+@pytest.fixture(scope="module")
+def full_filter() -> BloomFilter:
+    bloom = BloomFilter(CAPACITY, 0.01)
+    bloom.update(wallet(index) for index in range(CAPACITY))
+    return bloom
+
+
+def test_add_and_contains():
+    bloom = BloomFilter(100, 0.01)
+    assert wallet(1) not in bloom
+    assert bloom.add(wallet(1)) is True
+    assert wallet(1) in bloom
+    assert bloom.add(wallet(1)) is False # Item yang sama tidak dihitung dua kali
+    assert len(bloom) == 1
+
+
+def test_no_false_negatives(full_filter: BloomFilter):
+    assert all(wallet(index) in full_filter for index in range(CAPACITY))
+
+
+@pytest.mark.parametrize("error_rate", [0.01, 0.001])
+def test_false_positive_rate_near_target(error_rate: float):
+    bloom = BloomFilter(CAPACITY, error_rate)
+    bloom.update(wallet(index) for index in range(CAPACITY))
+    probes = 100_000
+    false_positives = sum(f"absent-{index}" in bloom for index in range(probes))
+    measured = false_positives / probes
+    assert error_rate * 0.5 <= measured <= error_rate * 1.5, measured
+    assert bloom.estimated_false_positive_rate() == pytest.approx(error_rate, rel=0.25)
+
+
+def test_report(full_filter: BloomFilter):
+    report = full_filter.report()
+    assert report["capacity"] == CAPACITY
+    assert report["numBits"] == full_filter.num_bits == math.ceil(-CAPACITY * math.log(0.01) / math.log(2) ** 2)
+    assert report["numHashes"] == 7
+    # add() yang tidak menyalakan bit baru (false positive saat insert) tidak menambah items
+    assert CAPACITY * 0.98 <= report["items"] <= CAPACITY
+    assert report["fillRatio"] == pytest.approx(0.5, abs=0.03) # k optimal: setengah bit menyala saat penuh
+    assert report["targetFalsePositiveRate"] == 0.01
+    assert report["estimatedFalsePositiveRate"] == pytest.approx(0.01, rel=0.25)
+    assert report["memoryBytes"] == math.ceil(full_filter.num_bits / 8)
+
+
+def test_empty_filter_report():
+    report = BloomFilter(1000, 0.01).report()
+    assert report["items"] == 0 and report["fillRatio"] == 0 and report["estimatedFalsePositiveRate"] == 0
+
+
+@pytest.mark.parametrize("error_rate", [0, 1, -0.1])
+def test_invalid_error_rate(error_rate: float):
+    with pytest.raises(ValueError):
+        BloomFilter(100, error_rate)
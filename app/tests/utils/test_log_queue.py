@@ -0,0 +1,108 @@
+# ===========================================================================
+# File: app/tests/utils/test_log_queue.py (BARU)
+# ===========================================================================
+import logging
+import queue
+
+import pytest
+
+from app.utils.log_queue import CallSiteSamplingFilter, LazyQueueHandler
+
+SECOND = 1_700_000_000
+
+
+def make_record(level: int = logging.INFO, lineno: int = 10, created: float = SECOND + 0.5, msg: str = "request %s", args=(1,)) -> logging.LogRecord:
+    record = logging.LogRecord("test", level, "/app/module.py", lineno, msg, args, None)
+    record.created = created
+    return record
+
+
+def test_per_call_site_limit_per_second():
+    sampling = CallSiteSamplingFilter(max_per_second=3)
+    passed = [sampling.filter(make_record(created=SECOND + index / 10)) for index in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    assert sampling.dropped_total == 7
+    assert sampling.filter(make_record(lineno=11)) # Call site lain punya kuota sendiri
+
+
+def test_next_record_reports_dropped_count():
+    sampling = CallSiteSamplingFilter(max_per_second=2)
+    for _ in range(5):
+        sampling.filter(make_record())
+    record = make_record(created=SECOND + 1.2, args=(42,))
+    assert sampling.filter(record)
+    assert record.getMessage() == "request 42 [sampled: 3 similar messages dropped in the previous second]"
+
+    quiet = make_record(created=SECOND + 2.2) # Tidak ada yang dibuang pada detik sebelumnya
+    assert sampling.filter(quiet)
+    assert quiet.getMessage() == "request 1"
+
+
+@pytest.mark.parametrize("level", [logging.WARNING, logging.ERROR, logging.CRITICAL])
+def test_warning_and_above_are_never_sampled(level: int):
+    sampling = CallSiteSamplingFilter(max_per_second=1)
+    assert all(sampling.filter(make_record(level=level)) for _ in range(50))
+    assert sampling.dropped_total == 0
+
+
+def test_debug_is_sampled_and_zero_disables_sampling():
+    sampling = CallSiteSamplingFilter(max_per_second=1)
+    assert [sampling.filter(make_record(level=logging.DEBUG)) for _ in range(3)] == [True, False, False]
+    disabled = CallSiteSamplingFilter(max_per_second=0)
+    assert all(disabled.filter(make_record()) for _ in range(100))
+
+
+@pytest.fixture
+def queued_logger():
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+    handler.addFilter(CallSiteSamplingFilter(max_per_second=5))
+    logger = logging.getLogger("test_log_queue")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    yield logger, log_queue
+    logger.removeHandler(handler)
+
+
+def drain(log_queue: queue.SimpleQueue) -> list:
+    records = []
+    while not log_queue.empty():
+        records.append(log_queue.get_nowait())
+    return records
+
+
+def test_args_are_resolved_at_enqueue_time(queued_logger):
+    logger, log_queue = queued_logger
+    payload = {"status": "pending"}
+    logger.info("payload %s", payload)
+    payload["status"] = "done" # Mutasi setelah log, sebelum thread listener memformat
+    [record] = drain(log_queue)
+    assert record.msg == "payload {'status': 'pending'}"
+    assert record.args is None
+    assert record.getMessage() == "payload {'status': 'pending'}"
+
+
+def test_formatting_is_left_to_the_listener(queued_logger):
+    logger, log_queue = queued_logger
+    try:
+        raise ValueError("bad")
+    except ValueError:
+        logger.error("failed %s", "op", exc_info=True)
+    [record] = drain(log_queue)
+    assert record.exc_info is not None and record.exc_text is None # Traceback belum diformat
+    formatted = logging.Formatter("%(levelname)s %(message)s").format(record)
+    assert formatted.startswith("ERROR failed op\nTraceback") and "ValueError: bad" in formatted
+
+
+def test_handler_samples_a_hot_call_site(queued_logger):
+    logger, log_queue = queued_logger
+    for index in range(50):
+        logger.info("hot line %s", index)
+    for index in range(3):
+        logger.warning("warning line %s", index)
+    records = drain(log_queue)
+    hot = [record for record in records if record.levelno == logging.INFO]
+    assert 5 <= len(hot) <= 10 # 5 per detik; batas detik bisa jatuh di tengah loop
+    assert len(records) - len(hot) == 3
+    assert hot[0].getMessage() == "hot line 0"
@@ -0,0 +1,46 @@
+# ===========================================================================
+# File: app/tests/utils/test_loop_lag.py (BARU)
+# ===========================================================================
+# Watchdog blocking event loop (app/utils/loop_lag.py).
+import asyncio
+import time
+
+import pytest
+
+from app.utils.loop_lag import LoopLagMonitor
+from app.utils.metrics import MetricsRegistry
+
+pytestmark = pytest.mark.asyncio
+
+THRESHOLD = 0.1
+
+
+def block_the_loop(seconds: float) -> None:
+    time.sleep(seconds) # Kode sinkron yang harus muncul di stack hasil capture
+
+
+@pytest.fixture
+async def monitor():
+    # Sampler lag tetap 0.5 detik: blocking di bawah ini terjadi di antara dua wake-up sampler
+    lag_monitor = LoopLagMonitor(interval=0.5, registry=MetricsRegistry(), block_threshold=THRESHOLD)
+    lag_monitor.start()
+    yield lag_monitor
+    await lag_monitor.stop()
+
+
+async def test_single_block_between_sampler_wakeups_is_captured(monitor: LoopLagMonitor):
+    await asyncio.sleep(0.05)
+    block_the_loop(2 * THRESHOLD)
+    await asyncio.sleep(THRESHOLD) # Beri watchdog kesempatan log sebelum assert
+
+    assert monitor.blocked_count == 1
+    _, duration, stack = monitor.recent_blocks[-1]
+    assert duration >= THRESHOLD
+    assert "block_the_loop" in stack
+
+
+async def test_idle_loop_is_not_reported(monitor: LoopLagMonitor):
+    await asyncio.sleep(0.6)
+    block_the_loop(THRESHOLD / 4)
+    await asyncio.sleep(THRESHOLD)
+    assert monitor.blocked_count == 0
@@ -0,0 +1,131 @@
+# ===========================================================================
+# File: app/tests/utils/test_metrics.py (BARU)
+# ===========================================================================
+# Render format Prometheus dan MetricsMiddleware. Middleware memakai registry global, jadi
+# setiap test memakai prefix route sendiri dan hanya membaca series miliknya.
+from typing import List
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.utils.metrics import (
+    Histogram, MetricsMiddleware, MetricsRegistry, _route_template, http_request_duration, http_requests_in_flight
+)
+
+
+def test_histogram_render_is_cumulative_with_inclusive_le():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(1.0, 0.25, 0.5)) # Diurutkan saat init
+    for value in (0.125, 0.25, 0.375, 0.5, 2.0): # 0.25 dan 0.5 tepat di batas bucket
+        histogram.observe(value, "/items")
+    assert histogram.render() == [
+        'latency_seconds_bucket{route="/items",le="0.25"} 2',
+        'latency_seconds_bucket{route="/items",le="0.5"} 4',
+        'latency_seconds_bucket{route="/items",le="1"} 4',
+        'latency_seconds_bucket{route="/items",le="+Inf"} 5',
+        'latency_seconds_count{route="/items"} 5',
+        'latency_seconds_sum{route="/items"} 3.25',
+    ]
+
+
+def test_histogram_series_per_label_set():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(1.0,))
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/b")
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{route="/a",le="1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/b",le="1"} 0' in lines
+    assert 'latency_seconds_bucket{route="/b",le="+Inf"} 1' in lines
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("events_total", "Events", ("name",)).inc('back\\slash "quoted"\nline')
+    assert registry.render().decode().splitlines()[-1] == r'events_total{name="back\\slash \"quoted\"\nline"} 1'
+
+
+def test_registry_render_headers_and_broken_callbacks():
+    registry = MetricsRegistry()
+    registry.gauge("idle_gauge", "Never set") # Tanpa sampel: tidak dirender sama sekali
+    registry.callback_gauge("pool_size", "Pool size", lambda: [(("a",), 3)], ("pool",))
+    registry.callback_gauge("pool_size", "Pool size", lambda: 1 / 0, ("pool",)) # Collector rusak dilewati
+    body = registry.render().decode()
+    assert body == '# HELP pool_size Pool size\n# TYPE pool_size gauge\npool_size{pool="a"} 3\n'
+
+
+def series_for(route_prefix: str) -> dict:
+    return {key: series for key, series in http_request_duration._series.items() if key[1].startswith(route_prefix)}
+
+
+def observed_count(series: List[float]) -> int:
+    return int(sum(series[:-1]))
+
+
+@pytest.fixture
+async def metrics_client():
+    inner = FastAPI()
+    router = APIRouter()
+    seen_in_flight = []
+
+    @router.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        seen_in_flight.append(http_requests_in_flight._values.get(("GET",)))
+        return {"id": item_id}
+
+    @router.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    inner.include_router(router, prefix="/metrics-test")
+    transport = ASGITransport(app=MetricsMiddleware(inner), raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        client.seen_in_flight = seen_in_flight
+        yield client
+
+
+async def test_route_label_is_the_template(metrics_client: AsyncClient):
+    before = series_for("/metrics-test/items")
+    for item_id in ("1", "2", "abc"):
+        assert (await metrics_client.get(f"/metrics-test/items/{item_id}")).status_code == 200
+    after = series_for("/metrics-test/items")
+    key = ("GET", "/metrics-test/items/{item_id}", "200")
+    assert list(after) == [key] # Satu series untuk semua ID, bukan satu per path mentah
+    assert observed_count(after[key]) - observed_count(before.get(key, [0.0])) == 3
+
+
+async def test_unmatched_path_is_not_used_as_label(metrics_client: AsyncClient):
+    before = http_request_duration._series.get(("GET", "<unmatched>", "404"), [0.0])
+    assert (await metrics_client.get("/metrics-test/no/such/path/123")).status_code == 404
+    after = http_request_duration._series[("GET", "<unmatched>", "404")]
+    assert observed_count(after) == observed_count(before) + 1
+    assert not any("/no/such" in key[1] for key in http_request_duration._series)
+
+
+def test_route_template_honours_root_path():
+    scope = {"root_path": "/api", "route": type("Route", (), {"path_format": "/users/{user_id}"})()}
+    assert _route_template(scope) == "/api/users/{user_id}"
+    assert _route_template({"path": "/raw/123"}) == "<unmatched>"
+
+
+async def test_in_flight_gauge_returns_to_zero(metrics_client: AsyncClient):
+    baseline = http_requests_in_flight._values.get(("GET",), 0)
+    await metrics_client.get("/metrics-test/items/1")
+    assert metrics_client.seen_in_flight[-1] == baseline + 1
+    assert http_requests_in_flight._values[("GET",)] == baseline
+
+    response = await metrics_client.get("/metrics-test/boom")
+    assert response.status_code == 500
+    assert http_requests_in_flight._values[("GET",)] == baseline
+    assert observed_count(http_request_duration._series[("GET", "/metrics-test/boom", "500")]) >= 1
+
+
+async def test_in_flight_gauge_returns_to_zero_when_no_response_is_sent():
+    async def crashing_app(scope, receive, send):
+        raise RuntimeError("crash before response")
+
+    baseline = http_requests_in_flight._values.get(("POST",), 0)
+    scope = {"type": "http", "method": "POST", "path": "/crash", "root_path": "", "headers": []}
+    with pytest.raises(RuntimeError):
+        await MetricsMiddleware(crashing_app)(scope, None, None)
+    assert http_requests_in_flight._values[("POST",)] == baseline
+    assert observed_count(http_request_duration._series[("POST", "<unmatched>", "500")]) >= 1
@@ -0,0 +1,114 @@
+# ===========================================================================
+# File: app/tests/utils/test_single_flight.py (BARU)
+# ===========================================================================
+# Coalescing pemanggilan bersamaan dalam satu proses (app/utils/single_flight.py).
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+pytestmark = pytest.mark.asyncio
+
+
+class Work:
+    """fn untuk SingleFlight.do: menghitung pemanggilan dan menunggu `release` sebelum selesai."""
+
+    def __init__(self, result=None, error: BaseException = None):
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def test_waiters_share_the_leader_result():
+    flight = SingleFlight()
+    work = Work(result="registered")
+    leader = asyncio.create_task(flight.do("wallet", work))
+    await work.started.wait()
+    assert flight.in_flight("wallet")
+
+    waiters = [asyncio.create_task(flight.do("wallet", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    work.release.set()
+
+    assert await asyncio.gather(leader, *waiters) == ["registered"] * 4
+    assert work.calls == 1
+    assert not flight.in_flight("wallet")
+
+
+async def test_leader_failure_is_raised_to_waiters_and_not_cached():
+    flight = SingleFlight()
+    failing = Work(error=ValueError("alchemy down"))
+    leader = asyncio.create_task(flight.do("wallet", failing))
+    await failing.started.wait()
+    waiter = asyncio.create_task(flight.do("wallet", failing))
+    await asyncio.sleep(0)
+    failing.release.set()
+
+    for task in (leader, waiter):
+        with pytest.raises(ValueError, match="alchemy down"):
+            await task
+    assert failing.calls == 1
+    assert not flight.in_flight("wallet")
+
+    # Kegagalan tidak disimpan: pemanggilan berikutnya menjalankan fn lagi
+    retry = Work(result="registered")
+    retry.release.set()
+    assert await flight.do("wallet", retry) == "registered"
+    assert retry.calls == 1
+
+
+async def test_waiter_takes_over_when_leader_is_cancelled():
+    flight = SingleFlight()
+    work = Work(result="registered")
+    leader = asyncio.create_task(flight.do("wallet", work))
+    await work.started.wait()
+    waiter = asyncio.create_task(flight.do("wallet", work))
+    await asyncio.sleep(0)
+
+    leader.cancel() # Misal client leader disconnect
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    await asyncio.sleep(0)
+    assert flight.in_flight("wallet") # Waiter sudah menjadi leader baru
+
+    work.release.set()
+    assert await waiter == "registered"
+    assert work.calls == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_the_leader():
+    flight = SingleFlight()
+    work = Work(result="registered")
+    leader = asyncio.create_task(flight.do("wallet", work))
+    await work.started.wait()
+    waiter = asyncio.create_task(flight.do("wallet", work))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    work.release.set()
+    assert await leader == "registered"
+    assert work.calls == 1
+
+
+async def test_different_keys_run_independently():
+    flight = SingleFlight()
+    first, second = Work(result=1), Work(result=2)
+    tasks = [asyncio.create_task(flight.do("a", first)), asyncio.create_task(flight.do("b", second))]
+    await first.started.wait()
+    await second.started.wait()
+    first.release.set()
+    second.release.set()
+    assert await asyncio.gather(*tasks) == [1, 2]
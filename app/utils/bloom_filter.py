@@ -0,0 +1,80 @@
+# ===========================================================================
+# File: app/utils/bloom_filter.py (BARU)
+# ===========================================================================
+import hashlib
+import math
+from typing import Any, Dict, Iterable
+
+from bitarray import bitarray
+
+
+class BloomFilter:
+    """
+    Bloom filter in-process berbasis bitarray.
+
+    Hanya menjawab dua hal: "pasti tidak ada" (tanpa false negative) atau
+    "mungkin ada" (dengan peluang false positive ~ error_rate saat jumlah
+    item <= capacity). Posisi bit dihitung dengan double hashing dari satu
+    digest blake2b, jadi biaya per lookup hanya satu hash.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.num_bits = max(64, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.bits = bitarray(self.num_bits)
+        self.bits.setall(0)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> bool:
+        """Menambahkan item. Mengembalikan True jika item sebelumnya belum (pasti) ada."""
+        is_new = False
+        bits = self.bits
+        for position in self._positions(item):
+            if not bits[position]:
+                bits[position] = 1
+                is_new = True
+        if is_new:
+            self.count += 1
+        return is_new
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[position] for position in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def estimated_false_positive_rate(self) -> float:
+        """Perkiraan FPR saat ini berdasarkan rasio bit yang terisi (fill ratio ** k)."""
+        fill_ratio = self.bits.count(1) / self.num_bits
+        return fill_ratio ** self.num_hashes
+
+    def memory_bytes(self) -> int:
+        return self.bits.buffer_info()[1]
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "items": self.count,
+            "capacity": self.capacity,
+            "numBits": self.num_bits,
+            "numHashes": self.num_hashes,
+            "fillRatio": round(self.bits.count(1) / self.num_bits, 6),
+            "targetFalsePositiveRate": self.error_rate,
+            "estimatedFalsePositiveRate": round(self.estimated_false_positive_rate(), 8),
+            "memoryBytes": self.memory_bytes(),
+        }
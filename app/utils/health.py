@@ -0,0 +1,233 @@
+# ===========================================================================
+# File: app/utils/health.py (BARU)
+# ===========================================================================
+# Health probe background + circuit breaker per dependency (MongoDB, Redis).
+# Request tidak pernah menunggu probe: request hanya membaca state breaker (O(1)) dan gagal
+# langsung dengan 503 selama circuit terbuka. /health menyajikan hasil probe terakhir.
+# Dipakai app utama dan api.py, jadi tidak bergantung pada app.core.config.
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.utils.metrics import LabelValues, MetricsRegistry, registry as default_registry
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+
+HealthCheck = Callable[[], Awaitable[Any]]
+
+
+class CircuitOpenError(Exception):
+    """Dependency ditandai down oleh probe; request gagal cepat tanpa menyentuh jaringan."""
+
+    def __init__(self, dependency: str, retry_after: float):
+        super().__init__(f"{dependency} circuit is open")
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class CircuitBreaker:
+    """
+    Breaker yang diberi makan probe background, bukan oleh request.
+
+    `failure_threshold` kegagalan probe berturut-turut membuka circuit; `recovery_threshold`
+    probe sukses berturut-turut menutupnya lagi. Karena probe sendiri yang menguji pemulihan,
+    tidak ada state half-open: request tidak pernah dipakai sebagai percobaan.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 2,
+        recovery_threshold: int = 1,
+        retry_after: float = 1.0,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_threshold = max(1, recovery_threshold)
+        self.retry_after = retry_after # Saran Retry-After; biasanya interval probe
+        self.logger = logger or logging.getLogger(__name__)
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        self.opened_at: Optional[float] = None # time.time() saat circuit terakhir terbuka
+        self.open_count = 0
+        self.rejected_count = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == CIRCUIT_OPEN
+
+    def check(self) -> None:
+        """Raise CircuitOpenError jika circuit terbuka. Dipanggil di jalur request."""
+        if self.state == CIRCUIT_OPEN:
+            self.rejected_count += 1
+            raise CircuitOpenError(self.name, self.retry_after)
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.consecutive_successes += 1
+        if self.state == CIRCUIT_OPEN and self.consecutive_successes >= self.recovery_threshold:
+            downtime = time.time() - self.opened_at if self.opened_at else 0.0
+            self.state = CIRCUIT_CLOSED
+            self.logger.info("Circuit %s closed after %.1fs open (%d requests rejected).", self.name, downtime, self.rejected_count)
+
+    def record_failure(self, error: str) -> None:
+        self.consecutive_successes = 0
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self.state == CIRCUIT_CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self.state = CIRCUIT_OPEN
+            self.opened_at = time.time()
+            self.open_count += 1
+            self.logger.error(
+                f"Circuit {self.name} opened after {self.consecutive_failures} failed health probes: {error}. "
+                "Requests depending on it fail fast with 503."
+            )
+
+
+class HealthProbe:
+    """Satu dependency: fungsi check (misal ping) + breaker + hasil probe terakhir."""
+
+    def __init__(self, check: HealthCheck, breaker: CircuitBreaker, timeout: float):
+        self.check = check
+        self.breaker = breaker
+        self.timeout = timeout
+        self.healthy: Optional[bool] = None # None: belum pernah di-probe
+        self.last_checked: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self._pending: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> bool:
+        # Check yang masih menggantung dari putaran sebelumnya ditunggu lagi, bukan ditumpuk:
+        # saat dependency blackhole, jumlah ping yang berjalan tetap satu per dependency.
+        if self._pending is None:
+            self._pending = asyncio.create_task(self.check())
+        task = self._pending
+        started = time.perf_counter()
+        done, _ = await asyncio.wait({task}, timeout=self.timeout)
+        self.last_checked = time.time()
+        self.last_latency = time.perf_counter() - started
+        if not done:
+            self._fail(f"timed out after {self.timeout:.1f}s")
+            return False
+        if self._pending is task:
+            self._pending = None
+        error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+        if error is not None:
+            self._fail(f"{type(error).__name__}: {error}")
+            return False
+        self.healthy = True
+        self.breaker.record_success()
+        return True
+
+    def _fail(self, error: str) -> None:
+        self.healthy = False
+        self.breaker.record_failure(error)
+
+    def cancel(self) -> None:
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        breaker = self.breaker
+        return {
+            "status": "unknown" if self.healthy is None else ("connected" if self.healthy else "error"),
+            "circuit": breaker.state,
+            "lastCheckedAgoSeconds": round(time.time() - self.last_checked, 3) if self.last_checked else None,
+            "latencyMs": round(self.last_latency * 1000, 2) if self.last_latency is not None else None,
+            "consecutiveFailures": breaker.consecutive_failures,
+            "lastError": breaker.last_error if not self.healthy else None,
+        }
+
+
+class HealthMonitor:
+    """
+    Menjalankan semua probe secara paralel setiap `interval` detik di satu task background.
+    `/health` membaca `report()`, jadi tidak ada I/O per request dan outage tidak membuat
+    health check ikut mengantre.
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        registry: MetricsRegistry = default_registry,
+        *,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.interval = interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.probes: Dict[str, HealthProbe] = {}
+        self._task: Optional[asyncio.Task] = None
+        registry.callback_gauge("dependency_up", "1 if the last health probe of the dependency succeeded", self._up_samples, ("dependency",))
+        registry.callback_gauge("circuit_open", "1 while the dependency circuit breaker is open", self._open_samples, ("dependency",))
+        registry.callback_counter("circuit_opened_total", "Times the dependency circuit breaker opened", self._opened_samples, ("dependency",))
+        registry.callback_counter("circuit_rejected_total", "Requests rejected by an open circuit breaker", self._rejected_samples, ("dependency",))
+
+    def _up_samples(self) -> List[Tuple[LabelValues, float]]:
+        return [((name,), float(bool(probe.healthy))) for name, probe in self.probes.items()]
+
+    def _open_samples(self) -> List[Tuple[LabelValues, float]]:
+        return [((name,), float(probe.breaker.is_open)) for name, probe in self.probes.items()]
+
+    def _opened_samples(self) -> List[Tuple[LabelValues, float]]:
+        return [((name,), probe.breaker.open_count) for name, probe in self.probes.items()]
+
+    def _rejected_samples(self) -> List[Tuple[LabelValues, float]]:
+        return [((name,), probe.breaker.rejected_count) for name, probe in self.probes.items()]
+
+    def add(self, breaker: CircuitBreaker, check: HealthCheck, *, timeout: float = 1.0) -> HealthProbe:
+        probe = HealthProbe(check, breaker, timeout)
+        self.probes[breaker.name] = probe
+        return probe
+
+    async def run_once(self) -> bool:
+        results = await asyncio.gather(*(probe.run_once() for probe in self.probes.values()))
+        return all(results)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for probe in self.probes.values():
+            probe.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.run_once()
+            except Exception as e: # Probe yang rusak tidak boleh menghentikan monitor
+                self.logger.error(f"HealthMonitor: probe round failed: {e}", exc_info=True)
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    @property
+    def healthy(self) -> bool:
+        return all(probe.healthy for probe in self.probes.values())
+
+    def report(self) -> Dict[str, Any]:
+        """Body /health: `services` kompatibel dengan format lama, detail probe di `checks`."""
+        checks = {name: probe.snapshot() for name, probe in self.probes.items()}
+        return {
+            "status": "healthy" if self.healthy else "unhealthy",
+            "services": {name: check["status"] for name, check in checks.items()},
+            "checks": checks,
+        }
@@ -0,0 +1,122 @@
+# ===========================================================================
+# File: app/utils/log_queue.py (BARU)
+# ===========================================================================
+# Logging non-blocking: handler root hanya memasukkan record ke queue, sedangkan format
+# baris log dan write ke stream dikerjakan thread QueueListener, di luar event loop.
+# Log line per-request yang berulang (INFO ke bawah) dibatasi per call site oleh
+# CallSiteSamplingFilter. Tidak bergantung pada app.core.config, dipakai juga oleh api.py.
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+DEFAULT_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+
+class CallSiteSamplingFilter(logging.Filter):
+    """
+    Rate sampling per call site (pathname, lineno) untuk record level <= `max_level`:
+    maksimal `max_per_second` record per detik per call site; sisanya dibuang dan dihitung.
+    Record pertama pada detik berikutnya membawa jumlah yang dibuang pada detik sebelumnya.
+    WARNING ke atas tidak pernah di-sample.
+    """
+
+    def __init__(self, max_per_second: int, max_level: int = logging.INFO):
+        super().__init__()
+        self.max_per_second = max_per_second
+        self.max_level = max_level
+        self._windows: Dict[Tuple[str, int], List[int]] = {} # call site -> [detik, jumlah lolos, jumlah dibuang]
+        self.dropped_total = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.max_per_second <= 0:
+            return True
+        site = (record.pathname, record.lineno)
+        second = int(record.created)
+        window = self._windows.get(site)
+        if window is None or window[0] != second:
+            dropped = window[2] if window is not None else 0
+            self._windows[site] = [second, 1, 0]
+            if dropped:
+                record.msg = f"{record.msg} [sampled: {dropped} similar messages dropped in the previous second]"
+            return True
+        if window[1] < self.max_per_second:
+            window[1] += 1
+            return True
+        window[2] += 1
+        self.dropped_total += 1
+        return False
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler bawaan memformat seluruh baris (waktu, level, traceback) di thread pemanggil.
+    Di sini hanya `msg % args` yang di-resolve (args bisa objek mutable yang berubah setelahnya);
+    format lengkap dikerjakan handler di thread listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_queue_logging(
+    level: str = "INFO",
+    *,
+    fmt: str = DEFAULT_FORMAT,
+    datefmt: str = DEFAULT_DATEFMT,
+    sample_max_per_second: int = 0,
+) -> QueueListener:
+    """
+    Mengganti handler root dengan QueueHandler -> QueueListener(StreamHandler stderr).
+    Idempotent: pemanggilan kedua mengembalikan listener yang sudah berjalan.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(fmt, datefmt))
+
+    queue_handler = LazyQueueHandler(log_queue)
+    if sample_max_per_second > 0:
+        queue_handler.addFilter(CallSiteSamplingFilter(sample_max_per_second))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_queue_logging) # Flush record yang masih di queue saat proses berhenti
+    return _listener
+
+
+def stop_queue_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def sampling_filter() -> Optional[CallSiteSamplingFilter]:
+    for handler in logging.getLogger().handlers:
+        for log_filter in handler.filters:
+            if isinstance(log_filter, CallSiteSamplingFilter):
+                return log_filter
+    return None
+
+
+def sampled_log_line_count() -> int:
+    log_filter = sampling_filter()
+    return log_filter.dropped_total if log_filter is not None else 0
@@ -0,0 +1,135 @@
+# ===========================================================================
+# File: app/utils/loop_lag.py (MODIFIKASI: Watchdog blocking via heartbeat + persentil lag)
+# ===========================================================================
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from app.utils.metrics import LabelValues, MetricsRegistry, registry as default_registry
+
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+LAG_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _quantile(sorted_values: List[float], quantile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(quantile * len(sorted_values)))
+    return sorted_values[index]
+
+
+class LoopLagMonitor:
+    """
+    Mengukur lag event loop: task tidur `interval` detik lalu mencatat keterlambatan bangunnya.
+    Lag tinggi berarti ada kode sinkron yang memblokir loop (CPU berat, I/O blocking).
+
+    Jika `block_threshold` diisi, task heartbeat terpisah memperbarui timestamp setiap
+    threshold/2 detik, dan thread watchdog memeriksa apakah heartbeat itu basi lebih dari
+    threshold. Heartbeat sengaja tidak menumpang sampler lag: sampler tidur `interval` detik,
+    jadi blocking yang selesai sebelum sampler bangun tidak akan terlihat. Selama loop masih
+    terblokir, stack thread loop diambil sekali (sys._current_frames) dan dicatat ke log,
+    jadi kode yang memblokir terlihat langsung.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        registry: MetricsRegistry = default_registry,
+        *,
+        block_threshold: Optional[float] = None,
+        logger: Optional[logging.Logger] = None,
+        window: int = 1200,
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.logger = logger or logging.getLogger(__name__)
+        self.last_lag = 0.0
+        self.blocked_count = 0
+        self.recent_blocks: Deque[Tuple[float, float, str]] = deque(maxlen=20) # (waktu, durasi saat capture, stack)
+        self._recent_lags: Deque[float] = deque(maxlen=window) # Jendela untuk persentil (default ~10 menit)
+        self._histogram = registry.histogram("event_loop_lag_seconds", "Event loop wake-up delay", buckets=LOOP_LAG_BUCKETS)
+        registry.callback_gauge("event_loop_lag_last_seconds", "Most recent event loop wake-up delay", lambda: [((), self.last_lag)])
+        registry.callback_gauge("event_loop_lag_quantile_seconds", "Event loop lag quantiles over the recent window", self._quantile_samples, ("quantile",))
+        registry.callback_counter("event_loop_blocked_total", "Times the watchdog saw the loop blocked past the threshold", lambda: [((), self.blocked_count)])
+        self._task: Optional[asyncio.Task] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_watchdog = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        # Blocking >= threshold yang dimulai kapan pun menunda heartbeat berikutnya >= threshold/2
+        self._heartbeat_interval = block_threshold / 2 if block_threshold else None
+        self._last_heartbeat: Optional[float] = None # Ditulis task heartbeat, dibaca thread watchdog
+
+    def _quantile_samples(self) -> List[Tuple[LabelValues, float]]:
+        values = sorted(self._recent_lags)
+        samples = [((str(quantile),), _quantile(values, quantile)) for quantile in LAG_QUANTILES]
+        samples.append((("max",), values[-1] if values else 0.0))
+        return samples
+
+    def start(self) -> None:
+        if self._task is None:
+            self._loop_thread_id = threading.get_ident()
+            self._task = asyncio.create_task(self._run())
+            if self.block_threshold:
+                self._last_heartbeat = time.perf_counter()
+                self._heartbeat_task = asyncio.create_task(self._heartbeat())
+                self._stop_watchdog.clear()
+                self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+                self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop_watchdog.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+        for task in (self._task, self._heartbeat_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._heartbeat_task = None
+        self._last_heartbeat = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, time.perf_counter() - expected)
+            self._histogram.observe(self.last_lag)
+            self._recent_lags.append(self.last_lag)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._last_heartbeat = time.perf_counter()
+            await asyncio.sleep(self._heartbeat_interval)
+
+    def _watch(self) -> None:
+        poll_interval = max(0.005, self.block_threshold / 4)
+        captured_for: Optional[float] = None # Satu capture per kejadian blocking
+        while not self._stop_watchdog.wait(poll_interval):
+            last_heartbeat = self._last_heartbeat
+            if last_heartbeat is None:
+                continue
+            # Lama loop tertahan: umur heartbeat dikurangi jeda tidurnya yang normal
+            overdue = time.perf_counter() - last_heartbeat - self._heartbeat_interval
+            if overdue < self.block_threshold or captured_for == last_heartbeat:
+                continue
+            captured_for = last_heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            self.blocked_count += 1
+            self.recent_blocks.append((time.time(), overdue, stack))
+            self.logger.warning(
+                "Event loop blocked for %.0f ms (threshold %.0f ms). Loop thread stack:\n%s",
+                overdue * 1000, self.block_threshold * 1000, stack,
+            )
@@ -0,0 +1,305 @@
+# ===========================================================================
+# File: app/utils/metrics.py (BARU)
+# ===========================================================================
+# Registry metrik ringan dengan output Prometheus text exposition format (0.0.4), tanpa
+# dependensi prometheus_client. Update metrik terjadi di event loop (satu thread), jadi
+# cukup operasi dict/list biasa tanpa lock; listener pool Motor (thread executor) memakai
+# lock kecil sendiri. Tidak bergantung pada app.core.config, dipakai juga oleh api.py.
+# Setiap worker punya registry sendiri: scrape per worker (atau lewat label instance).
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in list(self._values.items())]
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._values[labelvalues] = value
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) - amount
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in list(self._values.items())]
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label: [count per bucket (non-kumulatif, + slot +Inf)..., sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), series[:-1]):
+                cumulative += count
+                le_label = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le_label)} {cumulative}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-1])}")
+        return lines
+
+
+SampleCallback = Callable[[], Iterable[Tuple[LabelValues, float]]]
+
+
+class CallbackGauge(_Metric):
+    """Gauge yang nilainya dibaca saat scrape (stats pool, hit ratio cache, ...) dari satu atau lebih callback."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.callbacks: List[SampleCallback] = []
+
+    def add_callback(self, callback: SampleCallback) -> None:
+        self.callbacks.append(callback)
+
+    def render(self) -> List[str]:
+        lines = []
+        for callback in self.callbacks:
+            try:
+                samples = list(callback())
+            except Exception: # Collector yang rusak tidak boleh menggagalkan seluruh scrape
+                continue
+            lines.extend(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in samples)
+        return lines
+
+
+class CallbackCounter(CallbackGauge):
+    """Counter monotonic yang dibaca dari stats milik komponen lain saat scrape."""
+
+    metric_type = "counter"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._metrics.get(name) or self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._metrics.get(name) or self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._metrics.get(name) or self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback_gauge(self, name: str, documentation: str, callback: SampleCallback, labelnames: Sequence[str] = ()) -> CallbackGauge:
+        metric = self._metrics.get(name) or self.register(CallbackGauge(name, documentation, labelnames))
+        metric.add_callback(callback)
+        return metric
+
+    def callback_counter(self, name: str, documentation: str, callback: SampleCallback, labelnames: Sequence[str] = ()) -> CallbackCounter:
+        metric = self._metrics.get(name) or self.register(CallbackCounter(name, documentation, labelnames))
+        metric.add_callback(callback)
+        return metric
+
+    def render(self) -> bytes:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            samples = metric.render()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being processed", ("method",))
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if path_format:
+        return scope.get("root_path", "") + path_format
+    return "<unmatched>" # Jangan pakai path mentah: kardinalitas label tidak terbatas
+
+
+class MetricsMiddleware:
+    """Middleware ASGI murni: histogram latency per (method, route template, status) + gauge in-flight."""
+
+    def __init__(self, app: ASGIApp, *, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec(method)
+            http_request_duration.observe(time.perf_counter() - started, method, _route_template(scope), str(status_code))
+
+
+class MongoPoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Statistik pool Motor/PyMongo per alamat server. Event datang dari thread driver."""
+
+    def __init__(self, registry: MetricsRegistry = registry):
+        self._lock = threading.Lock()
+        self._open: Dict[str, int] = {}
+        self._checked_out: Dict[str, int] = {}
+        self._checkout_failures: Dict[str, int] = {}
+        registry.callback_gauge("mongo_pool_connections", "Open MongoDB connections per server", lambda: self._samples(self._open), ("address",))
+        registry.callback_gauge("mongo_pool_checked_out", "MongoDB connections checked out per server", lambda: self._samples(self._checked_out), ("address",))
+        registry.callback_gauge("mongo_pool_checkout_failures", "Failed MongoDB connection checkouts", lambda: self._samples(self._checkout_failures), ("address",))
+
+    def _samples(self, values: Dict[str, int]) -> List[Tuple[LabelValues, float]]:
+        with self._lock:
+            return [((address,), count) for address, count in values.items()]
+
+    def _add(self, values: Dict[str, int], address, delta: int) -> None:
+        key = f"{address[0]}:{address[1]}"
+        with self._lock:
+            values[key] = values.get(key, 0) + delta
+
+    def connection_created(self, event) -> None:
+        self._add(self._open, event.address, 1)
+
+    def connection_closed(self, event) -> None:
+        self._add(self._open, event.address, -1)
+
+    def connection_checked_out(self, event) -> None:
+        self._add(self._checked_out, event.address, 1)
+
+    def connection_checked_in(self, event) -> None:
+        self._add(self._checked_out, event.address, -1)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._add(self._checkout_failures, event.address, 1)
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+
+def register_redis_pool(name: str, get_client: Callable[[], Optional[object]], registry: MetricsRegistry = registry) -> None:
+    """Gauge koneksi pool redis.asyncio (in use / idle), dibaca saat scrape. `get_client` boleh mengembalikan None."""
+
+    def samples() -> List[Tuple[LabelValues, float]]:
+        client = get_client()
+        pool = getattr(client, "connection_pool", None)
+        if pool is None:
+            return []
+        return [
+            ((name, "in_use"), len(getattr(pool, "_in_use_connections", ()))),
+            ((name, "idle"), len(getattr(pool, "_available_connections", ()))),
+        ]
+
+    registry.callback_gauge("redis_pool_connections", "Redis pool connections per client and state", samples, ("client", "state"))
+
+
+def hit_ratio(hits: float, misses: float) -> float:
+    total = hits + misses
+    return hits / total if total else 0.0
@@ -0,0 +1,122 @@
+# ===========================================================================
+# File: app/utils/profiling.py (BARU)
+# ===========================================================================
+# Profiler on-demand untuk worker yang sedang berjalan: CPU lewat sampling stack thread
+# (sys._current_frames) dan memori lewat diff snapshot tracemalloc. Output dalam format
+# "folded stacks" (frame;frame;frame nilai), siap untuk flamegraph.pl / speedscope.
+# Tidak ada yang berjalan sebelum profiling diminta: thread sampler dan tracemalloc hanya
+# aktif selama sesi profiling.
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, Optional
+
+TRACEMALLOC_FRAMES = 25
+
+_path_prefixes = sorted({os.getcwd(), *(path for path in sys.path if path)}, key=len, reverse=True)
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _path_prefixes:
+        if filename.startswith(prefix):
+            return filename[len(prefix):].lstrip(os.sep)
+    return filename
+
+
+def _frame_label(code_name: Optional[str], filename: str, lineno: int) -> str:
+    location = f"{_short_path(filename)}:{lineno}"
+    label = f"{code_name}_({location})" if code_name else location
+    return label.replace(";", ":").replace(" ", "_") # ';' dan spasi adalah pemisah format folded
+
+
+def render_folded(counts: Dict[str, int]) -> str:
+    lines = [f"{stack} {value}" for stack, value in sorted(counts.items(), key=lambda item: item[1], reverse=True) if value > 0]
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+class StackSampler:
+    """
+    Mengambil sampel stack satu thread (default: thread pemanggil, yaitu thread event loop)
+    setiap `interval` detik dari thread terpisah. Untuk worker asyncio, sampel mencakup semua
+    coroutine yang berjalan di loop selama sesi, bukan hanya satu request.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.samples = 0
+        self._counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> "StackSampler":
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict[str, int]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._started
+        return dict(self._counts)
+
+    def _run(self) -> None:
+        code_labels: Dict[object, str] = {} # Cache label per code object: format string mahal
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                code = frame.f_code
+                label = code_labels.get(code)
+                if label is None:
+                    # Per fungsi (baris definisi), agar sampel dari baris berbeda tergabung di flame graph
+                    label = code_labels[code] = _frame_label(code.co_name, code.co_filename, code.co_firstlineno)
+                labels.append(label)
+                frame = frame.f_back
+            labels.reverse()
+            self._counts[";".join(labels)] += 1
+            self.samples += 1
+
+
+class MemoryTracer:
+    """Diff alokasi tracemalloc antara start() dan stop(), dikelompokkan per traceback (nilai = byte)."""
+
+    def __init__(self, frames: int = TRACEMALLOC_FRAMES):
+        self.frames = frames
+        self._owns_tracing = False
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self.total_bytes = 0
+
+    def start(self) -> "MemoryTracer":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        self._baseline = tracemalloc.take_snapshot()
+        return self
+
+    def stop(self) -> Dict[str, int]:
+        snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracing:
+            tracemalloc.stop()
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        snapshot = snapshot.filter_traces(filters)
+        baseline = self._baseline.filter_traces(filters)
+        counts: Dict[str, int] = {}
+        for stat in snapshot.compare_to(baseline, "traceback"):
+            if stat.size_diff <= 0:
+                continue
+            # Traceback tracemalloc terurut dari frame terlama (root), sama dengan urutan format folded
+            labels = [_frame_label(None, frame.filename, frame.lineno) for frame in stat.traceback]
+            stack = ";".join(labels)
+            counts[stack] = counts.get(stack, 0) + stat.size_diff
+            self.total_bytes += stat.size_diff
+        return counts
@@ -0,0 +1,177 @@
+# ===========================================================================
+# File: app/utils/server_timing.py (BARU)
+# ===========================================================================
+# Timer per request (contextvar) untuk header Server-Timing + satu log line terstruktur.
+# Tidak bergantung pada app.core.config, jadi dipakai juga oleh api.py (legacy, standalone).
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+TIMING_CATEGORIES = ("mongo", "redis", "upstream")
+
+
+class RequestTimings:
+    """Akumulator durasi + jumlah round trip per kategori untuk satu request."""
+
+    __slots__ = ("started", "_totals", "_counts", "_lock")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._totals: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock() # Event Motor datang dari thread executor
+
+    def add(self, category: str, seconds: float) -> None:
+        with self._lock:
+            self._totals[category] = self._totals.get(category, 0.0) + seconds
+            self._counts[category] = self._counts.get(category, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        {kategori: (total_ms, count)}, plus `total` (wall time) dan `other` = total dikurangi jumlah
+        durasi I/O. `other` BUKAN waktu CPU request ini: selain CPU dan serialisasi, isinya juga waktu
+        menunggu giliran di event loop (termasuk CPU request lain). CPU per request tidak bisa diukur
+        dengan delta time.thread_time(), karena coroutine semua request berbagi thread event loop.
+        """
+        total = time.perf_counter() - self.started
+        with self._lock:
+            result = {category: (self._totals[category] * 1000, self._counts[category]) for category in self._totals}
+        io_ms = sum(duration for duration, _ in result.values())
+        result["other"] = (max(0.0, total * 1000 - io_ms), 0)
+        result["total"] = (total * 1000, 0)
+        return result
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+def record(category: str, seconds: float) -> None:
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add(category, seconds)
+
+
+class MongoTimingListener(monitoring.CommandListener):
+    """Dipasang lewat `AsyncIOMotorClient(..., event_listeners=[MongoTimingListener()])`.
+    Motor menyalin contextvars ke thread executor, jadi event terhubung ke request yang memicunya."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        record("mongo", event.duration_micros / 1_000_000)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        record("mongo", event.duration_micros / 1_000_000)
+
+
+def instrument_redis(client: Any) -> Any:
+    """Bungkus `execute_command` milik instance client redis.asyncio (termasuk EVALSHA script).
+    Pipeline dan koneksi pub/sub tidak diukur."""
+    original_execute = client.execute_command
+
+    async def execute_command(*args, **options):
+        timings = current_timings.get()
+        if timings is None:
+            return await original_execute(*args, **options)
+        started = time.perf_counter()
+        try:
+            return await original_execute(*args, **options)
+        finally:
+            timings.add("redis", time.perf_counter() - started)
+
+    client.execute_command = execute_command
+    return client
+
+
+async def _httpx_request_started(request: Any) -> None:
+    request.extensions["server_timing_started"] = time.perf_counter()
+
+
+async def _httpx_response_received(response: Any) -> None:
+    started = response.request.extensions.get("server_timing_started")
+    if started is not None:
+        record("upstream", time.perf_counter() - started)
+
+
+def httpx_event_hooks() -> Dict[str, List[Any]]:
+    """`httpx.AsyncClient(event_hooks=httpx_event_hooks())`: waktu sampai header respons upstream diterima."""
+    return {"request": [_httpx_request_started], "response": [_httpx_response_received]}
+
+
+def aiohttp_trace_config() -> Any:
+    """`aiohttp.ClientSession(trace_configs=[aiohttp_trace_config()])`."""
+    import aiohttp # Hanya api.py yang memakai aiohttp
+
+    async def on_request_start(session, context, params) -> None:
+        context.server_timing_started = time.perf_counter()
+
+    async def on_request_finished(session, context, params) -> None:
+        started = getattr(context, "server_timing_started", None)
+        if started is not None:
+            record("upstream", time.perf_counter() - started)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_finished)
+    trace_config.on_request_exception.append(on_request_finished)
+    return trace_config
+
+
+def format_server_timing(snapshot: Dict[str, Any]) -> str:
+    parts = []
+    for category, (duration_ms, count) in snapshot.items():
+        if count:
+            parts.append(f'{category};dur={duration_ms:.1f};desc="{count} calls"')
+        else:
+            parts.append(f"{category};dur={duration_ms:.1f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI murni: memasang RequestTimings di contextvar dan menulis satu log line key=value
+    setelah body selesai. Header `Server-Timing` (nilai saat header dikirim) hanya ditambahkan jika
+    `expose_header`: rinciannya (jumlah query, waktu Redis/upstream) adalah info internal, jadi
+    default mati dan hanya dinyalakan untuk debugging.
+    Overhead saat request tidak memakai I/O: satu ContextVar.set + satu dict per request.
+    """
+
+    def __init__(self, app: ASGIApp, *, logger: Optional[logging.Logger] = None, expose_header: bool = False):
+        self.app = app
+        self.logger = logger or logging.getLogger(__name__)
+        self.expose_header = expose_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.expose_header:
+                    header_value = format_server_timing(timings.snapshot()).encode("latin-1")
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", header_value)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timings.reset(token)
+            if self.logger.isEnabledFor(logging.INFO):
+                snapshot = timings.snapshot()
+                fields = " ".join(
+                    f"{category}_ms={duration_ms:.1f}" + (f" {category}_calls={count}" if count else "")
+                    for category, (duration_ms, count) in snapshot.items()
+                )
+                self.logger.info("request_timing method=%s path=%s status=%s %s", scope["method"], scope["path"], status_code, fields)
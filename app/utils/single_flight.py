@@ -0,0 +1,53 @@
+# ===========================================================================
+# File: app/utils/single_flight.py (BARU)
+# ===========================================================================
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Menggabungkan pemanggilan bersamaan dengan key yang sama dalam satu proses.
+
+    Pemanggil pertama (leader) menjalankan `fn`; pemanggil lain dengan key yang
+    sama selama leader masih berjalan menunggu dan menerima hasil (atau
+    exception) yang sama, tanpa mengulang pekerjaannya.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        existing = self._calls.get(key)
+        while existing is not None:
+            try:
+                # shield: pembatalan satu follower tidak boleh membatalkan hasil bersama
+                return await asyncio.shield(existing)
+            except asyncio.CancelledError:
+                if not existing.cancelled():
+                    raise
+                # Leader dibatalkan (misal client disconnect); follower mencoba lagi sebagai leader baru
+                existing = self._calls.get(key)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception() # Tandai sudah diambil agar tidak ada warning jika tidak ada follower
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
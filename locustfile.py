@@ -1,12 +1,206 @@
-from locust import HttpUser, task, between
+# ===========================================================================
+# File: locustfile.py (MODIFIKASI: Skenario full journey untuk app utama)
+# ===========================================================================
+"""
+Load test full journey app utama (app.main):
+challenge -> sign (wallet eth_account lokal) -> connect, lalu polling directives / summary /
+badges / profil dengan If-None-Match, complete misi, dan sesekali connect X lewat stub.
 
-def generate_wallet_address():
-    return "0xCBc809C4a3243c5F0283754D8e5772FdA632aA96"
+Persiapan (MongoDB dan Redis lokal, upstream di-stub):
+    uvicorn app.scripts.loadtest_stubs:app --port 9100 &
+    RATE_LIMIT_ENABLED=false \\
+    TWITTER_API_BASE_URL=http://127.0.0.1:9100 \\
+    TWITTER_AUTHORIZATION_URL=http://127.0.0.1:9100/i/oauth2/authorize \\
+    uvicorn app.main:app --port 8000 --workers 4
+    locust -f locustfile.py --host http://127.0.0.1:8000 --headless -u 500 -r 50 -t 5m
 
-class CigarUser(HttpUser):
-    wait_time = between(0, 0)  # semua user submit di saat yang sama
+RATE_LIMIT_ENABLED=false karena semua user Locust datang dari satu IP.
+Env: LOADTEST_WALLETS (jumlah wallet, default 5000), LOADTEST_WALLET_SEED (seed kunci).
+Wallet dipakai bergiliran; setelah semua terpakai, user baru login ulang dengan wallet lama
+(returning user). Ringkasan latency per langkah (p50/p95/p99) dan throughput dicetak saat test
+berhenti; Locust juga menulis statistik lengkap lewat --csv / --html.
+
+Skenario lama (POST /register ke api.py): LOCUST_SCENARIO=legacy.
+"""
+import hashlib
+import itertools
+import os
+import random
+import threading
+from typing import Dict, List, Optional
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from locust import HttpUser, between, events, task
+
+API = "/api/v1"
+WALLET_COUNT = int(os.getenv("LOADTEST_WALLETS", "5000"))
+WALLET_SEED = os.getenv("LOADTEST_WALLET_SEED", "cigar-loadtest")
+LEGACY_SCENARIO = os.getenv("LOCUST_SCENARIO", "journey") == "legacy"
+
+# Urutan langkah di ringkasan akhir (nama request Locust)
+JOURNEY_STEPS = [
+    "auth: challenge", "auth: connect",
+    "missions: directives", "missions: summary", "users: badges", "users: me",
+    "missions: complete", "x: initiate-oauth", "x: callback",
+]
+COMPLETABLE_ACTIONS = {"external_link", "api_call", "claim_if_eligible"}
+
+_wallet_index = itertools.count()
+_wallet_lock = threading.Lock()
+
+
+def next_wallet() -> Account:
+    """Kunci privat deterministik dari seed + indeks: wallet yang sama di setiap run (dan di setiap worker Locust)."""
+    with _wallet_lock:
+        index = next(_wallet_index) % WALLET_COUNT
+    private_key = hashlib.sha256(f"{WALLET_SEED}:{index}".encode("utf-8")).digest()
+    return Account.from_key(private_key)
+
+
+class AgentJourneyUser(HttpUser):
+    abstract = LEGACY_SCENARIO
+    wait_time = between(1, 5)
+
+    def on_start(self) -> None:
+        self.account = next_wallet()
+        self.etags: Dict[str, str] = {}
+        self.directives: List[dict] = []
+        self.x_connected = False
+        self.headers: Dict[str, str] = {}
+        self.connect_wallet()
+
+    def connect_wallet(self) -> None:
+        with self.client.get(
+            f"{API}/auth/challenge", params={"walletAddress": self.account.address}, name="auth: challenge", catch_response=True
+        ) as response:
+            if response.status_code != 200:
+                response.failure(f"challenge status {response.status_code}")
+                return
+            challenge = response.json()
+        signed = Account.sign_message(encode_defunct(text=challenge["messageToSign"]), self.account.key)
+        payload = {
+            "walletAddress": self.account.address,
+            "message": challenge["messageToSign"],
+            "signature": "0x" + bytes(signed.signature).hex(),
+            "nonce": challenge["nonce"],
+        }
+        with self.client.post(f"{API}/auth/connect", json=payload, name="auth: connect", catch_response=True) as response:
+            if response.status_code != 200:
+                response.failure(f"connect status {response.status_code}")
+                return
+            body = response.json()
+        self.headers = {"Authorization": f"Bearer {body['access_token']}"}
+        self.x_connected = bool(body["user"].get("twitter_data"))
+
+    def conditional_get(self, path: str, name: str) -> Optional[dict]:
+        """GET dengan If-None-Match seperti frontend; 304 dihitung sukses dan tidak membawa body."""
+        headers = dict(self.headers)
+        if path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        with self.client.get(path, headers=headers, name=name, catch_response=True) as response:
+            if response.status_code == 304:
+                response.success()
+                return None
+            if response.status_code != 200:
+                response.failure(f"status {response.status_code}")
+                return None
+            if "etag" in response.headers:
+                self.etags[path] = response.headers["etag"]
+            return response.json()
+
+    @task(8)
+    def poll_directives(self) -> None:
+        if not self.headers:
+            return self.connect_wallet()
+        body = self.conditional_get(f"{API}/missions/directives", "missions: directives")
+        if body is not None:
+            self.directives = body["directives"]
+
+    @task(4)
+    def poll_summary(self) -> None:
+        if self.headers:
+            self.conditional_get(f"{API}/missions/me/summary", "missions: summary")
+
+    @task(2)
+    def poll_badges(self) -> None:
+        if self.headers:
+            self.conditional_get(f"{API}/users/me/badges", "users: badges")
+
+    @task(3)
+    def view_profile(self) -> None:
+        if self.headers:
+            self.conditional_get(f"{API}/users/me", "users: me")
+
+    @task(2)
+    def complete_mission(self) -> None:
+        candidates = [
+            directive for directive in self.directives
+            if directive["status"] == "available" and directive["action"]["type"] in COMPLETABLE_ACTIONS
+        ]
+        if not self.headers or not candidates:
+            return
+        mission = random.choice(candidates)
+        with self.client.post(
+            f"{API}/missions/directives/{mission['missionId_str']}/complete",
+            headers=self.headers, name="missions: complete", catch_response=True,
+        ) as response:
+            # 400 (sudah check-in / target ally belum tercapai) adalah hasil bisnis yang sah, bukan error beban
+            if response.status_code in (200, 400):
+                response.success()
+            else:
+                response.failure(f"status {response.status_code}")
+        mission["status"] = "completed" # Jangan ulangi sampai directives berikutnya memperbarui status
+
+    @task(1)
+    def connect_x(self) -> None:
+        if not self.headers or self.x_connected:
+            return
+        with self.client.get(f"{API}/auth/x/initiate-oauth", headers=self.headers, name="x: initiate-oauth", catch_response=True) as response:
+            if response.status_code != 200:
+                response.failure(f"status {response.status_code}")
+                return
+            redirect_url = response.json()["redirect_url"]
+        state = redirect_url.split("state=", 1)[1].split("&", 1)[0]
+        code = hashlib.sha256(self.account.address.encode("utf-8")).hexdigest()[:24] # Akun X stub tetap per wallet
+        with self.client.get(
+            f"{API}/auth/x/callback", params={"state": state, "code": code},
+            name="x: callback", allow_redirects=False, catch_response=True,
+        ) as response:
+            location = response.headers.get("location", "")
+            if response.status_code == 307 and "x_connected=true" in location:
+                self.x_connected = True
+                response.success()
+            else:
+                response.failure(f"status {response.status_code}, location {location[:120]}")
+
+
+class LegacyRegisterUser(HttpUser):
+    """Skenario lama untuk api.py: semua user submit POST /register bersamaan."""
+
+    abstract = not LEGACY_SCENARIO
+    wait_time = between(0, 0)
 
     @task
-    def register_wallet(self):
-        wallet = generate_wallet_address()
-        self.client.post("/register", json={"wallet_address": wallet})
+    def register_wallet(self) -> None:
+        self.client.post("/register", json={"wallet_address": next_wallet().address})
+
+
+@events.test_stop.add_listener
+def print_step_summary(environment, **kwargs) -> None:
+    stats = environment.stats
+    if not stats.entries:
+        return
+    order = {name: index for index, name in enumerate(JOURNEY_STEPS)}
+    entries = sorted(stats.entries.values(), key=lambda entry: (order.get(entry.name, len(order)), entry.name))
+    print(f"\n{'step':<24}{'requests':>10}{'fails':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for entry in entries:
+        print(
+            f"{entry.name:<24}{entry.num_requests:>10}{entry.num_failures:>8}{entry.total_rps:>9.1f}"
+            f"{entry.get_response_time_percentile(0.5):>9.0f}{entry.get_response_time_percentile(0.95):>9.0f}"
+            f"{entry.get_response_time_percentile(0.99):>9.0f}{entry.max_response_time:>9.0f}"
+        )
+    total = stats.total
+    print(f"{'total':<24}{total.num_requests:>10}{total.num_failures:>8}{total.total_rps:>9.1f}"
+          f"{total.get_response_time_percentile(0.5):>9.0f}{total.get_response_time_percentile(0.95):>9.0f}"
+          f"{total.get_response_time_percentile(0.99):>9.0f}{total.max_response_time:>9.0f}")